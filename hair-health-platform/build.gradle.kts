@@ -45,6 +45,7 @@ dependencies {
     implementation("io.projectreactor.kotlin:reactor-kotlin-extensions")
     implementation("org.jetbrains.kotlin:kotlin-reflect")
     implementation("org.jetbrains.kotlinx:kotlinx-coroutines-reactor")
+    implementation("org.jetbrains.kotlinx:kotlinx-coroutines-slf4j") // MDC (request id) across coroutine hops
     
 	// JWT and Security
     implementation("io.jsonwebtoken:jjwt-api:0.12.3")
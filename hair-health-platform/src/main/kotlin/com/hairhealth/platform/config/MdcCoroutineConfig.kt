@@ -0,0 +1,37 @@
+package com.hairhealth.platform.config
+
+import kotlinx.coroutines.slf4j.MDCContext
+import org.springframework.boot.autoconfigure.web.servlet.WebMvcRegistrations
+import org.springframework.context.annotation.Bean
+import org.springframework.context.annotation.Configuration
+import org.springframework.core.CoroutinesUtils
+import org.springframework.web.method.HandlerMethod
+import org.springframework.web.servlet.mvc.method.annotation.RequestMappingHandlerAdapter
+import org.springframework.web.servlet.mvc.method.annotation.ServletInvocableHandlerMethod
+import java.lang.reflect.Method
+
+/**
+ * Carries the servlet thread's MDC (notably the request id set by [RequestIdFilter]) into
+ * suspend controller methods. Without this, anything logged after a `withContext(Dispatchers.IO)`
+ * hop runs on a pool thread with an empty MDC.
+ */
+@Configuration
+class MdcCoroutineConfig {
+
+    @Bean
+    fun mdcWebMvcRegistrations(): WebMvcRegistrations = object : WebMvcRegistrations {
+        override fun getRequestMappingHandlerAdapter(): RequestMappingHandlerAdapter =
+            MdcRequestMappingHandlerAdapter()
+    }
+}
+
+class MdcRequestMappingHandlerAdapter : RequestMappingHandlerAdapter() {
+    override fun createInvocableHandlerMethod(handlerMethod: HandlerMethod): ServletInvocableHandlerMethod =
+        MdcInvocableHandlerMethod(handlerMethod)
+}
+
+class MdcInvocableHandlerMethod(handlerMethod: HandlerMethod) : ServletInvocableHandlerMethod(handlerMethod) {
+    // MDCContext() snapshots the MDC of the calling (servlet) thread and restores it on every resume.
+    override fun invokeSuspendingFunction(method: Method, target: Any, args: Array<Any?>): Any =
+        CoroutinesUtils.invokeSuspendingFunction(MDCContext(), method, target, *args)
+}
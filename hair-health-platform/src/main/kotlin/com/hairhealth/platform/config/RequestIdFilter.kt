@@ -0,0 +1,74 @@
+package com.hairhealth.platform.config
+
+import jakarta.servlet.FilterChain
+import jakarta.servlet.http.HttpServletRequest
+import jakarta.servlet.http.HttpServletResponse
+import org.slf4j.LoggerFactory
+import org.slf4j.MDC
+import org.springframework.core.Ordered
+import org.springframework.core.annotation.Order
+import org.springframework.stereotype.Component
+import org.springframework.web.filter.OncePerRequestFilter
+import java.util.UUID
+
+/**
+ * Tags every request with an id so client timings can be joined with server log lines.
+ *
+ * The id comes from the `X-Request-ID` header (the perf harness sends one per call) or is
+ * generated here. It is put into the SLF4J MDC as `requestId`, echoed on the response, and
+ * picked up by [com.hairhealth.platform.service.AuditLogService]. Runs before Spring Security
+ * so authentication failures are tagged too.
+ *
+ * Controllers are suspend functions, so Spring MVC handles most requests in two dispatches:
+ * the first returns as soon as async processing starts, and an ASYNC dispatch writes the
+ * response. The filter runs on both, keeping the id and start time in request attributes,
+ * and logs the `Completed ...` line (read by tests/request_join.py) only on the dispatch that
+ * finishes the request, so it carries the real status and duration.
+ */
+@Component
+@Order(Ordered.HIGHEST_PRECEDENCE)
+class RequestIdFilter : OncePerRequestFilter() {
+
+    private val logger = LoggerFactory.getLogger(RequestIdFilter::class.java)
+
+    override fun shouldNotFilterAsyncDispatch(): Boolean = false
+
+    override fun doFilterInternal(
+        request: HttpServletRequest,
+        response: HttpServletResponse,
+        filterChain: FilterChain
+    ) {
+        val requestId = request.getAttribute(ID_ATTRIBUTE) as String?
+            ?: (sanitize(request.getHeader(HEADER)) ?: UUID.randomUUID().toString()).also {
+                request.setAttribute(ID_ATTRIBUTE, it)
+                request.setAttribute(STARTED_ATTRIBUTE, System.nanoTime())
+                response.setHeader(HEADER, it)
+            }
+        MDC.put(MDC_KEY, requestId)
+        try {
+            filterChain.doFilter(request, response)
+        } finally {
+            if (!request.isAsyncStarted && logger.isDebugEnabled) {
+                val started = request.getAttribute(STARTED_ATTRIBUTE) as Long
+                val elapsedMs = (System.nanoTime() - started) / 1_000_000.0
+                logger.debug(
+                    "Completed {} {} -> {} in {}ms",
+                    request.method, request.requestURI, response.status, "%.1f".format(elapsedMs)
+                )
+            }
+            MDC.remove(MDC_KEY)
+        }
+    }
+
+    // Client-supplied ids end up in log lines; accept only short, plain tokens.
+    private fun sanitize(value: String?): String? =
+        value?.takeIf { it.length in 1..MAX_LENGTH && it.all { c -> c.isLetterOrDigit() || c in "-_." } }
+
+    companion object {
+        const val HEADER = "X-Request-ID"
+        const val MDC_KEY = "requestId"
+        private val ID_ATTRIBUTE = RequestIdFilter::class.java.name + ".id"
+        private val STARTED_ATTRIBUTE = RequestIdFilter::class.java.name + ".started"
+        private const val MAX_LENGTH = 64
+    }
+}
@@ -28,6 +28,7 @@ class SecurityConfig {
                 auth
                 // .anyRequest().permitAll() . toggle for debug
                     .requestMatchers("/api/v1/auth/**", "/api/v1/test/public", "/swagger-ui/**", "/v3/api-docs/**", "/api-docs/**").permitAll() // Public auth and docs
+                    .requestMatchers("/api/v1/dev/snapshots/**").permitAll() // Token-checked in DevSnapshotController; only exists when app.dev.snapshots.enabled=true
                     .requestMatchers(HttpMethod.GET, "/api/v1/professionals/me").hasAuthority("ROLE_PROFESSIONAL") // Secure professional /me
                     // Example for securing recommendation endpoints for professionals - adjust paths as needed
                     .requestMatchers("/api/v1/professionals/me/recommendations/**").hasAuthority("ROLE_PROFESSIONAL")
@@ -0,0 +1,68 @@
+package com.hairhealth.platform.controller
+
+import com.hairhealth.platform.service.DatasetSnapshotService
+import com.hairhealth.platform.service.dto.DatasetFingerprintResponse
+import com.hairhealth.platform.service.dto.DatasetSnapshotResponse
+import org.springframework.beans.factory.annotation.Value
+import org.springframework.boot.autoconfigure.condition.ConditionalOnProperty
+import org.springframework.http.HttpStatus
+import org.springframework.web.bind.annotation.*
+import org.springframework.web.server.ResponseStatusException
+import java.security.MessageDigest
+
+// Dataset snapshots for benchmark runs (tests/dataset_snapshot.py). Only registered when
+// app.dev.snapshots.enabled=true; open to anonymous callers (a snapshot must not contain the
+// caller's own account), so every call carries the shared X-Snapshot-Token instead.
+@RestController
+@RequestMapping("/api/v1/dev/snapshots")
+@ConditionalOnProperty(name = ["app.dev.snapshots.enabled"], havingValue = "true")
+class DevSnapshotController(
+    private val datasetSnapshotService: DatasetSnapshotService,
+    @Value("\${app.dev.snapshots.token:}") private val snapshotToken: String
+) {
+
+    @PostMapping("/{name}")
+    suspend fun exportSnapshot(
+        @RequestHeader("X-Snapshot-Token", required = false) token: String?,
+        @PathVariable name: String
+    ): DatasetSnapshotResponse {
+        checkToken(token)
+        return handle { datasetSnapshotService.export(name) }
+    }
+
+    @PostMapping("/{name}/restore")
+    suspend fun restoreSnapshot(
+        @RequestHeader("X-Snapshot-Token", required = false) token: String?,
+        @PathVariable name: String
+    ): DatasetSnapshotResponse {
+        checkToken(token)
+        return handle { datasetSnapshotService.restore(name) }
+    }
+
+    @GetMapping("/fingerprint")
+    suspend fun fingerprint(
+        @RequestHeader("X-Snapshot-Token", required = false) token: String?
+    ): DatasetFingerprintResponse {
+        checkToken(token)
+        return handle { DatasetFingerprintResponse(datasetSnapshotService.rowCounts()) }
+    }
+
+    private fun checkToken(token: String?) {
+        if (snapshotToken.isBlank()) {
+            throw ResponseStatusException(HttpStatus.FORBIDDEN, "app.dev.snapshots.token is not configured")
+        }
+        if (token == null || !MessageDigest.isEqual(token.toByteArray(), snapshotToken.toByteArray())) {
+            throw ResponseStatusException(HttpStatus.FORBIDDEN, "Invalid snapshot token")
+        }
+    }
+
+    private suspend fun <T> handle(block: suspend () -> T): T = try {
+        block()
+    } catch (e: NoSuchElementException) {
+        throw ResponseStatusException(HttpStatus.NOT_FOUND, e.message)
+    } catch (e: IllegalArgumentException) {
+        throw ResponseStatusException(HttpStatus.BAD_REQUEST, e.message)
+    } catch (e: IllegalStateException) {
+        throw ResponseStatusException(HttpStatus.CONFLICT, e.message)
+    }
+}
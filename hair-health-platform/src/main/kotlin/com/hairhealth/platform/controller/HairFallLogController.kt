@@ -3,11 +3,17 @@ package com.hairhealth.platform.controller
 import com.hairhealth.platform.domain.HairFallCategory // Keep this if service expects enum
 import com.hairhealth.platform.security.UserPrincipal
 import com.hairhealth.platform.service.HairFallLogService
+import com.hairhealth.platform.service.dto.BatchCreateHairFallLogsRequest
+import com.hairhealth.platform.service.dto.BatchCreateHairFallLogsResponse
 import com.hairhealth.platform.service.dto.CreateHairFallLogRequest // Import new DTO
 import com.hairhealth.platform.service.dto.HairFallLogResponse // Import new DTO
+import com.hairhealth.platform.service.dto.InvalidCursorException
+import com.hairhealth.platform.service.dto.PageCursor
 import com.hairhealth.platform.service.dto.toResponse // Import mapper
+import com.hairhealth.platform.service.dto.validationError
 // It seems toDomain is not directly used here if service expects raw params for create
 // import com.hairhealth.platform.service.dto.toDomain
+import org.springframework.beans.factory.annotation.Value
 import org.springframework.format.annotation.DateTimeFormat
 import org.springframework.http.HttpStatus
 import org.springframework.http.ResponseEntity
@@ -23,7 +29,8 @@ import java.util.*
 @RequestMapping("/api/v1/me/hair-fall-logs")
 // @PreAuthorize("hasAuthority('ROLE_USER')") // Add once security config is confirmed
 class HairFallLogController(
-    private val hairFallLogService: HairFallLogService
+    private val hairFallLogService: HairFallLogService,
+    @Value("\${app.hair-fall-logs.batch-max-size:500}") private val batchMaxSize: Int
 ) {
 
     @PostMapping
@@ -31,12 +38,9 @@ class HairFallLogController(
         @AuthenticationPrincipal userPrincipal: UserPrincipal,
         @Valid @RequestBody request: CreateHairFallLogRequest // Use DTO from service.dto
     ): ResponseEntity<HairFallLogResponse> {
+        request.validationError()?.let { throw ResponseStatusException(HttpStatus.BAD_REQUEST, it) }
         // Adapt to existing service method signature
-        val categoryEnum = try {
-            HairFallCategory.valueOf(request.category.uppercase())
-        } catch (e: IllegalArgumentException) {
-            throw ResponseStatusException(HttpStatus.BAD_REQUEST, "Invalid category: ${request.category}")
-        }
+        val categoryEnum = HairFallCategory.valueOf(request.category.uppercase())
 
         val domainHairFallLog = hairFallLogService.createHairFallLog(
             userId = userPrincipal.userId,
@@ -50,18 +54,50 @@ class HairFallLogController(
         return ResponseEntity.status(HttpStatus.CREATED).body(domainHairFallLog.toResponse())
     }
 
+    @PostMapping("/batch")
+    suspend fun createHairFallLogsBatch(
+        @AuthenticationPrincipal userPrincipal: UserPrincipal,
+        @Valid @RequestBody request: BatchCreateHairFallLogsRequest
+    ): ResponseEntity<BatchCreateHairFallLogsResponse> {
+        if (request.logs.isEmpty() || request.logs.size > batchMaxSize) {
+            throw ResponseStatusException(HttpStatus.BAD_REQUEST, "A batch holds 1 to $batchMaxSize logs, got ${request.logs.size}")
+        }
+        val result = hairFallLogService.createHairFallLogsBatch(userPrincipal.userId, request.logs)
+        val status = when {
+            result.failed == 0 -> HttpStatus.CREATED
+            result.created == 0 -> HttpStatus.BAD_REQUEST
+            else -> HttpStatus.MULTI_STATUS // some created, some rejected; see results
+        }
+        return ResponseEntity.status(status).body(result)
+    }
+
     @GetMapping
     suspend fun getHairFallLogs(
         @AuthenticationPrincipal userPrincipal: UserPrincipal,
         @RequestParam(defaultValue = "50") limit: Int, // Default to 50 as per existing service
-        @RequestParam(defaultValue = "0") offset: Int
+        @RequestParam(defaultValue = "0") offset: Int,
+        @RequestParam(required = false) cursor: String? // X-Next-Cursor of the previous page; offset is ignored
     ): ResponseEntity<List<HairFallLogResponse>> {
-        val logs = hairFallLogService.getHairFallLogsByUserId(
-            userId = userPrincipal.userId,
-            limit = limit,
-            offset = offset
-        )
-        return ResponseEntity.ok(logs.map { it.toResponse() }) // Map list items
+        val logs = try {
+            if (cursor != null) {
+                hairFallLogService.getHairFallLogsAfter(userPrincipal.userId, limit, PageCursor.decode(cursor))
+            } else {
+                hairFallLogService.getHairFallLogsByUserId(
+                    userId = userPrincipal.userId,
+                    limit = limit,
+                    offset = offset
+                )
+            }
+        } catch (e: InvalidCursorException) {
+            throw ResponseStatusException(HttpStatus.BAD_REQUEST, e.message)
+        }
+        val response = ResponseEntity.ok()
+        // A full page may have more behind it; the cursor lets the client seek there instead of using offset
+        if (limit > 0 && logs.size == limit) {
+            val last = logs.last()
+            response.header(PageCursor.HEADER, PageCursor.of(last.date, last.id).encode())
+        }
+        return response.body(logs.map { it.toResponse() }) // Map list items
     }
 
     @GetMapping("/date-range")
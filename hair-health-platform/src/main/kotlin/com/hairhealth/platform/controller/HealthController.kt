@@ -1,19 +1,25 @@
 package com.hairhealth.platform.controller
 
+import org.springframework.beans.factory.annotation.Value
 import org.springframework.web.bind.annotation.GetMapping
 import org.springframework.web.bind.annotation.RequestMapping
 import org.springframework.web.bind.annotation.RestController
 
 @RestController
 @RequestMapping("/api/v1")
-class HealthController {
+class HealthController(
+    // Unset means production: tooling that needs a non-production target (offline token minting
+    // in tests/jwt_mint.py) checks this value and refuses anything else.
+    @Value("\${app.environment:production}") private val environment: String
+) {
 
     @GetMapping("/health")
     fun health(): Map<String, String> {
         return mapOf(
             "status" to "UP",
             "service" to "Hair Health Platform",
-            "version" to "0.0.1-SNAPSHOT"
+            "version" to "0.0.1-SNAPSHOT",
+            "environment" to environment
         )
     }
-}
\ No newline at end of file
+}
@@ -7,7 +7,9 @@ import com.hairhealth.platform.service.InterventionInteractionException
 import com.hairhealth.platform.service.dto.CreateInterventionRequest
 import com.hairhealth.platform.service.dto.InterventionApplicationResponse
 import com.hairhealth.platform.service.dto.InterventionResponse
+import com.hairhealth.platform.service.dto.InvalidCursorException
 import com.hairhealth.platform.service.dto.LogApplicationRequest
+import com.hairhealth.platform.service.dto.PageCursor
 import org.springframework.http.HttpStatus
 import org.springframework.http.ResponseEntity
 import org.springframework.security.access.prepost.PreAuthorize
@@ -76,13 +78,25 @@ class InterventionController(
         @AuthenticationPrincipal userPrincipal: UserPrincipal,
         @PathVariable id: UUID, // This is interventionId
         @RequestParam(defaultValue = "50") limit: Int,
-        @RequestParam(defaultValue = "0") offset: Int
+        @RequestParam(defaultValue = "0") offset: Int,
+        @RequestParam(required = false) cursor: String? // X-Next-Cursor of the previous page; offset is ignored
     ): ResponseEntity<Any> { // Changed to ResponseEntity<Any> for error handling
          return try {
-            val applications = interventionService.getApplicationsForIntervention(userPrincipal.userId, id, limit, offset)
-            ResponseEntity.ok(applications)
+            val applications = if (cursor != null) {
+                interventionService.getApplicationsForInterventionAfter(userPrincipal.userId, id, limit, PageCursor.decode(cursor))
+            } else {
+                interventionService.getApplicationsForIntervention(userPrincipal.userId, id, limit, offset)
+            }
+            val response = ResponseEntity.ok()
+            if (limit > 0 && applications.size == limit) {
+                val last = applications.last()
+                response.header(PageCursor.HEADER, PageCursor.of(last.timestamp, last.id).encode())
+            }
+            response.body(applications)
         } catch (e: InterventionNotFoundException) {
             ResponseEntity.status(HttpStatus.NOT_FOUND).body(mapOf("message" to e.message))
+        } catch (e: InvalidCursorException) {
+            ResponseEntity.status(HttpStatus.BAD_REQUEST).body(mapOf("message" to e.message))
         }
     }
 }
\ No newline at end of file
@@ -6,9 +6,12 @@ import java.util.UUID
 
 interface HairFallLogRepository {
     suspend fun create(hairFallLog: HairFallLog): HairFallLog
+    suspend fun createAll(hairFallLogs: List<HairFallLog>): List<HairFallLog> // one JDBC batch, one transaction
     suspend fun findById(id: UUID): HairFallLog? // General find by ID
     suspend fun findByIdAndUserId(id: UUID, userId: UUID): HairFallLog? // Find by ID ensuring user ownership
     suspend fun findByUserId(userId: UUID, limit: Int = 50, offset: Int = 0): List<HairFallLog>
+    // Keyset page: rows after (afterDate, afterId) in findByUserId order; both null for the first page
+    suspend fun findByUserIdAfter(userId: UUID, limit: Int, afterDate: LocalDate?, afterId: UUID?): List<HairFallLog>
     suspend fun findByUserIdAndDateRange(
         userId: UUID, 
         startDate: LocalDate, 
@@ -22,6 +22,13 @@ interface InterventionApplicationRepository {
     suspend fun create(application: InterventionApplication): InterventionApplication
     suspend fun findById(id: UUID): InterventionApplication?
     suspend fun findByInterventionId(interventionId: UUID, limit: Int = 50, offset: Int = 0): List<InterventionApplication>
+    // Keyset page: rows after (afterTimestamp, afterId) in findByInterventionId order; both null for the first page
+    suspend fun findByInterventionIdAfter(
+        interventionId: UUID,
+        limit: Int,
+        afterTimestamp: Instant?,
+        afterId: UUID?
+    ): List<InterventionApplication>
     suspend fun findByUserIdAndDateRange(
         userId: UUID,
         startDate: Instant, // Changed from LocalDate
@@ -8,6 +8,7 @@ import kotlinx.coroutines.withContext
 import org.springframework.jdbc.core.namedparam.MapSqlParameterSource
 import org.springframework.jdbc.core.namedparam.NamedParameterJdbcTemplate
 import org.springframework.stereotype.Repository
+import org.springframework.transaction.support.TransactionTemplate
 import java.sql.Date
 import java.sql.ResultSet
 import java.sql.Timestamp
@@ -16,30 +17,43 @@ import java.util.*
 
 @Repository
 class JdbcHairFallLogRepository(
-    private val jdbcTemplate: NamedParameterJdbcTemplate
+    private val jdbcTemplate: NamedParameterJdbcTemplate,
+    private val transactionTemplate: TransactionTemplate
 ) : HairFallLogRepository {
 
-    override suspend fun create(hairFallLog: HairFallLog): HairFallLog = withContext(Dispatchers.IO) {
-        val sql = """
+    companion object {
+        private val INSERT_SQL = """
             INSERT INTO hair_fall_logs (id, user_id, date, count, category, description, photo_metadata_id, created_at, updated_at)
             VALUES (:id, :userId, :date, :count, :category, :description, :photoMetadataId, :createdAt, :updatedAt)
         """.trimIndent()
+    }
 
-        val params = MapSqlParameterSource()
-            .addValue("id", hairFallLog.id)
-            .addValue("userId", hairFallLog.userId)
-            .addValue("date", Date.valueOf(hairFallLog.date))
-            .addValue("count", hairFallLog.count)
-            .addValue("category", hairFallLog.category.name)
-            .addValue("description", hairFallLog.description)
-            .addValue("photoMetadataId", hairFallLog.photoMetadataId)
-            .addValue("createdAt", Timestamp.from(hairFallLog.createdAt))
-            .addValue("updatedAt", Timestamp.from(hairFallLog.updatedAt))
-
-        jdbcTemplate.update(sql, params)
+    override suspend fun create(hairFallLog: HairFallLog): HairFallLog = withContext(Dispatchers.IO) {
+        jdbcTemplate.update(INSERT_SQL, insertParams(hairFallLog))
         hairFallLog
     }
 
+    override suspend fun createAll(hairFallLogs: List<HairFallLog>): List<HairFallLog> = withContext(Dispatchers.IO) {
+        if (hairFallLogs.isEmpty()) return@withContext hairFallLogs
+        // One prepared statement executed as a JDBC batch (pgjdbc folds it into multi-row INSERTs
+        // with reWriteBatchedInserts=true); the transaction makes the batch all-or-nothing.
+        transactionTemplate.executeWithoutResult {
+            jdbcTemplate.batchUpdate(INSERT_SQL, hairFallLogs.map { insertParams(it) }.toTypedArray())
+        }
+        hairFallLogs
+    }
+
+    private fun insertParams(hairFallLog: HairFallLog) = MapSqlParameterSource()
+        .addValue("id", hairFallLog.id)
+        .addValue("userId", hairFallLog.userId)
+        .addValue("date", Date.valueOf(hairFallLog.date))
+        .addValue("count", hairFallLog.count)
+        .addValue("category", hairFallLog.category.name)
+        .addValue("description", hairFallLog.description)
+        .addValue("photoMetadataId", hairFallLog.photoMetadataId)
+        .addValue("createdAt", Timestamp.from(hairFallLog.createdAt))
+        .addValue("updatedAt", Timestamp.from(hairFallLog.updatedAt))
+
     override suspend fun findById(id: UUID): HairFallLog? = withContext(Dispatchers.IO) {
         val sql = """
             SELECT id, user_id, date, count, category, description, photo_metadata_id, created_at, updated_at
@@ -79,7 +93,7 @@ class JdbcHairFallLogRepository(
             SELECT id, user_id, date, count, category, description, photo_metadata_id, created_at, updated_at
             FROM hair_fall_logs
             WHERE user_id = :userId
-            ORDER BY date DESC, created_at DESC
+            ORDER BY date DESC, id DESC
             LIMIT :limit OFFSET :offset
         """.trimIndent()
 
@@ -91,6 +105,31 @@ class JdbcHairFallLogRepository(
         jdbcTemplate.query(sql, params) { rs, _ -> mapRowToHairFallLog(rs) }
     }
 
+    override suspend fun findByUserIdAfter(
+        userId: UUID,
+        limit: Int,
+        afterDate: LocalDate?,
+        afterId: UUID?
+    ): List<HairFallLog> = withContext(Dispatchers.IO) {
+        // Seeks on idx_hair_fall_logs_user_id_date_id, so page cost does not grow with depth
+        val seek = if (afterDate != null && afterId != null) "AND (date, id) < (:afterDate, :afterId)" else ""
+        val sql = """
+            SELECT id, user_id, date, count, category, description, photo_metadata_id, created_at, updated_at
+            FROM hair_fall_logs
+            WHERE user_id = :userId $seek
+            ORDER BY date DESC, id DESC
+            LIMIT :limit
+        """.trimIndent()
+
+        val params = MapSqlParameterSource()
+            .addValue("userId", userId)
+            .addValue("limit", limit)
+            .addValue("afterDate", afterDate?.let { Date.valueOf(it) })
+            .addValue("afterId", afterId)
+
+        jdbcTemplate.query(sql, params) { rs, _ -> mapRowToHairFallLog(rs) }
+    }
+
     override suspend fun findByUserIdAndDateRange(
         userId: UUID,
         startDate: LocalDate,
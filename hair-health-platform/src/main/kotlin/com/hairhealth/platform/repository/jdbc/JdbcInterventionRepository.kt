@@ -224,7 +224,7 @@ class JdbcInterventionApplicationRepository(
             SELECT id, intervention_id, user_id, timestamp, notes, created_at
             FROM intervention_applications
             WHERE intervention_id = :interventionId
-            ORDER BY timestamp DESC
+            ORDER BY timestamp DESC, id DESC
             LIMIT :limit OFFSET :offset
         """.trimIndent()
 
@@ -236,6 +236,31 @@ class JdbcInterventionApplicationRepository(
         jdbcTemplate.query(sql, params) { rs, _ -> mapRowToInterventionApplication(rs) }
     }
 
+    override suspend fun findByInterventionIdAfter(
+        interventionId: UUID,
+        limit: Int,
+        afterTimestamp: java.time.Instant?,
+        afterId: UUID?
+    ): List<InterventionApplication> = withContext(Dispatchers.IO) {
+        // Seeks on idx_intervention_applications_intervention_timestamp_id
+        val seek = if (afterTimestamp != null && afterId != null) "AND (timestamp, id) < (:afterTimestamp, :afterId)" else ""
+        val sql = """
+            SELECT id, intervention_id, user_id, timestamp, notes, created_at
+            FROM intervention_applications
+            WHERE intervention_id = :interventionId $seek
+            ORDER BY timestamp DESC, id DESC
+            LIMIT :limit
+        """.trimIndent()
+
+        val params = MapSqlParameterSource()
+            .addValue("interventionId", interventionId)
+            .addValue("limit", limit)
+            .addValue("afterTimestamp", afterTimestamp?.let { Timestamp.from(it) })
+            .addValue("afterId", afterId)
+
+        jdbcTemplate.query(sql, params) { rs, _ -> mapRowToInterventionApplication(rs) }
+    }
+
     override suspend fun findByUserIdAndDateRange(
         userId: UUID,
         startDate: java.time.Instant, // Changed from LocalDate
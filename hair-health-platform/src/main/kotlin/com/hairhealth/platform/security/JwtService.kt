@@ -1,6 +1,7 @@
 package com.hairhealth.platform.security
 
 import io.jsonwebtoken.Claims
+import io.jsonwebtoken.JwtParser
 import io.jsonwebtoken.Jwts
 import io.jsonwebtoken.security.Keys
 import org.springframework.beans.factory.annotation.Value
@@ -26,6 +27,13 @@ class JwtService {
         Keys.hmacShaKeyFor(jwtSecret.toByteArray())
     }
 
+    // Immutable and thread-safe once built, so every parse shares it
+    private val parser: JwtParser by lazy {
+        Jwts.parser()
+            .verifyWith(secretKey)
+            .build()
+    }
+
     fun generateAccessToken(userDetails: UserPrincipal): String {
         val now = Instant.now()
         val expiry = now.plus(accessTokenExpiration, ChronoUnit.SECONDS)
@@ -58,16 +66,26 @@ class JwtService {
 
     fun validateToken(token: String): Boolean {
         return try {
-            Jwts.parser()
-                .verifyWith(secretKey)
-                .build()
-                .parseSignedClaims(token)
+            parser.parseSignedClaims(token)
             true
         } catch (e: Exception) {
             false
         }
     }
 
+    /**
+     * Verifies the signature once and returns the claims, or null when the token is malformed,
+     * not signed with our key or expired. Callers read every claim they need from the result
+     * instead of re-parsing the token per claim.
+     */
+    fun parseVerifiedClaims(token: String): Claims? {
+        return try {
+            parser.parseSignedClaims(token).payload
+        } catch (e: Exception) {
+            null
+        }
+    }
+
     fun extractUserIdFromToken(token: String): UUID {
         val claims = extractAllClaims(token)
         return UUID.fromString(claims.subject)
@@ -104,11 +122,7 @@ class JwtService {
     }
 
     private fun extractAllClaims(token: String): Claims {
-        return Jwts.parser()
-            .verifyWith(secretKey)
-            .build()
-            .parseSignedClaims(token)
-            .payload
+        return parser.parseSignedClaims(token).payload
     }
 }
 
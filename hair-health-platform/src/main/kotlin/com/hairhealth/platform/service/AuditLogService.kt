@@ -9,7 +9,9 @@ import com.hairhealth.platform.repository.AuditLogRepository
 import kotlinx.coroutines.CoroutineScope
 import kotlinx.coroutines.Dispatchers
 import kotlinx.coroutines.launch
+import com.hairhealth.platform.config.RequestIdFilter
 import org.slf4j.LoggerFactory
+import org.slf4j.MDC
 import org.springframework.stereotype.Service
 import java.time.Instant
 import java.util.UUID
@@ -41,7 +43,10 @@ class AuditLogService(
         details: Map<String, Any?>? = null // Changed to Any? to allow nulls in map values
     ) {
         try {
-            val detailsJson = details?.let {
+            // Tie the audit entry to the HTTP request that caused it (null for scheduled jobs)
+            val requestId = MDC.get(RequestIdFilter.MDC_KEY)
+            val detailsWithRequest = if (requestId != null) (details ?: emptyMap()) + ("requestId" to requestId) else details
+            val detailsJson = detailsWithRequest?.let {
                 try {
                     objectMapper.writeValueAsString(it)
                 } catch (e: Exception) {
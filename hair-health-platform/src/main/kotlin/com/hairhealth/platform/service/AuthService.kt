@@ -234,20 +234,23 @@ class AuthService(
     }
 
     suspend fun validateAccessToken(token: String): UserPrincipal? {
+        // Runs on every authenticated request: one signature check, then the principal comes from the claims
+        val claims = jwtService.parseVerifiedClaims(token) ?: return null
         return try {
-            if (!jwtService.validateToken(token) || jwtService.isTokenExpired(token)) {
+            if (claims.expiration?.after(Date()) != true) {
                 return null
             }
 
-            if (jwtService.extractTokenType(token) != "access") {
+            if ((claims["type"] as? String ?: "access") != "access") {
                 return null
             }
 
+            @Suppress("UNCHECKED_CAST")
             UserPrincipal(
-                userId = jwtService.extractUserIdFromToken(token),
-                email = jwtService.extractEmailFromToken(token),
-                username = jwtService.extractUsernameFromToken(token),
-                roles = jwtService.extractRolesFromToken(token)
+                userId = UUID.fromString(claims.subject),
+                email = claims["email"] as String,
+                username = claims["username"] as String?,
+                roles = claims["roles"] as? List<String> ?: emptyList()
             )
         } catch (e: Exception) {
             null
@@ -2,6 +2,7 @@ package com.hairhealth.platform.service
 
 import com.hairhealth.platform.domain.*
 import com.hairhealth.platform.repository.*
+import org.slf4j.LoggerFactory
 import org.springframework.stereotype.Service
 import org.springframework.transaction.annotation.Transactional
 import java.time.Instant
@@ -646,10 +647,11 @@ class AdvancedEncryptionService {
 // Real-time notification service
 @Service
 class RealTimeNotificationService {
-   
+   private val logger = LoggerFactory.getLogger(RealTimeNotificationService::class.java)
+
    suspend fun sendRealTimeNotification(recipientId: UUID, notification: MedicalNotification) {
        // In real implementation, this would use WebSockets, SSE, or push notifications
-       println("Real-time notification sent to $recipientId: ${notification.title}")
+       logger.info("Real-time notification sent to {}: {}", recipientId, notification.title)
        
        // Could integrate with:
        // - WebSocket connections
@@ -661,7 +663,7 @@ class RealTimeNotificationService {
    
    suspend fun sendSecurityAlert(recipientId: UUID, alertType: SecurityAlertType, details: String) {
        // Send immediate security alerts for suspicious activity
-       println("SECURITY ALERT for $recipientId: $alertType - $details")
+       logger.warn("SECURITY ALERT for {}: {} - {}", recipientId, alertType, details)
        
        // In real implementation:
        // - Immediate push notification
@@ -0,0 +1,97 @@
+package com.hairhealth.platform.service
+
+import com.hairhealth.platform.service.dto.DatasetSnapshotResponse
+import kotlinx.coroutines.Dispatchers
+import kotlinx.coroutines.withContext
+import org.springframework.beans.factory.annotation.Value
+import org.springframework.jdbc.core.JdbcTemplate
+import org.springframework.stereotype.Service
+import java.nio.file.Files
+import java.nio.file.Path
+import java.nio.file.Paths
+import java.security.MessageDigest
+import javax.sql.DataSource
+
+/**
+ * Exports and restores the whole in-memory H2 database (the test profile) as a gzipped SQL script,
+ * so benchmark runs can start from the same seeded dataset. PostgreSQL is snapshotted with
+ * pg_dump/pg_restore from the harness instead (tests/dataset_snapshot.py).
+ */
+@Service
+class DatasetSnapshotService(
+    private val dataSource: DataSource,
+    @Value("\${app.dev.snapshots.dir:build/snapshots}") private val snapshotDir: String
+) {
+    private val jdbcTemplate = JdbcTemplate(dataSource)
+
+    companion object {
+        private val NAME = Regex("^[A-Za-z0-9_-]{1,64}$")
+        private const val FLYWAY_HISTORY = "flyway_schema_history"
+    }
+
+    suspend fun export(name: String): DatasetSnapshotResponse = withContext(Dispatchers.IO) {
+        val file = snapshotFile(name)
+        Files.createDirectories(file.parent)
+        jdbcTemplate.execute("SCRIPT TO ${literal(file)} COMPRESSION GZIP")
+        describe(name, file)
+    }
+
+    suspend fun restore(name: String): DatasetSnapshotResponse = withContext(Dispatchers.IO) {
+        val file = snapshotFile(name)
+        if (!Files.isRegularFile(file)) {
+            throw NoSuchElementException("No snapshot named $name")
+        }
+        jdbcTemplate.execute("DROP ALL OBJECTS")
+        jdbcTemplate.execute("RUNSCRIPT FROM ${literal(file)} COMPRESSION GZIP")
+        describe(name, file)
+    }
+
+    suspend fun rowCounts(): Map<String, Long> = withContext(Dispatchers.IO) {
+        requireH2()
+        countRows()
+    }
+
+    private fun snapshotFile(name: String): Path {
+        require(NAME.matches(name)) { "Snapshot names use letters, digits, '-' and '_' only" }
+        requireH2()
+        return Paths.get(snapshotDir, "$name.sql.gz")
+    }
+
+    private fun literal(file: Path) = "'" + file.toAbsolutePath().toString().replace("'", "''") + "'"
+
+    private fun requireH2() {
+        val product = dataSource.connection.use { it.metaData.databaseProductName }
+        check(product == "H2") { "Snapshots through the API are only supported on H2, not $product" }
+    }
+
+    private fun describe(name: String, file: Path) = DatasetSnapshotResponse(
+        name = name,
+        file = file.toAbsolutePath().toString(),
+        bytes = Files.size(file),
+        sha256 = sha256(file),
+        tables = countRows()
+    )
+
+    private fun countRows(): Map<String, Long> {
+        val tables = jdbcTemplate.queryForList(
+            "SELECT TABLE_NAME FROM INFORMATION_SCHEMA.TABLES WHERE TABLE_SCHEMA = 'PUBLIC' AND TABLE_TYPE IN ('BASE TABLE', 'TABLE')",
+            String::class.java
+        ).filter { !it.equals(FLYWAY_HISTORY, ignoreCase = true) }
+        return tables.associate { table ->
+            table.lowercase() to (jdbcTemplate.queryForObject("SELECT COUNT(*) FROM \"$table\"", Long::class.java) ?: 0L)
+        }.toSortedMap()
+    }
+
+    private fun sha256(file: Path): String {
+        val digest = MessageDigest.getInstance("SHA-256")
+        Files.newInputStream(file).use { input ->
+            val buffer = ByteArray(1 shl 16)
+            while (true) {
+                val read = input.read(buffer)
+                if (read < 0) break
+                digest.update(buffer, 0, read)
+            }
+        }
+        return digest.digest().joinToString("") { "%02x".format(it) }
+    }
+}
@@ -2,6 +2,11 @@ package com.hairhealth.platform.service
 
 // import com.hairhealth.platform.controller.HairFallStatsResponse // Old incorrect import
 import com.hairhealth.platform.service.dto.HairFallStatsResponse // Corrected import
+import com.hairhealth.platform.service.dto.BatchCreateHairFallLogsResponse
+import com.hairhealth.platform.service.dto.BatchItemResult
+import com.hairhealth.platform.service.dto.CreateHairFallLogRequest
+import com.hairhealth.platform.service.dto.PageCursor
+import com.hairhealth.platform.service.dto.validationError
 import com.hairhealth.platform.domain.HairFallCategory
 import com.hairhealth.platform.domain.HairFallLog
 import com.hairhealth.platform.repository.HairFallLogRepository
@@ -40,6 +45,44 @@ class HairFallLogService(
         return hairFallLogRepository.create(hairFallLog)
     }
 
+    /**
+     * Validates every log first, then inserts the valid ones in a single batch.
+     * Invalid entries are reported per index and never block the rest.
+     */
+    suspend fun createHairFallLogsBatch(
+        userId: UUID,
+        requests: List<CreateHairFallLogRequest>
+    ): BatchCreateHairFallLogsResponse {
+        val now = Instant.now()
+        val results = arrayOfNulls<BatchItemResult>(requests.size)
+        val valid = mutableListOf<Pair<Int, HairFallLog>>()
+        requests.forEachIndexed { index, request ->
+            val error = request.validationError()
+            if (error != null) {
+                results[index] = BatchItemResult(index, "INVALID", error = error)
+            } else {
+                valid += index to HairFallLog(
+                    id = UUID.randomUUID(),
+                    userId = userId,
+                    date = request.date,
+                    count = request.count,
+                    category = HairFallCategory.valueOf(request.category.uppercase()),
+                    description = request.description,
+                    photoMetadataId = request.photoMetadataId,
+                    createdAt = now,
+                    updatedAt = now
+                )
+            }
+        }
+        hairFallLogRepository.createAll(valid.map { it.second })
+        valid.forEach { (index, log) -> results[index] = BatchItemResult(index, "CREATED", id = log.id) }
+        return BatchCreateHairFallLogsResponse(
+            created = valid.size,
+            failed = requests.size - valid.size,
+            results = results.map { it!! }
+        )
+    }
+
     suspend fun getHairFallLogById(id: UUID): HairFallLog? {
         return hairFallLogRepository.findById(id)
     }
@@ -52,6 +95,14 @@ class HairFallLogService(
         return hairFallLogRepository.findByUserId(userId, limit, offset)
     }
 
+    suspend fun getHairFallLogsAfter(
+        userId: UUID,
+        limit: Int = 50,
+        cursor: PageCursor
+    ): List<HairFallLog> {
+        return hairFallLogRepository.findByUserIdAfter(userId, limit, cursor.dateKey(), cursor.id)
+    }
+
     suspend fun getHairFallLogsByDateRange(
         userId: UUID,
         startDate: LocalDate,
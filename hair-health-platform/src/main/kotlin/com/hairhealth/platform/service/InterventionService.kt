@@ -9,6 +9,7 @@ import com.hairhealth.platform.service.dto.CreateInterventionRequest
 import com.hairhealth.platform.service.dto.InterventionApplicationResponse
 import com.hairhealth.platform.service.dto.InterventionResponse
 import com.hairhealth.platform.service.dto.LogApplicationRequest
+import com.hairhealth.platform.service.dto.PageCursor
 import com.hairhealth.platform.service.dto.toDomain
 import com.hairhealth.platform.service.dto.toResponse
 import kotlinx.coroutines.Dispatchers
@@ -80,6 +81,14 @@ class InterventionService(
         interventionApplicationRepository.findByInterventionId(interventionId, limit, offset).map { it.toResponse() }
     }
 
+    suspend fun getApplicationsForInterventionAfter(userId: UUID, interventionId: UUID, limit: Int, cursor: PageCursor): List<InterventionApplicationResponse> = withContext(Dispatchers.IO) {
+        interventionRepository.findByIdAndUserId(interventionId, userId)
+            ?: throw InterventionNotFoundException("Intervention not found for user or ID: $interventionId")
+
+        interventionApplicationRepository.findByInterventionIdAfter(interventionId, limit, cursor.instantKey(), cursor.id)
+            .map { it.toResponse() }
+    }
+
     // Keeping existing getApplicationsByUserIdAndDateRange for potential internal use.
     // Note: Its signature in repository (LocalDate) differs from the updated one (Instant).
     // This might need alignment if this method is to be used widely and consistently.
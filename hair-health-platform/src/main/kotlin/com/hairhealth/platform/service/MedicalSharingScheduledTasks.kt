@@ -4,6 +4,7 @@ import com.hairhealth.platform.domain.MedicalSharingStatus
 import com.hairhealth.platform.domain.NotificationType
 import com.hairhealth.platform.domain.MedicalNotification
 import com.hairhealth.platform.repository.*
+import org.slf4j.LoggerFactory
 import org.springframework.scheduling.annotation.Scheduled
 import org.springframework.stereotype.Service
 import org.springframework.transaction.annotation.Transactional
@@ -19,6 +20,7 @@ class MedicalSharingScheduledTasks(
     private val notificationRepository: MedicalNotificationRepository,
     private val notificationService: RealTimeNotificationService
 ) {
+    private val logger = LoggerFactory.getLogger(MedicalSharingScheduledTasks::class.java)
 
     @Scheduled(fixedDelay = 300_000) // Every 5 minutes
     suspend fun expireOldSessions() {
@@ -50,7 +52,7 @@ class MedicalSharingScheduledTasks(
         }
         
         if (expiredSessions.isNotEmpty()) {
-            println("Expired ${expiredSessions.size} medical sharing sessions")
+            logger.info("Expired {} medical sharing sessions", expiredSessions.size)
         }
     }
     
@@ -58,7 +60,7 @@ class MedicalSharingScheduledTasks(
     suspend fun cleanupExpiredKeys() {
         val cleanedCount = ephemeralKeyRepository.cleanupExpiredKeys()
         if (cleanedCount > 0) {
-            println("Cleaned up $cleanedCount expired ephemeral keys")
+            logger.info("Cleaned up {} expired ephemeral keys", cleanedCount)
         }
     }
     
@@ -73,7 +75,7 @@ class MedicalSharingScheduledTasks(
         // - Suspicious device fingerprints
         // - Excessive screenshot attempts
         
-        println("Anomaly detection scan completed")
+        logger.info("Anomaly detection scan completed")
     }
     
     @Scheduled(cron = "0 0 8 * * *") // Daily at 8 AM
@@ -122,7 +124,7 @@ class MedicalSharingScheduledTasks(
         }
         
         if (soonToExpire.isNotEmpty()) {
-            println("Sent expiry reminders for ${soonToExpire.size} sessions")
+            logger.info("Sent expiry reminders for {} sessions", soonToExpire.size)
         }
     }
     
@@ -138,7 +140,7 @@ class MedicalSharingScheduledTasks(
         // - Suspicious activity incidents
         // - Policy violations
         
-        println("Daily compliance report generated")
+        logger.info("Daily compliance report generated")
     }
     
     private suspend fun notifySessionExpired(session: com.hairhealth.platform.domain.MedicalSharingSession) {
@@ -3,14 +3,18 @@ package com.hairhealth.platform.service
 import com.hairhealth.platform.domain.PhotoAngle
 import com.hairhealth.platform.domain.PhotoMetadata
 import com.hairhealth.platform.repository.PhotoMetadataRepository
+import org.springframework.beans.factory.annotation.Value
 import org.springframework.stereotype.Service
 import java.time.Instant
 import java.util.*
 
 @Service
 class PhotoMetadataService(
-    private val photoMetadataRepository: PhotoMetadataRepository
+    private val photoMetadataRepository: PhotoMetadataRepository,
+    // Where upload/view URLs point; tests/blob_server.py serves these paths for load tests
+    @Value("\${app.storage.base-url:https://mock-storage.example.com}") storageBaseUrl: String
 ) {
+    private val storageBaseUrl = storageBaseUrl.trimEnd('/')
 
     suspend fun createPhotoMetadata(
         userId: UUID,
@@ -133,12 +137,12 @@ class PhotoMetadataService(
 
     private fun generateUploadUrl(blobPath: String): String {
         // Mock implementation - in real system this would generate GCS pre-signed URL
-        return "https://mock-storage.example.com/upload/$blobPath?token=mock-upload-token"
+        return "$storageBaseUrl/upload/$blobPath?token=mock-upload-token"
     }
 
     private fun generateDownloadUrl(blobPath: String): String {
         // Mock implementation - in real system this would generate GCS pre-signed URL
-        return "https://mock-storage.example.com/download/$blobPath?token=mock-download-token"
+        return "$storageBaseUrl/download/$blobPath?token=mock-download-token"
     }
 }
 
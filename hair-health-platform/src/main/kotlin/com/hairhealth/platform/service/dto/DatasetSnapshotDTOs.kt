@@ -0,0 +1,14 @@
+package com.hairhealth.platform.service.dto
+
+// A dataset snapshot written to (or restored from) app.dev.snapshots.dir; tables holds exact row counts
+data class DatasetSnapshotResponse(
+    val name: String,
+    val file: String,
+    val bytes: Long,
+    val sha256: String,
+    val tables: Map<String, Long>
+)
+
+data class DatasetFingerprintResponse(
+    val tables: Map<String, Long>
+)
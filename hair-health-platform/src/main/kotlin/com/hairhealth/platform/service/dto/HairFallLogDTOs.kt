@@ -14,6 +14,24 @@ data class CreateHairFallLogRequest(
     val photoMetadataId: UUID?
 )
 
+data class BatchCreateHairFallLogsRequest(
+    val logs: List<CreateHairFallLogRequest>
+)
+
+// One entry per submitted log, in request order; id is set when status is CREATED
+data class BatchItemResult(
+    val index: Int,
+    val status: String, // "CREATED" or "INVALID"
+    val id: UUID? = null,
+    val error: String? = null
+)
+
+data class BatchCreateHairFallLogsResponse(
+    val created: Int,
+    val failed: Int,
+    val results: List<BatchItemResult>
+)
+
 data class HairFallLogResponse(
     val id: UUID,
     val userId: UUID,
@@ -26,6 +44,13 @@ data class HairFallLogResponse(
     val updatedAt: Instant
 )
 
+// Why a log cannot be stored, or null when it can; POST /hair-fall-logs and /batch share these rules
+fun CreateHairFallLogRequest.validationError(): String? = when {
+    HairFallCategory.values().none { it.name == category.uppercase() } -> "Invalid category: $category"
+    count != null && count < 0 -> "count must not be negative"
+    else -> null
+}
+
 // Mapper functions
 
 fun CreateHairFallLogRequest.toDomain(userId: UUID): HairFallLog {
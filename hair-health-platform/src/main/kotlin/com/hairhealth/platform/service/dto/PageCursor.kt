@@ -0,0 +1,57 @@
+package com.hairhealth.platform.service.dto
+
+import java.time.Instant
+import java.time.LocalDate
+import java.time.format.DateTimeParseException
+import java.util.Base64
+import java.util.UUID
+
+/**
+ * Keyset position of the last row of a page: its sort key (a date or an instant) and its id,
+ * which breaks ties. Clients only ever see the opaque [encode]d form, returned in the
+ * [HEADER] response header and sent back as the `cursor` query parameter.
+ */
+data class PageCursor(
+    val sortKey: String,
+    val id: UUID
+) {
+    fun encode(): String =
+        Base64.getUrlEncoder().withoutPadding().encodeToString("$sortKey|$id".toByteArray(Charsets.UTF_8))
+
+    fun dateKey(): LocalDate = try {
+        LocalDate.parse(sortKey)
+    } catch (e: DateTimeParseException) {
+        throw InvalidCursorException("Cursor does not hold a date")
+    }
+
+    fun instantKey(): Instant = try {
+        Instant.parse(sortKey)
+    } catch (e: DateTimeParseException) {
+        throw InvalidCursorException("Cursor does not hold a timestamp")
+    }
+
+    companion object {
+        const val HEADER = "X-Next-Cursor"
+
+        fun of(date: LocalDate, id: UUID) = PageCursor(date.toString(), id)
+
+        fun of(timestamp: Instant, id: UUID) = PageCursor(timestamp.toString(), id)
+
+        fun decode(token: String): PageCursor {
+            val parts = try {
+                String(Base64.getUrlDecoder().decode(token), Charsets.UTF_8).split('|')
+            } catch (e: IllegalArgumentException) {
+                throw InvalidCursorException("Cursor is not valid base64")
+            }
+            if (parts.size != 2) throw InvalidCursorException("Malformed cursor")
+            val id = try {
+                UUID.fromString(parts[1])
+            } catch (e: IllegalArgumentException) {
+                throw InvalidCursorException("Malformed cursor")
+            }
+            return PageCursor(parts[0], id)
+        }
+    }
+}
+
+class InvalidCursorException(message: String) : IllegalArgumentException(message)
@@ -0,0 +1,6 @@
+-- Keyset pagination (cursor query parameter) seeks on these instead of scanning and
+-- discarding every skipped row as LIMIT/OFFSET does; see tests/pagination_crawl.py.
+-- The trailing id column makes the order total, so a cursor is unambiguous within a day.
+CREATE INDEX IF NOT EXISTS idx_hair_fall_logs_user_id_date_id ON hair_fall_logs(user_id, date DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_intervention_applications_intervention_timestamp_id
+    ON intervention_applications(intervention_id, "timestamp" DESC, id DESC);
@@ -0,0 +1,142 @@
+package com.hairhealth.platform.config
+
+import ch.qos.logback.classic.Level
+import ch.qos.logback.classic.Logger
+import ch.qos.logback.classic.spi.ILoggingEvent
+import ch.qos.logback.core.read.ListAppender
+import jakarta.servlet.FilterChain
+import kotlinx.coroutines.delay
+import org.junit.jupiter.api.AfterEach
+import org.junit.jupiter.api.Assertions.assertEquals
+import org.junit.jupiter.api.Assertions.assertNotEquals
+import org.junit.jupiter.api.Assertions.assertNotNull
+import org.junit.jupiter.api.Assertions.assertNull
+import org.junit.jupiter.api.Assertions.assertTrue
+import org.junit.jupiter.api.BeforeEach
+import org.junit.jupiter.api.Test
+import org.slf4j.LoggerFactory
+import org.slf4j.MDC
+import org.springframework.http.HttpStatus
+import org.springframework.http.ResponseEntity
+import org.springframework.mock.web.MockHttpServletRequest
+import org.springframework.mock.web.MockHttpServletResponse
+import org.springframework.test.web.servlet.request.MockMvcRequestBuilders.asyncDispatch
+import org.springframework.test.web.servlet.request.MockMvcRequestBuilders.get
+import org.springframework.test.web.servlet.result.MockMvcResultMatchers.header
+import org.springframework.test.web.servlet.result.MockMvcResultMatchers.request
+import org.springframework.test.web.servlet.result.MockMvcResultMatchers.status
+import org.springframework.test.web.servlet.setup.MockMvcBuilders
+import org.springframework.test.web.servlet.setup.StandaloneMockMvcBuilder
+import org.springframework.web.bind.annotation.GetMapping
+import org.springframework.web.bind.annotation.RestController
+import java.util.UUID
+
+class RequestIdFilterTests {
+
+    private val filter = RequestIdFilter()
+
+    private val filterLogger = LoggerFactory.getLogger(RequestIdFilter::class.java) as Logger
+    private val logged = ListAppender<ILoggingEvent>()
+    private val previousLevel: Level? = filterLogger.level
+
+    @RestController
+    class SlowController {
+        @GetMapping("/slow")
+        suspend fun slow(): ResponseEntity<String> {
+            delay(SLOW_MS)
+            return ResponseEntity.status(HttpStatus.CREATED).body("done")
+        }
+    }
+
+    @BeforeEach
+    fun setUp() {
+        filterLogger.level = Level.DEBUG
+        logged.start()
+        filterLogger.addAppender(logged)
+    }
+
+    @AfterEach
+    fun tearDown() {
+        filterLogger.detachAppender(logged)
+        filterLogger.level = previousLevel
+    }
+
+    private fun runFilter(headerValue: String?): Pair<String?, MockHttpServletResponse> {
+        val request = MockHttpServletRequest("GET", "/api/v1/me/hair-fall-logs")
+        headerValue?.let { request.addHeader(RequestIdFilter.HEADER, it) }
+        val response = MockHttpServletResponse()
+        var idSeenInChain: String? = null
+        val chain = FilterChain { _, _ -> idSeenInChain = MDC.get(RequestIdFilter.MDC_KEY) }
+
+        filter.doFilter(request, response, chain)
+        return idSeenInChain to response
+    }
+
+    @Test
+    fun `testClientRequestId_IsPutInMdcAndEchoed`() {
+        val (idInChain, response) = runFilter("a1b2c3d4-3-17")
+
+        assertEquals("a1b2c3d4-3-17", idInChain)
+        assertEquals("a1b2c3d4-3-17", response.getHeader(RequestIdFilter.HEADER))
+        assertNull(MDC.get(RequestIdFilter.MDC_KEY)) // cleared once the request is done
+    }
+
+    @Test
+    fun `testMissingRequestId_IsGenerated`() {
+        val (idInChain, response) = runFilter(null)
+
+        assertNotNull(idInChain)
+        assertEquals(idInChain, response.getHeader(RequestIdFilter.HEADER))
+        UUID.fromString(idInChain) // generated ids are UUIDs
+    }
+
+    @Test
+    fun `testUnsafeRequestId_IsReplaced`() {
+        val injected = "abc\n2024-01-01 ERROR forged log line"
+        val (idInChain, _) = runFilter(injected)
+
+        assertNotEquals(injected, idInChain)
+        UUID.fromString(idInChain)
+
+        val (longIdInChain, _) = runFilter("x".repeat(65))
+        assertNotEquals("x".repeat(65), longIdInChain)
+    }
+
+    @Test
+    fun `testSuspendEndpoint_LogsFinalStatusAndDurationOnAsyncDispatch`() {
+        val mockMvc = MockMvcBuilders.standaloneSetup(SlowController())
+            .addFilters<StandaloneMockMvcBuilder>(filter)
+            .build()
+
+        val started = mockMvc.perform(get("/slow").header(RequestIdFilter.HEADER, "slow-1"))
+            .andExpect(request().asyncStarted())
+            .andReturn()
+        assertTrue(logged.list.isEmpty()) // nothing is complete when async processing starts
+
+        mockMvc.perform(asyncDispatch(started))
+            .andExpect(status().isCreated)
+            .andExpect(header().string(RequestIdFilter.HEADER, "slow-1"))
+
+        assertEquals(1, logged.list.size)
+        val event = logged.list.single()
+        val match = Regex("""Completed GET /slow -> (\d+) in ([\d.]+)ms""").find(event.formattedMessage)
+        assertNotNull(match, event.formattedMessage)
+        assertEquals("201", match!!.groupValues[1])
+        assertTrue(match.groupValues[2].toDouble() >= SLOW_MS, event.formattedMessage)
+        assertEquals("slow-1", event.mdcPropertyMap[RequestIdFilter.MDC_KEY]) // id restored on the async dispatch
+        assertNull(MDC.get(RequestIdFilter.MDC_KEY))
+    }
+
+    @Test
+    fun `testBlockingEndpoint_LogsOnce`() {
+        runFilter("sync-1")
+
+        assertEquals(1, logged.list.size)
+        assertTrue(logged.list.single().formattedMessage.startsWith("Completed GET /api/v1/me/hair-fall-logs -> 200 in "))
+        assertEquals("sync-1", logged.list.single().mdcPropertyMap[RequestIdFilter.MDC_KEY])
+    }
+
+    companion object {
+        private const val SLOW_MS = 50L
+    }
+}
@@ -4,9 +4,14 @@ import com.hairhealth.platform.config.SecurityConfig
 import com.hairhealth.platform.security.JwtService
 import com.hairhealth.platform.security.UserPrincipal
 import com.hairhealth.platform.service.HairFallLogService
+import com.hairhealth.platform.service.dto.BatchCreateHairFallLogsRequest
+import com.hairhealth.platform.service.dto.BatchCreateHairFallLogsResponse
+import com.hairhealth.platform.service.dto.BatchItemResult
 import com.hairhealth.platform.service.dto.CreateHairFallLogRequest
 import com.hairhealth.platform.service.dto.HairFallLogResponse
+import com.hairhealth.platform.service.dto.PageCursor
 import io.mockk.coEvery
+import io.mockk.coVerify
 import org.junit.jupiter.api.Test
 import org.springframework.beans.factory.annotation.Autowired
 import org.springframework.boot.test.autoconfigure.web.reactive.WebFluxTest
@@ -101,6 +106,69 @@ class HairFallLogControllerTests {
             }
     }
 
+    @Test
+    fun `testCreateHairFallLog_NegativeCount_ReturnsBadRequest`() {
+        // Same rule as the batch endpoint, which marks such an entry INVALID
+        webTestClient
+            .mutateWith(mockUser().principal(mockUserPrincipal))
+            .post().uri("/api/v1/me/hair-fall-logs")
+            .contentType(MediaType.APPLICATION_JSON)
+            .body(BodyInserters.fromValue(createLogRequestDTO.copy(count = -1)))
+            .exchange()
+            .expectStatus().isBadRequest
+
+        coVerify(exactly = 0) { hairFallLogService.createHairFallLog(any(), any(), any(), any(), any(), any()) }
+    }
+
+    @Test
+    fun `testCreateHairFallLogsBatch_AllValid_ReturnsCreated`() {
+        val request = BatchCreateHairFallLogsRequest(listOf(createLogRequestDTO, createLogRequestDTO))
+        coEvery { hairFallLogService.createHairFallLogsBatch(userId, request.logs) } returns BatchCreateHairFallLogsResponse(
+            created = 2, failed = 0,
+            results = listOf(BatchItemResult(0, "CREATED", id = UUID.randomUUID()), BatchItemResult(1, "CREATED", id = UUID.randomUUID()))
+        )
+
+        webTestClient
+            .mutateWith(mockUser().principal(mockUserPrincipal))
+            .post().uri("/api/v1/me/hair-fall-logs/batch")
+            .contentType(MediaType.APPLICATION_JSON)
+            .body(BodyInserters.fromValue(request))
+            .exchange()
+            .expectStatus().isCreated
+            .expectBody(BatchCreateHairFallLogsResponse::class.java)
+            .value { response -> assertEquals(2, response.created) }
+    }
+
+    @Test
+    fun `testCreateHairFallLogsBatch_PartlyInvalid_ReturnsMultiStatus`() {
+        val request = BatchCreateHairFallLogsRequest(listOf(createLogRequestDTO, createLogRequestDTO.copy(category = "SHAMPOO")))
+        coEvery { hairFallLogService.createHairFallLogsBatch(userId, request.logs) } returns BatchCreateHairFallLogsResponse(
+            created = 1, failed = 1,
+            results = listOf(BatchItemResult(0, "CREATED", id = UUID.randomUUID()), BatchItemResult(1, "INVALID", error = "Invalid category: SHAMPOO"))
+        )
+
+        webTestClient
+            .mutateWith(mockUser().principal(mockUserPrincipal))
+            .post().uri("/api/v1/me/hair-fall-logs/batch")
+            .contentType(MediaType.APPLICATION_JSON)
+            .body(BodyInserters.fromValue(request))
+            .exchange()
+            .expectStatus().isEqualTo(HttpStatus.MULTI_STATUS)
+    }
+
+    @Test
+    fun `testCreateHairFallLogsBatch_OverMaxSize_ReturnsBadRequest`() {
+        val request = BatchCreateHairFallLogsRequest(List(501) { createLogRequestDTO }) // default batch-max-size is 500
+
+        webTestClient
+            .mutateWith(mockUser().principal(mockUserPrincipal))
+            .post().uri("/api/v1/me/hair-fall-logs/batch")
+            .contentType(MediaType.APPLICATION_JSON)
+            .body(BodyInserters.fromValue(request))
+            .exchange()
+            .expectStatus().isBadRequest
+    }
+
     @Test
     fun `testGetHairFallLogs_ReturnsOk`() {
         coEvery { hairFallLogService.getHairFallLogsByUserId(userId, 50, 0) } returns listOf(
@@ -123,6 +191,48 @@ class HairFallLogControllerTests {
             }
     }
 
+    @Test
+    fun `testGetHairFallLogs_FullPage_ReturnsNextCursorHeader`() {
+        val lastDate = LocalDate.now().minusDays(3)
+        coEvery { hairFallLogService.getHairFallLogsByUserId(userId, 1, 0) } returns listOf(
+            com.hairhealth.platform.domain.HairFallLog(
+                id = logId, userId = userId, date = lastDate, count = 50,
+                category = com.hairhealth.platform.domain.HairFallCategory.SHOWER, description = "test", photoMetadataId = null,
+                createdAt = mockLogResponseDTO.createdAt, updatedAt = mockLogResponseDTO.updatedAt
+            )
+        )
+
+        webTestClient
+            .mutateWith(mockUser().principal(mockUserPrincipal))
+            .get().uri("/api/v1/me/hair-fall-logs?limit=1")
+            .exchange()
+            .expectStatus().isOk
+            .expectHeader().valueEquals(PageCursor.HEADER, PageCursor.of(lastDate, logId).encode())
+    }
+
+    @Test
+    fun `testGetHairFallLogs_WithCursor_SeeksAfterCursor`() {
+        val cursor = PageCursor.of(LocalDate.now().minusDays(3), UUID.randomUUID())
+        coEvery { hairFallLogService.getHairFallLogsAfter(userId, 50, cursor) } returns emptyList()
+
+        webTestClient
+            .mutateWith(mockUser().principal(mockUserPrincipal))
+            .get().uri("/api/v1/me/hair-fall-logs?cursor=${cursor.encode()}")
+            .exchange()
+            .expectStatus().isOk
+            .expectHeader().doesNotExist(PageCursor.HEADER) // short page: nothing behind it
+            .expectBodyList(HairFallLogResponse::class.java).hasSize(0)
+    }
+
+    @Test
+    fun `testGetHairFallLogs_MalformedCursor_ReturnsBadRequest`() {
+        webTestClient
+            .mutateWith(mockUser().principal(mockUserPrincipal))
+            .get().uri("/api/v1/me/hair-fall-logs?cursor=not-a-cursor")
+            .exchange()
+            .expectStatus().isBadRequest
+    }
+
     @Test
     fun `testGetHairFallLogById_ValidIdAndOwner_ReturnsOk`() {
         // Service's getHairFallLogById takes only ID, controller must verify ownership
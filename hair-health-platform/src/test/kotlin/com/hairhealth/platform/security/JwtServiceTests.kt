@@ -0,0 +1,47 @@
+package com.hairhealth.platform.security
+
+import org.junit.jupiter.api.Assertions.*
+import org.junit.jupiter.api.BeforeEach
+import org.junit.jupiter.api.Test
+import org.springframework.test.util.ReflectionTestUtils
+import java.util.UUID
+
+class JwtServiceTests {
+
+    private lateinit var jwtService: JwtService
+
+    private val userPrincipal = UserPrincipal(UUID.randomUUID(), "test@example.com", "testuser", listOf("USER"))
+
+    @BeforeEach
+    fun setUp() {
+        jwtService = JwtService()
+        ReflectionTestUtils.setField(jwtService, "jwtSecret", "test-secret-key-for-hair-health-platform-testing-only")
+    }
+
+    @Test
+    fun `testParseVerifiedClaims_AccessToken_ReturnsAllPrincipalClaims`() {
+        val claims = jwtService.parseVerifiedClaims(jwtService.generateAccessToken(userPrincipal))
+
+        assertNotNull(claims)
+        assertEquals(userPrincipal.userId.toString(), claims!!.subject)
+        assertEquals(userPrincipal.email, claims["email"])
+        assertEquals(userPrincipal.username, claims["username"])
+        assertEquals(userPrincipal.roles, claims["roles"])
+        assertEquals("access", claims["type"])
+    }
+
+    @Test
+    fun `testParseVerifiedClaims_TamperedSignature_ReturnsNull`() {
+        val token = jwtService.generateAccessToken(userPrincipal)
+        val tampered = token.dropLast(2) + if (token.endsWith("AA")) "BB" else "AA"
+
+        assertNull(jwtService.parseVerifiedClaims(tampered))
+    }
+
+    @Test
+    fun `testParseVerifiedClaims_ExpiredToken_ReturnsNull`() {
+        ReflectionTestUtils.setField(jwtService, "accessTokenExpiration", -60L)
+
+        assertNull(jwtService.parseVerifiedClaims(jwtService.generateAccessToken(userPrincipal)))
+    }
+}
@@ -4,9 +4,12 @@ import com.hairhealth.platform.domain.User
 import com.hairhealth.platform.repository.UserRepository
 import com.hairhealth.platform.security.JwtService
 import com.hairhealth.platform.security.UserPrincipal
+import io.jsonwebtoken.Claims
+import io.jsonwebtoken.Jwts
 import io.mockk.coEvery
 import io.mockk.every
 import io.mockk.mockk
+import io.mockk.verify
 import kotlinx.coroutines.runBlocking
 import org.junit.jupiter.api.Assertions.*
 import org.junit.jupiter.api.BeforeEach
@@ -14,6 +17,7 @@ import org.junit.jupiter.api.Test
 import org.junit.jupiter.api.assertThrows
 import org.springframework.security.crypto.password.PasswordEncoder
 import java.time.Instant
+import java.util.Date
 import java.util.UUID
 
 // Example using @SpringBootTest might be too heavy for pure service unit tests
@@ -182,4 +186,47 @@ class AuthServiceTests {
             authService.refreshToken("validTokenUserNotFound")
         }
     }
+
+    private fun accessClaims(type: String = "access", expiresAt: Instant = Instant.now().plusSeconds(3600)): Claims =
+        Jwts.claims()
+            .subject(userPrincipal.userId.toString())
+            .add("email", userPrincipal.email)
+            .add("username", userPrincipal.username)
+            .add("roles", userPrincipal.roles)
+            .add("type", type)
+            .expiration(Date.from(expiresAt))
+            .build()
+
+    @Test
+    fun `testValidateAccessToken_ValidToken_BuildsPrincipalFromOneParse`() = runBlocking {
+        every { jwtService.parseVerifiedClaims("accessToken") } returns accessClaims()
+
+        val principal = authService.validateAccessToken("accessToken")
+
+        assertEquals(userPrincipal, principal)
+        verify(exactly = 1) { jwtService.parseVerifiedClaims("accessToken") }
+        verify(exactly = 0) { jwtService.validateToken(any()) }
+        verify(exactly = 0) { jwtService.extractUserIdFromToken(any()) }
+    }
+
+    @Test
+    fun `testValidateAccessToken_InvalidSignature_ReturnsNull`() = runBlocking {
+        every { jwtService.parseVerifiedClaims("tamperedToken") } returns null
+
+        assertNull(authService.validateAccessToken("tamperedToken"))
+    }
+
+    @Test
+    fun `testValidateAccessToken_RefreshToken_ReturnsNull`() = runBlocking {
+        every { jwtService.parseVerifiedClaims("refreshToken") } returns accessClaims(type = "refresh")
+
+        assertNull(authService.validateAccessToken("refreshToken"))
+    }
+
+    @Test
+    fun `testValidateAccessToken_ExpiredClaims_ReturnsNull`() = runBlocking {
+        every { jwtService.parseVerifiedClaims("expiredToken") } returns accessClaims(expiresAt = Instant.now().minusSeconds(1))
+
+        assertNull(authService.validateAccessToken("expiredToken"))
+    }
 }
@@ -0,0 +1,63 @@
+package com.hairhealth.platform.service
+
+import kotlinx.coroutines.runBlocking
+import org.h2.jdbcx.JdbcDataSource
+import org.junit.jupiter.api.Assertions.*
+import org.junit.jupiter.api.BeforeEach
+import org.junit.jupiter.api.Test
+import org.junit.jupiter.api.assertThrows
+import org.junit.jupiter.api.io.TempDir
+import org.springframework.jdbc.core.JdbcTemplate
+import java.nio.file.Files
+import java.nio.file.Path
+import java.util.UUID
+
+class DatasetSnapshotServiceTests {
+
+    @TempDir
+    lateinit var snapshotDir: Path
+
+    private lateinit var jdbcTemplate: JdbcTemplate
+    private lateinit var datasetSnapshotService: DatasetSnapshotService
+
+    @BeforeEach
+    fun setUp() {
+        val dataSource = JdbcDataSource().apply {
+            setURL("jdbc:h2:mem:snapshot_${UUID.randomUUID()};DB_CLOSE_DELAY=-1")
+            user = "sa"
+        }
+        jdbcTemplate = JdbcTemplate(dataSource)
+        jdbcTemplate.execute("CREATE TABLE hair_fall_logs (id UUID PRIMARY KEY, count INTEGER)")
+        repeat(3) { jdbcTemplate.update("INSERT INTO hair_fall_logs VALUES (?, ?)", UUID.randomUUID(), it) }
+        datasetSnapshotService = DatasetSnapshotService(dataSource, snapshotDir.toString())
+    }
+
+    @Test
+    fun `testRestore_AfterRowsWereAdded_ReturnsToExportedRowCounts`() = runBlocking {
+        val exported = datasetSnapshotService.export("baseline")
+        jdbcTemplate.update("INSERT INTO hair_fall_logs VALUES (?, ?)", UUID.randomUUID(), 99)
+
+        val restored = datasetSnapshotService.restore("baseline")
+
+        assertEquals(mapOf("hair_fall_logs" to 3L), exported.tables)
+        assertEquals(exported.tables, restored.tables)
+        assertEquals(exported.sha256, restored.sha256)
+        assertTrue(Files.size(snapshotDir.resolve("baseline.sql.gz")) > 0)
+    }
+
+    @Test
+    fun `testExport_NameWithPathSeparator_ThrowsIllegalArgumentException`() = runBlocking {
+        assertThrows<IllegalArgumentException> {
+            datasetSnapshotService.export("../outside")
+        }
+        Unit
+    }
+
+    @Test
+    fun `testRestore_UnknownSnapshot_ThrowsNoSuchElementException`() = runBlocking {
+        assertThrows<NoSuchElementException> {
+            datasetSnapshotService.restore("missing")
+        }
+        Unit
+    }
+}
@@ -6,7 +6,9 @@ import com.hairhealth.platform.repository.HairFallLogRepository
 import com.hairhealth.platform.service.dto.CreateHairFallLogRequest
 import com.hairhealth.platform.service.dto.toResponse
 import io.mockk.coEvery
+import io.mockk.coVerify
 import io.mockk.mockk
+import io.mockk.slot
 import kotlinx.coroutines.runBlocking
 import org.junit.jupiter.api.Assertions.*
 import org.junit.jupiter.api.BeforeEach
@@ -111,6 +113,27 @@ class HairFallLogServiceTests {
         assertEquals(1, results.size)
     }
 
+    @Test
+    fun `testCreateHairFallLogsBatch_InvalidEntries_InsertsOnlyValidOnesInOneBatch`() = runBlocking {
+        val inserted = slot<List<HairFallLog>>()
+        coEvery { hairFallLogRepository.createAll(capture(inserted)) } answers { inserted.captured }
+        val requests = listOf(
+            createLogRequest,
+            createLogRequest.copy(category = "SHAMPOO"),
+            createLogRequest.copy(count = -1),
+            createLogRequest.copy(category = "pillow")
+        )
+
+        val result = hairFallLogService.createHairFallLogsBatch(userId, requests)
+
+        assertEquals(2, result.created)
+        assertEquals(2, result.failed)
+        assertEquals(listOf("CREATED", "INVALID", "INVALID", "CREATED"), result.results.map { it.status })
+        assertEquals(listOf(HairFallCategory.SHOWER, HairFallCategory.PILLOW), inserted.captured.map { it.category })
+        assertEquals(inserted.captured.map { it.id }, result.results.mapNotNull { it.id })
+        coVerify(exactly = 1) { hairFallLogRepository.createAll(any()) }
+    }
+
     @Test
     fun `testGetHairFallLogsByDateRange_Success`() = runBlocking {
         val startDate = LocalDate.now().minusDays(7)
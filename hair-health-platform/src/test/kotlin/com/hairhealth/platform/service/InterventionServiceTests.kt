@@ -6,7 +6,9 @@ import com.hairhealth.platform.domain.InterventionType
 import com.hairhealth.platform.repository.InterventionRepository
 import com.hairhealth.platform.repository.InterventionApplicationRepository
 import com.hairhealth.platform.service.dto.CreateInterventionRequest
+import com.hairhealth.platform.service.dto.InvalidCursorException
 import com.hairhealth.platform.service.dto.LogApplicationRequest
+import com.hairhealth.platform.service.dto.PageCursor
 import io.mockk.coEvery
 import io.mockk.mockk
 import kotlinx.coroutines.runBlocking
@@ -178,6 +180,31 @@ class InterventionServiceTests {
         assertEquals(applicationId, results[0].id)
     }
 
+    @Test
+    fun `testGetApplicationsForInterventionAfter_SeeksOnCursorTimestampAndId`() = runBlocking {
+        val cursor = PageCursor.of(Instant.parse("2024-03-01T08:00:00.123456Z"), UUID.randomUUID())
+        coEvery { interventionRepository.findByIdAndUserId(interventionId, userId) } returns mockIntervention
+        coEvery {
+            interventionApplicationRepository.findByInterventionIdAfter(interventionId, 50, cursor.instantKey(), cursor.id)
+        } returns listOf(mockApplication)
+
+        val results = interventionService.getApplicationsForInterventionAfter(userId, interventionId, 50,
+            PageCursor.decode(cursor.encode()))
+
+        assertEquals(1, results.size)
+        assertEquals(applicationId, results[0].id)
+    }
+
+    @Test
+    fun `testGetApplicationsForInterventionAfter_DateCursor_ThrowsInvalidCursorException`() = runBlocking {
+        coEvery { interventionRepository.findByIdAndUserId(interventionId, userId) } returns mockIntervention
+
+        assertThrows<InvalidCursorException> {
+            interventionService.getApplicationsForInterventionAfter(userId, interventionId, 50,
+                PageCursor.of(LocalDate.now(), UUID.randomUUID()))
+        }
+    }
+
     @Test
     fun `testGetApplicationsForIntervention_InterventionNotFoundOrNotOwned_ThrowsInterventionNotFoundException`() = runBlocking {
         coEvery { interventionRepository.findByIdAndUserId(interventionId, userId) } returns null // Intervention not found for user
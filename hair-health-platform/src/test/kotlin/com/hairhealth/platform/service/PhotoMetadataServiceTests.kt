@@ -0,0 +1,58 @@
+package com.hairhealth.platform.service
+
+import com.hairhealth.platform.domain.PhotoAngle
+import com.hairhealth.platform.domain.PhotoMetadata
+import com.hairhealth.platform.repository.PhotoMetadataRepository
+import io.mockk.coEvery
+import io.mockk.mockk
+import kotlinx.coroutines.runBlocking
+import org.junit.jupiter.api.Assertions.*
+import org.junit.jupiter.api.BeforeEach
+import org.junit.jupiter.api.Test
+import java.time.Instant
+import java.util.UUID
+
+class PhotoMetadataServiceTests {
+
+    private lateinit var photoMetadataRepository: PhotoMetadataRepository
+    private lateinit var photoMetadataService: PhotoMetadataService
+
+    private val userId = UUID.randomUUID()
+
+    @BeforeEach
+    fun setUp() {
+        photoMetadataRepository = mockk()
+        photoMetadataService = PhotoMetadataService(photoMetadataRepository, "http://localhost:9000/")
+    }
+
+    @Test
+    fun `testCreatePhotoMetadata_ConfiguredStorageBaseUrl_UploadUrlPointsAtBlobPath`() = runBlocking {
+        coEvery { photoMetadataRepository.create(any()) } answers { firstArg() }
+
+        val session = photoMetadataService.createPhotoMetadata(userId, "vertex.jpg", PhotoAngle.VERTEX, Instant.now(), "key-v1")
+
+        assertEquals("photos/$userId/${session.photoMetadataId}/vertex.jpg", session.blobPath)
+        assertEquals("http://localhost:9000/upload/${session.blobPath}?token=mock-upload-token", session.uploadUrl)
+    }
+
+    @Test
+    fun `testGenerateViewUrl_ConfiguredStorageBaseUrl_DownloadUrlPointsAtBlobPath`() = runBlocking {
+        val photoId = UUID.randomUUID()
+        val blobPath = "photos/$userId/$photoId/vertex.jpg"
+        coEvery { photoMetadataRepository.findById(photoId) } returns PhotoMetadata(
+            id = photoId,
+            userId = userId,
+            filename = "vertex.jpg",
+            angle = PhotoAngle.VERTEX,
+            captureDate = Instant.now(),
+            fileSize = 1024,
+            encryptionKeyInfo = "key-v1",
+            blobPath = blobPath,
+            uploadedAt = Instant.now()
+        )
+
+        val session = photoMetadataService.generateViewUrl(photoId)
+
+        assertEquals("http://localhost:9000/download/$blobPath?token=mock-download-token", session.downloadUrl)
+    }
+}
@@ -0,0 +1,194 @@
+# auth_overhead_bench.py
+"""
+Per-request cost of JwtAuthenticationFilter, measured from the outside.
+
+The same cheap endpoint is called with and without a bearer token, so the latency
+difference is what authenticating a request costs (AuthService.validateAccessToken
+and the SecurityContext setup), with routing, serialisation and the network held
+constant. Every worker cycles through the modes request by request, so server
+warm-up and background noise hit all of them alike:
+
+  anonymous   GET /api/v1/test/public, no Authorization header (the filter skips)
+  bearer      GET /api/v1/test/public with a valid access token
+  invalid     GET /api/v1/test/public with the token's signature altered
+  protected   GET /api/v1/test/protected with a valid access token
+
+meta["auth"] holds p50/p90/p99 per mode and each mode's p50 overhead over anonymous.
+Run it against the build before and after an auth change and pass the first bundle
+as --baseline to print the difference; `perf_runner.py report` compares them too,
+since each mode is recorded under its own endpoint name.
+
+Usage:
+    python perf_runner.py auth --requests 20000 --workers 4 --name auth-before
+    python perf_runner.py auth --requests 20000 --workers 4 --name auth-after --baseline runs/auth-before
+"""
+
+import contextlib
+import os
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+import numpy as np
+import requests
+
+from perf_metrics import EndpointTable, MetricsRecorder, RunBundle, classify_exception, new_run_meta
+
+PUBLIC_PATH = "/api/v1/test/public"
+PROTECTED_PATH = "/api/v1/test/protected"
+MODES = ("anonymous", "bearer", "invalid", "protected")
+WARMUP_REQUESTS = 200
+
+
+def tampered(token: str) -> str:
+    """Same header and claims, different signature"""
+    head, _, signature = token.rpartition(".")
+    return f"{head}.{signature[:-2]}{'BB' if signature.endswith('AA') else 'AA'}"
+
+
+class AuthOverheadBench:
+    """Interleaves the modes on --workers threads and compares their latency"""
+
+    def __init__(self, base_url: str, requests_per_mode: int = 10_000, workers: int = 4, name: str = None):
+        self.base_url = base_url.rstrip("/")
+        self.requests_per_mode = requests_per_mode
+        self.workers = workers
+        self.name = name or f"auth-{time.strftime('%Y%m%d-%H%M%S')}"
+        self.run_id = uuid.uuid4().hex[:8]
+        self.email = f"auth_{self.run_id}@hairhealth.com"
+        self.password = f"AuthPass_{self.run_id}!"
+
+        self.t0 = 0.0
+        self.endpoints = EndpointTable()
+        self.recorders: List[MetricsRecorder] = []
+        self.latencies: Dict[str, List[float]] = {mode: [] for mode in MODES}
+        self.statuses: Dict[str, Dict[int, int]] = {mode: {} for mode in MODES}
+        self.lock = threading.Lock()
+        self.requests_for: Dict[str, tuple] = {}
+
+    def authenticate(self) -> str:
+        from main_runner import ComprehensiveTestRunner
+
+        harness = ComprehensiveTestRunner(self.base_url)
+        harness.user_email, harness.user_password = self.email, self.password
+        harness.username = self.email.split("@")[0]
+        harness.test_user_registration()
+        if not harness.access_token:
+            harness.test_user_login()
+        if not harness.access_token:
+            raise RuntimeError(f"could not authenticate as {self.email}")
+        return harness.access_token
+
+    def _worker(self, index: int, count: int, record: bool):
+        session = requests.Session()
+        recorder = MetricsRecorder(self.endpoints, self.t0, worker=index, run_id=self.run_id)
+        latencies = {mode: [] for mode in MODES}
+        statuses = {mode: {} for mode in MODES}
+        for i in range(count):
+            for step in range(len(MODES)):
+                mode = MODES[(i + step + index) % len(MODES)] # rotate the order so no mode always goes first
+                path, headers = self.requests_for[mode]
+                headers = dict(headers, **{"X-Request-ID": recorder.next_request_id()})
+                start = time.monotonic()
+                try:
+                    response = session.get(f"{self.base_url}{path}", headers=headers, timeout=30)
+                except requests.exceptions.RequestException as e:
+                    recorder.record("GET", path, start, time.monotonic() - start, 0,
+                                    error=classify_exception(e), endpoint_name=f"GET {path} [{mode}]")
+                    continue
+                elapsed = time.monotonic() - start
+                recorder.record("GET", path, start, elapsed, response.status_code, len(response.content),
+                                endpoint_name=f"GET {path} [{mode}]")
+                latencies[mode].append(elapsed * 1000.0)
+                statuses[mode][response.status_code] = statuses[mode].get(response.status_code, 0) + 1
+        if not record:
+            return
+        with self.lock:
+            self.recorders.append(recorder)
+            for mode in MODES:
+                self.latencies[mode].extend(latencies[mode])
+                for status, n in statuses[mode].items():
+                    self.statuses[mode][status] = self.statuses[mode].get(status, 0) + n
+
+    def summary(self) -> Dict[str, Dict]:
+        results = {}
+        for mode in MODES:
+            values = np.array(self.latencies[mode])
+            results[mode] = {"requests": int(values.size), "statuses": {str(k): v for k, v in self.statuses[mode].items()},
+                             **({f"p{q}_ms": float(np.percentile(values, q)) for q in (50, 90, 99)} if values.size else {})}
+        anonymous = results["anonymous"].get("p50_ms")
+        for mode in MODES:
+            p50 = results[mode].get("p50_ms")
+            results[mode]["overhead_ms"] = p50 - anonymous if p50 is not None and anonymous is not None else None
+        return results
+
+    def run(self) -> RunBundle:
+        with open(os.devnull, "w") as sink, contextlib.redirect_stdout(sink):
+            token = self.authenticate()
+        bearer = {"Authorization": f"Bearer {token}"}
+        self.requests_for = {
+            "anonymous": (PUBLIC_PATH, {}),
+            "bearer": (PUBLIC_PATH, bearer),
+            "invalid": (PUBLIC_PATH, {"Authorization": f"Bearer {tampered(token)}"}),
+            "protected": (PROTECTED_PATH, bearer),
+        }
+        self.t0 = time.monotonic()
+        with ThreadPoolExecutor(max_workers=self.workers) as pool: # JIT and connection warm-up, not recorded
+            list(pool.map(lambda i: self._worker(i, WARMUP_REQUESTS // self.workers + 1, False), range(self.workers)))
+        self.t0 = time.monotonic()
+        meta = new_run_meta(self.name, self.base_url, scenario="auth-overhead", workers=self.workers,
+                            requests_per_mode=self.requests_per_mode, run_id=self.run_id, user_email=self.email)
+        per_worker = -(-self.requests_per_mode // self.workers)
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            list(pool.map(lambda i: self._worker(i, per_worker, True), range(self.workers)))
+        meta["duration_s"] = time.monotonic() - self.t0
+        bundle = RunBundle.from_recorders(self.recorders, meta)
+        bundle.meta["auth"] = self.summary()
+        return bundle
+
+
+def print_auth(results: Dict, baseline: Optional[Dict] = None):
+    print(f"\n🔐 {'Mode':<10} {'requests':>9} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'overhead':>9}"
+          + (f" {'vs baseline p50':>16}" if baseline else ""))
+    for mode, r in results.items():
+        if "p50_ms" not in r:
+            print(f"   {mode:<10} {r['requests']:>9,} {'-':>8}")
+            continue
+        line = (f"   {mode:<10} {r['requests']:>9,} {r['p50_ms']:>8.3f} {r['p90_ms']:>8.3f} {r['p99_ms']:>8.3f} "
+                f"{r['overhead_ms']:>+9.3f}")
+        before = (baseline or {}).get(mode, {}).get("p50_ms")
+        if before:
+            line += f" {r['p50_ms'] - before:>+10.3f} ({100 * (r['p50_ms'] / before - 1):+.0f}%)"
+        print(line)
+
+
+def configure_parser(parser):
+    parser.add_argument("--url", default="http://localhost:8080", help="Base URL for the backend API")
+    parser.add_argument("--requests", type=int, default=10_000, help="Requests per mode")
+    parser.add_argument("--workers", type=int, default=4, help="Concurrent clients")
+    parser.add_argument("--baseline", help="Bundle of an earlier auth run to compare p50s with")
+    parser.add_argument("--name", help="Bundle name (default: auth-<timestamp>)")
+    parser.add_argument("--out-dir", default="runs", help="Directory that receives the run bundle")
+
+
+def run_command(args) -> int:
+    baseline = None
+    if args.baseline:
+        try:
+            baseline = RunBundle.load(args.baseline).meta.get("auth")
+        except (OSError, ValueError, KeyError) as e:
+            print(f"❌ {args.baseline}: {e}", file=sys.stderr)
+            return 1
+    bench = AuthOverheadBench(args.url, args.requests, args.workers, args.name)
+    try:
+        bundle = bench.run()
+    except RuntimeError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
+    path = bundle.save(os.path.join(args.out_dir, bench.name))
+    print_auth(bundle.meta["auth"], baseline)
+    print(f"\n✅ {bundle.meta['requests']:,} requests -> {path}")
+    return 0
@@ -0,0 +1,186 @@
+# batch_insert_bench.py
+"""
+Rows/sec of POST /api/v1/me/hair-fall-logs (one row per request) against
+POST /api/v1/me/hair-fall-logs/batch (N rows per request, one JDBC batch).
+
+A fresh user gets --rows logs per mode, drawn from the synthetic dataset
+generator so dates, counts and categories look like real use. Every mode sends
+the same rows on --workers threads:
+
+  * single      one POST per row: request, JWT validation and INSERT each time
+  * batch-<N>   rows grouped N per request, for every N in --batch-size
+
+Every request is recorded (samples.npz), so `perf_runner.py report` shows the
+latency of each mode's requests; rows/sec, requests and rejected rows per mode
+are kept in meta["batch"].
+
+Usage:
+    python perf_runner.py batch --rows 20000 --batch-size 50 --batch-size 500
+    python perf_runner.py batch --rows 5000 --workers 16 --skip-single
+"""
+
+import contextlib
+import os
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from dataset_generator import DatasetGenerator
+from perf_metrics import EndpointTable, MetricsRecorder, RunBundle, new_run_meta
+
+LOGS_PATH = "/api/v1/me/hair-fall-logs"
+BATCH_PATH = f"{LOGS_PATH}/batch"
+DEFAULT_BATCH_SIZES = (50, 500) # 500 is the server's default app.hair-fall-logs.batch-max-size
+
+
+def generated_logs(rows: int, seed: int = 1) -> List[Dict]:
+    """CreateHairFallLogRequest bodies taken from the generator's hair_fall_logs table"""
+    generator = DatasetGenerator(users=max(rows // 200, 1) + 1, days=365, seed=seed)
+    logs: List[Dict] = []
+    for chunk in generator.chunks("hair_fall_logs"):
+        dates = chunk["date"].astype(str).tolist()
+        for i, (count, category, description) in enumerate(zip(
+                chunk["count"].tolist(), chunk["category"].tolist(), chunk["description"].tolist())):
+            logs.append({"date": dates[i], "count": None if count is None else int(count), "category": category,
+                         "description": description, "photoMetadataId": None})
+            if len(logs) == rows:
+                return logs
+    # the generator is sized to overshoot; a sparse draw that falls short repeats its rows
+    return [logs[i % len(logs)] for i in range(rows)] if logs else logs
+
+
+class BatchInsertBench:
+    """Inserts the same rows through the single-row and batch endpoints and compares throughput"""
+
+    def __init__(self, base_url: str, rows: int = 20_000, batch_sizes=DEFAULT_BATCH_SIZES, workers: int = 8,
+                 single: bool = True, seed: int = 1, name: str = None):
+        self.base_url = base_url
+        self.rows = rows
+        self.modes = (["single"] if single else []) + [f"batch-{n}" for n in batch_sizes]
+        self.workers = workers
+        self.seed = seed
+        self.name = name or f"batch-{time.strftime('%Y%m%d-%H%M%S')}"
+        self.run_id = uuid.uuid4().hex[:8]
+        self.email = f"batch_{self.run_id}@hairhealth.com"
+        self.password = f"BatchPass_{self.run_id}!"
+
+        self.t0 = 0.0
+        self.endpoints = EndpointTable()
+        self.recorders: List[MetricsRecorder] = []
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.access_token: Optional[str] = None
+        self.results: Dict[str, Dict] = {}
+
+    def _new_harness(self):
+        from main_runner import ComprehensiveTestRunner
+
+        harness = ComprehensiveTestRunner(self.base_url)
+        harness.user_email, harness.user_password = self.email, self.password
+        harness.username = self.email.split("@")[0]
+        return harness
+
+    def authenticate(self) -> bool:
+        harness = self._new_harness()
+        harness.test_user_registration()
+        if not harness.access_token:
+            harness.test_user_login()
+        self.access_token = harness.access_token
+        return self.access_token is not None
+
+    def worker_harness(self):
+        """This thread's harness, with its own recorder, created on first use"""
+        harness = getattr(self.local, "harness", None)
+        if harness is None:
+            harness = self._new_harness()
+            harness.access_token = self.access_token
+            with self.lock:
+                harness.recorder = MetricsRecorder(self.endpoints, self.t0, worker=len(self.recorders),
+                                                   run_id=self.run_id)
+                self.recorders.append(harness.recorder)
+            self.local.harness = harness
+        return harness
+
+    def _post_single(self, log: Dict) -> int:
+        response = self.worker_harness().make_request("POST", LOGS_PATH, data=log, use_auth=True)
+        return int(response is not None and response.status_code in (200, 201))
+
+    def _post_batch(self, logs: List[Dict]) -> int:
+        response = self.worker_harness().make_request("POST", BATCH_PATH, data={"logs": logs}, use_auth=True)
+        if response is None or response.status_code not in (200, 201, 207):
+            return 0
+        try:
+            created = response.json().get("created")
+        except (ValueError, AttributeError):
+            created = None
+        return created if isinstance(created, int) else len(logs)
+
+    def insert(self, mode: str, logs: List[Dict]):
+        if mode == "single":
+            work, send = logs, self._post_single
+        else:
+            size = int(mode.split("-", 1)[1])
+            work, send = [logs[i:i + size] for i in range(0, len(logs), size)], self._post_batch
+        started = time.monotonic()
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            created = sum(pool.map(send, work))
+        elapsed = time.monotonic() - started
+        self.results[mode] = {"rows": len(logs), "created": created, "rejected": len(logs) - created,
+                              "requests": len(work), "seconds": elapsed, "rows_per_s": created / max(elapsed, 1e-9)}
+
+    def run(self) -> RunBundle:
+        self.t0 = time.monotonic()
+        meta = new_run_meta(self.name, self.base_url, scenario="batch-insert", workers=self.workers,
+                            rows=self.rows, modes=self.modes, run_id=self.run_id, user_email=self.email)
+        logs = generated_logs(self.rows, self.seed)
+        with open(os.devnull, "w") as sink, contextlib.redirect_stdout(sink):
+            if not self.authenticate():
+                raise RuntimeError(f"could not authenticate as {self.email}")
+            for mode in self.modes:
+                print(f"📥 {mode}: {self.rows:,} rows on {self.workers} workers", file=sys.stderr)
+                self.insert(mode, logs)
+
+        meta["duration_s"] = time.monotonic() - self.t0
+        bundle = RunBundle.from_recorders(self.recorders, meta)
+        baseline = self.results.get("single", {}).get("rows_per_s")
+        for stats in self.results.values():
+            stats["speedup"] = stats["rows_per_s"] / baseline if baseline else None
+        bundle.meta["batch"] = self.results
+        return bundle
+
+
+def print_batch(results: Dict):
+    print(f"\n📥 {'Mode':<12} {'requests':>9} {'created':>9} {'rejected':>9} {'seconds':>8} {'rows/s':>9} {'vs single':>10}")
+    for mode, r in results.items():
+        speedup = f"{r['speedup']:.1f}x" if r["speedup"] else "-"
+        print(f"   {mode:<12} {r['requests']:>9,} {r['created']:>9,} {r['rejected']:>9,} {r['seconds']:>8.1f} "
+              f"{r['rows_per_s']:>9.0f} {speedup:>10}")
+
+
+def configure_parser(parser):
+    parser.add_argument("--url", default="http://localhost:8080", help="Base URL for the backend API")
+    parser.add_argument("--rows", type=int, default=20_000, help="Rows inserted per mode")
+    parser.add_argument("--batch-size", type=int, action="append",
+                        help=f"Logs per /batch request (repeatable, default: {', '.join(map(str, DEFAULT_BATCH_SIZES))})")
+    parser.add_argument("--workers", type=int, default=8, help="Concurrent requests")
+    parser.add_argument("--skip-single", action="store_true", help="Only run the batch modes")
+    parser.add_argument("--seed", type=int, default=1, help="Dataset generator seed")
+    parser.add_argument("--name", help="Bundle name (default: batch-<timestamp>)")
+    parser.add_argument("--out-dir", default="runs", help="Directory that receives the run bundle")
+
+
+def run_command(args) -> int:
+    bench = BatchInsertBench(args.url, args.rows, tuple(args.batch_size or DEFAULT_BATCH_SIZES), args.workers,
+                             not args.skip_single, args.seed, args.name)
+    try:
+        bundle = bench.run()
+    except RuntimeError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
+    path = bundle.save(os.path.join(args.out_dir, bench.name))
+    print_batch(bundle.meta["batch"])
+    print(f"\n✅ {bundle.meta['requests']:,} requests -> {path}")
+    return 0
@@ -0,0 +1,262 @@
+# blob_server.py
+"""
+Local stand-in for the photo blob store behind the upload and view URLs.
+
+PhotoMetadataService hands out <app.storage.base-url>/upload/<blobPath> and
+<app.storage.base-url>/download/<blobPath>; with app.storage.base-url pointed here,
+photo uploads and views can be load-tested on one box without cloud storage.
+
+  PUT     /upload/<blobPath>      stores the body (Content-Length required); it is
+                                  received straight into an mmap of the new file
+                                  and renamed into place once complete
+  GET     /download/<blobPath>    sends the file with sendfile(2); a single
+  HEAD                            Range: bytes=a-b / a- / -n is answered with 206
+  DELETE  /download/<blobPath>
+  GET     /_stats                 request and byte counters, MB/s in and out
+
+Either prefix works with every method; the ?token= of the mock URLs is ignored.
+Blobs live under --root as files named by their blob path.
+
+Usage:
+    python perf_runner.py blobs --port 9000
+    python perf_runner.py blobs --port 9000 --root /dev/shm/blobs --stats-interval 5
+"""
+
+import json
+import mmap
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+from urllib.parse import unquote, urlparse
+
+from impact_selector import HERE
+
+DEFAULT_ROOT = os.path.join(HERE, ".blobstore")
+PREFIXES = ("upload", "download")
+STATS_PATH = "/_stats"
+RECV_CHUNK = 4 << 20
+_RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+class BlobStats:
+    """Counters shared by all handler threads"""
+
+    FIELDS = ("puts", "gets", "heads", "deletes", "ranges", "not_found", "errors", "bytes_in", "bytes_out")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.started = time.monotonic()
+        self.counts = dict.fromkeys(self.FIELDS, 0)
+        self._last = (self.started, 0, 0)
+
+    def add(self, **deltas: int):
+        with self.lock:
+            for field, delta in deltas.items():
+                self.counts[field] += delta
+
+    def snapshot(self) -> Dict:
+        with self.lock:
+            now = time.monotonic()
+            elapsed = max(now - self.started, 1e-9)
+            return dict(self.counts, uptime_s=now - self.started,
+                        in_mb_per_s=self.counts["bytes_in"] / 1e6 / elapsed,
+                        out_mb_per_s=self.counts["bytes_out"] / 1e6 / elapsed)
+
+    def interval(self) -> Tuple[float, float]:
+        """MB/s in and out since the previous call"""
+        with self.lock:
+            now = time.monotonic()
+            last_t, last_in, last_out = self._last
+            self._last = (now, self.counts["bytes_in"], self.counts["bytes_out"])
+            elapsed = max(now - last_t, 1e-9)
+            return ((self.counts["bytes_in"] - last_in) / 1e6 / elapsed,
+                    (self.counts["bytes_out"] - last_out) / 1e6 / elapsed)
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """(offset, length) of a single bytes range; None to send the whole blob. Raises ValueError when unsatisfiable."""
+    match = _RANGE.match(header.strip()) if header else None
+    if not match or match.groups() == ("", ""):
+        return None # absent, multi-range or malformed: a full 200 is a valid answer
+    first, last = match.groups()
+    if first == "":
+        length = min(int(last), size)
+        if length == 0:
+            raise ValueError("empty suffix range")
+        return size - length, length
+    first = int(first)
+    last = min(int(last), size - 1) if last else size - 1
+    if first >= size or last < first:
+        raise ValueError(f"range starts past {size} bytes")
+    return first, last - first + 1
+
+
+class BlobRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "HairHealthBlobs/1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _reply(self, status: int, body: bytes = b"", content_type: str = "application/json", headers: Dict = None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        if body and self.command != "HEAD":
+            self.wfile.write(body)
+
+    def _error(self, status: int, message: str):
+        self.server.stats.add(errors=int(status >= 500), not_found=int(status == 404))
+        self._reply(status, json.dumps({"error": message}).encode())
+
+    def _blob_file(self) -> Optional[str]:
+        """File behind the request path, None (after replying) when the path is not a blob"""
+        parts = unquote(urlparse(self.path).path).strip("/").split("/")
+        if parts and parts[0] in PREFIXES:
+            parts = parts[1:]
+        if not parts or any(p in ("", ".", "..") for p in parts):
+            self._error(400, "not a blob path")
+            return None
+        return os.path.join(self.server.root, *parts)
+
+    def do_PUT(self):
+        path = self._blob_file()
+        if path is None:
+            return
+        length = self.headers.get("Content-Length")
+        if length is None or not length.isdigit():
+            self.close_connection = True
+            return self._error(411, "Content-Length required")
+        length = int(length)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".put-")
+        except OSError:
+            # a parent of this path is already a blob; the body is left unread
+            self.close_connection = True
+            return self._error(409, "blob path collides with an existing blob")
+        received = 0
+        try:
+            if length:
+                os.ftruncate(fd, length)
+                with mmap.mmap(fd, length) as mapped:
+                    view = memoryview(mapped)
+                    try:
+                        while received < length:
+                            n = self.rfile.readinto(view[received:min(received + RECV_CHUNK, length)])
+                            if not n:
+                                break
+                            received += n
+                    finally:
+                        view.release()
+        finally:
+            os.close(fd)
+        if received < length:
+            os.unlink(tmp)
+            self.close_connection = True
+            self.server.stats.add(errors=1, bytes_in=received)
+            return
+        try:
+            os.replace(tmp, path)
+        except OSError: # the path is a directory of other blobs
+            os.unlink(tmp)
+            return self._error(409, "blob path collides with an existing blob")
+        self.server.stats.add(puts=1, bytes_in=length)
+        self._reply(201, json.dumps({"bytes": length}).encode())
+
+    def do_GET(self):
+        if urlparse(self.path).path == STATS_PATH:
+            return self._reply(200, json.dumps(self.server.stats.snapshot()).encode())
+        path = self._blob_file()
+        if path is None:
+            return
+        try:
+            f = open(path, "rb")
+        except (FileNotFoundError, IsADirectoryError, NotADirectoryError):
+            return self._error(404, "no such blob")
+        with f:
+            size = os.fstat(f.fileno()).st_size
+            try:
+                requested = parse_range(self.headers.get("Range"), size)
+            except ValueError as e:
+                return self._reply(416, json.dumps({"error": str(e)}).encode(),
+                                   headers={"Content-Range": f"bytes */{size}"})
+            offset, count = requested or (0, size)
+            self.send_response(206 if requested else 200)
+            self.send_header("Content-Type", "application/octet-stream")
+            self.send_header("Content-Length", str(count))
+            self.send_header("Accept-Ranges", "bytes")
+            if requested:
+                self.send_header("Content-Range", f"bytes {offset}-{offset + count - 1}/{size}")
+            self.end_headers()
+            if self.command == "HEAD":
+                return self.server.stats.add(heads=1)
+            sent = self.connection.sendfile(f, offset, count) if count else 0
+        self.server.stats.add(gets=1, ranges=int(requested is not None), bytes_out=sent)
+
+    do_HEAD = do_GET
+
+    def do_DELETE(self):
+        path = self._blob_file()
+        if path is None:
+            return
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            return self._error(404, "no such blob")
+        self.server.stats.add(deletes=1)
+        self._reply(204)
+
+
+class BlobServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024
+
+    def __init__(self, address: Tuple[str, int], root: str = DEFAULT_ROOT):
+        super().__init__(address, BlobRequestHandler)
+        self.root = os.path.abspath(root)
+        self.stats = BlobStats()
+        os.makedirs(self.root, exist_ok=True)
+
+
+def configure_parser(parser):
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to listen on")
+    parser.add_argument("--port", type=int, default=9000, help="Port (point app.storage.base-url here)")
+    parser.add_argument("--root", default=DEFAULT_ROOT, help="Directory the blobs are stored under")
+    parser.add_argument("--stats-interval", type=float, default=10.0, help="Seconds between throughput lines (0: off)")
+
+
+def run_command(args) -> int:
+    server = BlobServer((args.host, args.port), args.root)
+    print(f"🪣 Blob store on http://{args.host}:{server.server_address[1]} -> {server.root} "
+          f"(counters at {STATS_PATH})", file=sys.stderr)
+    stop = threading.Event()
+
+    def report():
+        while not stop.wait(args.stats_interval):
+            mb_in, mb_out = server.stats.interval()
+            counts = server.stats.counts
+            print(f"   {mb_in:8.1f} MB/s in {mb_out:8.1f} MB/s out   {counts['puts']:>9,} PUT {counts['gets']:>9,} GET "
+                  f"{counts['errors']:>6,} errors", file=sys.stderr)
+
+    if args.stats_interval > 0:
+        threading.Thread(target=report, daemon=True).start()
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop.set()
+        server.server_close()
+    stats = server.stats.snapshot()
+    print(f"\n✅ {stats['puts']:,} PUT ({stats['bytes_in'] / 1e6:,.1f} MB), {stats['gets']:,} GET "
+          f"({stats['bytes_out'] / 1e6:,.1f} MB) in {stats['uptime_s']:.0f}s", file=sys.stderr)
+    return 0
@@ -0,0 +1,464 @@
+# copy_seeder.py
+"""
+Loads the synthetic dataset straight into PostgreSQL with COPY, bypassing the API.
+
+The table definitions are read from the Flyway migrations (db/migration/V*.sql,
+applied in version order, CREATE TABLE IF NOT EXISTS and ALTER TABLE ... ADD COLUMN
+included), and every generated table is checked against them before anything is
+sent: each generated column must exist, and every NOT NULL column without a
+default must be generated. Rows from dataset_generator are then encoded chunk by
+chunk and streamed in COPY binary (default) or text format, parents first, so
+memory stays flat for any size.
+
+  --rebuild-indexes  drops the secondary indexes the migrations create on the
+                     loaded tables, loads, then recreates them with one sort each
+                     instead of maintaining them row by row
+  --no-fk-checks     session_replication_role=replica for the load (superuser);
+                     generated rows are consistent by construction
+  --truncate         empties the loaded tables first (generated ids repeat per seed)
+
+psycopg 3 is used when it is installed, otherwise psql's \\copy ... from pstdin.
+The connection defaults to spring.datasource.* in application.properties.
+
+Usage:
+    python perf_runner.py seed --users 100000 --truncate --rebuild-indexes
+    python perf_runner.py seed --users 1000000 --tables users hair_fall_logs --no-fk-checks --format text
+    python perf_runner.py seed --check-schema
+"""
+
+import os
+import re
+import shutil
+import subprocess
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Sequence
+from urllib.parse import quote
+
+import numpy as np
+
+from dataset_generator import (COLUMNS, DEFAULT_CHUNK_ROWS, TABLES, UNUSABLE_PASSWORD_HASH, Chunk,
+                               DatasetGenerator, text_columns)
+from impact_selector import BACKEND, MIGRATION_DIR
+
+APPLICATION_PROPERTIES = os.path.join(BACKEND, "resources", "application.properties")
+FORMATS = ("binary", "text")
+
+PGCOPY_HEADER = b"PGCOPY\n\xff\r\n\x00" + b"\x00" * 8 # signature, flags, header extension length
+PGCOPY_TRAILER = b"\xff\xff"
+NULL_FIELD = b"\xff\xff\xff\xff" # field length -1
+PG_EPOCH = np.datetime64("2000-01-01T00:00:00", "us")
+TEXT_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+
+_VERSION = re.compile(r"^V(\d+)__")
+_CREATE_TABLE = re.compile(r"^CREATE\s+TABLE\s+(IF\s+NOT\s+EXISTS\s+)?\"?(\w+)\"?\s*\((.*)\)$", re.I | re.S)
+_ALTER_TABLE = re.compile(r"^ALTER\s+TABLE\s+(?:IF\s+EXISTS\s+)?\"?(\w+)\"?\s+(.*)$", re.I | re.S)
+_ADD_COLUMN = re.compile(r"^ADD\s+COLUMN\s+(?:IF\s+NOT\s+EXISTS\s+)?(.*)$", re.I | re.S)
+_CREATE_INDEX = re.compile(r"^CREATE\s+(UNIQUE\s+)?INDEX\s+(?:IF\s+NOT\s+EXISTS\s+)?\"?(\w+)\"?\s+ON\s+\"?(\w+)\"?",
+                           re.I)
+_TABLE_CONSTRAINTS = {"CONSTRAINT", "PRIMARY", "FOREIGN", "UNIQUE", "CHECK", "EXCLUDE"}
+_TYPE_END = {"PRIMARY", "NOT", "NULL", "DEFAULT", "REFERENCES", "UNIQUE", "CHECK", "CONSTRAINT", "GENERATED"}
+
+
+class SchemaMismatch(ValueError):
+    """Generated columns do not fit the tables the migrations define"""
+
+
+@dataclass
+class Column:
+    name: str
+    type: str # lower case as written, e.g. "timestamp with time zone", "varchar(255)"
+    not_null: bool
+    has_default: bool
+
+
+@dataclass
+class Index:
+    name: str
+    table: str
+    unique: bool
+    statement: str
+
+
+@dataclass
+class FlywaySchema:
+    tables: Dict[str, List[Column]] = field(default_factory=dict)
+    indexes: List[Index] = field(default_factory=list)
+
+    def column_types(self, table: str) -> Dict[str, str]:
+        return {c.name: c.type for c in self.tables[table]}
+
+    def secondary_indexes(self, table: str) -> List[Index]:
+        """Plain indexes the migrations add; unique ones back constraints and stay"""
+        return [i for i in self.indexes if i.table == table and not i.unique]
+
+
+def _split_top_level(body: str) -> List[str]:
+    parts, depth, start = [], 0, 0
+    for i, ch in enumerate(body):
+        if ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth -= 1
+        elif ch == "," and depth == 0:
+            parts.append(body[start:i].strip())
+            start = i + 1
+    parts.append(body[start:].strip())
+    return [p for p in parts if p]
+
+
+def _parse_column(definition: str) -> Optional[Column]:
+    words = definition.split()
+    if words[0].upper() in _TABLE_CONSTRAINTS:
+        return None
+    type_words = []
+    for word in words[1:]:
+        if word.upper() in _TYPE_END:
+            break
+        type_words.append(word)
+    rest = " ".join(words).upper()
+    return Column(words[0].strip('"').lower(), " ".join(type_words).lower(),
+                  "NOT NULL" in rest or "PRIMARY KEY" in rest, "DEFAULT" in rest)
+
+
+def migration_files(directory: str = MIGRATION_DIR) -> List[str]:
+    """Versioned migrations in the order Flyway applies them (V10 after V9)"""
+    paths = [os.path.join(directory, name) for name in os.listdir(directory) if _VERSION.match(name)]
+    return sorted(paths, key=lambda p: int(_VERSION.match(os.path.basename(p)).group(1)))
+
+
+def load_schema(directory: str = MIGRATION_DIR) -> FlywaySchema:
+    schema = FlywaySchema()
+    for path in migration_files(directory):
+        with open(path) as f:
+            sql = re.sub(r"--[^\n]*", "", f.read())
+        for statement in (s.strip() for s in sql.split(";")):
+            if not statement:
+                continue
+            match = _CREATE_TABLE.match(statement)
+            if match:
+                if_not_exists, table, body = match.groups()
+                if table.lower() in schema.tables and if_not_exists:
+                    continue # the earlier definition stays, as it does in the database
+                columns = [_parse_column(part) for part in _split_top_level(body)]
+                schema.tables[table.lower()] = [c for c in columns if c]
+                continue
+            match = _ALTER_TABLE.match(statement)
+            if match:
+                table, actions = match.groups()
+                for action in _split_top_level(actions):
+                    added = _ADD_COLUMN.match(action)
+                    if added and table.lower() in schema.tables:
+                        column = _parse_column(added.group(1))
+                        if column:
+                            schema.tables[table.lower()].append(column)
+                continue
+            match = _CREATE_INDEX.match(statement)
+            if match:
+                unique, name, table = match.groups()
+                schema.indexes.append(Index(name, table.lower(), bool(unique), " ".join(statement.split())))
+    return schema
+
+
+def check_columns(schema: FlywaySchema, table: str, columns: Sequence[str]):
+    if table not in schema.tables:
+        raise SchemaMismatch(f"{table}: not created by any migration")
+    defined = {c.name: c for c in schema.tables[table]}
+    unknown = [c for c in columns if c not in defined]
+    if unknown:
+        raise SchemaMismatch(f"{table}: generated columns {unknown} are not in the migrations")
+    missing = [c.name for c in schema.tables[table] if c.not_null and not c.has_default and c.name not in columns]
+    if missing:
+        raise SchemaMismatch(f"{table}: NOT NULL columns {missing} have no default and are not generated")
+
+
+# --- COPY encoding ---
+
+def _null_mask(values: np.ndarray) -> np.ndarray:
+    if values.dtype.kind == "O":
+        return np.equal(values, None)
+    if values.dtype.kind == "M":
+        return np.isnat(values)
+    return np.zeros(values.size, dtype=bool)
+
+
+def _fixed_width(values: np.ndarray, dtype: str) -> List[bytes]:
+    """Length-prefixed big-endian fields, packed in one NumPy pass"""
+    width = np.dtype(dtype).itemsize
+    packed = np.empty(values.size, dtype=[("n", ">i4"), ("v", dtype)])
+    packed["n"] = width
+    packed["v"] = values
+    return packed.view(f"V{4 + width}").tolist()
+
+
+def binary_fields(values: np.ndarray, pg_type: str) -> np.ndarray:
+    """One COPY binary field (length + payload, or NULL) per value of a column"""
+    null = _null_mask(values)
+    present = values[~null] if null.any() else values
+    if pg_type == "uuid":
+        raw = bytes.fromhex("".join(present.tolist()).replace("-", ""))
+        encoded = _fixed_width(np.frombuffer(raw, dtype="V16"), "V16")
+    elif pg_type == "date":
+        days = present.astype("datetime64[D]") - PG_EPOCH.astype("datetime64[D]")
+        encoded = _fixed_width(days.astype(np.int64), ">i4")
+    elif pg_type.startswith("timestamp"):
+        micros = present.astype("datetime64[us]") - PG_EPOCH
+        encoded = _fixed_width(micros.astype(np.int64), ">i8")
+    elif pg_type in ("integer", "int", "int4"):
+        encoded = _fixed_width(present.astype(np.int64), ">i4")
+    elif pg_type in ("bigint", "int8"):
+        encoded = _fixed_width(present.astype(np.int64), ">i8")
+    elif pg_type in ("smallint", "int2"):
+        encoded = _fixed_width(present.astype(np.int64), ">i2")
+    elif pg_type in ("boolean", "bool"):
+        encoded = _fixed_width(present.astype(bool), "?")
+    else: # text, varchar(n): UTF-8 as is
+        encoded = [len(b).to_bytes(4, "big") + b for b in (str(v).encode() for v in present.tolist())]
+    out = np.full(values.size, NULL_FIELD, dtype=object)
+    out[~null] = encoded
+    return out
+
+
+def encode_binary(chunk: Chunk, types: Dict[str, str]) -> bytes:
+    """Rows of a chunk in COPY binary format, without the stream header and trailer"""
+    n = len(next(iter(chunk.values())))
+    parts = np.empty((n, len(chunk) + 1), dtype=object)
+    parts[:, 0] = len(chunk).to_bytes(2, "big")
+    for j, (name, values) in enumerate(chunk.items(), 1):
+        parts[:, j] = binary_fields(values, types[name])
+    return b"".join(parts.ravel().tolist())
+
+
+def encode_text(chunk: Chunk, types: Dict[str, str]) -> bytes:
+    """Rows of a chunk in COPY text format: tab separated, \\N for NULL, backslash escapes"""
+    line = None
+    for name, column in zip(chunk, text_columns(chunk, true="t", false="f")):
+        if types[name] == "text" or types[name].startswith(("varchar", "character", "char")):
+            column = np.array([v if v is None else v.translate(TEXT_ESCAPES) for v in column.tolist()], dtype=object)
+        column = np.where(np.equal(column, None), "\\N", column).astype(str).astype(object) # ints arrive as int
+        line = column if line is None else line + "\t" + column
+    return ("\n".join(line.tolist()) + "\n").encode() if line is not None and line.size else b""
+
+
+def copy_stream(chunks: Iterator[Chunk], types: Dict[str, str], fmt: str, counter: Dict) -> Iterator[bytes]:
+    if fmt == "binary":
+        yield PGCOPY_HEADER
+    encode = encode_binary if fmt == "binary" else encode_text
+    for chunk in chunks:
+        data = encode(chunk, types)
+        counter["rows"] += len(chunk["id"])
+        counter["bytes"] += len(data)
+        yield data
+    if fmt == "binary":
+        yield PGCOPY_TRAILER
+
+
+# --- connections ---
+
+def datasource_dsn(path: str = APPLICATION_PROPERTIES) -> str:
+    """libpq URL for spring.datasource.url/username/password"""
+    props = {}
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith("#") and "=" in line:
+                key, value = line.split("=", 1)
+                props[key.strip()] = value.strip()
+    url = props.get("spring.datasource.url", "jdbc:postgresql://localhost:5432/postgres")
+    if not url.startswith("jdbc:postgresql://"):
+        raise ValueError(f"spring.datasource.url is not PostgreSQL: {url}")
+    address = url[len("jdbc:postgresql://"):].split("?", 1)[0]
+    user, password = props.get("spring.datasource.username"), props.get("spring.datasource.password")
+    credentials = quote(user, safe="") + (":" + quote(password, safe="") if password else "") + "@" if user else ""
+    return f"postgresql://{credentials}{address}"
+
+
+def _copy_sql(table: str, columns: Sequence[str], fmt: str, source: str) -> str:
+    quoted = ", ".join(f'"{c}"' for c in columns)
+    return f"COPY {table} ({quoted}) FROM {source} WITH (FORMAT {fmt})"
+
+
+class PsycopgConnection:
+    """COPY through psycopg 3; session settings apply to the one connection used for everything"""
+
+    name = "psycopg"
+
+    def __init__(self, dsn: str, session: Sequence[str] = ()):
+        import psycopg
+
+        self.conn = psycopg.connect(dsn, autocommit=True)
+        for statement in session:
+            self.conn.execute(statement)
+
+    def execute(self, sql: str):
+        self.conn.execute(sql)
+
+    def query(self, sql: str) -> List[tuple]:
+        return self.conn.execute(sql).fetchall()
+
+    def copy(self, table: str, columns: Sequence[str], fmt: str, blocks: Iterator[bytes]):
+        with self.conn.cursor() as cursor, cursor.copy(_copy_sql(table, columns, fmt, "STDIN")) as copy:
+            for block in blocks:
+                copy.write(block)
+
+    def close(self):
+        self.conn.close()
+
+
+class PsqlConnection:
+    """COPY through psql's \\copy ... from pstdin; each call is its own session, so session
+    settings are repeated in front of every command"""
+
+    name = "psql"
+
+    def __init__(self, dsn: str, session: Sequence[str] = (), psql: str = "psql"):
+        self.dsn = dsn
+        self.session = list(session)
+        self.psql = psql
+
+    def _command(self, *commands: str) -> List[str]:
+        argv = [self.psql, self.dsn, "-X", "-q", "-v", "ON_ERROR_STOP=1"]
+        for command in [*self.session, *commands]:
+            argv += ["-c", command]
+        return argv
+
+    def execute(self, sql: str):
+        subprocess.run(self._command(sql), check=True, stdout=subprocess.DEVNULL)
+
+    def query(self, sql: str) -> List[tuple]:
+        """Rows as tuples of strings (unaligned, tab separated output)"""
+        argv = self._command(sql)
+        argv[1:1] = ["-A", "-t", "-F", "\t"]
+        result = subprocess.run(argv, check=True, stdout=subprocess.PIPE, text=True)
+        return [tuple(line.split("\t")) for line in result.stdout.splitlines() if line]
+
+    def copy(self, table: str, columns: Sequence[str], fmt: str, blocks: Iterator[bytes]):
+        command = "\\copy" + _copy_sql(table, columns, fmt, "pstdin")[len("COPY"):] # meta-commands are lower case
+        process = subprocess.Popen(self._command(command), stdin=subprocess.PIPE, stdout=subprocess.DEVNULL)
+        try:
+            for block in blocks:
+                process.stdin.write(block)
+        finally:
+            process.stdin.close()
+            if process.wait() != 0:
+                raise subprocess.CalledProcessError(process.returncode, process.args)
+
+    def close(self):
+        pass
+
+
+def connect(dsn: str, session: Sequence[str] = (), psql: Optional[str] = None):
+    if psql is None:
+        try:
+            return PsycopgConnection(dsn, session)
+        except ImportError:
+            pass
+    executable = psql or shutil.which("psql")
+    if executable is None:
+        raise RuntimeError("neither psycopg (pip install 'psycopg[binary]') nor psql is available")
+    return PsqlConnection(dsn, session, executable)
+
+
+# --- seeding ---
+
+class CopySeeder:
+    """Streams DatasetGenerator tables into PostgreSQL, one COPY per table"""
+
+    def __init__(self, generator: DatasetGenerator, schema: FlywaySchema, tables: Sequence[str] = TABLES,
+                 fmt: str = "binary"):
+        self.generator = generator
+        self.schema = schema
+        self.tables = [t for t in TABLES if t in tables] # parents before children
+        self.fmt = fmt
+        for table in self.tables:
+            check_columns(schema, table, COLUMNS[table])
+
+    def run(self, conn, truncate: bool = False, rebuild_indexes: bool = False,
+            maintenance_work_mem: Optional[str] = None) -> Dict:
+        report = {"backend": conn.name, "format": self.fmt, "tables": {}, "indexes": {}}
+        if truncate:
+            conn.execute(f"TRUNCATE {', '.join(self.tables)} CASCADE")
+        dropped = [i for t in self.tables for i in self.schema.secondary_indexes(t)] if rebuild_indexes else []
+        for index in dropped:
+            conn.execute(f"DROP INDEX IF EXISTS {index.name}")
+
+        try:
+            for table in self.tables:
+                counter = {"rows": 0, "bytes": 0}
+                started = time.perf_counter()
+                conn.copy(table, COLUMNS[table], self.fmt,
+                          copy_stream(self.generator.chunks(table), self.schema.column_types(table), self.fmt, counter))
+                elapsed = time.perf_counter() - started
+                report["tables"][table] = {**counter, "seconds": elapsed, "rows_per_s": counter["rows"] / max(elapsed, 1e-9),
+                                           "mb_per_s": counter["bytes"] / 1e6 / max(elapsed, 1e-9)}
+                print(f"   {table:<26} {counter['rows']:>12,} rows {elapsed:7.1f}s "
+                      f"{report['tables'][table]['rows_per_s']:>10,.0f} rows/s {report['tables'][table]['mb_per_s']:6.1f} MB/s")
+        finally:
+            # Also after a failed COPY (e.g. duplicate keys without --truncate): never leave the tables unindexed
+            if dropped and maintenance_work_mem:
+                conn.execute(f"SET maintenance_work_mem = '{maintenance_work_mem}'")
+            for index in dropped:
+                started = time.perf_counter()
+                conn.execute(re.sub(r"^CREATE\s+INDEX\s+(?:IF\s+NOT\s+EXISTS\s+)?", "CREATE INDEX IF NOT EXISTS ",
+                                    index.statement, flags=re.I))
+                report["indexes"][index.name] = time.perf_counter() - started
+                print(f"   🔧 {index.name:<56} rebuilt in {report['indexes'][index.name]:6.1f}s")
+        started = time.perf_counter()
+        conn.execute(f"ANALYZE {', '.join(self.tables)}")
+        report["analyze_s"] = time.perf_counter() - started
+        return report
+
+
+def configure_parser(parser):
+    parser.add_argument("--dsn", help="libpq connection URL (default: spring.datasource.* in application.properties)")
+    parser.add_argument("--users", type=int, default=1000, help="Users to generate; other tables scale with it")
+    parser.add_argument("--days", type=int, default=730, help="History length, ending today")
+    parser.add_argument("--seed", type=int, default=1, help="Same seed, same rows")
+    parser.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS, help="Rows encoded per COPY write")
+    parser.add_argument("--tables", nargs="+", choices=TABLES, default=list(TABLES), help="Tables to load")
+    parser.add_argument("--password-hash", default=UNUSABLE_PASSWORD_HASH,
+                        help="users.password_hash for every generated user (a bcrypt hash)")
+    parser.add_argument("--format", choices=FORMATS, default="binary", help="COPY format")
+    parser.add_argument("--truncate", action="store_true", help="TRUNCATE the loaded tables (CASCADE) first")
+    parser.add_argument("--rebuild-indexes", action="store_true",
+                        help="Drop the migrations' secondary indexes on the loaded tables and recreate them afterwards")
+    parser.add_argument("--maintenance-work-mem", default="1GB", help="maintenance_work_mem for the index rebuild")
+    parser.add_argument("--no-fk-checks", action="store_true",
+                        help="Skip foreign-key triggers during the load (session_replication_role=replica, superuser)")
+    parser.add_argument("--psql", nargs="?", const="psql", help="Use psql \\copy even if psycopg is installed")
+    parser.add_argument("--migrations", default=MIGRATION_DIR, help="Flyway migration directory")
+    parser.add_argument("--check-schema", action="store_true",
+                        help="Only check the generated columns against the migrations; no database needed")
+
+
+def run_command(args) -> int:
+    schema = load_schema(args.migrations)
+    generator = DatasetGenerator(args.users, args.days, args.seed, args.chunk_rows, password_hash=args.password_hash)
+    try:
+        seeder = CopySeeder(generator, schema, args.tables, args.format)
+    except SchemaMismatch as e:
+        print(f"❌ {e}")
+        return 1
+    if args.check_schema:
+        for table in seeder.tables:
+            print(f"✅ {table}: {len(COLUMNS[table])} columns match; secondary indexes: "
+                  f"{', '.join(i.name for i in schema.secondary_indexes(table)) or '-'}")
+        return 0
+
+    session = ["SET session_replication_role = replica"] if args.no_fk_checks else []
+    try:
+        conn = connect(args.dsn or datasource_dsn(), session, args.psql)
+    except (RuntimeError, ValueError) as e:
+        print(f"❌ {e}")
+        return 1
+    print(f"🐘 COPY ({args.format}, {conn.name}) {args.users:,} users x {args.days} days (seed {args.seed})")
+    started = time.perf_counter()
+    try:
+        report = seeder.run(conn, args.truncate, args.rebuild_indexes, args.maintenance_work_mem)
+    finally:
+        conn.close()
+    elapsed = time.perf_counter() - started
+    rows = sum(t["rows"] for t in report["tables"].values())
+    print(f"✅ {rows:,} rows in {elapsed:.1f}s ({rows / max(elapsed, 1e-9):,.0f} rows/s overall, "
+          f"indexes {sum(report['indexes'].values()):.1f}s, analyze {report['analyze_s']:.1f}s)")
+    return 0
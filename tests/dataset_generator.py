@@ -0,0 +1,388 @@
+# dataset_generator.py
+"""
+Vectorised synthetic dataset for the tables behind the /me endpoints.
+
+Rows are drawn with NumPy for whole blocks of users at a time, never per row:
+
+  users                      one per generated user, emails gen_<seed>_<n>@hairhealth.com
+  hair_fall_logs             each user logs on a share of days; counts follow a per-user
+                             baseline and yearly trend with Poisson noise; categories
+                             follow a per-user Dirichlet draw around the HairFallCategory mix
+  interventions              ~1.2 per user, TOPICAL/ORAL/OTHER_TREATMENT, some ended
+  intervention_applications  one slot per scheduled dose; a slot is logged with the
+                             intervention's adherence, which fades over months and dips
+                             at weekends
+  photo_metadata             monthly-ish sessions; each session covers a subset of the
+                             PhotoAngle values, VERTEX and HAIRLINE almost always
+
+Every table is generated block by block (PROFILE_BLOCK users) from generators seeded
+with (seed, table, block), so a block can be regenerated for any table without
+keeping earlier blocks, and memory stays flat however many users are asked for.
+Column names and order follow the Flyway schema, so chunks can go straight into
+CSV/COPY (see write_csv and text_columns).
+
+Seeded users get --password-hash; the default cannot match any password, so
+authenticate as them with tokens minted offline or copy a real bcrypt hash from a
+registered user.
+
+Usage:
+    python perf_runner.py generate --users 10000 --out-dir dataset/
+    python perf_runner.py generate --users 200000 --tables hair_fall_logs --chunk-rows 500000
+"""
+
+import csv
+import os
+import time
+from datetime import date, timedelta
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+
+from schema_fuzzer import random_uuids
+
+Chunk = Dict[str, np.ndarray]
+
+PROFILE_BLOCK = 1000 # users per generation block; fixed so every table sees the same users
+DEFAULT_CHUNK_ROWS = 100_000
+UNUSABLE_PASSWORD_HASH = "!generated-user" # not a bcrypt hash, so no password matches
+
+# Column order of each table in the Flyway migrations
+COLUMNS: Dict[str, List[str]] = {
+    "users": ["id", "email", "username", "password_hash", "is_email_verified", "created_at", "updated_at",
+              "is_active"],
+    "hair_fall_logs": ["id", "user_id", "date", "count", "category", "description", "photo_metadata_id",
+                       "created_at", "updated_at"],
+    "interventions": ["id", "user_id", "type", "product_name", "dosage_amount", "frequency", "application_time",
+                      "start_date", "end_date", "is_active", "provider", "notes", "source_recommendation_id",
+                      "created_at", "updated_at"],
+    "intervention_applications": ["id", "intervention_id", "user_id", "timestamp", "notes", "created_at"],
+    "photo_metadata": ["id", "user_id", "filename", "angle", "capture_date", "file_size", "encryption_key_info",
+                       "blob_path", "uploaded_at", "is_deleted"],
+}
+TABLES = tuple(COLUMNS) # dependency order: parents first
+
+# HairFallCategory and its overall mix; each user's own mix is a Dirichlet draw around it
+CATEGORIES = np.array(["SHOWER", "PILLOW", "COMBING", "BRUSHING", "OTHER"], dtype=object)
+CATEGORY_MIX = np.array([0.42, 0.16, 0.14, 0.22, 0.06])
+CATEGORY_CONCENTRATION = 12.0 # higher -> users closer to the overall mix
+
+# PhotoAngle and the chance a session includes each angle
+ANGLES = np.array(["VERTEX", "HAIRLINE", "TEMPLES", "LEFT_SIDE", "RIGHT_SIDE", "BACK"], dtype=object)
+ANGLE_INCLUSION = np.array([0.92, 0.88, 0.55, 0.35, 0.35, 0.2])
+
+# InterventionType mix, products, schedule (doses per day; weekly as 1/7)
+INTERVENTION_TYPES = np.array(["TOPICAL", "ORAL", "OTHER_TREATMENT"], dtype=object)
+INTERVENTION_MIX = np.array([0.55, 0.35, 0.10])
+PRODUCTS = {
+    "TOPICAL": ["Minoxidil 5%", "Minoxidil 2% Foam", "Ketoconazole Shampoo", "Topical Finasteride"],
+    "ORAL": ["Finasteride 1mg", "Dutasteride 0.5mg", "Biotin", "Oral Minoxidil 2.5mg"],
+    "OTHER_TREATMENT": ["Microneedling", "LLLT Cap", "PRP Session"],
+}
+DOSAGES = {"TOPICAL": "1ml", "ORAL": "1 tablet", "OTHER_TREATMENT": None}
+LOG_NOTES = np.array(["after gym", "stressful week", "new shampoo", "humid day", "travelling"], dtype=object)
+
+MS_PER_DAY = 86_400_000
+MS_PER_HOUR = 3_600_000
+
+
+def concat_ranges(lengths: np.ndarray) -> np.ndarray:
+    """0..n-1 for every n in lengths, concatenated (the position within each repeated parent)"""
+    total = int(lengths.sum())
+    starts = np.repeat(np.cumsum(lengths) - lengths, lengths)
+    return np.arange(total, dtype=np.int64) - starts
+
+
+def pick(rng: np.random.Generator, cumulative: np.ndarray) -> np.ndarray:
+    """Index into per-row cumulative weights (rows x options)"""
+    draws = rng.random(cumulative.shape[0])[:, None]
+    return np.minimum((draws > cumulative).sum(axis=1), cumulative.shape[1] - 1)
+
+
+def with_nulls(values: np.ndarray, null: np.ndarray) -> np.ndarray:
+    out = values.astype(object)
+    out[null] = None
+    return out
+
+
+class DatasetGenerator:
+    """Streams column chunks per table; the same seed always yields the same rows"""
+
+    def __init__(self, users: int, days: int = 730, seed: int = 1, chunk_rows: int = DEFAULT_CHUNK_ROWS,
+                 end: Optional[date] = None, password_hash: str = UNUSABLE_PASSWORD_HASH):
+        self.users = users
+        self.days = days
+        self.seed = seed
+        self.chunk_rows = chunk_rows
+        self.end = end or date.today()
+        self.start = np.datetime64(self.end - timedelta(days=days - 1), "D")
+        self.password_hash = password_hash
+        self.blocks = (users + PROFILE_BLOCK - 1) // PROFILE_BLOCK
+
+    def rng(self, table: str, block: int) -> np.random.Generator:
+        return np.random.default_rng([self.seed, TABLES.index(table) if table in TABLES else len(TABLES), block])
+
+    # --- per-user traits, shared by every table ---
+
+    def profiles(self, block: int) -> Dict[str, np.ndarray]:
+        first = block * PROFILE_BLOCK
+        n = min(PROFILE_BLOCK, self.users - first)
+        rng = self.rng("profiles", block)
+        joined = rng.integers(0, max(self.days - 30, 1), n) * (rng.random(n) < 0.7) # 30% there from day one
+        return {
+            "index": np.arange(first, first + n),
+            "id": random_uuids(rng, n),
+            "joined": joined,
+            "active_days": self.days - joined,
+            "log_rate": np.clip(rng.beta(2.0, 2.5, n) * 1.2, 0.02, 1.0), # share of days with a log
+            "baseline": rng.lognormal(np.log(55), 0.5, n), # typical daily count
+            "trend": rng.normal(-0.08, 0.3, n), # relative change per year
+            "category_cdf": np.cumsum(rng.dirichlet(CATEGORY_MIX * CATEGORY_CONCENTRATION, n), axis=1),
+            "interventions": rng.poisson(1.2, n),
+            "photo_rate": rng.gamma(2.0, 0.5, n) / 30, # sessions per day
+            "log_hour": rng.normal(21.0, 1.5, n),
+        }
+
+    def days_to_ms(self, day: np.ndarray, hours: np.ndarray) -> np.ndarray:
+        base = (self.start - np.datetime64("1970-01-01", "D")).astype(np.int64) * MS_PER_DAY
+        return (base + day.astype(np.int64) * MS_PER_DAY
+                + np.clip(hours, 0, 23.99) * MS_PER_HOUR).astype(np.int64).astype("datetime64[ms]")
+
+    # --- tables ---
+
+    def users_block(self, block: int) -> Chunk:
+        p = self.profiles(block)
+        rng = self.rng("users", block)
+        n = p["id"].size
+        names = np.char.add(f"gen_{self.seed}_", p["index"].astype(str))
+        created = self.days_to_ms(p["joined"], rng.uniform(7, 23, n))
+        return {
+            "id": p["id"],
+            "email": np.char.add(names, "@hairhealth.com").astype(object),
+            "username": names.astype(object),
+            "password_hash": np.full(n, self.password_hash, dtype=object),
+            "is_email_verified": rng.random(n) < 0.8,
+            "created_at": created,
+            "updated_at": created,
+            "is_active": np.ones(n, dtype=bool),
+        }
+
+    def hair_fall_logs_block(self, block: int) -> Chunk:
+        p = self.profiles(block)
+        rng = self.rng("hair_fall_logs", block)
+        owner = np.repeat(np.arange(p["id"].size), p["active_days"])
+        day = p["joined"][owner] + concat_ranges(p["active_days"])
+        keep = rng.random(day.size) < p["log_rate"][owner]
+        owner, day = owner[keep], day[keep]
+        n = owner.size
+
+        years = (day - p["joined"][owner]) / 365.0
+        weekday = (day + (self.start.astype(np.int64) + 3) % 7) % 7 # 0 = Monday
+        expected = p["baseline"][owner] * np.maximum(1 + p["trend"][owner] * years, 0.15) \
+            * np.where(weekday >= 5, 1.15, 1.0) # longer showers and more brushing at weekends
+        counts = rng.poisson(expected)
+        noted = rng.random(n) < 0.12
+        created = self.days_to_ms(day, p["log_hour"][owner] + rng.normal(0, 0.75, n))
+        return {
+            "id": random_uuids(rng, n),
+            "user_id": p["id"][owner],
+            "date": (self.start + day).astype("datetime64[D]"),
+            "count": with_nulls(counts, rng.random(n) < 0.04),
+            "category": CATEGORIES[pick(rng, p["category_cdf"][owner])],
+            "description": with_nulls(LOG_NOTES[rng.integers(0, LOG_NOTES.size, n)], ~noted),
+            "photo_metadata_id": np.full(n, None, dtype=object),
+            "created_at": created,
+            "updated_at": created,
+        }
+
+    def _interventions(self, block: int) -> Dict[str, np.ndarray]:
+        """Intervention rows plus the schedule fields applications are expanded from"""
+        p = self.profiles(block)
+        rng = self.rng("interventions", block)
+        owner = np.repeat(np.arange(p["id"].size), p["interventions"])
+        n = owner.size
+        kind = pick(rng, np.broadcast_to(np.cumsum(INTERVENTION_MIX), (n, INTERVENTION_MIX.size)))
+        types = INTERVENTION_TYPES[kind]
+        product = np.empty(n, dtype=object)
+        for i, name in enumerate(INTERVENTION_TYPES):
+            mask = kind == i
+            product[mask] = np.array(PRODUCTS[name], dtype=object)[rng.integers(0, len(PRODUCTS[name]), mask.sum())]
+        twice = (kind == 0) & (rng.random(n) < 0.6)
+        weekly = kind == 2
+        start = p["joined"][owner] + (rng.random(n) * p["active_days"][owner] * 0.8).astype(np.int64)
+        ended = rng.random(n) < 0.35
+        end = np.minimum(start + rng.geometric(1 / 120, n), self.days - 1)
+        end = np.where(ended, end, self.days - 1)
+        return {
+            "owner": owner, "user_id": p["id"][owner], "kind": kind, "types": types, "product": product,
+            "twice": twice, "weekly": weekly, "start": start, "end": end, "ended": ended,
+            "id": random_uuids(rng, n),
+            "adherence": rng.beta(6.0, 1.6, n),
+            "fatigue_days": rng.uniform(60, 400, n),
+            "provider": with_nulls(np.full(n, "Dr. Generated", dtype=object), rng.random(n) > 0.3),
+        }
+
+    def interventions_block(self, block: int) -> Chunk:
+        iv = self._interventions(block)
+        n = iv["id"].size
+        frequency = np.where(iv["weekly"], "Weekly", np.where(iv["twice"], "Twice daily", "Once daily")).astype(object)
+        application_time = np.where(iv["twice"], "08:00,20:00", "08:00").astype(object)
+        application_time[iv["weekly"]] = None
+        dosage = np.array([DOSAGES[t] for t in INTERVENTION_TYPES], dtype=object)[iv["kind"]]
+        created = self.days_to_ms(iv["start"], np.full(n, 9.0))
+        updated = np.where(iv["ended"], self.days_to_ms(iv["end"], np.full(n, 9.0)), created)
+        return {
+            "id": iv["id"],
+            "user_id": iv["user_id"],
+            "type": iv["types"],
+            "product_name": iv["product"],
+            "dosage_amount": dosage,
+            "frequency": frequency,
+            "application_time": application_time,
+            "start_date": (self.start + iv["start"]).astype("datetime64[D]"),
+            "end_date": with_nulls(np.datetime_as_string(self.start + iv["end"]), ~iv["ended"]),
+            "is_active": ~iv["ended"],
+            "provider": iv["provider"],
+            "notes": np.full(n, None, dtype=object),
+            "source_recommendation_id": np.full(n, None, dtype=object),
+            "created_at": created,
+            "updated_at": updated,
+        }
+
+    def intervention_applications_block(self, block: int) -> Chunk:
+        iv = self._interventions(block)
+        rng = self.rng("intervention_applications", block)
+        span = iv["end"] - iv["start"] + 1
+        doses_per_day = np.where(iv["twice"], 2, 1)
+        slots = np.where(iv["weekly"], span // 7, span * doses_per_day)
+        parent = np.repeat(np.arange(iv["id"].size), slots)
+        slot = concat_ranges(slots)
+        dpd = doses_per_day[parent]
+        elapsed = np.where(iv["weekly"][parent], slot * 7, slot // dpd)
+        dose = np.where(iv["weekly"][parent], 0, slot % dpd)
+        day = iv["start"][parent] + elapsed
+
+        # adherence starts at the intervention's own level and fades towards 40% of it
+        p0 = iv["adherence"][parent]
+        floor = 0.4 * p0
+        weekday = (day + (self.start.astype(np.int64) + 3) % 7) % 7
+        chance = (floor + (p0 - floor) * np.exp(-elapsed / iv["fatigue_days"][parent])) \
+            * np.where(weekday >= 5, 0.88, 1.0) * np.where(dose == 1, 0.85, 1.0) # evening doses get skipped more
+        keep = rng.random(chance.size) < chance
+        parent, day, dose = parent[keep], day[keep], dose[keep]
+        n = parent.size
+
+        stamp = self.days_to_ms(day, 8.0 + 12.0 * dose + rng.normal(0, 0.75, n))
+        lag_ms = np.where(rng.random(n) < 0.1, rng.exponential(6 * MS_PER_HOUR, n), rng.exponential(60_000, n))
+        return {
+            "id": random_uuids(rng, n),
+            "intervention_id": iv["id"][parent],
+            "user_id": iv["user_id"][parent],
+            "timestamp": stamp,
+            "notes": with_nulls(np.full(n, "missed earlier, applied late", dtype=object), rng.random(n) > 0.02),
+            "created_at": stamp + lag_ms.astype("timedelta64[ms]"),
+        }
+
+    def photo_metadata_block(self, block: int) -> Chunk:
+        p = self.profiles(block)
+        rng = self.rng("photo_metadata", block)
+        sessions = rng.poisson(p["photo_rate"] * p["active_days"])
+        owner = np.repeat(np.arange(p["id"].size), sessions)
+        day = p["joined"][owner] + (rng.random(owner.size) * p["active_days"][owner]).astype(np.int64)
+        hour = rng.normal(19.0, 2.0, owner.size)
+        session, angle = np.nonzero(rng.random((owner.size, ANGLES.size)) < ANGLE_INCLUSION)
+        owner, day, hour = owner[session], day[session], hour[session]
+        n = owner.size
+
+        ids = random_uuids(rng, n)
+        user_ids = p["id"][owner]
+        captured = self.days_to_ms(day, hour)
+        stamp = np.char.replace(np.datetime_as_string(captured.astype("datetime64[s]")), ":", "")
+        filename = np.char.add(np.char.add(np.char.lower(ANGLES[angle].astype(str)), "_"),
+                               np.char.add(stamp.astype(str), ".jpg"))
+        blob = np.char.add(np.char.add(np.char.add("photos/", user_ids.astype(str)), "/"),
+                           np.char.add(np.char.add(ids.astype(str), "/"), filename))
+        return {
+            "id": ids,
+            "user_id": user_ids,
+            "filename": filename.astype(object),
+            "angle": ANGLES[angle],
+            "capture_date": captured,
+            "file_size": rng.lognormal(np.log(2.4e6), 0.35, n).astype(np.int64),
+            "encryption_key_info": np.full(n, "generated-key-v1", dtype=object),
+            "blob_path": blob.astype(object),
+            "uploaded_at": captured + rng.exponential(300_000, n).astype("timedelta64[ms]"),
+            "is_deleted": rng.random(n) < 0.02,
+        }
+
+    def chunks(self, table: str) -> Iterator[Chunk]:
+        """Every row of one table in chunks of at most chunk_rows"""
+        build = getattr(self, f"{table}_block")
+        for block in range(self.blocks):
+            columns = build(block)
+            rows = len(columns["id"])
+            for lo in range(0, rows, self.chunk_rows):
+                yield {name: columns[name][lo:lo + self.chunk_rows] for name in COLUMNS[table]}
+
+
+def text_columns(chunk: Chunk, true: str = "true", false: str = "false") -> List[np.ndarray]:
+    """Column values as str objects (None stays None) in the table's column order"""
+    out = []
+    for values in chunk.values():
+        if values.dtype.kind == "M":
+            unit = np.datetime_data(values.dtype)[0]
+            text = np.datetime_as_string(values, unit=unit, timezone="UTC" if unit != "D" else "naive")
+            out.append(text.astype(object))
+        elif values.dtype.kind == "b":
+            out.append(np.where(values, true, false).astype(object))
+        elif values.dtype.kind == "O":
+            out.append(values)
+        else:
+            out.append(values.astype(str).astype(object))
+    return out
+
+
+def write_csv(chunk: Chunk, f) -> int:
+    """Append a chunk as CSV rows (empty field = NULL, as psql \\copy ... CSV expects)"""
+    columns = text_columns(chunk)
+    csv.writer(f).writerows(zip(*(c.tolist() for c in columns)))
+    return len(columns[0]) if columns else 0
+
+
+def configure_parser(parser):
+    parser.add_argument("--users", type=int, default=1000, help="Users to generate; other tables scale with it")
+    parser.add_argument("--days", type=int, default=730, help="History length, ending today")
+    parser.add_argument("--seed", type=int, default=1, help="Same seed, same rows")
+    parser.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS, help="Rows per streamed chunk")
+    parser.add_argument("--tables", nargs="+", choices=TABLES, default=list(TABLES), help="Tables to generate")
+    parser.add_argument("--password-hash", default=UNUSABLE_PASSWORD_HASH,
+                        help="users.password_hash for every generated user (a bcrypt hash)")
+    parser.add_argument("--out-dir", help="Write <table>.csv files here (with a header row); "
+                                          "without it rows are only generated and counted")
+
+
+def run_command(args) -> int:
+    generator = DatasetGenerator(args.users, args.days, args.seed, args.chunk_rows,
+                                 password_hash=args.password_hash)
+    if args.out_dir:
+        os.makedirs(args.out_dir, exist_ok=True)
+    print(f"🧪 Generating {args.users:,} users x {args.days} days (seed {args.seed}), "
+          f"{generator.blocks} block(s) of {PROFILE_BLOCK}")
+    total_rows, total_started = 0, time.perf_counter()
+    for table in args.tables:
+        started, rows = time.perf_counter(), 0
+        f = open(os.path.join(args.out_dir, f"{table}.csv"), "w", newline="") if args.out_dir else None
+        try:
+            if f:
+                csv.writer(f).writerow(COLUMNS[table])
+            for chunk in generator.chunks(table):
+                rows += write_csv(chunk, f) if f else len(chunk["id"])
+        finally:
+            if f:
+                f.close()
+        elapsed = time.perf_counter() - started
+        total_rows += rows
+        print(f"   {table:<26} {rows:>12,} rows {elapsed:7.1f}s {rows / max(elapsed, 1e-9):>12,.0f} rows/s")
+    elapsed = time.perf_counter() - total_started
+    where = f" -> {args.out_dir}" if args.out_dir else ""
+    print(f"✅ {total_rows:,} rows in {elapsed:.1f}s{where}")
+    return 0
@@ -0,0 +1,283 @@
+# dataset_snapshot.py
+"""
+Named snapshots of a seeded benchmark database, restored before a run.
+
+  postgres  pg_dump --format=custom (compressed) into --dir, pg_restore --clean
+            with --jobs parallel workers back into the database
+  h2        the test profile's in-memory database, exported by the backend itself
+            (SCRIPT TO ... COMPRESSION GZIP under app.dev.snapshots.dir) through
+            POST /api/v1/dev/snapshots/{name}, restored with .../{name}/restore
+
+Every snapshot has a manifest (<dir>/<name>.json): the dump's sha256, exact row
+counts per table, and a digest of the Flyway migrations it was taken under. The
+fingerprint is a digest of the migrations and row counts. A restore is refused if the
+migrations changed since the snapshot was taken, and it fails unless the restored
+database reproduces the fingerprint, so two runs that name the same snapshot
+really started from the same rows. `perf_runner.py run --snapshot NAME` restores
+before the workers start and keeps the fingerprint in meta["snapshot"].
+
+Usage:
+    python perf_runner.py seed --users 100000 --truncate && python perf_runner.py snapshot save seeded-100k
+    python perf_runner.py snapshot restore seeded-100k --jobs 8
+    python perf_runner.py snapshot save h2-baseline --backend h2 --url http://localhost:8080
+    python perf_runner.py snapshot verify seeded-100k
+    python perf_runner.py snapshot list
+"""
+
+import hashlib
+import json
+import os
+import re
+import shutil
+import subprocess
+import time
+from typing import Dict, List, Optional
+
+import requests
+
+from copy_seeder import connect, datasource_dsn
+from impact_selector import HERE, migration_fingerprints
+
+SNAPSHOT_DIR = os.path.join(HERE, "snapshots")
+BACKENDS = ("postgres", "h2")
+ACTIONS = ("save", "restore", "verify", "list")
+SNAPSHOTS_PATH = "/api/v1/dev/snapshots"
+TOKEN_HEADER = "X-Snapshot-Token"
+DEFAULT_H2_TOKEN = "test-snapshot-token" # app.dev.snapshots.token in application-test.properties
+FLYWAY_HISTORY = "flyway_schema_history"
+NAME_PATTERN = re.compile(r"^[A-Za-z0-9_-]{1,64}$") # DatasetSnapshotService.NAME
+
+
+class SnapshotMismatch(RuntimeError):
+    """The database does not (or would not) hold what the snapshot recorded"""
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def migrations_digest() -> str:
+    return hashlib.sha256(json.dumps(migration_fingerprints(), sort_keys=True).encode()).hexdigest()[:16]
+
+
+def fingerprint(tables: Dict[str, int], migrations: str) -> str:
+    payload = json.dumps({"migrations": migrations, "tables": {t: int(n) for t, n in sorted(tables.items())}},
+                         sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+
+class PostgresSnapshots:
+    """pg_dump/pg_restore against the spring.datasource database (or --dsn)"""
+
+    backend = "postgres"
+
+    def __init__(self, dsn: str, directory: str = SNAPSHOT_DIR, jobs: int = 4):
+        self.dsn = dsn
+        self.directory = directory
+        self.jobs = jobs
+
+    def _tool(self, name: str) -> str:
+        path = shutil.which(name)
+        if path is None:
+            raise RuntimeError(f"{name} is not on PATH (install the PostgreSQL client tools)")
+        return path
+
+    def row_counts(self) -> Dict[str, int]:
+        conn = connect(self.dsn)
+        try:
+            tables = [row[0] for row in conn.query(
+                "SELECT table_name FROM information_schema.tables WHERE table_schema = 'public' "
+                f"AND table_type = 'BASE TABLE' AND table_name <> '{FLYWAY_HISTORY}' ORDER BY table_name")]
+            if not tables:
+                return {}
+            counts = conn.query(" UNION ALL ".join(f"SELECT '{t}', count(*) FROM \"{t}\"" for t in tables))
+        finally:
+            conn.close()
+        return {name: int(n) for name, n in counts}
+
+    def save(self, name: str) -> Dict:
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, f"{check_name(name)}.dump")
+        subprocess.run([self._tool("pg_dump"), "--format=custom", "--compress=6", "--no-owner", "--no-privileges",
+                        "--file", path, self.dsn], check=True)
+        return {"file": path, "bytes": os.path.getsize(path), "sha256": file_sha256(path),
+                "tables": self.row_counts()}
+
+    def restore(self, name: str, manifest: Dict) -> Dict[str, int]:
+        path = manifest["file"]
+        if not os.path.exists(path):
+            raise SnapshotMismatch(f"{path} is missing")
+        if file_sha256(path) != manifest["sha256"]:
+            raise SnapshotMismatch(f"{path} does not match the sha256 in its manifest")
+        subprocess.run([self._tool("pg_restore"), "--clean", "--if-exists", "--no-owner", "--no-privileges",
+                        f"--jobs={self.jobs}", "--dbname", self.dsn, path], check=True)
+        return self.row_counts()
+
+
+class H2Snapshots:
+    """The backend's own SCRIPT/RUNSCRIPT endpoints (test profile, app.dev.snapshots.enabled)"""
+
+    backend = "h2"
+
+    def __init__(self, base_url: str, token: str = DEFAULT_H2_TOKEN):
+        self.base_url = base_url.rstrip("/")
+        self.session = requests.Session()
+        self.session.headers[TOKEN_HEADER] = token
+
+    def _call(self, method: str, path: str) -> Dict:
+        response = self.session.request(method, f"{self.base_url}{SNAPSHOTS_PATH}{path}", timeout=600)
+        if response.status_code != 200:
+            raise RuntimeError(f"{method} {SNAPSHOTS_PATH}{path}: HTTP {response.status_code} {response.text[:200]}")
+        return response.json()
+
+    def row_counts(self) -> Dict[str, int]:
+        return self._call("GET", "/fingerprint")["tables"]
+
+    def save(self, name: str) -> Dict:
+        result = self._call("POST", f"/{check_name(name)}")
+        return {"file": result["file"], "bytes": result["bytes"], "sha256": result["sha256"],
+                "tables": result["tables"]}
+
+    def restore(self, name: str, manifest: Dict) -> Dict[str, int]:
+        result = self._call("POST", f"/{check_name(name)}/restore")
+        if result["sha256"] != manifest["sha256"]:
+            raise SnapshotMismatch(f"the server's {result['file']} was replaced since the manifest was written")
+        return result["tables"]
+
+
+def open_store(backend: str, base_url: str = "http://localhost:8080", dsn: Optional[str] = None,
+               token: Optional[str] = None, jobs: int = 4, directory: str = SNAPSHOT_DIR):
+    if backend == "h2":
+        return H2Snapshots(base_url, token or DEFAULT_H2_TOKEN)
+    return PostgresSnapshots(dsn or datasource_dsn(), directory, jobs)
+
+
+def check_name(name: str) -> str:
+    """The name as given; ValueError unless the backend would accept it (it also names the files)"""
+    if not NAME_PATTERN.match(name or ""):
+        raise ValueError(f"snapshot name {name!r} must be 1-64 letters, digits, '-' or '_'")
+    return name
+
+
+def manifest_path(directory: str, name: str) -> str:
+    return os.path.join(directory, f"{check_name(name)}.json")
+
+
+def load_manifest(directory: str, name: str) -> Dict:
+    path = manifest_path(directory, name)
+    if not os.path.exists(path):
+        raise SnapshotMismatch(f"no snapshot manifest {path}")
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_snapshot(store, name: str, directory: str = SNAPSHOT_DIR) -> Dict:
+    started = time.monotonic()
+    result = store.save(name)
+    migrations = migrations_digest()
+    manifest = {"name": name, "backend": store.backend, "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+                "migrations": migrations, "fingerprint": fingerprint(result["tables"], migrations),
+                "save_s": time.monotonic() - started, **result}
+    os.makedirs(directory, exist_ok=True)
+    with open(manifest_path(directory, name), "w") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def _diff(expected: Dict[str, int], actual: Dict[str, int]) -> str:
+    changed = [f"{t} {expected.get(t, 0):,} -> {actual.get(t, 0):,}"
+               for t in sorted(set(expected) | set(actual)) if expected.get(t, 0) != actual.get(t, 0)]
+    return ", ".join(changed[:6]) + (f" (+{len(changed) - 6} more)" if len(changed) > 6 else "")
+
+
+def restore_snapshot(store, name: str, directory: str = SNAPSHOT_DIR) -> Dict:
+    """Restore and check the result reproduces the manifest's fingerprint; returns run metadata"""
+    manifest = load_manifest(directory, name)
+    if manifest["backend"] != store.backend:
+        raise SnapshotMismatch(f"{name} is a {manifest['backend']} snapshot, not {store.backend}")
+    if manifest["migrations"] != migrations_digest():
+        raise SnapshotMismatch(f"db/migration changed since {name} was taken; seed and save it again")
+    started = time.monotonic()
+    tables = store.restore(name, manifest)
+    elapsed = time.monotonic() - started
+    restored = fingerprint(tables, manifest["migrations"])
+    if restored != manifest["fingerprint"]:
+        raise SnapshotMismatch(f"restored {name} does not match its manifest: {_diff(manifest['tables'], tables)}")
+    return {"name": name, "backend": store.backend, "fingerprint": restored, "restore_s": elapsed,
+            "rows": sum(tables.values())}
+
+
+def verify_snapshot(store, name: str, directory: str = SNAPSHOT_DIR) -> Dict:
+    """Compare the live database with a snapshot without restoring it"""
+    manifest = load_manifest(directory, name)
+    tables = store.row_counts()
+    live = fingerprint(tables, migrations_digest())
+    return {"name": name, "fingerprint": manifest["fingerprint"], "live": live,
+            "matches": live == manifest["fingerprint"], "diff": _diff(manifest["tables"], tables)}
+
+
+def restore_for_run(name: str, base_url: str, directory: str = SNAPSHOT_DIR) -> Dict:
+    """What `run --snapshot` calls: the manifest says which backend; defaults cover the rest"""
+    manifest = load_manifest(directory, name)
+    try:
+        return restore_snapshot(open_store(manifest["backend"], base_url, directory=directory), name, directory)
+    except (subprocess.CalledProcessError, requests.exceptions.RequestException) as e:
+        raise RuntimeError(f"restoring snapshot {name} failed: {e}") from e
+
+
+def list_snapshots(directory: str = SNAPSHOT_DIR) -> List[Dict]:
+    if not os.path.isdir(directory):
+        return []
+    manifests = []
+    for entry in sorted(os.listdir(directory)):
+        if entry.endswith(".json"):
+            with open(os.path.join(directory, entry)) as f:
+                manifests.append(json.load(f))
+    return manifests
+
+
+def configure_parser(parser):
+    parser.add_argument("action", choices=ACTIONS, help="save, restore or verify a snapshot, or list them")
+    parser.add_argument("name", nargs="?", help="Snapshot name (letters, digits, '-' and '_')")
+    parser.add_argument("--backend", choices=BACKENDS, help="Default: postgres for save, the manifest's otherwise")
+    parser.add_argument("--url", default="http://localhost:8080", help="Backend API (h2 snapshots)")
+    parser.add_argument("--dsn", help="libpq URL (default: spring.datasource.* in application.properties)")
+    parser.add_argument("--token", help=f"{TOKEN_HEADER} for h2 snapshots (default: the test profile's)")
+    parser.add_argument("--jobs", type=int, default=4, help="pg_restore parallel jobs")
+    parser.add_argument("--dir", default=SNAPSHOT_DIR, help="Where dumps and manifests are kept")
+
+
+def run_command(args) -> int:
+    if args.action == "list":
+        for m in list_snapshots(args.dir):
+            print(f"📸 {m['name']:<24} {m['backend']:<8} {m['fingerprint']}  {sum(m['tables'].values()):>12,} rows "
+                  f"{m['bytes'] / 1e6:9.1f} MB  {m['created_at']}")
+        return 0
+    if not args.name:
+        print(f"❌ {args.action} needs a snapshot name")
+        return 2
+    try:
+        backend = args.backend or ("postgres" if args.action == "save" else load_manifest(args.dir, args.name)["backend"])
+        store = open_store(backend, args.url, args.dsn, args.token, args.jobs, args.dir)
+        if args.action == "save":
+            m = save_snapshot(store, args.name, args.dir)
+            print(f"📸 {args.name}: {sum(m['tables'].values()):,} rows in {len(m['tables'])} tables, "
+                  f"{m['bytes'] / 1e6:.1f} MB in {m['save_s']:.1f}s, fingerprint {m['fingerprint']}")
+        elif args.action == "restore":
+            r = restore_snapshot(store, args.name, args.dir)
+            print(f"♻️  {args.name}: {r['rows']:,} rows restored in {r['restore_s']:.1f}s, fingerprint {r['fingerprint']}")
+        else:
+            v = verify_snapshot(store, args.name, args.dir)
+            if not v["matches"]:
+                print(f"⚠️ live database differs from {args.name}: {v['diff'] or 'migrations changed'}")
+                return 1
+            print(f"✅ live database matches {args.name} ({v['fingerprint']})")
+    except (SnapshotMismatch, RuntimeError, ValueError, subprocess.CalledProcessError,
+            requests.exceptions.RequestException) as e:
+        print(f"❌ {e}")
+        return 1
+    return 0
@@ -0,0 +1,454 @@
+# impact_selector.py
+"""
+Pick the harness tests and load scenarios affected by a backend change.
+
+The selector compares the current tree with the state recorded after the last
+successful run (tests/.selection/last_run.json):
+
+  * api_spec.json   - every operation is fingerprinted together with the
+                      component schemas it references, so a changed
+                      HairFallLogResponse marks every operation returning it
+  * db/migration    - new or edited migration files yield the tables their
+                      SQL creates, alters, indexes or writes
+
+Changed tables become operations through the Kotlin sources: each controller's
+@RequestMapping prefix is linked, via the types it references (services,
+repository interfaces and their Jdbc implementations), to the tables named in
+SQL (FROM/JOIN/INTO/UPDATE/TABLE) anywhere in that closure.
+
+Tests map to operations by reading their source: every `self.make_request(...)`
+in a test method or the helpers it calls is matched against the spec templates.
+The test map and the operation->tables map are cached in tests/.selection and
+rebuilt only when the files they were derived from change. A selected test also
+pulls in the earlier tests that set the `self.` attributes it reads (tokens,
+created ids), in run_all_tests order.
+
+Usage:
+    python perf_runner.py select                 # what changed, what would run
+    python main_runner.py --changed              # run only the affected tests
+    python perf_runner.py select --record        # accept the current tree as the baseline
+"""
+
+import ast
+import glob
+import hashlib
+import json
+import os
+import re
+from typing import Dict, Iterable, List, Optional, Set
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+BACKEND = os.path.join(HERE, "..", "hair-health-platform", "src", "main")
+MIGRATION_DIR = os.path.join(BACKEND, "resources", "db", "migration")
+KOTLIN_DIR = os.path.join(BACKEND, "kotlin")
+SPEC_PATH = os.path.join(HERE, "api_spec.json")
+RUNNER_PATH = os.path.join(HERE, "main_runner.py")
+STATE_DIR = os.path.join(HERE, ".selection")
+BASELINE = "last_run.json"
+TEST_MAP = "test_map.json"
+TEST_MAP_FORMAT = 3
+OPERATION_TABLES = "operation_tables.json"
+
+_PLACEHOLDER = re.compile(r"\{[^/}]*\}")
+SQL_TABLE = re.compile(r"\b(?:FROM|JOIN|INTO|UPDATE|TABLE(?: IF (?:NOT )?EXISTS)?|ON)\s+([a-z_][a-z0-9_]*)",
+                       re.IGNORECASE)
+KOTLIN_DECLARATION = re.compile(r"\b(?:class|interface|object)\s+([A-Z]\w*)")
+KOTLIN_SUPERTYPES = re.compile(r"\bclass\s+(\w+)\s*(?:\([^)]*\))?\s*:\s*([\w<>, ()]+?)\s*\{", re.DOTALL)
+KOTLIN_TYPE = re.compile(r"\b([A-Z]\w+)\b")
+REQUEST_MAPPING = re.compile(r'@RequestMapping\("([^"]+)"\)')
+SQL_WORDS = {"select", "set", "where", "values", "conflict", "delete", "the", "a"}
+
+
+def _digest(*chunks: bytes) -> str:
+    h = hashlib.sha1()
+    for chunk in chunks:
+        h.update(chunk)
+    return h.hexdigest()
+
+
+def _files_digest(paths: Iterable[str]) -> str:
+    h = hashlib.sha1()
+    for path in sorted(paths):
+        h.update(os.path.basename(path).encode())
+        with open(path, "rb") as f:
+            h.update(f.read())
+    return h.hexdigest()
+
+
+def canonical(template: str) -> str:
+    """'/a/{id}/b?x=1' and '/a/{self.created_id}/b' both become '/a/{}/b'"""
+    return _PLACEHOLDER.sub("{}", template.split("?", 1)[0])
+
+
+def _load_json(name: str) -> Optional[Dict]:
+    path = os.path.join(STATE_DIR, name)
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def _save_json(name: str, data: Dict):
+    os.makedirs(STATE_DIR, exist_ok=True)
+    with open(os.path.join(STATE_DIR, name), "w") as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+
+
+# --- spec and migrations ---
+
+def load_spec(path: str = SPEC_PATH) -> Dict:
+    from spec_validators import load_spec as load_cached_spec
+
+    return load_cached_spec(path)
+
+
+def operation_fingerprints(resolved_paths: Dict) -> Dict[str, str]:
+    """'METHOD /template' -> digest of the operation with every schema it references inlined"""
+    return {f"{method.upper()} {template}": _digest(json.dumps(op, sort_keys=True).encode())
+            for template, methods in resolved_paths.items() for method, op in methods.items()}
+
+
+def migration_files(directory: str = MIGRATION_DIR) -> List[str]:
+    return sorted(glob.glob(os.path.join(directory, "*.sql")))
+
+
+def migration_fingerprints(directory: str = MIGRATION_DIR) -> Dict[str, str]:
+    result = {}
+    for path in migration_files(directory):
+        with open(path, "rb") as f:
+            result[os.path.basename(path)] = _digest(f.read())
+    return result
+
+
+def tables_in_sql(sql: str) -> Set[str]:
+    sql = re.sub(r"--[^\n]*", "", sql)
+    return {name.lower() for name in SQL_TABLE.findall(sql)} - SQL_WORDS
+
+
+def current_state() -> Dict:
+    from spec_validators import load_resolved_paths
+
+    return {"operations": operation_fingerprints(load_resolved_paths(SPEC_PATH)),
+            "migrations": migration_fingerprints()}
+
+
+# --- operation -> tables, from the Kotlin sources ---
+
+def operation_tables(spec: Dict) -> Dict[str, List[str]]:
+    """Tables each operation can reach through its controller's type references (cached)"""
+    kotlin_files = glob.glob(os.path.join(KOTLIN_DIR, "**", "*.kt"), recursive=True)
+    key = _files_digest(kotlin_files + migration_files() + [SPEC_PATH])
+    cached = _load_json(OPERATION_TABLES)
+    if cached and cached.get("key") == key:
+        return cached["operations"]
+
+    known_tables = set()
+    for path in migration_files():
+        with open(path) as f:
+            known_tables |= tables_in_sql(f.read())
+
+    sources, declared_in = {}, {}
+    for path in kotlin_files:
+        with open(path, encoding="utf-8") as f:
+            sources[path] = f.read()
+        for name in KOTLIN_DECLARATION.findall(sources[path]):
+            declared_in.setdefault(name, path)
+
+    edges: Dict[str, Set[str]] = {path: set() for path in sources}
+    for path, text in sources.items():
+        for name in set(KOTLIN_TYPE.findall(text)):
+            target = declared_in.get(name)
+            if target and target != path:
+                edges[path].add(target)
+        # an interface reaches its implementations (HairFallLogRepository -> JdbcHairFallLogRepository)
+        for _, supertypes in KOTLIN_SUPERTYPES.findall(text):
+            for name in KOTLIN_TYPE.findall(supertypes):
+                if name in declared_in and declared_in[name] != path:
+                    edges[declared_in[name]].add(path)
+
+    tables_of = {path: tables_in_sql(text) & known_tables for path, text in sources.items()}
+    prefixes = []
+    for path, text in sources.items():
+        for prefix in REQUEST_MAPPING.findall(text):
+            reachable, stack = {path}, [path]
+            while stack:
+                for nxt in edges[stack.pop()] - reachable:
+                    reachable.add(nxt)
+                    stack.append(nxt)
+            prefixes.append((prefix, set().union(*(tables_of[p] for p in reachable))))
+    prefixes.sort(key=lambda item: len(item[0]), reverse=True)
+
+    operations = {}
+    for template, methods in spec.get("paths", {}).items():
+        match = next((tables for prefix, tables in prefixes
+                      if template == prefix or template.startswith(prefix.rstrip("/") + "/")), set())
+        for method in methods:
+            operations[f"{method.upper()} {template}"] = sorted(match)
+    _save_json(OPERATION_TABLES, {"key": key, "operations": operations})
+    return operations
+
+
+# --- tests -> operations, from the harness sources ---
+
+def test_modules(runner_path: str = RUNNER_PATH) -> List[str]:
+    """Harness modules main_runner mixes together, base class first"""
+    with open(runner_path) as f:
+        tree = ast.parse(f.read())
+    names = [node.module for node in ast.walk(tree)
+             if isinstance(node, ast.ImportFrom) and node.module and node.module.startswith("test_")]
+    return [os.path.join(HERE, f"{name}.py") for name in dict.fromkeys(names)]
+
+
+def run_order(runner_path: str = RUNNER_PATH) -> List[str]:
+    """Test methods in the order ComprehensiveTestRunner.run_all_tests calls them"""
+    with open(runner_path) as f:
+        tree = ast.parse(f.read())
+    for node in ast.walk(tree):
+        if isinstance(node, ast.FunctionDef) and node.name == "run_all_tests":
+            return [call.func.attr for call in ast.walk(node)
+                    if isinstance(call, ast.Call) and isinstance(call.func, ast.Attribute)
+                    and isinstance(call.func.value, ast.Name) and call.func.value.id == "self"
+                    and call.func.attr.startswith("test_")]
+    return []
+
+
+def _path_text(node) -> Optional[str]:
+    if isinstance(node, ast.Constant) and isinstance(node.value, str):
+        return node.value
+    if isinstance(node, ast.JoinedStr):
+        return "".join(part.value if isinstance(part, ast.Constant) else "{}" for part in node.values)
+    return None
+
+
+class _MethodScan(ast.NodeVisitor):
+    def __init__(self):
+        self.requests: Set[tuple] = set()  # (method or "*", canonical path)
+        self.calls: Set[str] = set()
+        self.reads: Set[str] = set()
+        self.writes: Set[str] = set()
+        self.api_strings: Set[str] = set()
+        self.fields: Set[str] = set()  # response fields read: x["f"], x.get("f"), expected_fields lists
+
+    def visit_Call(self, node):
+        func = node.func
+        if isinstance(func, ast.Attribute) and func.attr == "get" and node.args \
+                and isinstance(node.args[0], ast.Constant) and isinstance(node.args[0].value, str):
+            self.fields.add(node.args[0].value)
+        if isinstance(func, ast.Attribute) and isinstance(func.value, ast.Name) and func.value.id == "self":
+            if func.attr == "validate_response_schema" and len(node.args) >= 2 \
+                    and isinstance(node.args[1], (ast.List, ast.Tuple)):
+                self.fields |= {e.value for e in node.args[1].elts
+                                if isinstance(e, ast.Constant) and isinstance(e.value, str)}
+            if func.attr == "make_request" and len(node.args) >= 2:
+                method = node.args[0].value if isinstance(node.args[0], ast.Constant) else "*"
+                path = _path_text(node.args[1])
+                self.requests.add((str(method).upper(), canonical(path) if path else None))
+            elif func.attr == "follow_cursor" and node.args:  # GETs its endpoint page by page
+                path = _path_text(node.args[0])
+                self.requests.add(("GET", canonical(path) if path else None))
+            else:
+                self.calls.add(func.attr)
+            for arg in list(node.args) + [kw.value for kw in node.keywords]:
+                self.visit(arg)
+            return
+        self.generic_visit(node)
+
+    def visit_Subscript(self, node):
+        if isinstance(node.slice, ast.Constant) and isinstance(node.slice.value, str):
+            self.fields.add(node.slice.value)
+        self.generic_visit(node)
+
+    def visit_Attribute(self, node):
+        if isinstance(node.value, ast.Name) and node.value.id == "self":
+            (self.writes if isinstance(node.ctx, ast.Store) else self.reads).add(node.attr)
+        self.generic_visit(node)
+
+    def visit_Constant(self, node):
+        if isinstance(node.value, str) and node.value.startswith("/api/"):
+            self.api_strings.add(canonical(node.value))
+
+    def visit_JoinedStr(self, node):
+        text = _path_text(node)
+        if text and text.startswith("/api/"):
+            self.api_strings.add(canonical(text))
+
+
+def build_test_map(spec: Dict) -> Dict[str, Dict]:
+    """test name -> {"operations", "reads", "writes", "fields"} (cached per source digest)"""
+    modules = test_modules()
+    key = f"{TEST_MAP_FORMAT}:{_files_digest(modules + [SPEC_PATH, RUNNER_PATH])}"
+    cached = _load_json(TEST_MAP)
+    if cached and cached.get("key") == key:
+        return cached["tests"]
+
+    templates: Dict[str, List[str]] = {}
+    for template, methods in spec.get("paths", {}).items():
+        templates.setdefault(canonical(template), []).extend(m.upper() for m in methods)
+
+    scans: Dict[str, _MethodScan] = {}
+    for path in modules:
+        with open(path, encoding="utf-8") as f:
+            tree = ast.parse(f.read())
+        for node in ast.walk(tree):
+            if isinstance(node, ast.FunctionDef) and node.name not in ("make_request", "log_test"):
+                scan = _MethodScan()
+                for statement in node.body:
+                    scan.visit(statement)
+                scans[node.name] = scan  # later modules override, as in the mixin class
+
+    def operations_of(scan: _MethodScan) -> Set[str]:
+        found = set()
+        for method, path in scan.requests:
+            # a path held in a variable: assume any /api/ literal in the method may be requested
+            for candidate in ([path] if path else scan.api_strings):
+                for spec_method in templates.get(candidate, []):
+                    if method in ("*", spec_method):
+                        found.add(f"{spec_method} {_spec_template(spec, candidate, spec_method)}")
+        return found
+
+    tests = {}
+    for name, scan in scans.items():
+        if not name.startswith("test_"):
+            continue
+        seen, stack, ops = {name}, [name], set()
+        reads, writes, fields = set(scan.reads), set(scan.writes), set(scan.fields)
+        while stack:
+            current = scans[stack.pop()]
+            ops |= operations_of(current)
+            for helper in current.calls & scans.keys() - seen:
+                if not helper.startswith("test_"):
+                    seen.add(helper)
+                    stack.append(helper)
+                    reads |= scans[helper].reads
+                    writes |= scans[helper].writes
+                    fields |= scans[helper].fields
+        tests[name] = {"operations": sorted(ops), "reads": sorted(reads - writes), "writes": sorted(writes),
+                       "fields": sorted(fields)}
+    _save_json(TEST_MAP, {"key": key, "tests": tests})
+    return tests
+
+
+def _spec_template(spec: Dict, canonical_path: str, method: str) -> str:
+    for template, methods in spec["paths"].items():
+        if canonical(template) == canonical_path and method.lower() in methods:
+            return template
+    return canonical_path
+
+
+# --- selection ---
+
+def diff_state(baseline: Optional[Dict], current: Dict) -> Dict:
+    """Operations and migration files added, removed or changed since the baseline"""
+    if baseline is None:
+        return {"first_run": True, "operations": sorted(current["operations"]),
+                "migrations": sorted(current["migrations"])}
+    ops_before, ops_now = baseline.get("operations", {}), current["operations"]
+    mig_before, mig_now = baseline.get("migrations", {}), current["migrations"]
+    return {
+        "first_run": False,
+        "operations": sorted(op for op in ops_before.keys() | ops_now.keys()
+                             if ops_before.get(op) != ops_now.get(op)),
+        "migrations": sorted(name for name in mig_before.keys() | mig_now.keys()
+                             if mig_before.get(name) != mig_now.get(name)),
+    }
+
+
+def select(baseline: Optional[Dict] = None) -> Dict:
+    """Everything needed to run only what a spec/migration change can affect"""
+    from load_generator import SCENARIOS
+
+    spec = load_spec()
+    current = current_state()
+    if baseline is None:
+        baseline = _load_json(BASELINE)
+    changes = diff_state(baseline, current)
+
+    tables: Set[str] = set()
+    for name in changes["migrations"]:
+        path = os.path.join(MIGRATION_DIR, name)
+        if os.path.exists(path):  # a deleted migration changes nothing we can still run
+            with open(path) as f:
+                tables |= tables_in_sql(f.read())
+    op_tables = operation_tables(spec)
+    affected = set(changes["operations"]) | {op for op, used in op_tables.items() if tables & set(used)}
+
+    test_map = build_test_map(spec)
+    order = [name for name in run_order() if name in test_map]
+    direct = [name for name in order if changes["first_run"] or affected & set(test_map[name]["operations"])]
+
+    # pull in earlier tests that produce the state (tokens, created ids) a selected test reads
+    chosen = set(direct)
+    for name in reversed(order):
+        if name not in chosen:
+            continue
+        position = order.index(name)
+        for attribute in test_map[name]["reads"]:
+            chosen |= {producer for producer in order[:position] if attribute in test_map[producer]["writes"]}
+
+    scenarios = [scenario for scenario, steps in SCENARIOS.items() if set(steps) & set(direct)]
+    return {
+        "changes": changes,
+        "tables": sorted(tables),
+        "operations": sorted(affected),
+        "tests": [name for name in order if name in chosen],
+        "direct_tests": direct,
+        "scenarios": scenarios,
+        "uncovered_operations": sorted(affected - {op for t in test_map.values() for op in t["operations"]}),
+        "state": current,
+    }
+
+
+def record(state: Optional[Dict] = None):
+    """Remember the tree a successful run was made against"""
+    _save_json(BASELINE, state or current_state())
+
+
+def drive_pattern(operations: List[str]) -> str:
+    """Regex for `perf_runner.py drive --include` matching exactly these operations"""
+    return "|".join(re.escape(op) for op in operations).replace("\\ ", " ")
+
+
+def print_selection(selection: Dict):
+    changes = selection["changes"]
+    if changes["first_run"]:
+        print("🆕 No recorded run yet: everything is affected")
+    else:
+        print(f"🔀 {len(changes['operations'])} spec operations and {len(changes['migrations'])} "
+              f"migration files changed since the last recorded run")
+        for op in changes["operations"]:
+            print(f"   spec       {op}")
+        for name in changes["migrations"]:
+            print(f"   migration  {name}")
+    if selection["tables"] and not changes["first_run"]:
+        print(f"🗄️  Tables: {', '.join(selection['tables'])}")
+    print(f"🎯 {len(selection['operations'])} operations affected, {len(selection['tests'])} tests selected "
+          f"({len(selection['direct_tests'])} direct, the rest set up state they need)")
+    for name in selection["tests"]:
+        print(f"   {'•' if name in selection['direct_tests'] else '◦'} {name}")
+    if selection["scenarios"]:
+        print("🏋️  Benchmarks:")
+        for scenario in selection["scenarios"]:
+            print(f"   python perf_runner.py run --scenario {scenario}")
+    if selection["uncovered_operations"]:
+        print(f"⚠️  {len(selection['uncovered_operations'])} affected operations have no harness test; "
+              f"cover them with: python perf_runner.py drive --include "
+              f"'{drive_pattern(selection['uncovered_operations'])}'")
+
+
+def configure_parser(parser):
+    parser.add_argument("--json", help="Also write the selection as JSON to this file")
+    parser.add_argument("--record", action="store_true",
+                        help="Record the current spec and migrations as the baseline for the next selection")
+
+
+def run_command(args) -> int:
+    selection = select()
+    print_selection(selection)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({k: v for k, v in selection.items() if k != "state"}, f, indent=2)
+        print(f"\n💾 Selection written to {args.json}")
+    if args.record:
+        record(selection["state"])
+        print("📌 Current tree recorded as the baseline")
+    return 0
@@ -0,0 +1,261 @@
+# jwt_mint.py
+"""
+Access tokens minted locally with the backend's own JWT secret, for seeded users.
+
+Benchmarks of non-auth endpoints do not need /login at all: JwtAuthenticationFilter
+only checks the signature, the expiry and the claims of the bearer token, so a token
+signed here with app.jwt.secret is as good as one the server issued. A run over a
+million seeded users (perf_runner.py seed) then starts with no login traffic and no
+bcrypt work.
+
+Tokens carry what JwtService.generateAccessToken puts in them: sub (the user id),
+email, username, roles, type=access, iat and exp. The signature algorithm follows
+jjwt's choice for the key length (Keys.hmacShaKeyFor + signWith): HS512 for secrets
+of 64 bytes or more, HS384 from 48, HS256 from 32.
+
+Minting is refused unless the target is explicitly marked non-production:
+  - /api/v1/health must report an environment of development or test
+    (app.environment; a backend that does not set it reports production, so run the
+    local backend with the dev profile, which sets it)
+  - a secret read from a profile's properties file must come with the same marker
+  - one minted token must be accepted by the target before any other is handed out
+
+Seeded users are those of DatasetGenerator: pass the same --users, --days and --seed
+that seeded the database, since their ids are drawn from the same generators.
+
+Usage:
+    python perf_runner.py mint --users 1000000 --seed 1 --out tokens.jsonl
+    python perf_runner.py mint --profile test --url http://localhost:8081 --users 10 --print
+    python perf_runner.py run --scenario read-mostly --workers 64 --mint-users 1000000
+"""
+
+import base64
+import functools
+import hashlib
+import hmac
+import json
+import os
+import sys
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional, Sequence
+
+import requests
+
+from impact_selector import BACKEND, HERE
+
+# Spring profile -> properties files, later ones overriding earlier ones as Spring layers them
+PROFILES = {
+    "dev": (os.path.join(BACKEND, "resources", "application.properties"),
+            os.path.join(BACKEND, "resources", "application-dev.properties")),
+    "test": (os.path.join(BACKEND, "resources", "application.properties"),
+             os.path.join(HERE, "..", "hair-health-platform", "src", "test", "resources", "application-test.properties")),
+}
+DEFAULT_SECRET = "hair-health-platform-super-secret-key-for-development-only-change-in-production" # JwtService
+DEFAULT_ACCESS_TTL_S = 3600
+NON_PRODUCTION = ("development", "test")
+HEALTH_PATH = "/api/v1/health"
+PROBE_PATH = "/api/v1/users/me"
+
+# jjwt signWith(key): the strongest HMAC the key is long enough for
+_ALGORITHMS = ((64, "HS512", hashlib.sha512), (48, "HS384", hashlib.sha384), (32, "HS256", hashlib.sha256))
+
+
+class MintRefused(RuntimeError):
+    """The target is not marked non-production, or does not accept the minted tokens"""
+
+
+def read_properties(path: str) -> Dict[str, str]:
+    props = {}
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith("#") and "=" in line:
+                key, value = line.split("=", 1)
+                props[key.strip()] = value.strip()
+    return props
+
+
+@dataclass
+class JwtSettings:
+    secret: str
+    access_ttl_s: int
+    environment: Optional[str] # app.environment next to the secret; None for a secret given directly
+    source: str
+
+
+def load_settings(profile: str = "dev", secret: Optional[str] = None) -> JwtSettings:
+    """app.jwt.* of a profile, or an explicit secret"""
+    if secret:
+        return JwtSettings(secret, DEFAULT_ACCESS_TTL_S, None, "--secret")
+    props = {}
+    for path in PROFILES[profile]:
+        props.update(read_properties(path))
+    return JwtSettings(props.get("app.jwt.secret", DEFAULT_SECRET),
+                       int(props.get("app.jwt.access-token-expiration", DEFAULT_ACCESS_TTL_S)),
+                       props.get("app.environment", "production"), os.path.relpath(PROFILES[profile][-1]))
+
+
+def _b64(data: bytes) -> bytes:
+    return base64.urlsafe_b64encode(data).rstrip(b"=")
+
+
+def _json(value) -> bytes:
+    return json.dumps(value, separators=(",", ":")).encode()
+
+
+class TokenMinter:
+    """Signs access tokens the way JwtService.generateAccessToken does"""
+
+    def __init__(self, secret: str, ttl_s: int = DEFAULT_ACCESS_TTL_S):
+        key = secret.encode()
+        for min_bytes, name, digest in _ALGORITHMS:
+            if len(key) >= min_bytes:
+                self.algorithm = name
+                break
+        else:
+            raise ValueError(f"app.jwt.secret is {len(key)} bytes; jjwt needs at least 32")
+        self.ttl_s = ttl_s
+        self.header = _b64(_json({"alg": self.algorithm})) + b"."
+        self._mac = hmac.new(key, digestmod=digest) # copied per token, so the key is only hashed once
+
+    def mint(self, user_id: str, email: str, username: str, roles: Sequence[str] = ("USER",),
+             now: Optional[float] = None) -> str:
+        issued = int(time.time() if now is None else now)
+        claims = {"email": email, "username": username, "roles": list(roles), "type": "access",
+                  "sub": str(user_id), "iat": issued, "exp": issued + self.ttl_s}
+        signing_input = self.header + _b64(_json(claims))
+        mac = self._mac.copy()
+        mac.update(signing_input)
+        return (signing_input + b"." + _b64(mac.digest())).decode()
+
+
+def target_environment(base_url: str, session: Optional[requests.Session] = None) -> Optional[str]:
+    """environment reported by /api/v1/health, None when the target does not say"""
+    try:
+        response = (session or requests).get(f"{base_url.rstrip('/')}{HEALTH_PATH}", timeout=10)
+        body = response.json() if response.status_code == 200 else None
+    except (requests.exceptions.RequestException, ValueError):
+        return None
+    return body.get("environment") if isinstance(body, dict) else None
+
+
+def require_non_production(base_url: str, settings: JwtSettings, session: Optional[requests.Session] = None) -> str:
+    environment = target_environment(base_url, session)
+    if environment not in NON_PRODUCTION:
+        raise MintRefused(f"{base_url} reports environment {environment or 'unknown'}; offline tokens are only minted "
+                          f"for targets marked {' or '.join(NON_PRODUCTION)} (app.environment, "
+                          f"e.g. --spring.profiles.active=dev)")
+    if settings.environment is not None and settings.environment not in NON_PRODUCTION:
+        raise MintRefused(f"{settings.source} is marked app.environment={settings.environment}; "
+                          f"its secret is not used for offline tokens")
+    return environment
+
+
+def probe(base_url: str, token: str, session: Optional[requests.Session] = None):
+    """Check that the target accepts a minted token (a seeded user that is missing still gets past auth)"""
+    try:
+        response = (session or requests).get(f"{base_url.rstrip('/')}{PROBE_PATH}",
+                                             headers={"Authorization": f"Bearer {token}"}, timeout=10)
+    except requests.exceptions.RequestException as e:
+        raise MintRefused(f"{base_url}: {e}")
+    if response.status_code in (401, 403):
+        raise MintRefused(f"{base_url} refused a minted token ({response.status_code}); "
+                          f"is it running with the secret from the chosen profile?")
+
+
+class SeededUsers:
+    """Ids, emails and usernames of DatasetGenerator users, one generation block at a time"""
+
+    def __init__(self, users: int, days: int = 730, seed: int = 1):
+        from dataset_generator import PROFILE_BLOCK, DatasetGenerator
+
+        self.generator = DatasetGenerator(users, days, seed)
+        self.block_size = PROFILE_BLOCK
+
+    def __len__(self):
+        return self.generator.users
+
+    @functools.lru_cache(maxsize=16)
+    def _ids(self, block: int):
+        return self.generator.profiles(block)["id"]
+
+    def identity(self, index: int):
+        """(user_id, email, username) of user `index`"""
+        name = f"gen_{self.generator.seed}_{index}"
+        return self._ids(index // self.block_size)[index % self.block_size], f"{name}@hairhealth.com", name
+
+
+class MintedUsers:
+    """Seeded users with minted tokens, for load workers that should never log in"""
+
+    def __init__(self, minter: TokenMinter, users: SeededUsers, environment: str):
+        self.minter = minter
+        self.users = users
+        self.environment = environment
+
+    @classmethod
+    def for_target(cls, base_url: str, users: int, days: int = 730, seed: int = 1,
+                   profile: str = "dev", secret: Optional[str] = None) -> "MintedUsers":
+        settings = load_settings(profile, secret)
+        environment = require_non_production(base_url, settings)
+        minted = cls(TokenMinter(settings.secret, settings.access_ttl_s), SeededUsers(users, days, seed), environment)
+        probe(base_url, minted.token(0))
+        return minted
+
+    def token(self, index: int) -> str:
+        return self.minter.mint(*self.users.identity(index))
+
+    def apply(self, harness, index: int):
+        """Make a harness act as seeded user `index` (modulo the seeded count)"""
+        index %= len(self.users)
+        user_id, email, username = self.users.identity(index)
+        harness.user_id, harness.user_email, harness.username = user_id, email, username
+        harness.access_token, harness.refresh_token = self.minter.mint(user_id, email, username), None
+        harness.forget_created_ids() # the previous user's resources are not this user's to read or delete
+
+    def summary(self) -> Dict:
+        generator = self.users.generator
+        return {"users": generator.users, "days": generator.days, "seed": generator.seed,
+                "algorithm": self.minter.algorithm, "environment": self.environment}
+
+
+def configure_parser(parser):
+    parser.add_argument("--url", default="http://localhost:8080", help="Backend the tokens are for")
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="dev",
+                        help="Spring profile whose properties app.jwt.secret is read from")
+    parser.add_argument("--secret", help="Use this secret instead of a profile's")
+    parser.add_argument("--users", type=int, default=1000, help="Seeded users (as given to seed/generate)")
+    parser.add_argument("--days", type=int, default=730, help="History length the users were seeded with")
+    parser.add_argument("--seed", type=int, default=1, help="Seed the users were generated with")
+    parser.add_argument("--out", help="Write one JSON line per user (userId, email, username, accessToken)")
+    parser.add_argument("--print", action="store_true", help="Print the tokens instead")
+
+
+def run_command(args) -> int:
+    try:
+        minted = MintedUsers.for_target(args.url, args.users, args.days, args.seed, args.profile, args.secret)
+    except (MintRefused, ValueError, OSError) as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
+    print(f"🔑 {args.url} is {minted.environment}; minting {minted.minter.algorithm} tokens for "
+          f"{args.users:,} seeded users (seed {args.seed})", file=sys.stderr)
+    out = open(args.out, "w") if args.out else None
+    started = time.perf_counter()
+    try:
+        for index in range(args.users):
+            user_id, email, username = minted.users.identity(index)
+            token = minted.minter.mint(user_id, email, username)
+            if out:
+                out.write(json.dumps({"userId": user_id, "email": email, "username": username,
+                                      "accessToken": token}) + "\n")
+            elif args.print:
+                print(token)
+    finally:
+        if out:
+            out.close()
+    elapsed = time.perf_counter() - started
+    where = f" -> {args.out}" if args.out else ""
+    print(f"✅ {args.users:,} tokens in {elapsed:.1f}s ({args.users / max(elapsed, 1e-9):,.0f} tokens/s), "
+          f"valid for {minted.minter.ttl_s}s{where}", file=sys.stderr)
+    return 0
@@ -0,0 +1,331 @@
+# load_generator.py
+"""
+Timed multi-worker load runs built from the harness test methods.
+
+Each worker owns a full ComprehensiveTestRunner (its own session, user and
+MetricsRecorder) and loops over a scenario's test methods until the run
+deadline. Every request made through `make_request` is recorded, and the
+merged samples are saved as a run bundle for `perf_runner.py report`.
+
+Usage:
+    python perf_runner.py run --scenario hair-fall-logs --workers 8 --duration 300
+    python perf_runner.py run --server-pid $(pgrep -f HairHealthPlatform) --server-pid $(pgrep -f src/server.js)
+    python perf_runner.py run --scenario mixed --snapshot seeded-100k
+    python perf_runner.py run --scenario mixed --workers 200 --user-pool .user_pool/localhost_8080.json
+    python perf_runner.py run --scenario read-mostly --workers 64 --mint-users 1000000
+"""
+
+import contextlib
+import os
+import sys
+import threading
+import time
+import uuid
+from typing import Dict, List
+
+from perf_metrics import EndpointTable, MetricsRecorder, RunBundle, new_run_meta
+from resource_monitor import ClientMonitor, ServerSampler
+from spec_validators import ValidationSampler
+
+HAIR_FALL_LOG_STEPS = [
+    "test_create_hair_fall_log",
+    "test_get_hair_fall_logs",
+    "test_get_hair_fall_log_by_id",
+    "test_update_hair_fall_log",
+    "test_get_hair_fall_stats",
+    "test_get_hair_fall_logs_by_date_range",
+    "test_delete_hair_fall_log",
+]
+
+INTERVENTION_STEPS = [
+    "test_create_intervention",
+    "test_get_interventions",
+    "test_get_intervention_by_id",
+    "test_log_intervention_application",
+    "test_get_intervention_applications",
+    "test_get_intervention_adherence_stats",
+]
+
+PHOTO_STEPS = [
+    "test_request_upload_url",
+    "test_finalize_photo_upload",
+    "test_get_progress_photos",
+    "test_get_progress_photo_by_id",
+]
+
+READ_STEPS = [
+    "test_get_current_user",
+    "test_get_hair_fall_logs",
+    "test_get_interventions",
+    "test_get_progress_photos",
+    "test_get_hair_fall_stats",
+]
+
+SCENARIOS: Dict[str, List[str]] = {
+    "hair-fall-logs": HAIR_FALL_LOG_STEPS,
+    "interventions": INTERVENTION_STEPS,
+    "photos": PHOTO_STEPS,
+    "read-mostly": READ_STEPS,
+    "mixed": HAIR_FALL_LOG_STEPS + INTERVENTION_STEPS + PHOTO_STEPS,
+}
+
+PROGRESS_INTERVAL_S = 5.0
+
+# Contract checks are sampled under load; every endpoint is still checked on its first responses
+# and whenever a response already looks wrong.
+DEFAULT_VALIDATION = "first:20,errors,1/20"
+
+
+class LoadGenerator:
+    """Runs one scenario on N worker threads for a fixed duration"""
+
+    def __init__(self, base_url: str, scenario: str, workers: int, duration: float,
+                 think_time: float = 0.0, name: str = None, server_pids: List[int] = (),
+                 sample_interval: float = 1.0, validation: str = DEFAULT_VALIDATION, snapshot: str = None,
+                 user_pool: str = None, mint: Dict = None, token_refresh: bool = True):
+        if scenario not in SCENARIOS:
+            raise ValueError(f"Unknown scenario '{scenario}', choose from: {', '.join(SCENARIOS)}")
+        self.base_url = base_url
+        self.scenario = scenario
+        self.steps = SCENARIOS[scenario]
+        self.workers = workers
+        self.duration = duration
+        self.think_time = think_time
+        self.name = name or f"{scenario}-{time.strftime('%Y%m%d-%H%M%S')}"
+        self.run_id = uuid.uuid4().hex[:8]
+        self.server_pids = list(server_pids)
+        self.sample_interval = sample_interval
+        self.validation = ValidationSampler(validation)
+        if snapshot:
+            from dataset_snapshot import check_name
+
+            check_name(snapshot) # before anything runs: the name becomes a file and a URL
+        self.snapshot = snapshot
+        self.user_pool = user_pool
+        self.pool_users = [] # user_pool.PooledUser per worker when --user-pool is given
+        self.mint = mint # jwt_mint.MintedUsers.for_target arguments when --mint-users is given
+        self.minted = None
+        self.token_refresh = token_refresh
+        self.refresher = None # token_refresher.TokenRefresher, keeps workers logged in past token expiry
+        self.harnesses = [None] * workers
+
+        self.t0 = 0.0
+        self.endpoints = EndpointTable()
+        self.recorders: List[MetricsRecorder] = []
+        self.iterations = [0] * workers
+        self.step_errors = [0] * workers
+        self.stop = threading.Event()
+
+    def _make_harness(self, index: int, recorder: MetricsRecorder):
+        from main_runner import ComprehensiveTestRunner
+
+        harness = ComprehensiveTestRunner(self.base_url)
+        harness.user_email = f"load_{self.run_id}_{index}@hairhealth.com"
+        harness.username = f"load_{self.run_id}_{index}"
+        harness.user_password = f"LoadPass_{self.run_id}_{index}!"
+        harness.recorder = recorder
+        harness.validation = self.validation
+        return harness
+
+    def _worker(self, index: int, deadline: float):
+        recorder = self.recorders[index]
+        harness = self._make_harness(index, recorder)
+        self.harnesses[index] = harness
+        if self.minted:
+            self.minted.apply(harness, index)
+        elif self.pool_users:
+            self.pool_users[index].apply(harness)
+        else:
+            harness.test_user_registration()
+        if not harness.access_token:
+            harness.test_user_login()
+        if not harness.access_token:
+            print(f"⚠️ worker {index}: could not authenticate, stopping", file=sys.stderr)
+            return
+        if self.refresher:
+            self.refresher.register(index, harness)
+
+        while time.monotonic() < deadline and not self.stop.is_set():
+            if self.minted and self.iterations[index]:
+                # Every iteration as the next seeded user: minting is an HMAC, not a login
+                self.minted.apply(harness, index + self.iterations[index] * self.workers)
+            for step in self.steps:
+                try:
+                    getattr(harness, step)()
+                except Exception:
+                    self.step_errors[index] += 1
+            # Results only matter as recorded samples; don't let a soak run grow this list forever.
+            harness.test_results.clear()
+            self.iterations[index] += 1
+            if self.think_time:
+                time.sleep(self.think_time)
+
+    def _report_progress(self, deadline: float):
+        while not self.stop.wait(PROGRESS_INTERVAL_S):
+            elapsed = time.monotonic() - self.t0
+            total = sum(len(r) for r in self.recorders)
+            print(f"⏱️  {elapsed:6.0f}s  {total:>9,} requests  {total / max(elapsed, 1e-9):8.1f} req/s",
+                  file=sys.stderr)
+            if time.monotonic() >= deadline:
+                return
+
+    def run(self) -> RunBundle:
+        # Validate --server-pid before anything is leased or started; t0 is set once the run begins.
+        sampler = ServerSampler(self.server_pids, 0.0, self.sample_interval) if self.server_pids else None
+        snapshot = None
+        if self.snapshot:
+            from dataset_snapshot import restore_for_run
+
+            snapshot = restore_for_run(self.snapshot, self.base_url)
+            print(f"♻️  Restored {snapshot['name']} ({snapshot['fingerprint']}) in {snapshot['restore_s']:.1f}s",
+                  file=sys.stderr)
+        pool = None
+        monitor = None
+        if self.user_pool:
+            from user_pool import UserPool
+
+            pool = UserPool(self.user_pool, self.base_url)
+            started = time.monotonic()
+            # before t0: token refreshes are not part of the run; a restored snapshot may lack some users
+            self.pool_users = pool.lease(self.workers, verify=snapshot is not None)
+            print(f"👥 Leased {self.workers} pooled users in {time.monotonic() - started:.1f}s: {pool.last_refresh}",
+                  file=sys.stderr)
+        try:
+            if self.mint:
+                from jwt_mint import MintedUsers
+
+                self.minted = MintedUsers.for_target(self.base_url, **self.mint)
+                print(f"🔑 Minting {self.minted.minter.algorithm} tokens for {self.mint['users']:,} seeded users "
+                      f"({self.minted.environment} target)", file=sys.stderr)
+            self.t0 = time.monotonic()
+            deadline = self.t0 + self.duration
+            self.recorders = [MetricsRecorder(self.endpoints, self.t0, worker=i, run_id=self.run_id)
+                              for i in range(self.workers)]
+            if self.token_refresh and not self.minted: # minted users get a fresh token every iteration
+                from token_refresher import TokenRefresher
+
+                refresh_recorder = MetricsRecorder(self.endpoints, self.t0, worker=self.workers, run_id=self.run_id)
+                self.refresher = TokenRefresher(self.base_url, refresh_recorder)
+                self.refresher.start()
+            meta = new_run_meta(self.name, self.base_url, scenario=self.scenario,
+                                workers=self.workers, target_duration_s=self.duration,
+                                think_time_s=self.think_time, run_id=self.run_id, snapshot=snapshot,
+                                user_pool={"path": self.user_pool, "auth": pool.last_refresh} if pool else None,
+                                minted_users=self.minted.summary() if self.minted else None)
+
+            threads = [threading.Thread(target=self._worker, args=(i, deadline), daemon=True)
+                       for i in range(self.workers)]
+            progress = threading.Thread(target=self._report_progress, args=(deadline,), daemon=True)
+            monitor = ClientMonitor(self.t0)
+            monitor.start()
+            if sampler:
+                sampler.t0 = self.t0
+                sampler.start()
+
+            # The harness narrates every test on stdout; under load that is pure overhead.
+            with open(os.devnull, "w") as sink, contextlib.redirect_stdout(sink):
+                progress.start()
+                for t in threads:
+                    t.start()
+                try:
+                    for t in threads:
+                        t.join()
+                except KeyboardInterrupt:
+                    print("🛑 Interrupted, stopping workers...", file=sys.stderr)
+                    self.stop.set()
+                    for t in threads:
+                        t.join()
+        finally:
+            # Whatever happened, hand the leased users back and stop every background thread.
+            self.stop.set()
+            if self.refresher:
+                self.refresher.stop()
+            if monitor:
+                monitor.stop()
+            if sampler:
+                sampler.stop()
+            if pool:
+                for user, harness in zip(self.pool_users, self.harnesses):
+                    if harness is not None:
+                        user.take(harness)
+                pool.release(self.pool_users)
+
+        meta["duration_s"] = time.monotonic() - self.t0
+        meta["iterations"] = sum(self.iterations)
+        meta["step_errors"] = sum(self.step_errors)
+        meta["client_saturation"] = monitor.summary(self.workers)
+        meta["validation"] = self.validation.summary()
+        recorders = self.recorders
+        if self.refresher:
+            meta["token_refresh"] = self.refresher.summary()
+            recorders = recorders + [self.refresher.recorder]
+        bundle = RunBundle.from_recorders(recorders, meta)
+        bundle.series["client"] = monitor.to_arrays()
+        if sampler:
+            bundle.meta["servers"] = sampler.summary()
+            bundle.series.update(sampler.to_series())
+        return bundle
+
+
+def configure_parser(parser):
+    parser.add_argument("--url", default="http://localhost:8080", help="Base URL for the backend API")
+    parser.add_argument("--scenario", default="mixed", choices=sorted(SCENARIOS), help="Test steps each worker loops over")
+    parser.add_argument("--workers", type=int, default=4, help="Concurrent worker threads")
+    parser.add_argument("--duration", type=float, default=60.0, help="Run length in seconds")
+    parser.add_argument("--think-time", type=float, default=0.0, help="Pause between iterations per worker (s)")
+    parser.add_argument("--name", help="Bundle name (default: <scenario>-<timestamp>)")
+    parser.add_argument("--out-dir", default="runs", help="Directory that receives the run bundle")
+    parser.add_argument("--server-pid", type=int, action="append", default=[], dest="server_pids",
+                        help="Backend process to sample from /proc (repeat for the JVM and the Node server)")
+    parser.add_argument("--sample-interval", type=float, default=1.0, help="Server sampling interval (s)")
+    parser.add_argument("--validate", default=DEFAULT_VALIDATION,
+                        help="Contract validation policy: all, none, 1/N, first:K, errors, comma-combined")
+    parser.add_argument("--snapshot", help="Restore this dataset snapshot (perf_runner.py snapshot) before the run")
+    parser.add_argument("--user-pool", help="Lease workers' users from this pool file (perf_runner.py pool) "
+                                            "instead of registering new ones")
+    parser.add_argument("--no-token-refresh", dest="token_refresh", action="store_false",
+                        help="Let workers' access tokens expire instead of refreshing them in the background")
+    parser.add_argument("--mint-users", type=int,
+                        help="Act as this many seeded users (perf_runner.py seed) with tokens minted offline; "
+                             "non-production targets only (perf_runner.py mint)")
+    parser.add_argument("--mint-seed", type=int, default=1, help="Seed the users were generated with")
+    parser.add_argument("--mint-days", type=int, default=730, help="History length the users were seeded with")
+    parser.add_argument("--mint-profile", choices=("dev", "test"), default="dev", help="Properties file the JWT secret is read from (dev, test)")
+
+
+def run_command(args) -> int:
+    if args.mint_users and args.user_pool:
+        print("❌ --mint-users and --user-pool both choose the workers' users; pick one")
+        return 1
+    mint = dict(users=args.mint_users, days=args.mint_days, seed=args.mint_seed,
+                profile=args.mint_profile) if args.mint_users else None
+    try:
+        generator = LoadGenerator(args.url, args.scenario, args.workers, args.duration, args.think_time,
+                                  args.name, args.server_pids, args.sample_interval, args.validate, args.snapshot,
+                                  args.user_pool, mint, args.token_refresh)
+        print(f"🚀 Load run '{generator.name}': {args.scenario} x {args.workers} workers for {args.duration:.0f}s")
+        bundle = generator.run()
+    except (ValueError, RuntimeError) as e:
+        print(f"❌ {e}")
+        return 1
+    path = bundle.save(os.path.join(args.out_dir, generator.name))
+    print(f"✅ {bundle.meta['requests']:,} requests in {bundle.meta['duration_s']:.1f}s "
+          f"({bundle.meta['iterations']:,} iterations) -> {path}")
+    validation = bundle.meta["validation"]
+    print(f"🔍 Contract checks ({validation['policy']}): {validation['validated']:,} of "
+          f"{validation['responses']:,} responses ({100 * validation['rate']:.1f}%), "
+          f"{validation['mismatches']:,} mismatches")
+    saturation = bundle.meta["client_saturation"]
+    if saturation["saturated_seconds"]:
+        print(f"⚠️  Load generator saturated for {saturation['saturated_seconds']:.0f}s "
+              f"({100 * saturation['saturated_fraction']:.0f}% of the run, peak cpu {saturation['peak_cpu_pct']:.0f}%, "
+              f"peak lag {saturation['peak_lag_ms']:.0f}ms)")
+        print(f"    💡 {saturation['suggestion']}")
+    refresh = bundle.meta.get("token_refresh")
+    if refresh and (refresh["refreshed"] or refresh["failed"]):
+        print(f"🔄 {refresh['refreshed']:,} scheduled token refreshes ({refresh['failed']:,} failed, "
+              f"{refresh['late']:,} after expiry)")
+    for server in bundle.meta.get("servers", []):
+        print(f"🖥️  {server['name']} (pid {server['pid']}): peak cpu {server['peak_cpu_pct']:.0f}%, "
+              f"peak rss {server['peak_rss_mb']:.0f} MB, {server['peak_threads']} threads")
+    return 0
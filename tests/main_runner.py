@@ -47,6 +47,7 @@ class ComprehensiveTestRunner(
         print("\n--- Running Hair Fall Log Tests ---")
         self.test_create_hair_fall_log()
         self.test_get_hair_fall_logs()
+        self.test_get_hair_fall_logs_cursor()
         self.test_get_hair_fall_log_by_id()
         self.test_update_hair_fall_log()
         self.test_get_hair_fall_stats()
@@ -98,10 +99,17 @@ class ComprehensiveTestRunner(
         self.test_setup_test_user()
         self.test_setup_photo_data()
         self.test_setup_intervention_data()
+        self.test_pool_lease_after_snapshot_restore()
 
         print("\n--- Running Final Logout ---")
         self.test_logout() # Ensure logout works at the end
 
+    def run_selected_tests(self, names):
+        """Run a subset of the test methods, in the order given (see impact_selector.select)"""
+        print(f"\n--- Running {len(names)} Selected Tests ---")
+        for name in names:
+            getattr(self, name)()
+
     def print_summary(self, strict_mode: bool):
         print("\n" + "=" * 60)
         print("📊 TEST HARNESS SUMMARY")
@@ -155,6 +163,8 @@ def main():
                        help="Base URL for the backend API")
     parser.add_argument("--strict", action="store_true",
                        help="Treat warnings as failures")
+    parser.add_argument("--changed", action="store_true",
+                       help="Only run tests affected by spec/migration changes since the last successful run")
     
     args = parser.parse_args()
     
@@ -162,9 +172,21 @@ def main():
     print("Testing every endpoint from your OpenAPI specification")
     print("-" * 60)
     
+    selection = None
+    if args.changed:
+        import impact_selector
+        selection = impact_selector.select()
+        impact_selector.print_selection(selection)
+        if not selection["tests"]:
+            print("✅ Nothing affected since the last successful run")
+            sys.exit(0)
+    
     # Run comprehensive OpenAPI-based tests
     harness = ComprehensiveTestRunner(args.url)
-    harness.run_all_tests()
+    if selection is not None:
+        harness.run_selected_tests(selection["tests"])
+    else:
+        harness.run_all_tests()
     success = harness.print_summary(args.strict)
     
     # Exit with appropriate code
@@ -172,6 +194,10 @@ def main():
         warnings = sum(1 for test in harness.test_results if test.result == TestResult.WARN)
         success = success and warnings == 0
     
+    if success:
+        import impact_selector
+        impact_selector.record(selection["state"] if selection else None) # baseline for the next --changed run
+    
     sys.exit(0 if success else 1)
 
 if __name__ == "__main__":
@@ -0,0 +1,302 @@
+# pagination_crawl.py
+"""
+Deep-pagination benchmark for the limit/offset list endpoints.
+
+One fresh user is seeded with --rows hair-fall logs and --rows applications on a
+single intervention, then every page of
+
+    GET /api/v1/me/hair-fall-logs?limit=L&offset=O
+    GET /api/v1/me/interventions/{id}/applications?limit=L&offset=O
+
+is fetched in order, one request at a time, --passes times. Each page's latency
+is kept against its offset (series crawl_<target>), and a least-squares line gives
+the cost of skipping rows: with OFFSET the database reads and discards every
+earlier row, so latency should grow linearly with depth. `perf_runner.py report`
+plots latency against offset for every crawl bundle, so a baseline and a
+candidate (e.g. keyset pagination) land on the same chart.
+
+--mode cursor follows the X-Next-Cursor header (keyset pagination) instead of
+sending offset, so the two modes over the same seeded user compare directly.
+
+Seeding 100k rows through the API takes a while; pass --email/--password of an
+already seeded user to crawl it again without reseeding.
+
+Usage:
+    python perf_runner.py crawl --rows 100000 --page-size 50 --name offset-baseline
+    python perf_runner.py crawl --email crawl_ab12cd34@hairhealth.com --password ... --mode cursor --name keyset
+    python perf_runner.py crawl --email crawl_ab12cd34@hairhealth.com --password ... --passes 3
+"""
+
+import contextlib
+import os
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from perf_metrics import EndpointTable, MetricsRecorder, RunBundle, new_run_meta
+from test_harness_base import NEXT_CURSOR_HEADER
+
+LOGS_PATH = "/api/v1/me/hair-fall-logs"
+INTERVENTIONS_PATH = "/api/v1/me/interventions"
+TARGETS = ("hair-fall-logs", "applications")
+MODES = ("offset", "cursor")
+CRAWL_PRODUCT = "pagination-crawl" # productName of the intervention that holds the seeded applications
+CATEGORIES = ("SHOWER", "BRUSHING", "PILLOW", "OTHER")
+SEED_PROGRESS_EVERY = 10_000
+PAGE_ATTEMPTS = 2 # a failed page is retried once; only the successful attempt is kept in the series
+
+
+def fit_offset_cost(offsets: np.ndarray, latency_ms: np.ndarray) -> Dict:
+    """Least-squares latency = intercept + slope * offset, plus first/last decile medians"""
+    if offsets.size < 2 or np.ptp(offsets) == 0:
+        return {"slope_ms_per_10k": 0.0, "intercept_ms": float(np.median(latency_ms)) if latency_ms.size else 0.0,
+                "r": 0.0, "first_decile_ms": 0.0, "last_decile_ms": 0.0}
+    slope, intercept = np.polyfit(offsets.astype(np.float64), latency_ms, 1)
+    order = np.argsort(offsets, kind="stable")
+    decile = max(order.size // 10, 1)
+    return {
+        "slope_ms_per_10k": float(slope * 10_000),
+        "intercept_ms": float(intercept),
+        "r": float(np.corrcoef(offsets, latency_ms)[0, 1]),
+        "first_decile_ms": float(np.median(latency_ms[order[:decile]])),
+        "last_decile_ms": float(np.median(latency_ms[order[-decile:]])),
+    }
+
+
+class PaginationCrawler:
+    """Seeds one user with deep collections and times every page of them"""
+
+    def __init__(self, base_url: str, rows: int = 100_000, page_size: int = 50, passes: int = 1,
+                 seed_workers: int = 16, targets: Tuple[str, ...] = TARGETS, name: str = None,
+                 email: str = None, password: str = None, mode: str = "offset"):
+        self.base_url = base_url
+        self.rows = rows
+        self.page_size = page_size
+        self.passes = passes
+        self.seed_workers = seed_workers
+        self.targets = targets
+        self.mode = mode
+        self.name = name or f"crawl-{mode}-{time.strftime('%Y%m%d-%H%M%S')}"
+        self.run_id = uuid.uuid4().hex[:8]
+        self.email = email or f"crawl_{self.run_id}@hairhealth.com"
+        self.password = password or f"CrawlPass_{self.run_id}!"
+        self.reuse = email is not None
+
+        self.t0 = 0.0
+        self.endpoints = EndpointTable()
+        self.recorder: Optional[MetricsRecorder] = None
+        self.harness = None
+        self.intervention_id: Optional[str] = None
+        self.local = threading.local()
+        self.seeded: Dict[str, Dict] = {}
+        self.pages: Dict[str, List[Tuple[int, int, float, int, int]]] = {t: [] for t in targets}
+
+    def _new_harness(self):
+        from main_runner import ComprehensiveTestRunner
+
+        harness = ComprehensiveTestRunner(self.base_url)
+        harness.user_email, harness.user_password = self.email, self.password
+        harness.username = self.email.split("@")[0]
+        return harness
+
+    def authenticate(self) -> bool:
+        self.harness = self._new_harness()
+        if not self.reuse:
+            self.harness.test_user_registration()
+        if not self.harness.access_token:
+            self.harness.test_user_login()
+        return self.harness.access_token is not None
+
+    def seed_harness(self):
+        """This thread's harness for seeding: own session, shared token, nothing recorded"""
+        harness = getattr(self.local, "harness", None)
+        if harness is None:
+            harness = self._new_harness()
+            self.local.harness = harness
+        harness.access_token = self.harness.access_token
+        return harness
+
+    def find_intervention(self) -> Optional[str]:
+        response = self.harness.make_request("GET", INTERVENTIONS_PATH, use_auth=True)
+        if response is None or response.status_code != 200:
+            return None
+        ids = [i.get("id") for i in response.json() if isinstance(i, dict) and i.get("productName") == CRAWL_PRODUCT]
+        return ids[0] if ids else None
+
+    def create_intervention(self) -> Optional[str]:
+        response = self.harness.make_request("POST", INTERVENTIONS_PATH, data={
+            "type": "TOPICAL", "productName": CRAWL_PRODUCT, "dosageAmount": "1ml", "frequency": "Twice daily",
+            "applicationTime": "08:00", "startDate": (date.today() - timedelta(days=3650)).isoformat(),
+            "endDate": None, "provider": None, "notes": "Holds the rows crawled by pagination_crawl.py",
+            "sourceRecommendationId": None}, use_auth=True)
+        if response is None or response.status_code not in (200, 201):
+            return None
+        return response.json().get("id")
+
+    def _seed_log(self, i: int) -> bool:
+        # ~27 per day, newest first, so the date-ordered list has realistic ties
+        response = self.seed_harness().make_request("POST", LOGS_PATH, data={
+            "date": (date.today() - timedelta(days=i // 27)).isoformat(), "count": 20 + i % 80,
+            "category": CATEGORIES[i % len(CATEGORIES)], "description": f"crawl seed {i}",
+            "photoMetadataId": None}, use_auth=True)
+        return response is not None and response.status_code in (200, 201)
+
+    def _seed_application(self, i: int) -> bool:
+        stamp = datetime.now(timezone.utc) - timedelta(hours=12 * i)
+        response = self.seed_harness().make_request(
+            "POST", f"{INTERVENTIONS_PATH}/{self.intervention_id}/log-application",
+            data={"timestamp": stamp.strftime("%Y-%m-%dT%H:%M:%SZ"), "notes": f"crawl seed {i}"}, use_auth=True)
+        return response is not None and response.status_code in (200, 201)
+
+    def seed(self, target: str):
+        insert = self._seed_log if target == "hair-fall-logs" else self._seed_application
+        started = time.monotonic()
+        ok = 0
+        with ThreadPoolExecutor(max_workers=self.seed_workers) as pool:
+            for done, success in enumerate(pool.map(insert, range(self.rows), chunksize=64), 1):
+                ok += success
+                if done % SEED_PROGRESS_EVERY == 0:
+                    elapsed = time.monotonic() - started
+                    print(f"🌱 {target}: {done:>9,}/{self.rows:,} rows  {done / elapsed:8.1f} rows/s", file=sys.stderr)
+        elapsed = time.monotonic() - started
+        self.seeded[target] = {"rows": ok, "failed": self.rows - ok, "seconds": elapsed,
+                               "rows_per_s": ok / max(elapsed, 1e-9), "method": "api"}
+
+    def page_path(self, target: str) -> str:
+        if target == "hair-fall-logs":
+            return LOGS_PATH
+        return f"{INTERVENTIONS_PATH}/{self.intervention_id}/applications"
+
+    def crawl(self, target: str, pass_index: int):
+        """Fetch pages in order until one comes back short, failed or past the seeded depth.
+        In cursor mode each page after the first sends the previous page's X-Next-Cursor instead of
+        offset; the series still records how many rows deep the page starts."""
+        path = self.page_path(target)
+        max_offset = self.rows + self.page_size if not self.reuse else None
+        offset, cursor = 0, None
+        while max_offset is None or offset < max_offset:
+            params = {"limit": self.page_size}
+            if self.mode == "cursor" and cursor:
+                params["cursor"] = cursor
+            else:
+                params["offset"] = offset
+            for attempt in range(PAGE_ATTEMPTS):
+                started = time.perf_counter()
+                response = self.harness.make_request("GET", path, use_auth=True, params=params)
+                elapsed_ms = (time.perf_counter() - started) * 1000
+                if response is not None and response.status_code == 200:
+                    break
+            else:
+                print(f"⚠️ {target}: page at offset {offset:,} failed {PAGE_ATTEMPTS}x, stopping this pass",
+                      file=sys.stderr)
+                return
+            returned = len(response.json())
+            self.pages[target].append((pass_index, offset, elapsed_ms, returned, len(response.content)))
+            if returned < self.page_size:
+                return
+            offset += returned
+            if self.mode == "cursor":
+                cursor = response.headers.get(NEXT_CURSOR_HEADER)
+                if not cursor:
+                    print(f"⚠️ {target}: full page at offset {offset - returned:,} carried no "
+                          f"{NEXT_CURSOR_HEADER}, stopping this pass", file=sys.stderr)
+                    return
+
+    def run(self) -> RunBundle:
+        self.t0 = time.monotonic()
+        meta = new_run_meta(self.name, self.base_url, scenario="pagination-crawl", workers=1,
+                            page_size=self.page_size, passes=self.passes, mode=self.mode, run_id=self.run_id,
+                            user_email=self.email)
+        self.recorder = MetricsRecorder(self.endpoints, self.t0, run_id=self.run_id)
+
+        with open(os.devnull, "w") as sink, contextlib.redirect_stdout(sink):
+            if not self.authenticate():
+                raise RuntimeError(f"could not authenticate as {self.email}")
+            if "applications" in self.targets:
+                self.intervention_id = (self.find_intervention() if self.reuse else None) or self.create_intervention()
+                if self.intervention_id is None:
+                    raise RuntimeError("could not create the intervention that holds the applications")
+            if not self.reuse:
+                for target in self.targets:
+                    self.seed(target)
+            # Only the crawl is recorded; seeding throughput is kept in meta["seed"]
+            self.harness.recorder = self.recorder
+            crawl_started = time.monotonic()
+            for pass_index in range(self.passes):
+                for target in self.targets:
+                    self.crawl(target, pass_index)
+
+        meta["duration_s"] = time.monotonic() - self.t0
+        meta["crawl_duration_s"] = time.monotonic() - crawl_started
+        meta["seed"] = self.seeded
+        bundle = RunBundle.from_recorders([self.recorder], meta)
+        crawl = {}
+        for target, pages in self.pages.items():
+            if not pages:
+                continue
+            arrays = np.array(pages, dtype=np.float64).T
+            series = {
+                "pass": arrays[0].astype(np.uint16),
+                "offset": arrays[1].astype(np.int64),
+                "latency_ms": arrays[2].astype(np.float32),
+                "rows": arrays[3].astype(np.uint32),
+                "nbytes": arrays[4].astype(np.uint32),
+            }
+            bundle.series[f"crawl_{target}"] = series
+            crawl[target] = {"pages": int(series["offset"].size), "rows": int(series["rows"].sum() // self.passes),
+                             "max_offset": int(series["offset"].max()),
+                             **fit_offset_cost(series["offset"], series["latency_ms"].astype(np.float64))}
+        bundle.meta["crawl"] = crawl
+        return bundle
+
+
+def print_crawl(crawl: Dict, seed: Dict):
+    for target, stats in seed.items():
+        print(f"🌱 {target}: seeded {stats['rows']:,} rows in {stats['seconds']:.0f}s "
+              f"({stats['rows_per_s']:.0f} rows/s{', ' + format(stats['failed'], ',') + ' failed' if stats['failed'] else ''})")
+    print(f"\n📄 {'Target':<16} {'pages':>7} {'rows':>9} {'first 10%':>10} {'last 10%':>10} {'ms/10k rows':>12} {'r':>6}")
+    for target, c in crawl.items():
+        print(f"   {target:<16} {c['pages']:>7,} {c['rows']:>9,} {c['first_decile_ms']:>8.1f}ms "
+              f"{c['last_decile_ms']:>8.1f}ms {c['slope_ms_per_10k']:>12.2f} {c['r']:>6.2f}")
+
+
+def configure_parser(parser):
+    parser.add_argument("--url", default="http://localhost:8080", help="Base URL for the backend API")
+    parser.add_argument("--rows", type=int, default=100_000, help="Rows seeded per target")
+    parser.add_argument("--page-size", type=int, default=50, help="limit= for every page")
+    parser.add_argument("--passes", type=int, default=1, help="Full crawls per target")
+    parser.add_argument("--seed-workers", type=int, default=16, help="Concurrent inserts while seeding")
+    parser.add_argument("--mode", choices=MODES, default="offset",
+                        help="offset: limit/offset for every page; cursor: follow X-Next-Cursor (keyset)")
+    parser.add_argument("--target", action="append", choices=TARGETS, help="Crawl only these (repeatable)")
+    parser.add_argument("--email", help="Crawl this already seeded user instead of creating and seeding one")
+    parser.add_argument("--password", help="Password for --email")
+    parser.add_argument("--name", help="Bundle name (default: crawl-<mode>-<timestamp>)")
+    parser.add_argument("--out-dir", default="runs", help="Directory that receives the run bundle")
+
+
+def run_command(args) -> int:
+    if args.email and not args.password:
+        print("❌ --email needs --password", file=sys.stderr)
+        return 2
+    crawler = PaginationCrawler(args.url, args.rows, args.page_size, args.passes, args.seed_workers,
+                                tuple(args.target or TARGETS), args.name, args.email, args.password, args.mode)
+    if not crawler.reuse:
+        print(f"🌱 Seeding {crawler.email} with {args.rows:,} rows per target on {args.seed_workers} workers")
+    try:
+        bundle = crawler.run()
+    except RuntimeError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
+    path = bundle.save(os.path.join(args.out_dir, crawler.name))
+    print_crawl(bundle.meta["crawl"], bundle.meta["seed"])
+    if not crawler.reuse:
+        print(f"\n🔁 Crawl again without reseeding: --email {crawler.email} --password {crawler.password}")
+    print(f"\n✅ {bundle.meta['requests']:,} pages in {bundle.meta['crawl_duration_s']:.1f}s -> {path}")
+    return 0
@@ -0,0 +1,201 @@
+# payload_profile.py
+"""
+Response payload sizes, element counts and over-fetch per endpoint.
+
+Drives every spec operation (spec_driver) and looks at each response body:
+
+  * bytes on the wire and, for list responses, the number of elements
+  * for every field of every element (one level of nesting, "user.id"), how many
+    serialised bytes it contributed
+
+Fields are then compared with what the harness tests read from the same
+operation (impact_selector's test map: x["field"], x.get("field") and the
+expected-fields lists given to validate_response_schema). An operation is
+flagged when fields no test reads carry more than --unread-share of its bytes,
+or when its p95 response exceeds --large-bytes; bodies under --min-bytes are
+not worth trimming and are only listed. List endpoints that return
+their default page (limit=50 on hair-fall-logs) of full objects show up here
+first.
+
+The run is saved as a normal bundle (meta["payload"]), so `perf_runner.py report`
+adds a payload section next to the latency charts.
+
+Usage:
+    python perf_runner.py payload --url http://localhost:8080 --iterations 60
+    python perf_runner.py payload --include "hair-fall-logs|progress-photos" --json payload.json
+"""
+
+import json
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from spec_driver import Operation, SpecDriver
+from spec_validators import DEFAULT_SPEC, load_spec
+
+COMPACT = (",", ":")  # Jackson's default output has no whitespace either
+
+
+def _size(value) -> int:
+    return len(json.dumps(value, separators=COMPACT, ensure_ascii=False).encode())
+
+
+class PayloadProfiler:
+    """Collects per-operation body statistics from the spec driver's responses"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.bytes: Dict[str, List[int]] = {}
+        self.elements: Dict[str, List[int]] = {}
+        self.field_bytes: Dict[str, Dict[str, int]] = {}
+        self.field_seen: Dict[str, Dict[str, int]] = {}
+
+    def observe(self, op: Operation, response):
+        if response is None or response.status_code >= 300 or not response.content:
+            return
+        try:
+            data = response.json()
+        except ValueError:
+            return
+        items = data if isinstance(data, list) else [data]
+        sizes: Dict[str, int] = {}
+        seen: Dict[str, int] = {}
+        for item in items:
+            if not isinstance(item, dict):
+                continue
+            for key, value in item.items():
+                if isinstance(value, dict) and value:
+                    for inner_key, inner_value in value.items():
+                        path = f"{key}.{inner_key}"
+                        sizes[path] = sizes.get(path, 0) + _size(inner_value) + len(inner_key) + 3
+                        seen[path] = seen.get(path, 0) + 1
+                    continue
+                sizes[key] = sizes.get(key, 0) + _size(value) + len(key) + 3  # "key": plus separator
+                seen[key] = seen.get(key, 0) + 1
+        with self.lock:
+            self.bytes.setdefault(op.name, []).append(len(response.content))
+            self.elements.setdefault(op.name, []).append(len(data) if isinstance(data, list) else 1)
+            totals = self.field_bytes.setdefault(op.name, {})
+            counts = self.field_seen.setdefault(op.name, {})
+            for path, n in sizes.items():
+                totals[path] = totals.get(path, 0) + n
+                counts[path] = counts.get(path, 0) + seen[path]
+
+    def summary(self, fields_read: Dict[str, List[str]], unread_share: float, large_bytes: int,
+                min_bytes: int) -> Dict:
+        operations = []
+        for name in sorted(self.bytes):
+            sizes = np.array(self.bytes[name], dtype=np.int64)
+            elements = np.array(self.elements[name], dtype=np.int64)
+            read = set(fields_read.get(name, []))
+            field_bytes = self.field_bytes.get(name, {})
+            body_bytes = sum(field_bytes.values()) or 1
+            # a field counts as read if the test names it or, for "user.id", its leaf or parent
+            unread = {path: n for path, n in field_bytes.items()
+                      if not ({path, path.split(".")[-1], path.split(".")[0]} & read)}
+            share = sum(unread.values()) / body_bytes
+            p95 = float(np.percentile(sizes, 95))
+            flags = []
+            if share > unread_share and field_bytes and sizes.mean() >= min_bytes:
+                flags.append(f"{100 * share:.0f}% of bytes in fields no test reads")
+            if p95 > large_bytes:
+                flags.append(f"p95 body {p95 / 1024:.0f} KiB")
+            operations.append({
+                "operation": name,
+                "responses": int(sizes.size),
+                "bytes": {"p50": float(np.percentile(sizes, 50)), "p95": p95, "max": int(sizes.max()),
+                          "mean": float(sizes.mean())},
+                "elements": {"p50": float(np.percentile(elements, 50)), "max": int(elements.max()),
+                             "mean": float(elements.mean())},
+                "bytes_per_element": float(sizes.sum() / max(int(elements.sum()), 1)),
+                "fields": {path: {"bytes": n, "share": n / body_bytes, "read": path not in unread,
+                                  "present": self.field_seen[name][path]}
+                           for path, n in sorted(field_bytes.items(), key=lambda kv: kv[1], reverse=True)},
+                "tested": name in fields_read,
+                "unread_share": share,
+                "flags": flags,
+            })
+        operations.sort(key=lambda o: (bool(o["flags"]), o["bytes"]["mean"] * o["responses"]), reverse=True)
+        return {"unread_share_threshold": unread_share, "large_bytes": large_bytes, "min_bytes": min_bytes,
+                "operations": operations}
+
+
+def fields_read_by_tests(spec: Dict) -> Dict[str, List[str]]:
+    """Operation -> response fields read by any harness test that calls it"""
+    from impact_selector import build_test_map
+
+    read: Dict[str, set] = {}
+    for test in build_test_map(spec).values():
+        for op in test["operations"]:
+            read.setdefault(op, set()).update(test["fields"])
+    return {op: sorted(fields) for op, fields in read.items()}
+
+
+def profile(base_url: str, spec_path: str = DEFAULT_SPEC, workers: int = 4, iterations: int = 20,
+            include: Optional[str] = None, name: str = None, unread_share: float = 0.5,
+            large_bytes: int = 64 * 1024, min_bytes: int = 1024):
+    driver = SpecDriver(base_url, spec_path, workers, iterations, name or f"payload-{time.strftime('%Y%m%d-%H%M%S')}",
+                        include)
+    profiler = PayloadProfiler()
+    driver.observer = profiler.observe
+    bundle = driver.run()
+    bundle.meta["scenario"] = "payload"
+    bundle.meta["payload"] = profiler.summary(fields_read_by_tests(load_spec(spec_path)), unread_share,
+                                               large_bytes, min_bytes)
+    return driver, bundle
+
+
+def _fmt_bytes(n: float) -> str:
+    return f"{n / 1024:.1f}K" if n >= 1024 else f"{n:.0f}B"
+
+
+def print_payload(payload: Dict, show_fields: int):
+    print(f"\n📦 {'Operation':<66} {'p50':>7} {'p95':>7} {'max':>7} {'elems':>6} {'unread':>7}")
+    for op in payload["operations"]:
+        b, e = op["bytes"], op["elements"]
+        unread = f"{100 * op['unread_share']:.0f}%" if op["tested"] else "untested"
+        print(f"   {op['operation']:<66} {_fmt_bytes(b['p50']):>7} {_fmt_bytes(b['p95']):>7} "
+              f"{_fmt_bytes(b['max']):>7} {e['mean']:>6.1f} {unread:>7}")
+    flagged = [op for op in payload["operations"] if op["flags"]]
+    if flagged:
+        print(f"\n🚩 {len(flagged)} operations send more than their tests use:")
+        for op in flagged:
+            print(f"   {op['operation']}: {'; '.join(op['flags'])}")
+            unread = [(path, f) for path, f in op["fields"].items() if not f["read"]][:show_fields]
+            if unread:
+                print("      heaviest unread fields: " + ", ".join(
+                    f"{path} {100 * f['share']:.0f}%" for path, f in unread))
+
+
+def configure_parser(parser):
+    parser.add_argument("--url", default="http://localhost:8080", help="Base URL for the backend API")
+    parser.add_argument("--spec", default=DEFAULT_SPEC, help="OpenAPI document to drive")
+    parser.add_argument("--workers", type=int, default=4, help="Concurrent requests within a phase")
+    parser.add_argument("--iterations", type=int, default=20,
+                        help="Driver iterations; each creates rows, so lists grow towards their page limit")
+    parser.add_argument("--include", help="Regex on 'METHOD /path'; auth operations always run")
+    parser.add_argument("--unread-share", type=float, default=0.5,
+                        help="Flag when fields no test reads carry more than this share of the body")
+    parser.add_argument("--large-bytes", type=int, default=64 * 1024, help="Flag when p95 body exceeds this")
+    parser.add_argument("--min-bytes", type=int, default=1024,
+                        help="Bodies smaller than this on average are too small for over-fetch to matter")
+    parser.add_argument("--fields", type=int, default=5, help="Unread fields listed per flagged operation")
+    parser.add_argument("--name", help="Bundle name (default: payload-<timestamp>)")
+    parser.add_argument("--out-dir", default="runs", help="Directory that receives the run bundle")
+    parser.add_argument("--json", help="Also write the payload profile as JSON to this file")
+
+
+def run_command(args) -> int:
+    driver, bundle = profile(args.url, args.spec, args.workers, args.iterations, args.include, args.name,
+                             args.unread_share, args.large_bytes, args.min_bytes)
+    path = bundle.save(os.path.join(args.out_dir, driver.name))
+    print_payload(bundle.meta["payload"], args.fields)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(bundle.meta["payload"], f, indent=2)
+        print(f"\n💾 Payload profile written to {args.json}")
+    print(f"\n✅ {bundle.meta['requests']:,} requests -> {path}")
+    return 0
@@ -0,0 +1,319 @@
+# perf_metrics.py
+"""
+Per-request metrics recording and run bundle persistence.
+
+A run bundle is a directory holding everything one load run produced:
+
+    meta.json     run name, start time, base URL, arguments, endpoint table
+    samples.npz   one row per request (columnar NumPy arrays)
+    errors.npz    sparse per-second error counters by endpoint and error class
+    <series>.npz  optional time series sampled alongside the requests
+                  (e.g. client.npz from resource_monitor), same time base
+
+Recording happens on the hot path of every request, so samples are appended
+to plain `array.array` columns owned by a single worker. NumPy is only needed
+when a bundle is saved or loaded.
+"""
+
+import json
+import os
+import re
+import threading
+import time
+from array import array
+from typing import Dict, List, Optional
+
+UUID_SEGMENT = re.compile(
+    r"/[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}(?=/|$)"
+)
+NUMERIC_SEGMENT = re.compile(r"/\d+(?=/|$)")
+
+BUNDLE_META = "meta.json"
+BUNDLE_SAMPLES = "samples.npz"
+
+# --- Error taxonomy ---
+# Every failure maps to one slot of a fixed-size space, so per-second counters
+# stay small integer keys: transport failures, then 4xx and 5xx by exact code,
+# then responses that arrived fine but did not match the expected schema.
+CONNECT_REFUSED, CONNECT_TIMEOUT, READ_TIMEOUT, RESET, TRANSPORT_OTHER = range(5)
+TRANSPORT_LABELS = ["connect_refused", "connect_timeout", "read_timeout", "reset", "transport_other"]
+SLOT_4XX = 5        # + (status - 400)
+SLOT_5XX = 105      # + (status - 500)
+SCHEMA_MISMATCH = 205
+ERROR_SLOTS = 206
+
+
+def status_slot(status: int) -> Optional[int]:
+    """Error slot for an HTTP status, None when the status is not an error"""
+    if status >= 500:
+        return SLOT_5XX + min(status, 599) - 500
+    if status >= 400:
+        return SLOT_4XX + status - 400
+    return None
+
+
+def error_label(slot: int) -> str:
+    if slot < SLOT_4XX:
+        return TRANSPORT_LABELS[slot]
+    if slot == SCHEMA_MISMATCH:
+        return "schema_mismatch"
+    if slot >= SLOT_5XX:
+        return f"http_{slot - SLOT_5XX + 500}"
+    return f"http_{slot - SLOT_4XX + 400}"
+
+
+def error_family(slot: int) -> str:
+    """Coarse grouping used for charts: transport, 4xx, 5xx or schema"""
+    if slot < SLOT_4XX:
+        return "transport"
+    if slot == SCHEMA_MISMATCH:
+        return "schema"
+    return "5xx" if slot >= SLOT_5XX else "4xx"
+
+
+def classify_exception(exc: BaseException) -> int:
+    """Map a requests/urllib3 transport exception to its error slot"""
+    import requests
+
+    if isinstance(exc, requests.exceptions.ConnectTimeout):
+        return CONNECT_TIMEOUT
+    if isinstance(exc, requests.exceptions.ReadTimeout):
+        return READ_TIMEOUT
+    if isinstance(exc, requests.exceptions.ChunkedEncodingError):
+        return RESET
+    # urllib3 wraps the socket error a few levels down; walk the chain, then fall back to the text.
+    seen, cause = set(), exc
+    while cause is not None and id(cause) not in seen:
+        seen.add(id(cause))
+        if isinstance(cause, ConnectionRefusedError):
+            return CONNECT_REFUSED
+        if isinstance(cause, (ConnectionResetError, BrokenPipeError, ConnectionAbortedError)):
+            return RESET
+        cause = getattr(cause, "reason", None) or cause.__cause__ or cause.__context__
+    text = str(exc)
+    if "refused" in text:
+        return CONNECT_REFUSED
+    if "reset" in text or "aborted" in text or "RemoteDisconnected" in text:
+        return RESET
+    if "timed out" in text:
+        return CONNECT_TIMEOUT if isinstance(exc, requests.exceptions.ConnectionError) else READ_TIMEOUT
+    return TRANSPORT_OTHER
+
+
+def endpoint_key(method: str, path: str) -> str:
+    """Collapse a concrete request path into its endpoint template, e.g. 'GET /api/v1/me/hair-fall-logs/{id}'"""
+    path = path.split("?", 1)[0]
+    path = UUID_SEGMENT.sub("/{id}", path)
+    path = NUMERIC_SEGMENT.sub("/{id}", path)
+    return f"{method.upper()} {path}"
+
+
+def request_id(run_id: str, worker: int, seq: int) -> str:
+    """Request id sent by a load worker; `seq` is the row in that worker's recorder"""
+    return f"{run_id}-{worker}-{seq}"
+
+
+class EndpointTable:
+    """Stable endpoint-name <-> small integer mapping shared by all recorders of a run"""
+
+    def __init__(self, names: Optional[List[str]] = None):
+        self.names: List[str] = list(names or [])
+        self._index: Dict[str, int] = {name: i for i, name in enumerate(self.names)}
+        self._lock = threading.Lock()
+
+    def index(self, name: str) -> int:
+        idx = self._index.get(name)
+        if idx is None:
+            # New endpoints are rare after warm-up, so only the insert path takes the lock.
+            with self._lock:
+                idx = self._index.get(name)
+                if idx is None:
+                    idx = len(self.names)
+                    self.names.append(name)
+                    self._index[name] = idx
+        return idx
+
+
+class MetricsRecorder:
+    """Columnar per-request sample store owned by one worker thread"""
+
+    def __init__(self, endpoints: EndpointTable, t0: float, worker: int = 0, run_id: str = ""):
+        self.endpoints = endpoints
+        self.t0 = t0  # time.monotonic() at run start, shared by every recorder of the run
+        self.worker = worker
+        self.run_id = run_id
+        self.t = array("d")           # request start, seconds since t0
+        self.latency_ms = array("f")
+        self.endpoint = array("H")
+        self.status = array("h")      # HTTP status, 0 when no response was received
+        self.nbytes = array("I")      # response body size
+
+        # Error counters for the current second, keyed endpoint * ERROR_SLOTS + slot, and
+        # flushed as sparse (second, endpoint, slot, count) rows when the second rolls over.
+        self._errors: Dict[int, int] = {}
+        self._error_second = -1
+        self.error_second = array("I")
+        self.error_endpoint = array("H")
+        self.error_slot = array("H")
+        self.error_count = array("I")
+
+    def record(self, method: str, path: str, start: float, elapsed: float,
+               status: int, nbytes: int = 0, error: Optional[int] = None, endpoint_name: Optional[str] = None):
+        """Append one request; `start` is a time.monotonic() reading, `elapsed` is in seconds.
+        `error` is the transport error slot when no response was received. `endpoint_name`
+        overrides the endpoint template, to keep e.g. background calls apart from the scenario's."""
+        t = start - self.t0
+        endpoint = self.endpoints.index(endpoint_name or endpoint_key(method, path))
+        self.t.append(t)
+        self.latency_ms.append(elapsed * 1000.0)
+        self.endpoint.append(endpoint)
+        self.status.append(status)
+        self.nbytes.append(nbytes)
+        slot = status_slot(status) if status else (TRANSPORT_OTHER if error is None else error)
+        if slot is not None:
+            self.count_error(endpoint, slot, t)
+
+    def record_schema_mismatch(self, method: str, path: str):
+        self.count_error(self.endpoints.index(endpoint_key(method, path)), SCHEMA_MISMATCH,
+                         time.monotonic() - self.t0)
+
+    def count_error(self, endpoint: int, slot: int, t: float):
+        second = int(t)
+        if second != self._error_second:
+            self.flush_errors()
+            self._error_second = second
+        key = endpoint * ERROR_SLOTS + slot
+        self._errors[key] = self._errors.get(key, 0) + 1
+
+    def flush_errors(self):
+        for key, count in self._errors.items():
+            self.error_second.append(self._error_second)
+            self.error_endpoint.append(key // ERROR_SLOTS)
+            self.error_slot.append(key % ERROR_SLOTS)
+            self.error_count.append(count)
+        self._errors.clear()
+
+    def next_request_id(self) -> str:
+        """X-Request-ID for the request about to be recorded: <run_id>-<worker>-<row>"""
+        return request_id(self.run_id, self.worker, len(self.t))
+
+    def __len__(self) -> int:
+        return len(self.t)
+
+    def reset(self):
+        for column in (self.t, self.latency_ms, self.endpoint, self.status, self.nbytes,
+                       self.error_second, self.error_endpoint, self.error_slot, self.error_count):
+            del column[:]
+        self._errors.clear()
+        self._error_second = -1
+
+
+class RunBundle:
+    """A finished run: metadata plus columnar samples, loadable for reporting"""
+
+    def __init__(self, meta: Dict, samples: Dict, series: Optional[Dict[str, Dict]] = None):
+        self.meta = meta
+        self.samples = samples
+        self.series: Dict[str, Dict] = series or {}
+
+    @property
+    def name(self) -> str:
+        return self.meta.get("name", "run")
+
+    @property
+    def endpoints(self) -> List[str]:
+        return self.meta.get("endpoints", [])
+
+    @property
+    def duration(self) -> float:
+        return float(self.meta.get("duration_s") or 0.0)
+
+    @classmethod
+    def from_recorders(cls, recorders: List[MetricsRecorder], meta: Dict) -> "RunBundle":
+        import numpy as np
+
+        def column(attr, dtype):
+            parts = [np.frombuffer(getattr(r, attr), dtype=dtype) for r in recorders if len(r)]
+            return np.concatenate(parts) if parts else np.zeros(0, dtype=dtype)
+
+        t = column("t", np.float64)
+        order = np.argsort(t, kind="stable")
+        samples = {
+            "t": t[order],
+            "latency_ms": column("latency_ms", np.float32)[order],
+            "endpoint": column("endpoint", np.uint16)[order],
+            "status": column("status", np.int16)[order],
+            "nbytes": column("nbytes", np.uint32)[order],
+            # worker + seq rebuild each sample's X-Request-ID (see request_id)
+            "worker": np.concatenate([np.full(len(r), r.worker, dtype=np.uint16) for r in recorders if len(r)]
+                                     or [np.zeros(0, dtype=np.uint16)])[order],
+            "seq": np.concatenate([np.arange(len(r), dtype=np.uint32) for r in recorders if len(r)]
+                                  or [np.zeros(0, dtype=np.uint32)])[order],
+        }
+        meta = dict(meta)
+        if recorders:
+            meta["endpoints"] = list(recorders[0].endpoints.names)
+        meta["requests"] = int(t.size)
+        return cls(meta, samples, {"errors": merge_error_counters(recorders)})
+
+    def save(self, path: str) -> str:
+        import numpy as np
+
+        os.makedirs(path, exist_ok=True)
+        # Uncompressed: a 24h soak bundle must load in seconds, and latency data barely compresses.
+        np.savez(os.path.join(path, BUNDLE_SAMPLES), **self.samples)
+        for name, arrays in self.series.items():
+            np.savez(os.path.join(path, f"{name}.npz"), **arrays)
+        with open(os.path.join(path, BUNDLE_META), "w") as f:
+            json.dump(self.meta, f, indent=2, default=str)
+        return path
+
+    @classmethod
+    def load(cls, path: str) -> "RunBundle":
+        import numpy as np
+
+        with open(os.path.join(path, BUNDLE_META)) as f:
+            meta = json.load(f)
+        with np.load(os.path.join(path, BUNDLE_SAMPLES)) as data:
+            samples = {key: data[key] for key in data.files}
+        series = {}
+        for filename in sorted(os.listdir(path)):
+            if filename.endswith(".npz") and filename != BUNDLE_SAMPLES:
+                with np.load(os.path.join(path, filename)) as data:
+                    series[filename[:-4]] = {key: data[key] for key in data.files}
+        meta.setdefault("name", os.path.basename(os.path.normpath(path)))
+        return cls(meta, samples, series)
+
+
+def merge_error_counters(recorders: List[MetricsRecorder]) -> Dict:
+    """Sum every worker's sparse error rows into one (second, endpoint, slot) -> count table"""
+    import numpy as np
+
+    for r in recorders:
+        r.flush_errors()
+
+    def column(attr, dtype):
+        parts = [np.frombuffer(getattr(r, attr), dtype=dtype) for r in recorders]
+        return np.concatenate(parts) if parts else np.zeros(0, dtype=dtype)
+
+    second = column("error_second", np.uint32).astype(np.int64)
+    key = (second * 65536 + column("error_endpoint", np.uint16)) * ERROR_SLOTS + column("error_slot", np.uint16)
+    keys, inverse = np.unique(key, return_inverse=True)
+    counts = np.bincount(inverse, weights=column("error_count", np.uint32), minlength=keys.size)
+    return {
+        "second": (keys // (65536 * ERROR_SLOTS)).astype(np.uint32),
+        "endpoint": (keys // ERROR_SLOTS % 65536).astype(np.uint16),
+        "slot": (keys % ERROR_SLOTS).astype(np.uint16),
+        "count": counts.astype(np.uint32),
+    }
+
+
+def new_run_meta(name: str, base_url: str, **extra) -> Dict:
+    """Metadata skeleton stamped at run start"""
+    meta = {
+        "name": name,
+        "base_url": base_url,
+        "started_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+    }
+    meta.update(extra)
+    return meta
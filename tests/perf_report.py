@@ -0,0 +1,687 @@
+# perf_report.py
+"""
+Static HTML performance report built from one or more run bundles.
+
+The report is a single self-contained file (inline CSS, SVG and PNG data URIs)
+so it can be opened offline or attached to a ticket. Every aggregate is computed
+with whole-array NumPy operations (one `bincount` per view), so a 24-hour soak
+bundle with tens of millions of samples renders in seconds.
+
+Usage:
+    python perf_runner.py report runs/baseline runs/candidate -o report.html
+"""
+
+import base64
+import html
+import struct
+import time
+import zlib
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from perf_metrics import ERROR_SLOTS, SCHEMA_MISMATCH, SLOT_4XX, SLOT_5XX, RunBundle, error_label
+
+# Latency axis shared by heatmaps and percentile estimation: 0.1 ms .. 60 s, log scale.
+LAT_MIN_MS = 0.1
+LAT_MAX_MS = 60_000.0
+HEATMAP_LAT_BINS = 48
+PCTL_LAT_BINS = 2000  # ~0.7% relative resolution, plenty for p50/p95/p99
+MAX_TIME_BINS = 300
+
+RUN_COLORS = ["#2563eb", "#dc2626", "#16a34a", "#9333ea", "#ea580c", "#0891b2"]
+
+# Perceptually ordered ramp (light -> dark) used for heatmap cells.
+_RAMP_ANCHORS = np.array([
+    [255, 255, 217], [199, 233, 180], [65, 182, 196],
+    [34, 94, 168], [37, 52, 148], [8, 29, 88],
+], dtype=np.float64)
+
+
+def _colormap() -> np.ndarray:
+    x = np.linspace(0, len(_RAMP_ANCHORS) - 1, 256)
+    lo = np.floor(x).astype(int).clip(0, len(_RAMP_ANCHORS) - 2)
+    frac = (x - lo)[:, None]
+    lut = _RAMP_ANCHORS[lo] * (1 - frac) + _RAMP_ANCHORS[lo + 1] * frac
+    lut = lut.astype(np.uint8)
+    lut[0] = (248, 250, 252)  # empty cells
+    return lut
+
+
+COLORMAP = _colormap()
+
+
+def log_bins(latency_ms: np.ndarray, nbins: int) -> np.ndarray:
+    """Map latencies onto `nbins` log-spaced buckets between LAT_MIN_MS and LAT_MAX_MS"""
+    span = np.log(LAT_MAX_MS / LAT_MIN_MS)
+    pos = np.log(np.maximum(latency_ms, LAT_MIN_MS) / LAT_MIN_MS) / span
+    return np.minimum((pos * nbins).astype(np.int64), nbins - 1)
+
+
+def bin_to_latency(bin_index: np.ndarray, nbins: int) -> np.ndarray:
+    """Geometric centre of a log latency bucket, in ms"""
+    return LAT_MIN_MS * (LAT_MAX_MS / LAT_MIN_MS) ** ((bin_index + 0.5) / nbins)
+
+
+def time_binning(duration: float) -> Tuple[float, int]:
+    width = max(1.0, float(np.ceil(duration / MAX_TIME_BINS)))
+    return width, max(1, int(np.ceil(duration / width)))
+
+
+def endpoint_percentiles(endpoint: np.ndarray, latency_ms: np.ndarray, n_endpoints: int,
+                         quantiles=(0.5, 0.95, 0.99)) -> np.ndarray:
+    """Per-endpoint latency quantiles from one fine log histogram (O(n), no sort)"""
+    lb = log_bins(latency_ms, PCTL_LAT_BINS)
+    hist = np.bincount(endpoint.astype(np.int64) * PCTL_LAT_BINS + lb,
+                       minlength=n_endpoints * PCTL_LAT_BINS).reshape(n_endpoints, PCTL_LAT_BINS)
+    cdf = np.cumsum(hist, axis=1)
+    totals = cdf[:, -1:]
+    out = np.full((n_endpoints, len(quantiles)), np.nan)
+    for j, q in enumerate(quantiles):
+        # first bucket whose cumulative count reaches q * total
+        idx = np.argmax(cdf >= np.maximum(q * totals, 1), axis=1)
+        out[:, j] = np.where(totals[:, 0] > 0, bin_to_latency(idx, PCTL_LAT_BINS), np.nan)
+    return out
+
+
+def _histogram_p99(hist: np.ndarray) -> np.ndarray:
+    """Per-row p99 from (rows, HEATMAP_LAT_BINS) counts; NaN for empty rows"""
+    total = hist.sum(axis=1)
+    cum = np.cumsum(hist, axis=1)
+    idx = np.argmax(cum >= np.ceil(0.99 * total)[:, None], axis=1)
+    return np.where(total > 0, bin_to_latency(idx, HEATMAP_LAT_BINS), np.nan)
+
+
+ERROR_FAMILIES = [("transport", "#9333ea"), ("4xx", "#ea580c"), ("5xx", "#dc2626"), ("schema", "#0891b2")]
+
+
+class RunSummary:
+    """All aggregates the report needs for one bundle"""
+
+    def __init__(self, bundle: RunBundle):
+        s = bundle.samples
+        self.bundle = bundle
+        self.name = bundle.name
+        self.endpoints = bundle.endpoints
+        n_ep = max(len(self.endpoints), 1)
+        t = s["t"]
+        ep = s["endpoint"].astype(np.int64)
+        status = s["status"]
+        lat = s["latency_ms"]
+
+        self.duration = max(bundle.duration, float(t[-1]) if t.size else 0.0, 1.0)
+        self.bin_width, n_tb = time_binning(self.duration)
+        tb = np.minimum((t / self.bin_width).astype(np.int64), n_tb - 1)
+        self.n_time_bins = n_tb
+
+        failed = (status == 0) | (status >= 400)
+        self.count = np.bincount(ep, minlength=n_ep)
+        self.errors = np.bincount(ep, weights=failed, minlength=n_ep).astype(np.int64)
+        self.bytes = np.bincount(ep, weights=s["nbytes"], minlength=n_ep)
+        self.pctl = endpoint_percentiles(ep, lat, n_ep)
+        self.total_pctl = endpoint_percentiles(np.zeros_like(ep), lat, 1)[0]
+
+        self.throughput = np.bincount(tb, minlength=n_tb) / self.bin_width
+        self.error_rate = np.bincount(tb, weights=failed, minlength=n_tb) / self.bin_width
+
+        lb = log_bins(lat, HEATMAP_LAT_BINS)
+        self.heatmaps = np.bincount(
+            (ep * n_tb + tb) * HEATMAP_LAT_BINS + lb,
+            minlength=n_ep * n_tb * HEATMAP_LAT_BINS,
+        ).reshape(n_ep, n_tb, HEATMAP_LAT_BINS)
+        self.p99_over_time = _histogram_p99(self.heatmaps.sum(axis=0))
+
+        # (endpoint, status) pairs for every non-2xx/3xx outcome
+        codes, counts = np.unique(ep[failed] * 1000 + status[failed], return_counts=True)
+        self.error_breakdown: Dict[int, Dict[int, int]] = {}
+        for code, n in zip(codes.tolist(), counts.tolist()):
+            self.error_breakdown.setdefault(code // 1000, {})[code % 1000] = n
+
+        # Error taxonomy from the per-second counters (bundles recorded before it existed lack the series)
+        self.error_classes: Optional[Dict[int, Dict[int, int]]] = None
+        errors = bundle.series.get("errors")
+        if errors is not None:
+            self._summarise_error_classes(errors, n_tb)
+
+    def _summarise_error_classes(self, errors: Dict[str, np.ndarray], n_tb: int):
+        second = errors["second"].astype(np.int64)
+        ep = errors["endpoint"].astype(np.int64)
+        slot = errors["slot"].astype(np.int64)
+        count = errors["count"].astype(np.int64)
+
+        keys, inverse = np.unique(ep * ERROR_SLOTS + slot, return_inverse=True)
+        totals = np.bincount(inverse, weights=count, minlength=keys.size)
+        self.error_classes = {}
+        for key, n in zip(keys.tolist(), totals.tolist()):
+            self.error_classes.setdefault(key // ERROR_SLOTS, {})[key % ERROR_SLOTS] = int(n)
+
+        # errors/s per family over time, and when each class first appeared
+        family = np.select([slot < SLOT_4XX, slot == SCHEMA_MISMATCH, slot >= SLOT_5XX], [0, 3, 2], default=1)
+        tb = np.minimum(((second + 0.5) / self.bin_width).astype(np.int64), n_tb - 1)
+        self.error_families = np.bincount(family * n_tb + tb, weights=count,
+                                          minlength=len(ERROR_FAMILIES) * n_tb).reshape(-1, n_tb) / self.bin_width
+        self.error_onset: Dict[int, Tuple[int, int, int]] = {}  # slot -> (first second, peak/s, total)
+        for cls in np.unique(slot).tolist():
+            mask = slot == cls
+            per_second = np.bincount(second[mask], weights=count[mask])
+            self.error_onset[cls] = (int(second[mask].min()), int(per_second.max()), int(count[mask].sum()))
+
+    def rps(self) -> np.ndarray:
+        return self.count / self.duration
+
+
+# --- Rendering helpers ---
+
+def png_data_uri(rgb: np.ndarray) -> str:
+    """Encode an (h, w, 3) uint8 array as a PNG data URI using only zlib"""
+    h, w, _ = rgb.shape
+    raw = np.concatenate([np.zeros((h, 1), dtype=np.uint8), rgb.reshape(h, w * 3)], axis=1)
+
+    def chunk(tag: bytes, payload: bytes) -> bytes:
+        return (struct.pack(">I", len(payload)) + tag + payload
+                + struct.pack(">I", zlib.crc32(tag + payload) & 0xFFFFFFFF))
+
+    png = (b"\x89PNG\r\n\x1a\n"
+           + chunk(b"IHDR", struct.pack(">IIBBBBB", w, h, 8, 2, 0, 0, 0))
+           + chunk(b"IDAT", zlib.compress(raw.tobytes(), 6))
+           + chunk(b"IEND", b""))
+    return "data:image/png;base64," + base64.b64encode(png).decode("ascii")
+
+
+def heatmap_svg(counts: np.ndarray, bin_width: float, width: int = 900, height: int = 150) -> str:
+    """counts: (time_bins, latency_bins) -> SVG with an embedded pixelated PNG and axes"""
+    scaled = np.log1p(counts.astype(np.float64))
+    peak = scaled.max()
+    levels = np.zeros(scaled.shape, dtype=np.uint8)
+    if peak > 0:
+        levels = np.where(counts > 0, 1 + (scaled / peak * 254), 0).astype(np.uint8)
+    # rows = latency (slowest on top), columns = time
+    rgb = COLORMAP[levels.T[::-1]]
+    uri = png_data_uri(np.ascontiguousarray(rgb))
+
+    left, bottom = 52, 18
+    plot_w, plot_h = width - left - 8, height - bottom - 4
+    parts = [f'<svg class="chart" viewBox="0 0 {width} {height}" width="{width}" height="{height}">',
+             f'<image x="{left}" y="4" width="{plot_w}" height="{plot_h}" preserveAspectRatio="none" '
+             f'style="image-rendering:pixelated" href="{uri}"/>']
+    span = np.log(LAT_MAX_MS / LAT_MIN_MS)
+    for label, ms in (("1ms", 1), ("10ms", 10), ("100ms", 100), ("1s", 1000), ("10s", 10000)):
+        y = 4 + plot_h * (1 - np.log(ms / LAT_MIN_MS) / span)
+        parts.append(f'<line x1="{left - 4}" x2="{left}" y1="{y:.1f}" y2="{y:.1f}" stroke="#64748b"/>'
+                     f'<text x="{left - 6}" y="{y + 3:.1f}" text-anchor="end">{label}</text>')
+    parts.append(_time_axis(left, 4 + plot_h, plot_w, counts.shape[0] * bin_width))
+    parts.append("</svg>")
+    return "".join(parts)
+
+
+def _time_axis(left: float, y: float, plot_w: float, duration: float, fmt=None) -> str:
+    fmt = fmt or _fmt_duration
+    ticks = []
+    for i in range(6):
+        x = left + plot_w * i / 5
+        ticks.append(f'<text x="{x:.1f}" y="{y + 13:.1f}" text-anchor="middle">'
+                     f'{fmt(duration * i / 5)}</text>')
+    return "".join(ticks)
+
+
+def line_chart_svg(series: List[Tuple[str, str, np.ndarray, float]], y_label: str,
+                   width: int = 900, height: int = 200,
+                   bands: List[Tuple[float, float, str]] = (), x_max: float = None, x_fmt=None) -> str:
+    """series: (label, colour, values, x_step_seconds); all share one y-axis.
+    bands: (start_s, end_s, colour) spans shaded behind the lines.
+    x_fmt formats x-axis ticks (default: durations); pass _fmt_num for non-time axes."""
+    left, bottom, top = 52, 18, 8
+    plot_w, plot_h = width - left - 8, height - bottom - top
+    x_max = x_max or max((len(v) * step for _, _, v, step in series), default=1.0) or 1.0
+    y_max = max((float(np.nanmax(v)) for _, _, v, _ in series if len(v)), default=1.0) or 1.0
+    parts = [f'<svg class="chart" viewBox="0 0 {width} {height}" width="{width}" height="{height}">',
+             f'<rect x="{left}" y="{top}" width="{plot_w}" height="{plot_h}" fill="#f8fafc"/>']
+    for start, end, colour in bands:
+        x0 = left + plot_w * min(start / x_max, 1.0)
+        x1 = left + plot_w * min(end / x_max, 1.0)
+        parts.append(f'<rect x="{x0:.1f}" y="{top}" width="{max(x1 - x0, 1.0):.1f}" height="{plot_h}" '
+                     f'fill="{colour}" fill-opacity="0.12"/>')
+    for i in range(5):
+        v = y_max * i / 4
+        y = top + plot_h * (1 - i / 4)
+        parts.append(f'<line x1="{left}" x2="{left + plot_w}" y1="{y:.1f}" y2="{y:.1f}" stroke="#e2e8f0"/>'
+                     f'<text x="{left - 6}" y="{y + 3:.1f}" text-anchor="end">{_fmt_num(v)}</text>')
+    for label, colour, values, step in series:
+        if not len(values):
+            continue
+        xs = left + plot_w * (np.arange(len(values)) + 0.5) * step / x_max
+        ys = top + plot_h * (1 - np.nan_to_num(np.asarray(values, dtype=np.float64)) / y_max)
+        points = " ".join(f"{x:.1f},{y:.1f}" for x, y in zip(xs.tolist(), ys.tolist()))
+        parts.append(f'<polyline fill="none" stroke="{colour}" stroke-width="1.5" points="{points}">'
+                     f'<title>{html.escape(label)}</title></polyline>')
+    parts.append(_time_axis(left, top + plot_h, plot_w, x_max, x_fmt))
+    parts.append(f'<text x="4" y="{top + 10}" class="axis-label">{html.escape(y_label)}</text></svg>')
+    return "".join(parts)
+
+
+def _fmt_duration(seconds: float) -> str:
+    seconds = int(round(seconds))
+    if seconds >= 3600:
+        return f"{seconds // 3600}h{(seconds % 3600) // 60:02d}m"
+    if seconds >= 60:
+        return f"{seconds // 60}m{seconds % 60:02d}s"
+    return f"{seconds}s"
+
+
+def _fmt_num(v: float) -> str:
+    if v != v:  # NaN
+        return "–"
+    if abs(v) >= 1000:
+        return f"{v / 1000:.1f}k"
+    if abs(v) >= 100:
+        return f"{v:.0f}"
+    return f"{v:.1f}" if abs(v) >= 10 else f"{v:.2f}"
+
+
+def _fmt_ms(v: float) -> str:
+    if v != v:
+        return "–"
+    return f"{v / 1000:.2f}s" if v >= 1000 else f"{v:.1f}ms"
+
+
+def _status_label(code: int) -> str:
+    return "no response" if code == 0 else str(code)
+
+
+def _dataset_label(snapshot: Optional[Dict]) -> str:
+    if not snapshot:
+        return "–"
+    return f'{html.escape(snapshot["name"])} <span class="muted">{html.escape(snapshot["fingerprint"][:8])}</span>'
+
+
+# --- Page sections ---
+
+def render_overview(summaries: List[RunSummary]) -> str:
+    rows = []
+    for i, s in enumerate(summaries):
+        total = int(s.count.sum())
+        errors = int(s.errors.sum())
+        colour = RUN_COLORS[i % len(RUN_COLORS)]
+        rows.append(
+            f'<tr><td><span class="swatch" style="background:{colour}"></span>{html.escape(s.name)}</td>'
+            f'<td>{html.escape(str(s.bundle.meta.get("started_at", "")))}</td>'
+            f"<td>{_fmt_duration(s.duration)}</td><td>{total:,}</td>"
+            f"<td>{total / s.duration:.1f}</td><td>{100.0 * errors / max(total, 1):.2f}%</td>"
+            f"<td>{_fmt_ms(s.total_pctl[0])}</td><td>{_fmt_ms(s.total_pctl[1])}</td>"
+            f"<td>{_fmt_ms(s.total_pctl[2])}</td><td>{_dataset_label(s.bundle.meta.get('snapshot'))}</td></tr>")
+    datasets = {(s.bundle.meta.get("snapshot") or {}).get("fingerprint") for s in summaries}
+    note = ""
+    if len(datasets) > 1 and datasets != {None}: # some runs restored a snapshot, not all the same one
+        note = ('<p class="worse">⚠️ These runs did not all start from the same dataset snapshot '
+                "(perf_runner.py run --snapshot), so differences may come from the data as well as the code.</p>")
+    return ("<h2>Runs</h2><table><tr><th>Run</th><th>Started</th><th>Duration</th><th>Requests</th>"
+            "<th>req/s</th><th>Errors</th><th>p50</th><th>p95</th><th>p99</th><th>Dataset</th></tr>"
+            + "".join(rows) + "</table>" + note)
+
+
+def _saturation_bands(summaries: List[RunSummary]) -> List[Tuple[float, float, str]]:
+    bands = []
+    for i, s in enumerate(summaries):
+        colour = RUN_COLORS[i % len(RUN_COLORS)]
+        for start, end in (s.bundle.meta.get("client_saturation") or {}).get("intervals", []):
+            bands.append((start, end, colour))
+    return bands
+
+
+def render_throughput(summaries: List[RunSummary]) -> str:
+    series, errors = [], []
+    for i, s in enumerate(summaries):
+        colour = RUN_COLORS[i % len(RUN_COLORS)]
+        series.append((s.name, colour, s.throughput, s.bin_width))
+        errors.append((s.name, colour, s.error_rate, s.bin_width))
+    bands = _saturation_bands(summaries)
+    note = ('<p class="muted">Shaded spans: the load generator itself was saturated, '
+            "so latency there includes client-side queueing.</p>" if bands else "")
+    return ("<h2>Throughput</h2>" + note + line_chart_svg(series, "req/s", bands=bands)
+            + "<h3>Errors</h3>" + line_chart_svg(errors, "errors/s", bands=bands))
+
+
+def render_client_health(summaries: List[RunSummary]) -> str:
+    monitored = [(i, s) for i, s in enumerate(summaries) if "client" in s.bundle.series]
+    if not monitored:
+        return ""
+    out = ["<h2>Load generator health</h2>"]
+    rows = []
+    for i, s in monitored:
+        sat = s.bundle.meta.get("client_saturation") or {}
+        verdict = ('<span class="worse">saturated {:.0f}s</span>'.format(sat.get("saturated_seconds", 0))
+                   if sat.get("saturated_seconds") else '<span class="better">ok</span>')
+        rows.append(f"<tr><td>{html.escape(s.name)}</td><td>{sat.get('peak_cpu_pct', 0):.0f}%</td>"
+                    f"<td>{sat.get('peak_lag_ms', 0):.0f}ms</td><td>{sat.get('peak_rss_mb', 0):.0f} MB</td>"
+                    f"<td>{verdict}</td><td style=\"text-align:left\">{html.escape(sat.get('suggestion') or '')}</td></tr>")
+    out.append("<table><tr><th>Run</th><th>Peak CPU</th><th>Peak lag</th><th>Peak RSS</th>"
+               "<th>Verdict</th><th>Advice</th></tr>" + "".join(rows) + "</table>")
+    cpu, lag = [], []
+    for i, s in monitored:
+        client = s.bundle.series["client"]
+        colour = RUN_COLORS[i % len(RUN_COLORS)]
+        step = float(np.median(np.diff(client["t"]))) if client["t"].size > 1 else 1.0
+        cpu.append((s.name, colour, client["cpu_pct"], step))
+        lag.append((s.name, colour, client["lag_ms_max"], step))
+    bands = _saturation_bands(summaries)
+    out.append("<h3>Client CPU (100% = one core)</h3>" + line_chart_svg(cpu, "cpu %", height=150, bands=bands))
+    out.append("<h3>Client scheduling lag</h3>" + line_chart_svg(lag, "lag ms", height=150, bands=bands))
+    return "".join(out)
+
+
+SERVER_CHARTS = [
+    ("cpu_pct", "cpu %", "CPU (100% = one core)"),
+    ("rss_mb", "MB", "Resident memory"),
+    ("threads", "threads", "Threads"),
+    ("invol_cs", "switches/s", "Involuntary context switches (CPU contention)"),
+    ("vol_cs", "switches/s", "Voluntary context switches (blocking waits)"),
+]
+
+
+def _resample(series: Dict[str, np.ndarray], key: str, centres: np.ndarray,
+              exited: bool = False) -> np.ndarray:
+    """Step a sampled resource column onto the report's time bins so charts line up with latency"""
+    t, values = series["t"], series[key].astype(np.float64)
+    if not t.size:
+        return np.full(centres.shape, np.nan)
+    return np.interp(centres, t, values, right=np.nan if exited else values[-1])
+
+
+def _correlation(a: np.ndarray, b: np.ndarray) -> float:
+    ok = ~(np.isnan(a) | np.isnan(b))
+    if ok.sum() < 3 or np.std(a[ok]) == 0 or np.std(b[ok]) == 0:
+        return float("nan")
+    return float(np.corrcoef(a[ok], b[ok])[0, 1])
+
+
+def _fmt_corr(r: float) -> str:
+    return "–" if np.isnan(r) else f"{r:+.2f}"
+
+
+def render_server_resources(summaries: List[RunSummary]) -> str:
+    out = []
+    for i, s in enumerate(summaries):
+        servers = s.bundle.meta.get("servers") or []
+        if not servers:
+            continue
+        colour = RUN_COLORS[i % len(RUN_COLORS)]
+        centres = (np.arange(s.n_time_bins) + 0.5) * s.bin_width
+        p99 = s.p99_over_time
+        out.append(f"<h3>{html.escape(s.name)}</h3>")
+        rows = []
+        resampled = {}
+        for server in servers:
+            series = s.bundle.series.get(server["series"])
+            if series is None:
+                continue
+            label = f"{server['name']} ({server['pid']})"
+            resampled[label] = {key: _resample(series, key, centres, bool(server.get("exited_at_s")))
+                                for key in series if key != "t"}
+            r = resampled[label]
+            exited = f"exited at {_fmt_duration(server['exited_at_s'])}" if server.get("exited_at_s") else ""
+            rows.append(f'<tr><td class="ep">{html.escape(label)}</td><td>{server["peak_cpu_pct"]:.0f}%</td>'
+                        f'<td>{server["peak_rss_mb"]:.0f} MB</td><td>{server["peak_threads"]}</td>'
+                        f'<td>{_fmt_corr(_correlation(p99, r["cpu_pct"]))}</td>'
+                        f'<td>{_fmt_corr(_correlation(p99, r["rss_mb"]))}</td>'
+                        f'<td>{_fmt_corr(_correlation(p99, r["invol_cs"]))}</td><td>{exited}</td></tr>')
+        out.append("<table><tr><th>Process</th><th>Peak CPU</th><th>Peak RSS</th><th>Peak threads</th>"
+                   "<th>r(p99, cpu)</th><th>r(p99, rss)</th><th>r(p99, invol cs)</th><th></th></tr>"
+                   + "".join(rows) + "</table>")
+        out.append("<div class=\"muted\">p99 latency, all endpoints</div>"
+                   + line_chart_svg([(s.name, colour, p99, s.bin_width)], "p99 ms", height=150,
+                                    x_max=s.duration))
+        palette = RUN_COLORS[1:] + RUN_COLORS[:1]
+        for key, unit, heading in SERVER_CHARTS:
+            lines = [(label, palette[j % len(palette)], r[key], s.bin_width)
+                     for j, (label, r) in enumerate(resampled.items())]
+            out.append(f"<div class=\"muted\">{heading}</div>"
+                       + line_chart_svg(lines, unit, height=130, x_max=s.duration))
+        io = [(f"{label} {direction}", palette[j % len(palette)], r[f"{direction}_mb_s"], s.bin_width)
+              for j, (label, r) in enumerate(resampled.items()) for direction in ("read", "write")
+              if not np.all(np.isnan(r[f"{direction}_mb_s"]))]
+        if io:
+            out.append("<div class=\"muted\">Storage I/O</div>" + line_chart_svg(io, "MB/s", height=130,
+                                                                                  x_max=s.duration))
+    if not out:
+        return ""
+    return ("<h2>Server resources</h2><p class=\"muted\">Sampled from /proc on the same clock as the requests; "
+            "r(...) is the correlation between per-bucket p99 latency and that resource.</p>" + "".join(out))
+
+
+def render_comparison(summaries: List[RunSummary], heading: str = "Endpoint comparison") -> str:
+    endpoints = sorted({name for s in summaries for name in s.endpoints})
+    head = "".join(f'<th colspan="5" class="run-head">{html.escape(s.name)}</th>' for s in summaries)
+    sub = "".join("<th>n</th><th>req/s</th><th>p50</th><th>p95</th><th>p99</th>" for _ in summaries)
+    base = summaries[0]
+    base_index = {name: i for i, name in enumerate(base.endpoints)}
+    rows = []
+    for name in endpoints:
+        cells = []
+        for k, s in enumerate(summaries):
+            try:
+                i = s.endpoints.index(name)
+            except ValueError:
+                cells.append('<td colspan="5" class="muted">not exercised</td>')
+                continue
+            p50, p95, p99 = s.pctl[i]
+            delta = ""
+            j = base_index.get(name)
+            if k > 0 and j is not None and not np.isnan(base.pctl[j][1]) and not np.isnan(p95):
+                change = (p95 - base.pctl[j][1]) / base.pctl[j][1] * 100
+                cls = "worse" if change > 10 else ("better" if change < -10 else "same")
+                delta = f' <span class="{cls}">{change:+.0f}%</span>'
+            cells.append(f"<td>{int(s.count[i]):,}</td><td>{s.rps()[i]:.2f}</td>"
+                         f"<td>{_fmt_ms(p50)}</td><td>{_fmt_ms(p95)}{delta}</td><td>{_fmt_ms(p99)}</td>")
+        rows.append(f"<tr><td class=\"ep\">{html.escape(name)}</td>{''.join(cells)}</tr>")
+    note = "<p class=\"muted\">p95 deltas are relative to the first run.</p>" if len(summaries) > 1 else ""
+    return (f"<h2>{heading}</h2>{note}"
+            f"<table><tr><th rowspan=\"2\">Endpoint</th>{head}</tr><tr>{sub}</tr>"
+            + "".join(rows) + "</table>")
+
+
+def render_error_classes(s: RunSummary) -> str:
+    """Endpoint x error-class table, onset per class and errors/s by family over time"""
+    slots = sorted({slot for per_ep in s.error_classes.values() for slot in per_ep})
+    head = "".join(f"<th>{error_label(slot)}</th>" for slot in slots)
+    rows = []
+    for ep_index in sorted(s.error_classes, key=lambda e: -sum(s.error_classes[e].values())):
+        per_ep = s.error_classes[ep_index]
+        cells = "".join(f"<td>{per_ep.get(slot, 0) or ''}</td>" for slot in slots)
+        share = 100.0 * sum(per_ep.values()) / max(int(s.count[ep_index]), 1)
+        rows.append(f'<tr><td class="ep">{html.escape(s.endpoints[ep_index])}</td>{cells}'
+                    f"<td>{share:.1f}%</td></tr>")
+    onset = "".join(
+        f"<tr><td>{error_label(slot)}</td><td>{_fmt_duration(first)}</td><td>{peak:,}</td><td>{total:,}</td></tr>"
+        for slot, (first, peak, total) in sorted(s.error_onset.items(), key=lambda kv: kv[1][0]))
+    families = [(name, colour, s.error_families[i], s.bin_width)
+                for i, (name, colour) in enumerate(ERROR_FAMILIES) if s.error_families[i].any()]
+    return (f"<h3>{html.escape(s.name)}</h3><table><tr><th>Endpoint</th>{head}<th>of calls</th></tr>"
+            + "".join(rows) + "</table>"
+            + "<div class=\"grid\"><table><tr><th>Class</th><th>First seen</th><th>Peak /s</th><th>Total</th></tr>"
+            + onset + "</table><div>"
+            + line_chart_svg(families, "errors/s", width=640, height=160, x_max=s.duration) + "</div></div>")
+
+
+def render_errors(summaries: List[RunSummary]) -> str:
+    out = ["<h2>Error breakdown</h2>"]
+    for s in summaries:
+        if s.error_classes:
+            out.append(render_error_classes(s))
+            continue
+        if not s.error_breakdown:
+            out.append(f"<h3>{html.escape(s.name)}</h3><p class=\"muted\">No failed requests.</p>")
+            continue
+        codes = sorted({code for per_ep in s.error_breakdown.values() for code in per_ep})
+        head = "".join(f"<th>{_status_label(c)}</th>" for c in codes)
+        rows = []
+        for ep_index in sorted(s.error_breakdown, key=lambda e: -sum(s.error_breakdown[e].values())):
+            per_ep = s.error_breakdown[ep_index]
+            cells = "".join(f"<td>{per_ep.get(c, 0) or ''}</td>" for c in codes)
+            share = 100.0 * sum(per_ep.values()) / max(int(s.count[ep_index]), 1)
+            rows.append(f'<tr><td class="ep">{html.escape(s.endpoints[ep_index])}</td>{cells}'
+                        f"<td>{share:.1f}%</td></tr>")
+        out.append(f"<h3>{html.escape(s.name)}</h3><table><tr><th>Endpoint</th>{head}<th>of calls</th></tr>"
+                   + "".join(rows) + "</table>")
+    return "".join(out)
+
+
+def render_validation(summaries: List[RunSummary]) -> str:
+    """Achieved contract-check sampling rate and mismatches per endpoint"""
+    checked = [s for s in summaries if s.bundle.meta.get("validation")]
+    if not checked:
+        return ""
+    out = ["<h2>Contract validation</h2>"]
+    for s in checked:
+        v = s.bundle.meta["validation"]
+        rows = []
+        for key, e in v["endpoints"].items():
+            cls = ' class="worse"' if e["mismatches"] else ""
+            rows.append(f'<tr><td class="ep">{html.escape(key)}</td><td>{e["responses"]:,}</td>'
+                        f'<td>{e["validated"]:,}</td><td>{100 * e["rate"]:.1f}%</td>'
+                        f'<td{cls}>{e["mismatches"]:,}</td></tr>')
+        out.append(f"<h3>{html.escape(s.name)}</h3><p class=\"muted\">Policy <code>{html.escape(v['policy'])}</code>: "
+                   f"{v['validated']:,} of {v['responses']:,} responses checked ({100 * v['rate']:.1f}%), "
+                   f"{v['mismatches']:,} mismatches.</p><table><tr><th>Endpoint</th><th>responses</th>"
+                   f"<th>checked</th><th>rate</th><th>mismatches</th></tr>{''.join(rows)}</table>")
+    return "".join(out)
+
+
+def render_payload(summaries: List[RunSummary]) -> str:
+    """Response body sizes per endpoint from every bundle; element counts and over-fetch when profiled"""
+    out = ["<h2>Response payloads</h2>"]
+    for s in summaries:
+        # one sort by endpoint, then each endpoint's sizes are a contiguous slice
+        order = np.argsort(s.bundle.samples["endpoint"], kind="stable")
+        endpoint, nbytes = s.bundle.samples["endpoint"][order], s.bundle.samples["nbytes"][order]
+        starts = np.flatnonzero(np.r_[True, endpoint[1:] != endpoint[:-1]]) if endpoint.size else np.zeros(0, np.int64)
+        by_endpoint = dict(zip(endpoint[starts].tolist(), np.split(nbytes, starts[1:])))
+        profiled = {op["operation"]: op for op in (s.bundle.meta.get("payload") or {}).get("operations", [])}
+        rows = []
+        for i, name in enumerate(s.endpoints):
+            sizes = by_endpoint.get(i)
+            if sizes is None:
+                continue
+            p50, p95 = np.percentile(sizes, [50, 95])
+            op = profiled.get(name)
+            extra = ""
+            if profiled:
+                if op is None:
+                    extra = '<td colspan="3" class="muted">-</td>'
+                else:
+                    flag = "; ".join(op["flags"])
+                    unread = f'{100 * op["unread_share"]:.0f}%' if op["tested"] else "untested"
+                    cls = ' class="worse"' if flag else ""
+                    extra = f'<td>{op["elements"]["mean"]:.1f}</td><td>{unread}</td><td{cls}>{html.escape(flag)}</td>'
+            rows.append(f'<tr><td class="ep">{html.escape(name)}</td><td>{_fmt_num(p50)}</td>'
+                        f'<td>{_fmt_num(p95)}</td><td>{_fmt_num(float(sizes.max()))}</td>'
+                        f'<td>{_fmt_num(float(sizes.sum()) / max(s.duration, 1e-9))}</td>{extra}</tr>')
+        head = "<th>elements</th><th>unread</th><th>flag</th>" if profiled else ""
+        out.append(f"<h3>{html.escape(s.name)}</h3><table><tr><th>Endpoint</th><th>p50 B</th><th>p95 B</th>"
+                   f"<th>max B</th><th>B/s</th>{head}</tr>{''.join(rows)}</table>")
+    return "".join(out)
+
+
+def crawl_profile(series: Dict[str, np.ndarray], page_size: int) -> np.ndarray:
+    """Median page latency per page index (offset // page_size) across crawl passes"""
+    page = (series["offset"] // max(page_size, 1)).astype(np.int64)
+    order = np.lexsort((series["latency_ms"], page))
+    page, latency = page[order], series["latency_ms"][order].astype(np.float64)
+    starts = np.flatnonzero(np.r_[True, page[1:] != page[:-1]])
+    counts = np.diff(np.r_[starts, page.size])
+    lower = latency[starts + (counts - 1) // 2]
+    upper = latency[starts + counts // 2]
+    profile = np.full(int(page.max()) + 1, np.nan)
+    profile[page[starts]] = (lower + upper) / 2
+    return profile
+
+
+def render_pagination(summaries: List[RunSummary]) -> str:
+    """Page latency against offset for crawl bundles, one chart per target"""
+    crawled = [(i, s) for i, s in enumerate(summaries) if s.bundle.meta.get("crawl")]
+    if not crawled:
+        return ""
+    out = ["<h2>Pagination depth</h2>"]
+    targets = sorted({t for _, s in crawled for t in s.bundle.meta["crawl"]})
+    for target in targets:
+        lines, rows = [], []
+        for i, s in crawled:
+            stats = s.bundle.meta["crawl"].get(target)
+            series = s.bundle.series.get(f"crawl_{target}")
+            if stats is None or series is None:
+                continue
+            colour = RUN_COLORS[i % len(RUN_COLORS)]
+            page_size = s.bundle.meta.get("page_size", 50)
+            lines.append((s.name, colour, crawl_profile(series, page_size), float(page_size)))
+            rows.append(f'<tr><td><span class="swatch" style="background:{colour}"></span>{html.escape(s.name)}</td>'
+                        f'<td>{stats["pages"]:,}</td><td>{stats["rows"]:,}</td>'
+                        f'<td>{_fmt_ms(stats["first_decile_ms"])}</td><td>{_fmt_ms(stats["last_decile_ms"])}</td>'
+                        f'<td>{stats["slope_ms_per_10k"]:.2f}</td><td>{stats["r"]:.2f}</td></tr>')
+        out.append(f"<h3>{html.escape(target)}</h3>"
+                   + line_chart_svg(lines, "page ms", height=220, x_fmt=_fmt_num)
+                   + "<table><tr><th>Run</th><th>pages</th><th>rows</th><th>first 10% p50</th>"
+                     "<th>last 10% p50</th><th>ms per 10k offset</th><th>r</th></tr>" + "".join(rows) + "</table>")
+    return "".join(out)
+
+
+def render_heatmaps(summaries: List[RunSummary]) -> str:
+    out = ["<h2>Latency over time</h2><p class=\"muted\">Each column is one time bucket; "
+           "darker cells hold more requests at that latency.</p>"]
+    endpoints = sorted({name for s in summaries for name in s.endpoints})
+    for name in endpoints:
+        out.append(f'<h3 class="ep">{html.escape(name)}</h3><div class="grid">')
+        for s in summaries:
+            if name not in s.endpoints:
+                continue
+            i = s.endpoints.index(name)
+            out.append(f"<div><div class=\"muted\">{html.escape(s.name)} · {int(s.count[i]):,} requests · "
+                       f"p99 {_fmt_ms(s.pctl[i][2])}</div>{heatmap_svg(s.heatmaps[i], s.bin_width)}</div>")
+        out.append("</div>")
+    return "".join(out)
+
+
+STYLE = """
+body{font:13px/1.4 -apple-system,Segoe UI,Helvetica,Arial,sans-serif;margin:24px;color:#0f172a}
+h1{font-size:20px}h2{font-size:16px;margin-top:32px;border-bottom:1px solid #e2e8f0}h3{font-size:13px}
+table{border-collapse:collapse;margin:8px 0}td,th{border:1px solid #e2e8f0;padding:3px 8px;text-align:right}
+th{background:#f1f5f9}td.ep,h3.ep{text-align:left;font-family:ui-monospace,Menlo,monospace}
+.muted{color:#64748b}.worse{color:#dc2626}.better{color:#16a34a}.same{color:#64748b}
+.swatch{display:inline-block;width:10px;height:10px;margin-right:6px}
+svg.chart text{font-size:10px;fill:#475569}.grid{display:flex;flex-wrap:wrap;gap:12px}
+"""
+
+
+def render_report(bundles: List[RunBundle], title: str = "Performance report") -> str:
+    summaries = [RunSummary(b) for b in bundles]
+    body = [render_overview(summaries), render_throughput(summaries), render_client_health(summaries),
+            render_server_resources(summaries),
+            render_comparison(summaries, "Endpoint comparison" if len(summaries) > 1 else "Endpoints")]
+    body.append(render_errors(summaries))
+    body.append(render_validation(summaries))
+    body.append(render_payload(summaries))
+    body.append(render_pagination(summaries))
+    body.append(render_heatmaps(summaries))
+    generated = time.strftime("%Y-%m-%d %H:%M:%S")
+    return (f"<!DOCTYPE html><html><head><meta charset=\"utf-8\"><title>{html.escape(title)}</title>"
+            f"<style>{STYLE}</style></head><body><h1>{html.escape(title)}</h1>"
+            f"<p class=\"muted\">Generated {generated} from {len(bundles)} run bundle(s).</p>"
+            + "".join(body) + "</body></html>")
+
+
+def write_report(bundle_paths: List[str], output: str, title: str = "Performance report") -> str:
+    bundles = [RunBundle.load(path) for path in bundle_paths]
+    with open(output, "w", encoding="utf-8") as f:
+        f.write(render_report(bundles, title))
+    return output
+
+
+def configure_parser(parser):
+    parser.add_argument("bundles", nargs="+", help="Run bundle directories (first one is the baseline)")
+    parser.add_argument("-o", "--output", default="perf_report.html", help="HTML file to write")
+    parser.add_argument("--title", default="Performance report", help="Report title")
+
+
+def run_command(args) -> int:
+    started = time.perf_counter()
+    path = write_report(args.bundles, args.output, args.title)
+    print(f"📄 Report written to {path} ({time.perf_counter() - started:.1f}s)")
+    return 0
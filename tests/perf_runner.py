@@ -0,0 +1,73 @@
+# perf_runner.py
+#!/usr/bin/env python3
+"""
+Entry point for the performance tooling that sits next to the functional harness.
+
+    python perf_runner.py run --scenario mixed --workers 8 --duration 600
+    python perf_runner.py report runs/baseline runs/candidate -o report.html
+    python perf_runner.py explain runs/candidate --log server.log
+    python perf_runner.py drive --workers 8 --iterations 5
+    python perf_runner.py fuzz --target hair-fall-logs --requests 50000
+    python perf_runner.py select --json changed.json
+    python perf_runner.py payload --iterations 60
+    python perf_runner.py crawl --rows 100000 --page-size 50
+    python perf_runner.py generate --users 10000 --out-dir dataset/
+    python perf_runner.py batch --rows 20000 --batch-size 50 --batch-size 500
+    python perf_runner.py seed --users 100000 --truncate --rebuild-indexes
+    python perf_runner.py snapshot save seeded-100k
+    python perf_runner.py pool create --size 10000
+    python perf_runner.py mint --users 1000000 --out tokens.jsonl
+    python perf_runner.py upload --blob-base http://localhost:9000 --concurrency 8 --concurrency 64
+    python perf_runner.py blobs --port 9000
+    python perf_runner.py corpus build --photos 600
+    python perf_runner.py auth --requests 20000 --baseline runs/auth-before
+
+Each command lives in its own module exposing `configure_parser(parser)` and
+`run_command(args)`; only the module for the chosen command is imported.
+"""
+
+import argparse
+import importlib
+import sys
+
+COMMANDS = {
+    "run": ("load_generator", "Run a timed multi-worker load scenario and save a run bundle"),
+    "report": ("perf_report", "Render one or more run bundles into a static HTML report"),
+    "explain": ("request_join", "Join the slowest requests of a run with backend log lines by X-Request-ID"),
+    "drive": ("spec_driver", "Exercise every api_spec.json operation with synthesised parameters and chained ids"),
+    "fuzz": ("schema_fuzzer", "Send batches of schema-derived valid and invalid bodies; report 5xx and latency outliers"),
+    "select": ("impact_selector", "List the tests and benchmarks affected by spec/migration changes since the last run"),
+    "payload": ("payload_profile", "Profile response sizes and element counts per endpoint and flag over-fetching"),
+    "crawl": ("pagination_crawl", "Seed one user with deep collections and time every limit/offset page"),
+    "generate": ("dataset_generator", "Stream a synthetic dataset (users, logs, interventions, applications, photos) in chunks"),
+    "batch": ("batch_insert_bench", "Compare rows/sec of single-row hair fall log POSTs with the /batch endpoint"),
+    "seed": ("copy_seeder", "COPY the synthetic dataset straight into PostgreSQL, checked against the Flyway schema"),
+    "snapshot": ("dataset_snapshot", "Save, restore and verify fingerprinted snapshots of a seeded benchmark database"),
+    "pool": ("user_pool", "Maintain a file of pre-registered users with cached tokens that load runs lease"),
+    "mint": ("jwt_mint", "Mint access tokens for seeded users offline (non-production targets only)"),
+    "upload": ("upload_pipeline_bench", "Time upload-url, blob PUT and finalize per photo; report photos/s and MB/s"),
+    "blobs": ("blob_server", "Serve a local blob store for the photo upload/view URLs (PUT, GET with ranges, counters)"),
+    "corpus": ("photo_corpus", "Build or describe a memory-mapped corpus of encrypted photo blobs for upload load"),
+    "auth": ("auth_overhead_bench", "Measure the per-request cost of bearer-token authentication against anonymous calls"),
+}
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    parser = argparse.ArgumentParser(description="Hair Health backend performance tooling")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    chosen = next((arg for arg in argv if arg in COMMANDS), None)
+    for name, (module_name, help_text) in COMMANDS.items():
+        subparser = subparsers.add_parser(name, help=help_text)
+        if name == chosen:
+            module = importlib.import_module(module_name)
+            module.configure_parser(subparser)
+            subparser.set_defaults(handler=module.run_command)
+
+    args = parser.parse_args(argv)
+    sys.exit(args.handler(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+# photo_corpus.py
+"""
+A pre-generated corpus of encrypted progress-photo blobs, memory-mapped by upload workers.
+
+Drawing fresh random bytes for every upload costs the load generator more CPU and
+memory than sending them. The corpus is built once into a single file, and workers
+send slices of it: sendfile(2) straight from the page cache on plain sockets, slices
+of a read-only mmap on TLS ones. Either way no blob is ever copied into the Python
+heap, so memory stays flat however many gigabits of photos are pushed.
+
+Each blob is what a client stores after ClientEncryptionService.encryptPhotoForStorage:
+the 12-byte GCM IV followed by encryptedData (the ciphertext with its 16-byte tag
+appended, as Cipher.doFinal returns it). AES-GCM output cannot be told from random
+bytes, so the blobs are random; the keyInfo they would be decrypted with is shared
+by the corpus and sent as encryptionKeyInfo. Plaintext sizes are log-normal around a
+median per PhotoAngle (ANGLE_MEDIAN_KB), and angles take turns like a photo session.
+
+File layout: MAGIC, a little-endian u32 header length, the JSON header (keyInfo and
+[angle, offset, length] per blob), then the blobs, each starting on a page boundary.
+
+Usage:
+    python perf_runner.py corpus build --photos 600
+    python perf_runner.py corpus info
+    python perf_runner.py upload --corpus .photo_corpus/corpus.bin --blob-base http://localhost:9000
+"""
+
+import contextlib
+import json
+import mmap
+import os
+import ssl
+import struct
+import sys
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Dict, List
+
+import numpy as np
+
+from impact_selector import HERE
+
+DEFAULT_PATH = os.path.join(HERE, ".photo_corpus", "corpus.bin")
+MAGIC = b"HHPHOTO1"
+FORMAT = 1
+PAGE = 4096
+IV_BYTES = 12 # Cipher.getInstance("AES/GCM/NoPadding").iv
+TAG_BYTES = 16 # appended to encryptedData by doFinal
+WRITE_CHUNK = 4 << 20
+
+# Median JPEG size per PhotoAngle from a phone camera; wide shots of the whole head run larger
+ANGLE_MEDIAN_KB = {"VERTEX": 2300, "HAIRLINE": 2600, "TEMPLES": 1900, "LEFT_SIDE": 2100, "RIGHT_SIDE": 2100,
+                   "BACK": 2400}
+SIZE_SIGMA = 0.3
+
+
+def _align(n: int) -> int:
+    return (n + PAGE - 1) // PAGE * PAGE
+
+
+@dataclass
+class CorpusBlob:
+    angle: str
+    offset: int
+    length: int
+
+    @property
+    def original_size(self) -> int:
+        return self.length - IV_BYTES - TAG_BYTES
+
+
+def _header(key_info: Dict, seed: int, angles: List[str], lengths: List[int]) -> bytes:
+    """JSON header; blob offsets depend on its own length, so grow it until they agree"""
+    start = PAGE
+    while True:
+        offsets, offset = [], start
+        for length in lengths:
+            offsets.append(offset)
+            offset = _align(offset + length)
+        header = json.dumps({"format": FORMAT, "seed": seed, "keyInfo": key_info,
+                             "blobs": [[a, o, n] for a, o, n in zip(angles, offsets, lengths)]},
+                            separators=(",", ":")).encode()
+        needed = _align(len(MAGIC) + 4 + len(header))
+        if needed <= start:
+            return header
+        start = needed
+
+
+def build_corpus(path: str, photos: int, seed: int = 1, scale: float = 1.0) -> Dict:
+    """Write a corpus of `photos` blobs to `path`; returns its header"""
+    rng = np.random.default_rng(seed)
+    angles = [list(ANGLE_MEDIAN_KB)[i % len(ANGLE_MEDIAN_KB)] for i in range(photos)]
+    medians = np.array([ANGLE_MEDIAN_KB[a] * 1024 * scale for a in angles])
+    originals = np.maximum(medians * rng.lognormal(0.0, SIZE_SIGMA, photos), 1024).astype(np.int64)
+    lengths = (originals + IV_BYTES + TAG_BYTES).tolist()
+    key_info = {"keyId": str(uuid.UUID(bytes=rng.bytes(16), version=4)), "algorithm": "AES-256-GCM",
+                "keyVersion": "v1"}
+    header = _header(key_info, seed, angles, lengths)
+    blobs = json.loads(header)["blobs"]
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(MAGIC + struct.pack("<I", len(header)) + header)
+        for _, offset, length in blobs:
+            f.seek(offset)
+            for start in range(0, length, WRITE_CHUNK):
+                f.write(rng.bytes(min(WRITE_CHUNK, length - start)))
+        f.truncate(_align(f.tell()))
+    os.replace(tmp, path)
+    return json.loads(header)
+
+
+class PhotoCorpus:
+    """Read-only view of a corpus file, shared by every upload thread"""
+
+    def __init__(self, path: str = DEFAULT_PATH):
+        self.path = path
+        self._file = open(path, "rb")
+        if self._file.read(len(MAGIC)) != MAGIC:
+            self._file.close()
+            raise ValueError(f"{path} is not a photo corpus (perf_runner.py corpus build)")
+        (length,) = struct.unpack("<I", self._file.read(4))
+        self.header = json.loads(self._file.read(length))
+        self.blobs = [CorpusBlob(*b) for b in self.header["blobs"]]
+        self.key_info = json.dumps(self.header["keyInfo"], separators=(",", ":"))
+        self.map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.local = threading.local()
+        self._thread_files: List = [] # every thread's sendfile handle, closed by close()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.blobs)
+
+    def blob(self, index: int) -> CorpusBlob:
+        return self.blobs[index % len(self.blobs)]
+
+    def view(self, index: int) -> memoryview:
+        """The blob's bytes, as a slice of the mapping (no copy)"""
+        blob = self.blob(index)
+        return memoryview(self.map)[blob.offset:blob.offset + blob.length]
+
+    def send(self, sock, index: int) -> int:
+        """Write blob `index` to a connected socket: sendfile(2) when possible, mmap slices through TLS"""
+        blob = self.blob(index)
+        if isinstance(sock, ssl.SSLSocket):
+            with self.view(index) as view:
+                sock.sendall(view)
+            return blob.length
+        f = getattr(self.local, "file", None)
+        if f is None or f.closed:
+            # socket.sendfile moves the file position on return; keep that per thread
+            f = self.local.file = open(self.path, "rb")
+            with self._lock:
+                self._thread_files.append(f)
+        return sock.sendfile(f, blob.offset, blob.length)
+
+    def total_bytes(self) -> int:
+        return sum(b.length for b in self.blobs)
+
+    def close_thread_files(self):
+        """Close the sending threads' handles, e.g. once a thread pool has finished (reopened on demand)"""
+        with self._lock:
+            for f in self._thread_files:
+                f.close()
+            self._thread_files.clear()
+
+    def close(self):
+        self.close_thread_files()
+        self.map.close()
+        self._file.close()
+
+
+def configure_parser(parser):
+    parser.add_argument("action", choices=("build", "info"), help="build a corpus file, or describe one")
+    parser.add_argument("--path", default=DEFAULT_PATH, help="Corpus file")
+    parser.add_argument("--photos", type=int, default=600, help="build: blobs in the corpus (100 per angle)")
+    parser.add_argument("--seed", type=int, default=1, help="build: same seed, same corpus")
+    parser.add_argument("--scale", type=float, default=1.0, help="build: multiply every angle's median size")
+
+
+def run_command(args) -> int:
+    if args.action == "build":
+        started = time.perf_counter()
+        build_corpus(args.path, args.photos, args.seed, args.scale)
+        print(f"🖼️  Built {args.path} in {time.perf_counter() - started:.1f}s")
+    try:
+        corpus = PhotoCorpus(args.path)
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
+    with contextlib.closing(corpus):
+        print(f"📦 {len(corpus):,} blobs, {corpus.total_bytes() / 1e6:,.1f} MB, key {corpus.header['keyInfo']['keyId']}")
+        for angle in ANGLE_MEDIAN_KB:
+            sizes = np.array([b.length for b in corpus.blobs if b.angle == angle])
+            if sizes.size:
+                print(f"   {angle:<11} {sizes.size:>6,} blobs  median {np.median(sizes) / 1024:>7,.0f} KiB  "
+                      f"p95 {np.percentile(sizes, 95) / 1024:>7,.0f} KiB")
+    return 0
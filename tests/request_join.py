@@ -0,0 +1,166 @@
+# request_join.py
+"""
+Explain the slowest requests of a load run from the backend's own log lines.
+
+Every harness request carries an X-Request-ID (`<run_id>-<worker>-<seq>`);
+the backend puts it into each log line via the MDC (RequestIdFilter, pattern
+`%5p [%X{requestId:-}]`) and logs `Completed <method> <uri> -> <status> in <ms>ms`
+at DEBUG when the request finishes. This command picks the slowest fraction of
+a bundle's samples, rebuilds their ids, pulls the matching lines out of the
+server log(s) and splits each request's latency into server time and time
+spent outside the server (network, client queueing).
+
+Usage:
+    python perf_runner.py explain runs/soak --log server.log
+    python perf_runner.py explain runs/soak --log server.log --fraction 0.01 --json slow.json
+"""
+
+import json
+import re
+import sys
+from typing import Dict, List
+
+import numpy as np
+
+from perf_metrics import RunBundle, request_id
+
+COMPLETED = re.compile(r"Completed (\S+) (\S+) -> (\d+) in ([\d.]+)ms")
+BRACKETED = re.compile(r"\[([A-Za-z0-9_.-]+)\]")
+
+SERVER_BOUND_SHARE = 0.8  # server time >= 80% of client latency: the backend is the explanation
+
+
+def slowest_samples(bundle: RunBundle, fraction: float, minimum: int = 10) -> np.ndarray:
+    """Indices of the slowest `fraction` of samples (at least `minimum`), slowest first"""
+    latency = bundle.samples["latency_ms"]
+    k = min(latency.size, max(minimum, int(np.ceil(latency.size * fraction))))
+    if k == 0:
+        return np.zeros(0, dtype=np.int64)
+    top = np.argpartition(latency, latency.size - k)[latency.size - k:]
+    return top[np.argsort(latency[top])[::-1]]
+
+
+def scan_logs(paths: List[str], wanted: Dict[str, int], run_id: str) -> Dict[str, List[str]]:
+    """Collect log lines tagged with any wanted request id, in file order"""
+    found: Dict[str, List[str]] = {}
+    for path in paths:
+        with open(path, encoding="utf-8", errors="replace") as f:
+            for line in f:
+                # Nearly every line belongs to some other request; a substring test skips them cheaply.
+                if run_id not in line:
+                    continue
+                for token in BRACKETED.findall(line):
+                    if token in wanted:
+                        found.setdefault(token, []).append(line.rstrip("\n"))
+                        break
+    return found
+
+
+def _in_intervals(t: float, intervals: List[List[float]]) -> bool:
+    return any(start <= t <= end for start, end in intervals)
+
+
+def explain(bundle: RunBundle, log_paths: List[str], fraction: float, max_lines: int) -> Dict:
+    run_id = bundle.meta.get("run_id")
+    s = bundle.samples
+    if not run_id or "seq" not in s:
+        raise ValueError(f"Bundle '{bundle.name}' predates request ids; re-run it with the current harness")
+
+    picked = slowest_samples(bundle, fraction)
+    ids = {request_id(run_id, int(s["worker"][i]), int(s["seq"][i])): int(i) for i in picked}
+    lines = scan_logs(log_paths, ids, run_id)
+    saturated = (bundle.meta.get("client_saturation") or {}).get("intervals", [])
+
+    requests = []
+    for rid, i in ids.items():
+        client_ms = float(s["latency_ms"][i])
+        tagged = lines.get(rid, [])
+        server_ms = None
+        for line in tagged:
+            match = COMPLETED.search(line)
+            if match:
+                server_ms = float(match.group(4))
+        if server_ms is None:
+            verdict = "no server log" if not tagged else "server incomplete"
+        elif server_ms >= SERVER_BOUND_SHARE * client_ms:
+            verdict = "server"
+        elif _in_intervals(float(s["t"][i]), saturated):
+            verdict = "client saturated"
+        else:
+            verdict = "outside server"
+        requests.append({
+            "request_id": rid,
+            "endpoint": bundle.endpoints[int(s["endpoint"][i])],
+            "t_s": round(float(s["t"][i]), 3),
+            "status": int(s["status"][i]),
+            "client_ms": round(client_ms, 1),
+            "server_ms": server_ms,
+            "outside_ms": round(client_ms - server_ms, 1) if server_ms is not None else None,
+            "verdict": verdict,
+            "log_lines": len(tagged),
+            "lines": [line for line in tagged if not COMPLETED.search(line)][:max_lines],
+        })
+    requests.sort(key=lambda r: r["client_ms"], reverse=True)
+
+    verdicts: Dict[str, int] = {}
+    endpoints: Dict[str, int] = {}
+    for r in requests:
+        verdicts[r["verdict"]] = verdicts.get(r["verdict"], 0) + 1
+        endpoints[r["endpoint"]] = endpoints.get(r["endpoint"], 0) + 1
+    threshold = min((r["client_ms"] for r in requests), default=0.0)
+    return {
+        "bundle": bundle.name,
+        "run_id": run_id,
+        "fraction": fraction,
+        "threshold_ms": threshold,
+        "total_requests": int(s["latency_ms"].size),
+        "verdicts": verdicts,
+        "endpoints": dict(sorted(endpoints.items(), key=lambda kv: kv[1], reverse=True)),
+        "requests": requests,
+    }
+
+
+def print_explanation(result: Dict, show: int):
+    print(f"🐢 {len(result['requests'])} slowest of {result['total_requests']:,} requests "
+          f"in '{result['bundle']}' (>= {result['threshold_ms']:.1f}ms)")
+    print("\n📊 Where the time went:")
+    for verdict, n in sorted(result["verdicts"].items(), key=lambda kv: kv[1], reverse=True):
+        print(f"   {verdict:<18} {n:>6}")
+    print("\n🎯 Endpoints:")
+    for endpoint, n in list(result["endpoints"].items())[:10]:
+        print(f"   {n:>6}  {endpoint}")
+    print()
+    for r in result["requests"][:show]:
+        server = f"{r['server_ms']:.1f}ms" if r["server_ms"] is not None else "?"
+        print(f"🔎 {r['request_id']}  {r['endpoint']}  -> {r['status']}  client {r['client_ms']:.1f}ms, "
+              f"server {server}  [{r['verdict']}]")
+        for line in r["lines"]:
+            print(f"      {line}")
+
+
+def configure_parser(parser):
+    parser.add_argument("bundle", help="Run bundle directory")
+    parser.add_argument("--log", action="append", required=True, dest="logs",
+                        help="Backend log file (repeat for several files or instances)")
+    parser.add_argument("--fraction", type=float, default=0.001, help="Share of slowest requests to explain")
+    parser.add_argument("--lines", type=int, default=8, help="Log lines kept per request")
+    parser.add_argument("--show", type=int, default=20, help="Requests printed in detail")
+    parser.add_argument("--json", help="Also write the full join as JSON to this file")
+
+
+def run_command(args) -> int:
+    bundle = RunBundle.load(args.bundle)
+    try:
+        result = explain(bundle, args.logs, args.fraction, args.lines)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 1
+    print_explanation(result, args.show)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(result, f, indent=2)
+        print(f"\n💾 Full join written to {args.json}")
+    if result["requests"] and result["verdicts"].get("no server log") == len(result["requests"]):
+        print("⚠️  No log lines matched. Is the backend logging at DEBUG with the requestId pattern?",
+              file=sys.stderr)
+    return 0
@@ -0,0 +1,340 @@
+# resource_monitor.py
+"""
+Resource sampling that runs alongside a load run.
+
+ClientMonitor watches the load generator itself. When the Python client runs
+out of CPU (or the GIL is saturated), requests queue inside the client and
+every latency it reports is inflated, so each run records one sample per
+second of:
+
+    cpu_pct      process CPU over the interval, 100 = one full core
+    rss_mb       resident set size
+    lag_ms_max   worst scheduling delay of a 10 ms probe tick in the interval
+    lag_ms_mean  average probe delay; threads waiting on the GIL show up here
+    threads      live threads in the process
+
+Intervals where the generator itself was the bottleneck are flagged and
+saved with the run bundle (client.npz + meta["client_saturation"]).
+
+ServerSampler watches the backend processes under test (e.g. the Spring Boot
+JVM and the Node server) by pid, reading /proc/<pid>/stat, status and io at a
+fixed interval. Each pid becomes a `server-<pid>` series on the same time base
+as the request samples:
+
+    cpu_pct        user+system CPU over the interval, 100 = one full core
+    rss_mb         resident set size
+    threads        thread count
+    vol_cs         voluntary context switches per second (blocking, I/O waits)
+    invol_cs       involuntary context switches per second (CPU contention)
+    read_mb_s      storage bytes read per second   (NaN if /proc/<pid>/io is unreadable)
+    write_mb_s     storage bytes written per second
+"""
+
+import os
+import sys
+import threading
+import time
+from array import array
+from typing import Dict, List, Optional, Tuple
+
+SAMPLE_INTERVAL_S = 1.0
+PROBE_TICK_S = 0.010
+
+# A threaded CPython client cannot use much more than one core (GIL), so
+# ~90% of one core means the generator, not the server, is setting the pace.
+CPU_SATURATION_PCT = 90.0
+LAG_SATURATION_MS = 50.0
+SUSTAINED_SECONDS = 3  # consecutive saturated samples before we warn mid-run
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+_CLK_TCK = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+
+
+def current_rss_mb() -> float:
+    """Current RSS from /proc/self/statm, falling back to peak RSS from getrusage"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE / (1024 * 1024)
+    except (OSError, IndexError, ValueError):
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+class ClientMonitor:
+    """Samples the generator's own CPU, RSS and scheduling lag once per second"""
+
+    def __init__(self, t0: float, interval: float = SAMPLE_INTERVAL_S,
+                 cpu_threshold: float = CPU_SATURATION_PCT, lag_threshold_ms: float = LAG_SATURATION_MS):
+        self.t0 = t0
+        self.interval = interval
+        self.cpu_threshold = cpu_threshold
+        self.lag_threshold_ms = lag_threshold_ms
+        self.t = array("d")
+        self.cpu_pct = array("f")
+        self.rss_mb = array("f")
+        self.lag_ms_max = array("f")
+        self.lag_ms_mean = array("f")
+        self.threads = array("H")
+        self.saturated = array("B")
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._warned = False
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="client-monitor", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+
+    def _run(self):
+        last_wall, last_cpu = time.monotonic(), time.process_time()
+        streak = 0
+        while not self._stop.is_set():
+            # Probe with short sleeps: when workers hog the GIL or the CPU, this
+            # thread wakes late, and the overshoot is the delay a request sees.
+            lag_max, lag_sum, ticks = 0.0, 0.0, 0
+            window_end = last_wall + self.interval
+            while not self._stop.is_set():
+                expected = time.monotonic() + PROBE_TICK_S
+                time.sleep(PROBE_TICK_S)
+                now = time.monotonic()
+                lag = max(0.0, now - expected) * 1000.0
+                lag_max = max(lag_max, lag)
+                lag_sum += lag
+                ticks += 1
+                if now >= window_end:
+                    break
+
+            now, cpu = time.monotonic(), time.process_time()
+            cpu_pct = 100.0 * (cpu - last_cpu) / max(now - last_wall, 1e-9)
+            last_wall, last_cpu = now, cpu
+
+            saturated = cpu_pct >= self.cpu_threshold or lag_max >= self.lag_threshold_ms
+            self.t.append(now - self.t0)
+            self.cpu_pct.append(cpu_pct)
+            self.rss_mb.append(current_rss_mb())
+            self.lag_ms_max.append(lag_max)
+            self.lag_ms_mean.append(lag_sum / max(ticks, 1))
+            self.threads.append(threading.active_count())
+            self.saturated.append(1 if saturated else 0)
+
+            streak = streak + 1 if saturated else 0
+            if streak >= SUSTAINED_SECONDS and not self._warned:
+                self._warned = True
+                print(f"⚠️  Load generator saturated at t={now - self.t0:.0f}s "
+                      f"(cpu {cpu_pct:.0f}%, lag {lag_max:.0f}ms); latencies from here on include client queueing",
+                      file=sys.stderr)
+
+    def saturated_intervals(self) -> List[Tuple[float, float]]:
+        """Merge consecutive saturated samples into (start_s, end_s) intervals"""
+        intervals: List[Tuple[float, float]] = []
+        for i, flag in enumerate(self.saturated):
+            if not flag:
+                continue
+            start = self.t[i] - self.interval
+            if intervals and start <= intervals[-1][1] + 1e-6:
+                intervals[-1] = (intervals[-1][0], self.t[i])
+            else:
+                intervals.append((max(start, 0.0), self.t[i]))
+        return intervals
+
+    def summary(self, workers: int) -> Dict:
+        samples = len(self.t)
+        saturated = sum(self.saturated)
+        peak_cpu = max(self.cpu_pct) if samples else 0.0
+        summary = {
+            "samples": samples,
+            "saturated_seconds": saturated * self.interval,
+            "saturated_fraction": saturated / samples if samples else 0.0,
+            "peak_cpu_pct": peak_cpu,
+            "peak_rss_mb": max(self.rss_mb) if samples else 0.0,
+            "peak_lag_ms": max(self.lag_ms_max) if samples else 0.0,
+            "intervals": [[round(a, 1), round(b, 1)] for a, b in self.saturated_intervals()],
+            "cpu_threshold_pct": self.cpu_threshold,
+            "lag_threshold_ms": self.lag_threshold_ms,
+            "suggestion": None,
+        }
+        if saturated:
+            summary["suggestion"] = suggest_workers(workers, peak_cpu)
+        return summary
+
+    def to_arrays(self) -> Dict:
+        import numpy as np
+
+        return {
+            "t": np.frombuffer(self.t, dtype=np.float64).copy(),
+            "cpu_pct": np.frombuffer(self.cpu_pct, dtype=np.float32).copy(),
+            "rss_mb": np.frombuffer(self.rss_mb, dtype=np.float32).copy(),
+            "lag_ms_max": np.frombuffer(self.lag_ms_max, dtype=np.float32).copy(),
+            "lag_ms_mean": np.frombuffer(self.lag_ms_mean, dtype=np.float32).copy(),
+            "threads": np.frombuffer(self.threads, dtype=np.uint16).copy(),
+            "saturated": np.frombuffer(self.saturated, dtype=np.uint8).copy(),
+        }
+
+
+def suggest_workers(workers: int, peak_cpu_pct: float) -> str:
+    """Advice for a saturated generator: spread the same workers over more processes"""
+    # Aim each process at ~60% of a core so it keeps headroom for bursts.
+    processes = max(2, int(-(-peak_cpu_pct // 60.0)) + 1)
+    if workers < processes:
+        return ("The load generator was the bottleneck with only "
+                f"{workers} worker(s); the client is spinning (e.g. on fast failures) rather than waiting "
+                "on the server. Check the error breakdown before adding load.")
+    per_process = -(-workers // processes)
+    return (f"The load generator was the bottleneck. More threads in this process will not help (GIL); "
+            f"run {processes} perf_runner processes with --workers {per_process} each "
+            f"(~{workers} workers in total), or move some of them to another host.")
+
+
+def read_proc_counters(pid: int) -> Optional[Dict[str, float]]:
+    """Cumulative counters for one pid from /proc, or None once the process is gone"""
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            stat = f.read()
+        with open(f"/proc/{pid}/status") as f:
+            status = f.read()
+    except (FileNotFoundError, ProcessLookupError):
+        return None
+    # comm (field 2) may contain spaces and parens; the numeric fields follow the last ')'
+    fields = stat[stat.rindex(")") + 2:].split()
+    counters = {
+        "start_ticks": float(fields[19]),  # starttime: changes when the pid belongs to a new process
+        "cpu_s": (int(fields[11]) + int(fields[12])) / _CLK_TCK,  # utime + stime
+        "rss_mb": int(fields[21]) * _PAGE_SIZE / (1024 * 1024),
+        "threads": int(fields[17]),
+        "vol_cs": 0.0,
+        "invol_cs": 0.0,
+        "read_bytes": float("nan"),
+        "write_bytes": float("nan"),
+    }
+    for line in status.splitlines():
+        if line.startswith("voluntary_ctxt_switches:"):
+            counters["vol_cs"] = float(line.split()[1])
+        elif line.startswith("nonvoluntary_ctxt_switches:"):
+            counters["invol_cs"] = float(line.split()[1])
+    try:
+        with open(f"/proc/{pid}/io") as f:
+            for line in f:
+                key, _, value = line.partition(":")
+                if key in ("read_bytes", "write_bytes"):
+                    counters[key] = float(value)
+    except OSError:
+        pass  # io is only readable by the owner (or root); keep NaN rather than failing the run
+    return counters
+
+
+def process_name(pid: int) -> str:
+    try:
+        with open(f"/proc/{pid}/comm") as f:
+            return f.read().strip()
+    except OSError:
+        return str(pid)
+
+
+class ServerSampler:
+    """Samples CPU, memory, threads, context switches and I/O of server pids at a fixed interval"""
+
+    COLUMNS = ("cpu_pct", "rss_mb", "threads", "vol_cs", "invol_cs", "read_mb_s", "write_mb_s")
+
+    def __init__(self, pids: List[int], t0: float, interval: float = SAMPLE_INTERVAL_S):
+        if not os.path.isdir("/proc"):
+            raise RuntimeError("--server-pid needs a Linux /proc filesystem")
+        for pid in pids:
+            if read_proc_counters(pid) is None:
+                raise ValueError(f"No such process: {pid}")
+        self.pids = list(pids)
+        self.t0 = t0
+        self.interval = interval
+        self.names = {pid: process_name(pid) for pid in self.pids}
+        self.t = {pid: array("d") for pid in self.pids}
+        self.columns = {pid: {name: array("f") for name in self.COLUMNS} for pid in self.pids}
+        self.exited: Dict[int, float] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="server-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+
+    def _run(self):
+        previous = {}
+        for pid in self.pids:
+            try:
+                previous[pid] = (time.monotonic(), read_proc_counters(pid))
+            except (OSError, ValueError, IndexError):
+                previous[pid] = (time.monotonic(), None) # the first tick decides whether it is gone
+        next_tick = time.monotonic() + self.interval
+        while not self._stop.wait(max(0.0, next_tick - time.monotonic())):
+            next_tick += self.interval
+            for pid in self.pids:
+                if pid in self.exited:
+                    continue
+                now = time.monotonic()
+                try:
+                    counters = read_proc_counters(pid)
+                except (OSError, ValueError, IndexError) as e:
+                    self._give_up(pid, now, f"could not be read ({e})")
+                    continue
+                if counters is None:
+                    self._give_up(pid, now, "exited")
+                    continue
+                last_wall, last = previous[pid]
+                previous[pid] = (now, counters)
+                if last is None:
+                    continue # gone or unreadable at the previous tick: this one only sets the baseline
+                if counters["start_ticks"] != last["start_ticks"]:
+                    # a restarted server (or an unrelated process) now has this pid; its counters started over
+                    self._give_up(pid, now, "was taken over by a new process (server restarted?)")
+                    continue
+                dt = max(now - last_wall, 1e-9)
+                col = self.columns[pid]
+                self.t[pid].append(now - self.t0)
+                col["cpu_pct"].append(100.0 * (counters["cpu_s"] - last["cpu_s"]) / dt)
+                col["rss_mb"].append(counters["rss_mb"])
+                col["threads"].append(counters["threads"])
+                col["vol_cs"].append((counters["vol_cs"] - last["vol_cs"]) / dt)
+                col["invol_cs"].append((counters["invol_cs"] - last["invol_cs"]) / dt)
+                col["read_mb_s"].append((counters["read_bytes"] - last["read_bytes"]) / dt / (1024 * 1024))
+                col["write_mb_s"].append((counters["write_bytes"] - last["write_bytes"]) / dt / (1024 * 1024))
+
+    def _give_up(self, pid: int, now: float, why: str):
+        self.exited[pid] = now - self.t0
+        print(f"⚠️  Server pid {pid} ({self.names[pid]}) {why} at t={now - self.t0:.0f}s; no longer sampled",
+              file=sys.stderr)
+
+    def summary(self) -> List[Dict]:
+        servers = []
+        for pid in self.pids:
+            col = self.columns[pid]
+            samples = len(self.t[pid])
+            servers.append({
+                "pid": pid,
+                "name": self.names[pid],
+                "series": f"server-{pid}",
+                "samples": samples,
+                "peak_cpu_pct": max(col["cpu_pct"]) if samples else 0.0,
+                "peak_rss_mb": max(col["rss_mb"]) if samples else 0.0,
+                "peak_threads": int(max(col["threads"])) if samples else 0,
+                "exited_at_s": self.exited.get(pid),
+            })
+        return servers
+
+    def to_series(self) -> Dict[str, Dict]:
+        import numpy as np
+
+        series = {}
+        for pid in self.pids:
+            arrays = {"t": np.frombuffer(self.t[pid], dtype=np.float64).copy()}
+            for name, column in self.columns[pid].items():
+                arrays[name] = np.frombuffer(column, dtype=np.float32).copy()
+            series[f"server-{pid}"] = arrays
+        return series
@@ -0,0 +1,445 @@
+# schema_fuzzer.py
+"""
+Schema-derived request fuzzing at load-test rates.
+
+Every operation with a JSON request body is a target. For each body field the
+fuzzer knows how to produce valid values (enum members, recent dates, ids the
+spec driver collected, short text) and which mutations make sense for its type:
+
+    missing       required field left out
+    null          JSON null
+    wrong_type    e.g. a number where a string belongs, a string for an integer
+    empty         "" or []
+    oversized     strings from 1k up to --max-string characters, 10k-element arrays
+    out_of_range  negative / int32+int64 overflowing numbers, year 0001 or 9999
+    bad_format    malformed dates and uuids, control characters, markup, SQL quotes
+    bad_enum      a value outside the enum
+    unknown_id    a well-formed uuid that does not exist
+
+Requests are generated in batches: per batch one NumPy Generator call draws the
+target, the mutated field and the mutation for every row, and each field's
+column of values is filled per mutation with vectorised draws (dates via
+datetime64 arithmetic, uuids by viewing one random hex buffer as fields, text
+as slices of one random buffer). Only the final dict per row is assembled in
+Python.
+
+Findings are rows that got a 5xx or whose latency exceeded --outlier-factor
+times the median of the same operation's valid requests. They are grouped by
+(operation, field, mutation) with a few reproducible example bodies (long
+strings abbreviated to their length). Invalid inputs that were accepted (2xx)
+are counted too.
+
+Usage:
+    python perf_runner.py fuzz --url http://localhost:8080 --workers 16 --requests 50000
+    python perf_runner.py fuzz --target "hair-fall-logs" --invalid-rate 0.8 --seed 7
+"""
+
+import contextlib
+import json
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timezone
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from perf_metrics import new_run_meta, RunBundle
+from perf_report import PCTL_LAT_BINS, bin_to_latency, log_bins
+from spec_driver import Operation, SpecDriver
+from spec_validators import DEFAULT_SPEC
+
+MUTATIONS = ["valid", "missing", "null", "wrong_type", "empty", "oversized",
+             "out_of_range", "bad_format", "bad_enum", "unknown_id"]
+M = {name: code for code, name in enumerate(MUTATIONS)}
+
+MISSING = object()  # column marker: leave the key out of the body
+
+WRONG_TYPES = {
+    "string": np.array([12345, True, [], {}, 1.5], dtype=object),
+    "integer": np.array(["abc", "12", 1.5, True, []], dtype=object),
+    "array": np.array(["not-a-list", 1, {}], dtype=object),
+}
+OUT_OF_RANGE = {
+    "integer": np.array([-1, -2**31, 2**31, 2**63, 10**20], dtype=object),
+    "date": np.array(["0001-01-01", "9999-12-31", "1900-02-28"], dtype=object),
+    "date-time": np.array(["0001-01-01T00:00:00Z", "9999-12-31T23:59:59Z"], dtype=object),
+}
+BAD_FORMATS = {
+    "date": np.array(["2025-13-45", "31/12/2025", "2025-02-30", "yesterday", "2025-1-1"], dtype=object),
+    "date-time": np.array(["2025-13-45T25:61:00Z", "not-a-time", "2025-01-01 10:00"], dtype=object),
+    "uuid": np.array(["not-a-uuid", "00000000-0000-0000-0000-00000000000g", "123", "{}"], dtype=object),
+    "string": np.array(["\x00", "‮\u0000﻿", "<script>alert(1)</script>", "'; DROP TABLE users; --",
+                        "🧪" * 64, "%s%n%x", "\\u0000"], dtype=object),
+}
+TEXT_ALPHABET = np.frombuffer(b"abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789 .,-", dtype=np.uint8)
+UUID_FIELDS = np.dtype([("a", "U8"), ("b", "U4"), ("c", "U4"), ("d", "U4"), ("e", "U12")])
+EXAMPLES_PER_FINDING = 3
+EXAMPLE_STRING_LIMIT = 120
+
+
+def random_uuids(rng: np.random.Generator, k: int) -> np.ndarray:
+    hexes = np.array(rng.bytes(16 * k).hex()).reshape(1).view(UUID_FIELDS)
+    dashed = hexes["a"]
+    for part in "bcde":
+        dashed = np.char.add(np.char.add(dashed, "-"), hexes[part])
+    return dashed.astype(object)
+
+
+def random_text(rng: np.random.Generator, lengths: np.ndarray) -> np.ndarray:
+    buffer = TEXT_ALPHABET[rng.integers(0, TEXT_ALPHABET.size, int(lengths.sum()))].tobytes().decode("ascii")
+    ends = np.cumsum(lengths)
+    out = np.empty(lengths.size, dtype=object)
+    out[:] = [buffer[end - n:end] for end, n in zip(ends.tolist(), lengths.tolist())]
+    return out
+
+
+def object_column(values: List) -> np.ndarray:
+    """Object array of list values (np.array would try to make them a second dimension)"""
+    out = np.empty(len(values), dtype=object)
+    for i, value in enumerate(values):
+        out[i] = value
+    return out
+
+
+def recent_dates(rng: np.random.Generator, k: int, with_time: bool) -> np.ndarray:
+    if with_time:
+        now = np.datetime64(datetime.now(timezone.utc).replace(tzinfo=None), "s")
+        stamps = now - rng.integers(0, 90 * 86400, k).astype("timedelta64[s]")
+        return np.char.add(np.datetime_as_string(stamps, unit="s"), "Z").astype(object)
+    today = np.datetime64(date.today(), "D")
+    return np.datetime_as_string(today - rng.integers(0, 90, k).astype("timedelta64[D]")).astype(object)
+
+
+class FieldFuzzer:
+    """Valid values and applicable mutations for one body field"""
+
+    def __init__(self, name: str, schema: Dict, required: bool, driver: SpecDriver):
+        self.name = name
+        self.schema = schema
+        self.required = required
+        self.driver = driver
+        self.kind = schema.get("type", "string")
+        self.format = schema.get("format")
+        self.enum = np.array(schema["enum"], dtype=object) if "enum" in schema else None
+
+        mutations = ["null", "wrong_type"]
+        if required:
+            mutations.append("missing")
+        if self.kind == "string":
+            mutations.append("empty")
+            if self.enum is not None:
+                mutations.append("bad_enum")
+            elif self.format in ("date", "date-time"):
+                mutations += ["bad_format", "out_of_range"]
+            elif self.format == "uuid":
+                mutations += ["bad_format", "unknown_id"]
+            else:
+                mutations += ["oversized", "bad_format"]
+        elif self.kind == "integer":
+            mutations.append("out_of_range")
+        elif self.kind == "array":
+            mutations += ["empty", "oversized"]
+        self.mutations = np.array([M[m] for m in mutations], dtype=np.int8)
+
+    def valid(self, rng: np.random.Generator, k: int) -> np.ndarray:
+        if self.enum is not None:
+            return self.enum[rng.integers(0, self.enum.size, k)]
+        if self.kind == "integer":
+            return rng.integers(0, 500, k).astype(object)
+        if self.kind == "array":
+            return object_column([self.driver.value_for(self.name, self.schema)] * k)
+        if self.format in ("date", "date-time"):
+            return recent_dates(rng, k, self.format == "date-time")
+        if self.format == "uuid":
+            known = self.driver.value_for(self.name, self.schema)
+            return np.full(k, known, dtype=object)
+        if self.name in self.driver.context:
+            return np.full(k, self.driver.context[self.name], dtype=object)
+        minimum = int(self.schema.get("minLength", 1))
+        return random_text(rng, rng.integers(minimum, minimum + 48, k))
+
+    def mutated(self, rng: np.random.Generator, mutation: int, k: int, max_string: int) -> np.ndarray:
+        name = MUTATIONS[mutation]
+        if name == "missing":
+            return np.full(k, MISSING, dtype=object)
+        if name == "null":
+            return np.full(k, None, dtype=object)
+        if name == "wrong_type":
+            choices = WRONG_TYPES.get(self.kind, WRONG_TYPES["string"])
+            return choices[rng.integers(0, choices.size, k)]
+        if name == "empty":
+            return object_column([[]] * k) if self.kind == "array" else np.full(k, "", dtype=object)
+        if name == "oversized":
+            if self.kind == "array":
+                return object_column([random_uuids(rng, 10_000).tolist() for _ in range(k)])
+            # log-uniform: most oversized strings are kilobytes, a few reach max_string
+            lengths = np.exp(rng.uniform(np.log(1_000), np.log(max_string), k)).astype(np.int64)
+            return random_text(rng, lengths)
+        if name == "out_of_range":
+            choices = OUT_OF_RANGE.get(self.format if self.kind == "string" else self.kind)
+            return choices[rng.integers(0, choices.size, k)]
+        if name == "bad_format":
+            choices = BAD_FORMATS.get(self.format, BAD_FORMATS["string"])
+            return choices[rng.integers(0, choices.size, k)]
+        if name == "bad_enum":
+            return np.full(k, "NOT_A_" + str(self.enum[0]), dtype=object)
+        return random_uuids(rng, k)  # unknown_id
+
+
+class OperationFuzzer:
+    """Builds batches of bodies for one operation"""
+
+    def __init__(self, op: Operation, driver: SpecDriver):
+        self.op = op
+        schema = driver.resolve(op.body_schema)
+        required = set(schema.get("required", []))
+        self.fields = [FieldFuzzer(name, driver.resolve(field_schema), name in required, driver)
+                       for name, field_schema in schema.get("properties", {}).items()]
+
+    def batch(self, rng: np.random.Generator, k: int, invalid_rate: float, max_string: int):
+        """(bodies, mutated field index or -1, mutation code, longest string length) for k rows"""
+        invalid = rng.random(k) < invalid_rate
+        field_index = np.where(invalid, rng.integers(0, len(self.fields), k), -1)
+        mutation = np.zeros(k, dtype=np.int8)
+        lengths = np.zeros(k, dtype=np.int64)
+        columns = []
+        for i, field in enumerate(self.fields):
+            mine = field_index == i
+            mutation[mine] = field.mutations[rng.integers(0, field.mutations.size, int(mine.sum()))]
+            column = field.valid(rng, k)
+            if not field.required:  # optional fields are left out of about half the valid rows
+                column[~mine & (rng.random(k) < 0.5)] = MISSING
+            for code in np.unique(mutation[mine]):
+                rows = mine & (mutation == code)
+                column[rows] = field.mutated(rng, int(code), int(rows.sum()), max_string)
+                if code == M["oversized"] and field.kind == "string":
+                    lengths[rows] = [len(v) for v in column[rows]]
+            columns.append(column)
+
+        names = [field.name for field in self.fields]
+        bodies = [{name: value for name, value in zip(names, row) if value is not MISSING}
+                  for row in zip(*columns)]
+        return bodies, field_index, mutation, lengths
+
+
+def abbreviate(value):
+    if isinstance(value, str) and len(value) > EXAMPLE_STRING_LIMIT:
+        return f"<{len(value):,} chars>"
+    if isinstance(value, list) and len(value) > 5:
+        return f"<{len(value):,} items>"
+    if isinstance(value, dict):
+        return {k: abbreviate(v) for k, v in value.items()}
+    return value
+
+
+class SchemaFuzzer:
+    def __init__(self, base_url: str, spec_path: str = DEFAULT_SPEC, workers: int = 16,
+                 target: Optional[str] = None, seed: Optional[int] = None, invalid_rate: float = 0.7,
+                 batch_size: int = 2048, max_string: int = 1_000_000, outlier_factor: float = 10.0,
+                 name: str = None):
+        self.name = name or f"fuzz-{time.strftime('%Y%m%d-%H%M%S')}"
+        self.driver = SpecDriver(base_url, spec_path, workers, name=self.name)
+        self.workers = workers
+        self.seed = seed if seed is not None else int(np.random.SeedSequence().entropy % 2**32)
+        self.rng = np.random.default_rng(self.seed)
+        self.invalid_rate = invalid_rate
+        self.batch_size = batch_size
+        self.max_string = max_string
+        self.outlier_factor = outlier_factor
+
+        pattern = re.compile(target) if target else None
+        self.targets = [op for op in self.driver.operations
+                        if op.body_schema and op.phase != "logout" and (not pattern or pattern.search(op.name))]
+        self.fuzzers: List[OperationFuzzer] = []
+
+        # one row per request sent
+        self.rows: Dict[str, List[np.ndarray]] = {key: [] for key in
+                                                  ("op", "field", "mutation", "length", "status", "latency_ms")}
+        self.examples: Dict[tuple, List] = {}
+        # per-operation log histogram of valid-body latencies, so the outlier thresholds
+        # cost O(batch) to maintain instead of a pass over every row sent so far
+        self.valid_hist = np.zeros((0, PCTL_LAT_BINS), dtype=np.int64)
+
+    def prepare(self):
+        """Log in and create one of everything so bodies and paths can reference real ids"""
+        self.driver.t0 = time.monotonic()
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            self.driver.authenticate()
+            list(pool.map(self.driver.execute, self.driver.phase_operations("create")))
+        self.fuzzers = [OperationFuzzer(op, self.driver) for op in self.targets]
+        self.valid_hist = np.zeros((len(self.fuzzers), PCTL_LAT_BINS), dtype=np.int64)
+
+    def _send(self, request):
+        method, path, body = request
+        harness = self.driver.worker_harness()
+        start = time.monotonic()
+        response = harness.make_request(method, path, body, use_auth=True)
+        return (response.status_code if response is not None else 0), (time.monotonic() - start) * 1000
+
+    def run_batch(self, pool: ThreadPoolExecutor):
+        k = self.batch_size
+        op_index = self.rng.integers(0, len(self.fuzzers), k)
+        requests, fields, mutations, lengths, ops, bodies_all = [], [], [], [], [], []
+        for i, fuzzer in enumerate(self.fuzzers):
+            n = int((op_index == i).sum())
+            if not n:
+                continue
+            path, _, _, skip = self.driver.build_request(fuzzer.op)
+            if skip:
+                continue
+            bodies, field_index, mutation, length = fuzzer.batch(self.rng, n, self.invalid_rate, self.max_string)
+            requests += [(fuzzer.op.method, path, body) for body in bodies]
+            bodies_all += bodies
+            ops.append(np.full(n, i, dtype=np.int16))
+            fields.append(field_index.astype(np.int16))
+            mutations.append(mutation)
+            lengths.append(length)
+        if not requests:
+            raise RuntimeError("No fuzz target could be addressed; did authentication and setup succeed?")
+
+        results = np.array(list(pool.map(self._send, requests)), dtype=np.float64).reshape(-1, 2)
+        batch = {"op": np.concatenate(ops), "field": np.concatenate(fields),
+                 "mutation": np.concatenate(mutations), "length": np.concatenate(lengths),
+                 "status": results[:, 0].astype(np.int16), "latency_ms": results[:, 1].astype(np.float32)}
+        for key, column in batch.items():
+            self.rows[key].append(column)
+        valid = batch["field"] < 0
+        self.valid_hist += np.bincount(batch["op"][valid].astype(np.int64) * PCTL_LAT_BINS
+                                       + log_bins(batch["latency_ms"][valid], PCTL_LAT_BINS),
+                                       minlength=self.valid_hist.size).reshape(self.valid_hist.shape)
+        self._keep_examples(batch, bodies_all)
+        return len(requests)
+
+    def outlier_thresholds(self) -> np.ndarray:
+        """--outlier-factor x each operation's median valid latency; inf until it has 20 valid rows"""
+        cdf = np.cumsum(self.valid_hist, axis=1)
+        totals = cdf[:, -1]
+        median = bin_to_latency(np.argmax(cdf >= np.maximum(0.5 * totals, 1)[:, None], axis=1), PCTL_LAT_BINS)
+        return np.where(totals >= 20, self.outlier_factor * median, np.inf)
+
+    def _keep_examples(self, batch: Dict[str, np.ndarray], bodies: List[Dict]):
+        flagged = batch["status"] >= 500
+        flagged |= batch["latency_ms"] > self.outlier_thresholds()[batch["op"]]
+        for row in np.flatnonzero(flagged):
+            key = self._key(int(batch["op"][row]), int(batch["field"][row]), int(batch["mutation"][row]))
+            examples = self.examples.setdefault(key, [])
+            if len(examples) < EXAMPLES_PER_FINDING:
+                examples.append({"status": int(batch["status"][row]),
+                                 "latency_ms": round(float(batch["latency_ms"][row]), 1),
+                                 "body": abbreviate(bodies[row])})
+
+    def _key(self, op: int, field: int, mutation: int) -> tuple:
+        fuzzer = self.fuzzers[op]
+        return (fuzzer.op.name, fuzzer.fields[field].name if field >= 0 else "-", MUTATIONS[mutation])
+
+    def summarise(self) -> Dict:
+        r = {key: np.concatenate(parts) for key, parts in self.rows.items()}
+        thresholds = self.outlier_thresholds()
+        outlier = r["latency_ms"] > thresholds[r["op"]]
+        server_error = r["status"] >= 500
+        accepted = (r["field"] >= 0) & (r["status"] >= 200) & (r["status"] < 300)
+
+        # one key per (operation, field, mutation) so the grouping below is a single np.unique
+        key = (r["op"].astype(np.int64) * 1024 + (r["field"] + 1)) * len(MUTATIONS) + r["mutation"]
+        keys, inverse, counts = np.unique(key, return_inverse=True, return_counts=True)
+        groups = []
+        for g, value in enumerate(keys.tolist()):
+            op, rest = divmod(value, 1024 * len(MUTATIONS))
+            field, mutation = divmod(rest, len(MUTATIONS))
+            rows = inverse == g
+            latency = r["latency_ms"][rows]
+            name = self._key(op, field - 1, mutation)
+            groups.append({
+                "operation": name[0], "field": name[1], "mutation": name[2],
+                "requests": int(counts[g]),
+                "server_errors": int(server_error[rows].sum()),
+                "outliers": int(outlier[rows].sum()),
+                "accepted_invalid": int(accepted[rows].sum()),
+                "p50_ms": round(float(np.median(latency)), 1),
+                "max_ms": round(float(latency.max()), 1),
+                "max_length": int(r["length"][rows].max()),
+                "examples": self.examples.get(name, []),
+            })
+        groups.sort(key=lambda g: (g["server_errors"], g["outliers"]), reverse=True)
+        return {
+            "seed": self.seed,
+            "invalid_rate": self.invalid_rate,
+            "targets": [f.op.name for f in self.fuzzers],
+            "outlier_thresholds_ms": {f.op.name: (None if np.isinf(t) else round(float(t), 1))
+                                      for f, t in zip(self.fuzzers, thresholds)},
+            "groups": groups,
+        }, r
+
+    def run(self, total: int, duration: Optional[float]) -> RunBundle:
+        meta = new_run_meta(self.name, self.driver.base_url, scenario="fuzz", workers=self.workers,
+                            run_id=self.driver.run_id, seed=self.seed)
+        sent = 0
+        with open(os.devnull, "w") as sink, contextlib.redirect_stdout(sink), \
+                ThreadPoolExecutor(max_workers=self.workers) as pool:
+            self.prepare()
+            if not self.fuzzers:
+                raise RuntimeError("No operation with a request body matches the target filter")
+            deadline = time.monotonic() + duration if duration else None
+            while sent < total and (deadline is None or time.monotonic() < deadline):
+                sent += self.run_batch(pool)
+
+        meta["duration_s"] = time.monotonic() - self.driver.t0
+        meta["fuzz"], rows = self.summarise()
+        bundle = RunBundle.from_recorders(self.driver.recorders, meta)
+        bundle.series["fuzz"] = rows
+        return bundle
+
+
+def print_findings(fuzz: Dict, show: int):
+    groups = fuzz["groups"]
+    failing = [g for g in groups if g["server_errors"] or g["outliers"]]
+    print(f"\n🧨 {len(failing)} input classes caused 5xx responses or latency outliers (seed {fuzz['seed']})")
+    for g in failing[:show]:
+        size = f", up to {g['max_length']:,} chars" if g["max_length"] else ""
+        what = "valid body" if g["field"] == "-" else f"{g['field']}={g['mutation']}"
+        print(f"   {g['operation']}  {what}{size}: {g['server_errors']} x 5xx, "
+              f"{g['outliers']} outliers of {g['requests']} (p50 {g['p50_ms']}ms, max {g['max_ms']}ms)")
+        for example in g["examples"][:1]:
+            print(f"      -> {example['status']} in {example['latency_ms']}ms  {json.dumps(example['body'])[:160]}")
+    accepted = [g for g in groups if g["accepted_invalid"]]
+    if accepted:
+        print(f"\n🕳️  Invalid inputs accepted with 2xx:")
+        for g in sorted(accepted, key=lambda g: g["accepted_invalid"], reverse=True)[:show]:
+            print(f"   {g['operation']}  {g['field']}={g['mutation']}: {g['accepted_invalid']}/{g['requests']}")
+
+
+def configure_parser(parser):
+    parser.add_argument("--url", default="http://localhost:8080", help="Base URL for the backend API")
+    parser.add_argument("--spec", default=DEFAULT_SPEC, help="OpenAPI document the bodies are derived from")
+    parser.add_argument("--target", help="Regex on 'METHOD /path' selecting the operations to fuzz")
+    parser.add_argument("--workers", type=int, default=16, help="Concurrent requests")
+    parser.add_argument("--requests", type=int, default=20_000, help="Stop after this many fuzz requests")
+    parser.add_argument("--duration", type=float, help="Or stop after this many seconds")
+    parser.add_argument("--batch", type=int, default=2048, help="Rows generated per batch")
+    parser.add_argument("--invalid-rate", type=float, default=0.7, help="Share of rows with one mutated field")
+    parser.add_argument("--max-string", type=int, default=1_000_000, help="Longest oversized string")
+    parser.add_argument("--outlier-factor", type=float, default=10.0,
+                        help="Latency outlier = this many times the operation's median valid latency")
+    parser.add_argument("--seed", type=int, help="Random seed (printed, so a run can be repeated)")
+    parser.add_argument("--show", type=int, default=20, help="Findings printed")
+    parser.add_argument("--name", help="Bundle name (default: fuzz-<timestamp>)")
+    parser.add_argument("--out-dir", default="runs", help="Directory that receives the run bundle")
+
+
+def run_command(args) -> int:
+    fuzzer = SchemaFuzzer(args.url, args.spec, args.workers, args.target, args.seed, args.invalid_rate,
+                          args.batch, args.max_string, args.outlier_factor, args.name)
+    print(f"🎲 Fuzzing {len(fuzzer.targets)} operations on {args.workers} workers (seed {fuzzer.seed})")
+    try:
+        bundle = fuzzer.run(args.requests, args.duration)
+    except RuntimeError as e:
+        print(f"❌ {e}")
+        return 1
+    path = bundle.save(os.path.join(args.out_dir, fuzzer.name))
+    print_findings(bundle.meta["fuzz"], args.show)
+    rate = bundle.meta["requests"] / max(bundle.meta["duration_s"], 1e-9) * 60
+    print(f"\n✅ {bundle.meta['requests']:,} requests in {bundle.meta['duration_s']:.1f}s "
+          f"({rate:,.0f}/min) -> {path}")
+    return 0
@@ -0,0 +1,352 @@
+# spec_driver.py
+"""
+Drive every operation in api_spec.json without hand-written test methods.
+
+Each (method, path) in the spec becomes an Operation. Parameters and request
+bodies are synthesised from their schemas: enums, formats, defaults, field
+names the driver already knows (email, password, refreshToken, userId) and
+ids produced by earlier operations. Ids are chained by where they came from:
+
+    POST /api/v1/me/interventions -> {"id": ...}
+        fills {id} in /api/v1/me/interventions/{id}/...  (same collection)
+        and any field/param named interventionId
+    POST /api/v1/me/progress-photos/upload-url -> {"photoMetadataId": ...}
+        fills {photoMetadataId} and photoIds[] elsewhere
+
+Operations run in phases (auth, create, use, teardown); everything inside a
+phase runs concurrently. Every call goes through the harness `make_request`,
+so latency, errors and contract checks land in a normal run bundle and
+new endpoints show up in `perf_runner.py report` as soon as they are in the spec.
+
+Usage:
+    python perf_runner.py drive --url http://localhost:8080 --workers 8 --iterations 5
+"""
+
+import contextlib
+import os
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from perf_metrics import EndpointTable, MetricsRecorder, RunBundle, new_run_meta
+from spec_validators import DEFAULT_SPEC, REF_PREFIX, load_spec
+
+PHASES = ["auth", "create", "use", "teardown", "logout"]
+
+# Final path segments that end a resource's life; they run after everything that might still need it.
+DESTRUCTIVE_ACTIONS = {"revoke", "deactivate", "delete"}
+AUTH_ORDER = ["/register", "/login", "/refresh-token", "/me"]
+
+_PARAM = re.compile(r"\{([^/}]+)\}")
+
+
+def _camel_id(segment: str) -> str:
+    """'hair-fall-logs' -> 'hairFallLogId', 'sessions' -> 'sessionId'"""
+    words = segment.rstrip("s").split("-")
+    return words[0] + "".join(w.title() for w in words[1:]) + "Id"
+
+
+@dataclass
+class Operation:
+    method: str
+    template: str
+    path_params: List[Tuple[str, Dict]]
+    query_params: List[Tuple[str, Dict, bool]]
+    body_schema: Optional[Dict]
+    phase: str
+    results: Dict[str, int] = field(default_factory=dict)  # status (or skip reason) -> count
+
+    @property
+    def name(self) -> str:
+        return f"{self.method} {self.template}"
+
+    @property
+    def collection(self) -> str:
+        """Path whose POST creates the resource this operation addresses"""
+        params = _PARAM.findall(self.template)
+        if not params:
+            return self.template
+        return self.template[:self.template.index("{" + params[-1] + "}")].rstrip("/")
+
+
+def load_operations(spec: Dict) -> List[Operation]:
+    operations = []
+    for template, methods in spec.get("paths", {}).items():
+        for method, op in methods.items():
+            path_params, query_params = [], []
+            for param in op.get("parameters", []):
+                if param.get("in") == "path":
+                    path_params.append((param["name"], param.get("schema", {})))
+                elif param.get("in") == "query":
+                    query_params.append((param["name"], param.get("schema", {}), bool(param.get("required"))))
+            content = (op.get("requestBody") or {}).get("content", {})
+            body_schema = next((c.get("schema") for c in content.values() if c.get("schema")), None)
+            operations.append(Operation(method.upper(), template, path_params, query_params, body_schema,
+                                        _phase(method.upper(), template)))
+    return operations
+
+
+def _phase(method: str, template: str) -> str:
+    last = template.rstrip("/").rsplit("/", 1)[-1]
+    if template.startswith("/api/v1/auth/"):
+        return "logout" if last == "logout" else "auth"
+    if method == "DELETE" or last in DESTRUCTIVE_ACTIONS:
+        return "teardown"
+    if method == "POST" and "{" not in template:
+        return "create"
+    return "use"
+
+
+class SpecDriver:
+    """Synthesises requests for every spec operation and runs them phase by phase"""
+
+    def __init__(self, base_url: str, spec_path: str = DEFAULT_SPEC, workers: int = 8,
+                 iterations: int = 1, name: str = None, include: Optional[str] = None):
+        spec = load_spec(spec_path)
+        self.components: Dict[str, Dict] = spec.get("components", {}).get("schemas", {})
+        self.operations = load_operations(spec)
+        if include:
+            pattern = re.compile(include)
+            self.operations = [op for op in self.operations if op.template.startswith("/api/v1/auth/")
+                               or pattern.search(op.name)]
+        self.base_url = base_url
+        self.workers = workers
+        self.iterations = iterations
+        self.name = name or f"spec-driver-{time.strftime('%Y%m%d-%H%M%S')}"
+        self.run_id = uuid.uuid4().hex[:8]
+
+        self.email = f"driver_{self.run_id}@hairhealth.com"
+        self.password = f"DriverPass_{self.run_id}!"
+        self.context: Dict[str, Any] = {"email": self.email, "password": self.password,
+                                        "username": f"driver_{self.run_id}"}
+        self.pool: Dict[str, List[str]] = {}  # collection path or field name -> ids seen
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.t0 = 0.0
+        self.endpoints = EndpointTable()
+        self.recorders: List[MetricsRecorder] = []
+        self.observer: Optional[Callable] = None  # observer(op, response) after every call, from worker threads
+
+    # --- value synthesis ---
+
+    def resolve(self, schema: Dict) -> Dict:
+        while "$ref" in schema:
+            schema = self.components[schema["$ref"][len(REF_PREFIX):]]
+        return schema
+
+    def _pooled(self, *keys: str) -> Optional[str]:
+        with self.lock:
+            for key in keys:
+                if self.pool.get(key):
+                    return random.choice(self.pool[key])
+        return None
+
+    def value_for(self, name: str, schema: Dict):
+        schema = self.resolve(schema)
+        if name in self.context:
+            return self.context[name]
+        if "enum" in schema:
+            return random.choice(schema["enum"])
+        if "default" in schema:
+            return schema["default"]
+        kind, fmt = schema.get("type"), schema.get("format")
+        if kind == "string":
+            if fmt == "uuid" or name.endswith("Id"):
+                return self._pooled(name) or str(uuid.uuid4())
+            if fmt == "date":
+                offset = -30 if name.startswith("start") else 1 if name.startswith("end") else 0
+                return (date.today() + timedelta(days=offset)).isoformat()
+            if fmt == "date-time":
+                offset = -30 if name.startswith("start") else 1 if name.startswith("end") else 0
+                return (datetime.now(timezone.utc) + timedelta(days=offset)).strftime("%Y-%m-%dT%H:%M:%SZ")
+            return f"spec-driver {name}".ljust(int(schema.get("minLength", 0)), "x")
+        if kind == "integer":
+            return max(int(schema.get("minimum", 1)), 1)
+        if kind == "number":
+            return 1.0
+        if kind == "boolean":
+            return False
+        if kind == "array":
+            item_schema = self.resolve(schema.get("items", {}))
+            if item_schema.get("format") == "uuid":
+                singular = name[:-1] if name.endswith("s") else name
+                related = [key for key in self.pool if key.startswith(singular[:-2])]
+                found = self._pooled(singular, *related)
+                return [found] if found else []
+            return [self.value_for(name[:-1], item_schema)]
+        if kind == "object" or "properties" in schema:
+            return {prop: self.value_for(prop, prop_schema)
+                    for prop, prop_schema in schema.get("properties", {}).items()}
+        return None
+
+    def path_value(self, op: Operation, param: str) -> Optional[str]:
+        name = param if param != "id" else _camel_id(op.collection.rsplit("/", 1)[-1])
+        found = self._pooled(op.collection, name) if param == "id" else self._pooled(name)
+        return found or self.context.get(name)  # e.g. /users/{id} -> the driver's own userId
+
+    def build_request(self, op: Operation) -> Tuple[Optional[str], Dict, Optional[Dict], Optional[str]]:
+        """(path, query, body, skip_reason)"""
+        path = op.template
+        for param, _ in op.path_params:
+            value = self.path_value(op, param)
+            if value is None:
+                return None, {}, None, f"no id for {{{param}}}"
+            path = path.replace("{" + param + "}", value)
+        query = {name: self.value_for(name, schema) for name, schema, required in op.query_params
+                 if required or "default" in schema}
+        body = self.value_for("body", op.body_schema) if op.body_schema else None
+        return path, query, body, None
+
+    # --- id chaining ---
+
+    def harvest(self, op: Operation, data: Any):
+        """Remember ids a response produced, keyed by collection and by field name"""
+        items = data if isinstance(data, list) else [data]
+        with self.lock:
+            for item in items:
+                if not isinstance(item, dict):
+                    continue
+                for key, value in item.items():
+                    if isinstance(value, dict):
+                        if key == "user" and "id" in value:
+                            self.context.setdefault("userId", value["id"])
+                        continue
+                    if not (isinstance(value, str) and len(value) == 36 and value.count("-") == 4):
+                        continue
+                    if key == "id":
+                        self.pool.setdefault(op.collection, []).append(value)
+                        self.pool.setdefault(_camel_id(op.collection.rsplit("/", 1)[-1]), []).append(value)
+                    elif key != "userId":
+                        self.pool.setdefault(key, []).append(value)
+                if "accessToken" in item:
+                    self.context["accessToken"] = item["accessToken"]
+                    self.context["refreshToken"] = item.get("refreshToken")
+
+    def forget(self, op: Operation, path: str):
+        """Drop the id a successful teardown consumed (its last path parameter) from every pool list"""
+        params = [value for segment, value in zip(op.template.split("/"), path.split("/")) if segment.startswith("{")]
+        if not params:
+            return
+        with self.lock:
+            for ids in self.pool.values():
+                ids[:] = [i for i in ids if i != params[-1]]
+
+    # --- execution ---
+
+    def worker_harness(self):
+        """This thread's harness, with its own recorder and the current token"""
+        harness = getattr(self.local, "harness", None)
+        if harness is None:
+            from test_harness_base import OpenAPITestHarness
+
+            with self.lock:
+                index = len(self.recorders)
+                recorder = MetricsRecorder(self.endpoints, self.t0, worker=index, run_id=self.run_id)
+                self.recorders.append(recorder)
+            harness = OpenAPITestHarness(self.base_url)
+            harness.recorder = recorder
+            self.local.harness = harness
+        harness.access_token = self.context.get("accessToken")
+        return harness
+
+    def execute(self, op: Operation):
+        path, query, body, skip = self.build_request(op)
+        if skip:
+            with self.lock:
+                op.results[f"skipped: {skip}"] = op.results.get(f"skipped: {skip}", 0) + 1
+            return
+        harness = self.worker_harness()
+        response = harness.make_request(op.method, path, body, use_auth=True, params=query or None)
+        if self.observer is not None:
+            self.observer(op, response)
+        if response is None:
+            outcome = harness.last_error or "no response"
+        else:
+            outcome = str(response.status_code)
+            if response.status_code < 300 and response.content:
+                valid, _ = harness.validate_response_schema(response, [])
+                if not valid:
+                    outcome += " schema_mismatch"
+                try:
+                    self.harvest(op, response.json())
+                except ValueError:
+                    pass
+            if response.status_code < 300 and op.phase == "teardown":
+                self.forget(op, path)
+        with self.lock:
+            op.results[outcome] = op.results.get(outcome, 0) + 1
+
+    def phase_operations(self, phase: str) -> List[Operation]:
+        ops = [op for op in self.operations if op.phase == phase]
+        if phase == "auth":
+            ops.sort(key=lambda op: next((i for i, suffix in enumerate(AUTH_ORDER)
+                                          if op.template.endswith(suffix)), len(AUTH_ORDER)))
+        return ops
+
+    def authenticate(self):
+        """Run the auth operations one by one; each step needs the previous one's token"""
+        for op in self.phase_operations("auth"):
+            self.execute(op)
+
+    def run(self) -> RunBundle:
+        self.t0 = time.monotonic()
+        meta = new_run_meta(self.name, self.base_url, scenario="spec-driver", workers=self.workers,
+                            iterations=self.iterations, run_id=self.run_id)
+
+        with open(os.devnull, "w") as sink, contextlib.redirect_stdout(sink), \
+                ThreadPoolExecutor(max_workers=self.workers) as pool:
+            self.authenticate()
+            for _ in range(self.iterations):
+                for phase in ("create", "use", "teardown"):
+                    list(pool.map(self.execute, self.phase_operations(phase)))
+            for op in self.phase_operations("logout"):
+                self.execute(op)
+
+        meta["duration_s"] = time.monotonic() - self.t0
+        meta["coverage"] = [{"operation": op.name, "phase": op.phase, "results": op.results}
+                            for op in self.operations]
+        return RunBundle.from_recorders(self.recorders, meta)
+
+
+def is_covered(results: Dict[str, int]) -> bool:
+    return any(outcome[:1] == "2" and "schema_mismatch" not in outcome for outcome in results)
+
+
+def print_coverage(coverage: List[Dict]):
+    covered = sum(1 for entry in coverage if is_covered(entry["results"]))
+    print(f"\n📋 Spec coverage: {covered}/{len(coverage)} operations returned a valid 2xx")
+    for entry in sorted(coverage, key=lambda e: (PHASES.index(e["phase"]), e["operation"])):
+        icon = "✅" if is_covered(entry["results"]) else "⏭️" if all(
+            k.startswith("skipped") for k in entry["results"]) else "❌"
+        outcomes = ", ".join(f"{k} x{v}" for k, v in sorted(entry["results"].items()))
+        print(f"   {icon} {entry['operation']:<80} {outcomes}")
+
+
+def configure_parser(parser):
+    parser.add_argument("--url", default="http://localhost:8080", help="Base URL for the backend API")
+    parser.add_argument("--spec", default=DEFAULT_SPEC, help="OpenAPI document to drive")
+    parser.add_argument("--workers", type=int, default=8, help="Concurrent requests within a phase")
+    parser.add_argument("--iterations", type=int, default=1, help="Times the create/use/teardown phases repeat")
+    parser.add_argument("--include", help="Regex on 'METHOD /path'; auth operations always run")
+    parser.add_argument("--name", help="Bundle name (default: spec-driver-<timestamp>)")
+    parser.add_argument("--out-dir", default="runs", help="Directory that receives the run bundle")
+
+
+def run_command(args) -> int:
+    driver = SpecDriver(args.url, args.spec, args.workers, args.iterations, args.name, args.include)
+    print(f"🧭 Driving {len(driver.operations)} spec operations x {args.iterations} iteration(s) "
+          f"on {args.workers} workers")
+    bundle = driver.run()
+    path = bundle.save(os.path.join(args.out_dir, driver.name))
+    print_coverage(bundle.meta["coverage"])
+    print(f"\n✅ {bundle.meta['requests']:,} requests in {bundle.meta['duration_s']:.1f}s -> {path}")
+    if "accessToken" not in driver.context:
+        print("⚠️  Could not authenticate; only public operations were exercised", file=sys.stderr)
+    return 0
@@ -0,0 +1,489 @@
+# spec_validators.py
+"""
+Response contract validation compiled from api_spec.json.
+
+Every component schema (and every inline response schema) is turned into a
+specialised Python function once per process: type, enum, required-field and
+format checks with `$ref`s resolved to direct calls, applied column-wise so a
+list response is checked field by field in C-level passes rather than element
+by element. The generated functions only answer "valid or not"; when one says
+no, a small interpreter walks the same schema again to produce readable
+problems, so the error path pays for messages and the hot path does not.
+
+    validator = get_validator()  # cached on disk per spec content, see load_spec
+    ok, problems = validator.validate_response("GET", "/api/v1/me/hair-fall-logs", 200, data)
+
+High-rate load runs validate a sample instead of every response (ValidationSampler).
+"""
+
+import functools
+import hashlib
+import itertools
+import json
+import marshal
+import operator
+import os
+import pickle
+import random
+import re
+import sys
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from perf_metrics import endpoint_key
+
+DEFAULT_SPEC = os.path.join(os.path.dirname(os.path.abspath(__file__)), "api_spec.json")
+REF_PREFIX = "#/components/schemas/"
+MAX_PROBLEMS = 20
+
+# Cheap shape checks only; full parsing of every date would cost more than the rest of the validation.
+FORMAT_LENGTHS = {"uuid": 36, "date": 10}
+
+def _ref_name(ref: str) -> str:
+    if not ref.startswith(REF_PREFIX):
+        raise ValueError(f"Unsupported $ref '{ref}' (only {REF_PREFIX}* is resolved)")
+    return ref[len(REF_PREFIX):]
+
+
+def _template_segments(template: str) -> Tuple[Optional[str], ...]:
+    """'/a/{id}/b' -> ('', 'a', None, 'b'); None matches any single segment.
+
+    Plain tuples rather than regexes: compiling one pattern per template was most of the
+    start-up left once the validators come from the cache.
+    """
+    return tuple(None if "{" in segment else segment for segment in template.split("/"))
+
+
+def _segments_match(segments: Tuple[Optional[str], ...], parts: List[str]) -> bool:
+    return len(segments) == len(parts) and all(s is None or s == p for s, p in zip(segments, parts))
+
+
+def _identifier(name: str) -> str:
+    return re.sub(r"\W", "_", name)
+
+
+TYPE_SETS = {
+    "string": frozenset({str}),
+    "integer": frozenset({int}),
+    "number": frozenset({int, float}),
+    "boolean": frozenset({bool}),
+    "array": frozenset({list}),
+    "object": frozenset({dict}),
+}
+
+# Helpers the generated code closes over; each keeps the per-element loop inside C.
+RUNTIME = {
+    "_chain": itertools.chain.from_iterable,
+    "_repeat": itertools.repeat,
+    "_ge": operator.ge,
+    "_get": dict.get,
+    "_join": "".join,
+    "_keys": dict.keys,
+    "_values": dict.values,
+    "_not_none": functools.partial(operator.is_not, None),
+}
+
+
+class _CodeGenerator:
+    """Emits one `_all_*` function per schema into a single module source.
+
+    Checks are column-wise: a function receives a sequence of values and, for an
+    object schema, pulls each property out of every element with
+    `map(dict.get, ...)` and checks the whole column at once (`set(map(type, col))`,
+    `set(col) <= enum`, ...). A 1k-element list response then costs a handful of
+    C-level passes per field instead of a Python loop over every element.
+    """
+
+    def __init__(self, components: Dict[str, Dict]):
+        self.components = components
+        self.lines: List[str] = []
+        self.consts: Dict[str, Any] = {}
+        self._const_names: Dict[Any, str] = {}
+        self._inline = 0
+
+    def const(self, value) -> str:
+        if value not in self._const_names:
+            name = f"_C{len(self.consts)}"
+            self.consts[name] = value
+            self._const_names[value] = name
+        return self._const_names[value]
+
+    def function_for(self, schema: Dict, name: Optional[str] = None) -> str:
+        if "$ref" in schema:
+            return f"_all_{_identifier(_ref_name(schema['$ref']))}"
+        if name is None:
+            self._inline += 1
+            name = f"_all_inline_{self._inline}"
+        body: List[str] = []
+        self._column_checks(schema, "vs", body, "    ", depth=0, nullable=False)
+        self.lines.append(f"def {name}(vs):")
+        self.lines.extend(body)
+        self.lines.append("    return True")
+        self.lines.append("")
+        return name
+
+    def _column_checks(self, schema: Dict, col: str, out: List[str], ind: str, depth: int, nullable: bool):
+        non_null = f"nn{depth}"
+        if "$ref" in schema:
+            if nullable:
+                out.append(f"{ind}{non_null} = list(filter(_not_none, {col}))")
+                col = non_null
+            out.append(f"{ind}if not {self.function_for(schema)}({col}): return False")
+            return
+        kind = schema.get("type") or ("object" if "properties" in schema else None)
+        if kind not in TYPE_SETS:
+            return
+        if "enum" in schema:
+            # Membership in a set of strings (plus None) already pins the type; unhashable values
+            # raise TypeError, which the caller treats as a failed check.
+            enum = frozenset(schema["enum"]) | ({None} if nullable else set())
+            out.append(f"{ind}if not set({col}) <= {self.const(enum)}: return False")
+        elif kind == "string" and not nullable:
+            # str.join is the cheapest all-strings test in CPython; anything else raises TypeError.
+            out.append(f"{ind}_join({col})")
+        else:
+            allowed = TYPE_SETS[kind] | ({type(None)} if nullable else set())
+            out.append(f"{ind}if not set(map(type, {col})) <= {self.const(frozenset(allowed))}: return False")
+
+        needs_values = (schema.get("format") in FORMAT_LENGTHS or "minLength" in schema
+                        or kind == "array" and schema.get("items") or kind == "object")
+        if not needs_values:
+            return
+        if nullable:
+            out.append(f"{ind}{non_null} = list(filter(_not_none, {col}))")
+            col = non_null
+
+        if kind == "string":
+            if schema.get("format") in FORMAT_LENGTHS:
+                lengths = frozenset({FORMAT_LENGTHS[schema["format"]]})
+                out.append(f"{ind}if not set(map(len, {col})) <= {self.const(lengths)}: return False")
+            if "minLength" in schema:
+                minimum = int(schema["minLength"])
+                out.append(f"{ind}if min(map(len, {col}), default={minimum}) < {minimum}: return False")
+        elif kind == "array":
+            items = f"i{depth}"
+            out.append(f"{ind}{items} = list(_chain({col}))")
+            self._column_checks(schema["items"], items, out, ind, depth + 1, nullable=False)
+        elif kind == "object":
+            required = schema.get("required") or []
+            column = f"c{depth}"
+            uses = re.compile(rf"\b{column}\b")
+            for prop, prop_schema in (schema.get("properties") or {}).items():
+                inner: List[str] = []
+                # Jackson writes absent Kotlin nullables as null, so null is only an error for required
+                # fields. A missing required key reads as None and fails the type check, so required
+                # fields need no separate key test.
+                self._column_checks(prop_schema, column, inner, ind, depth + 1, nullable=prop not in required)
+                if not inner and prop in required:
+                    inner.append(f"{ind}if None in {column}: return False")
+                extract = f"map(_get, {col}, _repeat({prop!r}))"
+                if sum(len(uses.findall(line)) for line in inner) == 1:
+                    out.extend(uses.sub(extract, line) for line in inner)  # single pass: no need for a list
+                elif inner:
+                    out.append(f"{ind}{column} = list({extract})")
+                    out.extend(inner)
+            extra = schema.get("additionalProperties")
+            if isinstance(extra, dict) and extra:
+                values = f"a{depth}"
+                out.append(f"{ind}{values} = list(_chain(map(_values, {col})))")
+                self._column_checks(extra, values, out, ind, depth + 1, nullable=False)
+
+
+def explain(schema: Dict, value, components: Dict[str, Dict], path: str = "$",
+            problems: Optional[List[str]] = None) -> List[str]:
+    """Readable contract violations for `value`; only used after a compiled check has failed"""
+    problems = [] if problems is None else problems
+    if len(problems) >= MAX_PROBLEMS:
+        return problems
+    if "$ref" in schema:
+        return explain(components[_ref_name(schema["$ref"])], value, components, path, problems)
+    kind = schema.get("type") or ("object" if "properties" in schema else None)
+    expected = {"string": str, "integer": int, "boolean": bool, "array": list, "object": dict}
+    if kind == "number":
+        if type(value) not in (int, float):
+            problems.append(f"{path}: expected number, got {type(value).__name__}")
+        return problems
+    if kind in expected and type(value) is not expected[kind]:
+        problems.append(f"{path}: expected {kind}, got {type(value).__name__}")
+        return problems
+    if kind == "string":
+        if "enum" in schema and value not in schema["enum"]:
+            problems.append(f"{path}: {value!r} is not one of {', '.join(schema['enum'])}")
+        length = FORMAT_LENGTHS.get(schema.get("format"))
+        if length and len(value) != length:
+            problems.append(f"{path}: {value!r} is not a {schema['format']}")
+        if len(value) < schema.get("minLength", 0):
+            problems.append(f"{path}: shorter than {schema['minLength']}")
+    elif kind == "array" and schema.get("items"):
+        for i, item in enumerate(value):
+            explain(schema["items"], item, components, f"{path}[{i}]", problems)
+            if len(problems) >= MAX_PROBLEMS:
+                break
+    elif kind == "object":
+        required = schema.get("required") or []
+        for prop in required:
+            if value.get(prop) is None:
+                problems.append(f"{path}.{prop}: required field {'is null' if prop in value else 'missing'}")
+        for prop, prop_schema in (schema.get("properties") or {}).items():
+            if value.get(prop) is not None:
+                explain(prop_schema, value[prop], components, f"{path}.{prop}", problems)
+        extra = schema.get("additionalProperties")
+        if isinstance(extra, dict) and extra:
+            for key, item in value.items():
+                explain(extra, item, components, f"{path}.{key}", problems)
+    return problems
+
+
+def _passes(check: Callable, data) -> bool:
+    try:
+        return check((data,))
+    except TypeError:  # a non-string in a string column, or an unhashable value where an enum was expected
+        return False
+
+
+def compile_spec(spec: Dict) -> Dict:
+    """Generate and compile the validator module for a spec; the result is what the on-disk cache stores"""
+    components = spec.get("components", {}).get("schemas", {})
+    gen = _CodeGenerator(components)
+    for name, schema in components.items():
+        gen.function_for(schema, f"_all_{_identifier(name)}")
+
+    # (METHOD, path template) -> {status: (function name, schema)}
+    responses: Dict[Tuple[str, str], Dict[int, Tuple[str, Dict]]] = {}
+    for template, operations in spec.get("paths", {}).items():
+        for method, operation in operations.items():
+            for status, response in (operation.get("responses") or {}).items():
+                content = response.get("content") or {}
+                schema = next((c.get("schema") for c in content.values() if c.get("schema")), None)
+                if schema is None or not status.isdigit():
+                    continue
+                responses.setdefault((method.upper(), template), {})[int(status)] = \
+                    (gen.function_for(schema), schema)
+
+    source = "\n".join(gen.lines)
+    return {"source": source, "code": compile(source, "<api_spec validators>", "exec"),
+            "consts": gen.consts, "responses": responses}
+
+
+class SpecValidator:
+    """Compiled validators for every component schema and response of one OpenAPI document"""
+
+    def __init__(self, spec: Dict, compiled: Optional[Dict] = None):
+        self.components: Dict[str, Dict] = spec.get("components", {}).get("schemas", {})
+        compiled = compiled or compile_spec(spec)
+        self.source = compiled["source"]
+        namespace: Dict[str, Any] = dict(RUNTIME, **compiled["consts"])
+        exec(compiled["code"], namespace)
+        self.schema_checks: Dict[str, Callable] = {
+            name: namespace[f"_all_{_identifier(name)}"] for name in self.components}
+        self.responses = {key: {status: (namespace[fn], schema) for status, (fn, schema) in per_status.items()}
+                          for key, per_status in compiled["responses"].items()}
+
+        # Literal templates win over parameterised ones (/hair-fall-logs/stats vs /hair-fall-logs/{id})
+        self._literal = {key: key for key in self.responses if "{" not in key[1]}
+        self._patterns = sorted(
+            ((method, _template_segments(t), t) for method, t in self.responses if "{" in t),
+            key=lambda entry: -sum(1 for seg in entry[2].split("/") if seg and "{" not in seg))
+        self._resolved: Dict[str, Optional[Tuple[str, str]]] = {}
+
+    def operation(self, method: str, path: str) -> Optional[Tuple[str, str]]:
+        """Spec (METHOD, template) for a concrete request path, cached per endpoint"""
+        key = endpoint_key(method, path)
+        if key in self._resolved:
+            return self._resolved[key]
+        method, path = method.upper(), path.split("?", 1)[0]
+        found = self._literal.get((method, path))
+        if found is None:
+            parts = path.split("/")
+            found = next(((m, t) for m, segments, t in self._patterns
+                          if m == method and _segments_match(segments, parts)), None)
+        self._resolved[key] = found
+        return found
+
+    def check_schema(self, name: str, data) -> Tuple[bool, List[str]]:
+        if _passes(self.schema_checks[name], data):
+            return True, []
+        return False, explain(self.components[name], data, self.components)
+
+    def validate_response(self, method: str, path: str, status: int, data) -> Tuple[bool, List[str]]:
+        """Check a decoded response body against the spec; unknown operations/statuses pass"""
+        operation = self.operation(method, path)
+        if operation is None:
+            return True, []
+        entry = self.responses[operation].get(status)
+        if entry is None:
+            return True, []
+        check, schema = entry
+        if _passes(check, data):
+            return True, []
+        return False, explain(schema, data, self.components)
+
+
+def resolve_refs(node, components: Dict[str, Dict], seen: frozenset = frozenset()):
+    """Copy of `node` with component $refs inlined; a recursive reference is left as {"$ref": name}"""
+    if isinstance(node, dict):
+        ref = node.get("$ref")
+        if isinstance(ref, str):
+            name = _ref_name(ref)
+            if name in seen:
+                return {"$ref": name}
+            return resolve_refs(components.get(name, {}), components, seen | {name})
+        return {key: resolve_refs(value, components, seen) for key, value in node.items()}
+    if isinstance(node, list):
+        return [resolve_refs(value, components, seen) for value in node]
+    return node
+
+
+class ValidationSampler:
+    """Decides which responses get the contract check, and counts what it decided.
+
+    A policy is a comma-separated combination; a response is validated if any part says so:
+
+        all         every response (the default, and what functional runs use)
+        none        never
+        1/N         a random 1 in N responses of each endpoint
+        first:K     the first K responses of each endpoint
+        errors      every response that is already suspect: status >= 400, or the
+                    test's own expected-field check failed
+
+    e.g. "first:20,errors,1/50" for a high-rate load run. A load run shares one sampler
+    across its workers, so "first:K" means K per endpoint for the whole run.
+    """
+
+    def __init__(self, policy: str = "all", seed: Optional[int] = None):
+        self.policy = policy
+        self.every = self.one_in = self.first = 0
+        self.errors = False
+        for part in filter(None, (p.strip() for p in policy.split(","))):
+            if part == "all":
+                self.every = 1
+            elif part == "none":
+                pass
+            elif part == "errors":
+                self.errors = True
+            elif part.startswith("1/") and part[2:].isdigit() and int(part[2:]) > 0:
+                self.one_in = int(part[2:])
+            elif part.startswith("first:") and part[6:].isdigit():
+                self.first = int(part[6:])
+            else:
+                raise ValueError(f"Unknown validation policy '{part}' (use all, none, 1/N, first:K, errors)")
+        self._random = random.Random(seed).random
+        self._lock = threading.Lock()
+        self.counts: Dict[str, List[int]] = {}  # endpoint key -> [responses, validated, mismatches]
+
+    def should_validate(self, key: str, status: int, suspect: bool = False) -> bool:
+        with self._lock:
+            counts = self.counts.get(key)
+            if counts is None:
+                counts = self.counts[key] = [0, 0, 0]
+            counts[0] += 1
+            chosen = (self.every or counts[0] <= self.first or (self.errors and (suspect or status >= 400))
+                      or (self.one_in and self._random() * self.one_in < 1.0))
+            if chosen:
+                counts[1] += 1
+        return bool(chosen)
+
+    def record_mismatch(self, key: str):
+        with self._lock:
+            self.counts[key][2] += 1
+
+    def summary(self) -> Dict:
+        """Achieved sampling rate and mismatches, overall and per endpoint"""
+        with self._lock:
+            per_endpoint = {key: list(counts) for key, counts in self.counts.items()}
+        responses = sum(c[0] for c in per_endpoint.values())
+        validated = sum(c[1] for c in per_endpoint.values())
+        return {
+            "policy": self.policy,
+            "responses": responses,
+            "validated": validated,
+            "rate": validated / responses if responses else 0.0,
+            "mismatches": sum(c[2] for c in per_endpoint.values()),
+            "endpoints": {key: {"responses": c[0], "validated": c[1], "mismatches": c[2],
+                                "rate": c[1] / c[0] if c[0] else 0.0}
+                          for key, c in sorted(per_endpoint.items())},
+        }
+
+
+# --- on-disk cache ---
+#
+# Parsing the spec and generating + compiling the validators costs ~15ms per process; the harness
+# is started thousands of times from the shell scripts. The cache entry is keyed by the spec bytes,
+# this module's own source (the generator) and the interpreter version (marshal's code format), so
+# it never needs invalidating by hand. The code object goes through marshal; everything else through
+# pickle, which also handles the type objects in the generated constants.
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".spec_cache")
+CACHE_FORMAT = 1
+
+_loaded: Dict[str, Dict] = {}
+_validators: Dict[str, SpecValidator] = {}
+
+
+def _cache_path(spec_bytes: bytes) -> str:
+    with open(__file__, "rb") as f:
+        generator = f.read()
+    digest = hashlib.sha256(b"%d\0%s\0" % (CACHE_FORMAT, sys.version.encode()) + generator + b"\0" + spec_bytes)
+    return os.path.join(CACHE_DIR, f"spec-{digest.hexdigest()[:24]}.pickle")
+
+
+def _build_entry(spec_bytes: bytes) -> Dict:
+    spec = json.loads(spec_bytes)
+    components = spec.get("components", {}).get("schemas", {})
+    compiled = compile_spec(spec)
+    return {"spec": spec, "paths": resolve_refs(spec.get("paths", {}), components), "compiled": compiled}
+
+
+def _read_entry(path: str) -> Optional[Dict]:
+    try:
+        with open(path, "rb") as f:
+            entry = pickle.load(f)
+        entry["compiled"]["code"] = marshal.loads(entry["compiled"]["code"])
+        return entry
+    except (OSError, EOFError, ValueError, TypeError, KeyError, pickle.UnpicklingError):
+        return None
+
+
+def _write_entry(path: str, entry: Dict):
+    stored = dict(entry, compiled=dict(entry["compiled"], code=marshal.dumps(entry["compiled"]["code"])))
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump(stored, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)  # concurrent workers may race here; last writer wins with identical bytes
+    except OSError:
+        pass  # read-only checkout: work uncached
+
+
+def _entry(spec_path: str) -> Dict:
+    entry = _loaded.get(spec_path)
+    if entry is None:
+        with open(spec_path, "rb") as f:
+            spec_bytes = f.read()
+        cache_path = _cache_path(spec_bytes)
+        entry = _read_entry(cache_path)
+        if entry is None:
+            entry = _build_entry(spec_bytes)
+            _write_entry(cache_path, entry)
+        _loaded[spec_path] = entry
+    return entry
+
+
+def load_spec(spec_path: str = DEFAULT_SPEC) -> Dict:
+    """Parsed OpenAPI document (from the on-disk cache when the file is unchanged)"""
+    return _entry(spec_path)["spec"]
+
+
+def load_resolved_paths(spec_path: str = DEFAULT_SPEC) -> Dict:
+    """The spec's `paths` with every component $ref inlined"""
+    return _entry(spec_path)["paths"]
+
+
+def get_validator(spec_path: str = DEFAULT_SPEC) -> SpecValidator:
+    """Process-wide compiled validator for a spec file (compiled on first use, or loaded from the cache)"""
+    validator = _validators.get(spec_path)
+    if validator is None:
+        entry = _entry(spec_path)
+        validator = _validators[spec_path] = SpecValidator(entry["spec"], entry["compiled"])
+    return validator
@@ -1,6 +1,12 @@
 # test_dev_endpoints.py
 import json
+import os
+import tempfile
 import uuid
+from datetime import datetime
+
+import requests
+
 from test_harness_base import OpenAPITestHarness, TestResult
 
 class DevTests(OpenAPITestHarness):
@@ -69,4 +75,46 @@ class DevTests(OpenAPITestHarness):
                         "Dev intervention data set up successfully")
         else:
             self.log_test("Setup Intervention Data (Dev)", TestResult.FAIL, 
-                        f"Failed to setup intervention data: {response.status_code}")
\ No newline at end of file
+                        f"Failed to setup intervention data: {response.status_code}")
+
+    def test_pool_lease_after_snapshot_restore(self):
+        """A snapshot restore drops a pooled user; a verified lease (as `run --snapshot` takes) registers it again"""
+        from dataset_snapshot import H2Snapshots, restore_snapshot, save_snapshot
+        from user_pool import UserPool
+
+        name = "Pool Lease After Snapshot Restore (Dev)"
+        snapshot = f"pool_restore_{uuid.uuid4().hex[:8]}"
+        with tempfile.TemporaryDirectory() as directory:
+            store = H2Snapshots(self.base_url)
+            try:
+                save_snapshot(store, snapshot, directory)
+            except (RuntimeError, KeyError, ValueError, requests.exceptions.RequestException) as e:
+                self.log_test(name, TestResult.SKIP, f"Snapshots unavailable (test profile only): {e}")
+                return
+
+            pool = UserPool(os.path.join(directory, "pool.json"), self.base_url, workers=1)
+            created = pool.create(1) # registered after the snapshot, so the restore drops it
+            if created != {"registered": 1}:
+                self.log_test(name, TestResult.FAIL, f"Could not register the pooled user: {created}")
+                return
+            restore_snapshot(store, snapshot, directory)
+
+            user = pool.lease(1, verify=True)[0]
+            try:
+                if pool.last_refresh != {"registered": 1}:
+                    self.log_test(name, TestResult.FAIL,
+                                  f"Dropped user was not registered again: {pool.last_refresh}")
+                    return
+                harness = OpenAPITestHarness(self.base_url)
+                user.apply(harness)
+                response = harness.make_request("POST", "/api/v1/me/hair-fall-logs", {
+                    "date": datetime.now().strftime("%Y-%m-%d"), "count": 10, "category": "SHOWER",
+                }, use_auth=True)
+            finally:
+                pool.release([user])
+
+        if response is not None and response.status_code == 200:
+            self.log_test(name, TestResult.PASS, "Pooled user re-registered and able to create data")
+        else:
+            self.log_test(name, TestResult.FAIL, f"Create as the re-registered user failed: "
+                                                 f"{response.status_code if response is not None else 'no response'}")
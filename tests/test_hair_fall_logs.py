@@ -35,6 +35,30 @@ class HairFallLogTests(OpenAPITestHarness):
             self.log_test("Get Hair Fall Logs", TestResult.FAIL, 
                         f"Failed to get hair fall logs: {response.status_code}")
 
+    def test_get_hair_fall_logs_cursor(self):
+        """Test GET /api/v1/me/hair-fall-logs following X-Next-Cursor"""
+        if not self.access_token:
+            self.log_test("Get Hair Fall Logs (Cursor)", TestResult.SKIP, "No access token")
+            return
+
+        # limit=1 so even a fresh user with one log gets a cursor back
+        logs, responses = self.follow_cursor("/api/v1/me/hair-fall-logs", limit=1, max_pages=20)
+        if not responses:
+            self.log_test("Get Hair Fall Logs (Cursor)", TestResult.FAIL, "No response")
+            return
+
+        failed = [r.status_code for r in responses if r.status_code != 200]
+        ids = [log.get("id") for log in logs]
+        if failed:
+            self.log_test("Get Hair Fall Logs (Cursor)", TestResult.FAIL,
+                        f"Cursor page failed: {failed[0]}")
+        elif len(ids) != len(set(ids)):
+            self.log_test("Get Hair Fall Logs (Cursor)", TestResult.FAIL,
+                        "Cursor pages returned the same log twice")
+        else:
+            self.log_test("Get Hair Fall Logs (Cursor)", TestResult.PASS,
+                        f"Followed {len(responses)} cursor page(s), {len(ids)} distinct logs")
+
     def test_create_hair_fall_log(self):
         """Test POST /api/v1/me/hair-fall-logs"""
         if not self.access_token:
@@ -1,14 +1,21 @@
 # test_harness_base.py
-import requests
 import json
 import time
 import uuid
 from datetime import datetime, timedelta
-from typing import Dict, Any, Optional, List, Tuple
+from typing import Dict, Any, Optional, List, Tuple, TYPE_CHECKING
 import sys
 from dataclasses import dataclass
 from enum import Enum
 
+from perf_metrics import classify_exception, endpoint_key, error_label, status_slot
+from spec_validators import ValidationSampler, get_validator
+
+if TYPE_CHECKING:
+    import requests
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor" # keyset pagination on list endpoints, see PageCursor.kt
+
 class TestResult(Enum):
     PASS = "✅ PASS"
     FAIL = "❌ FAIL"
@@ -21,11 +28,14 @@ class TestCase:
     result: TestResult
     message: str = ""
     response_data: Optional[Dict] = None
+    error_class: Optional[str] = None # e.g. "connect_refused", "http_503", "schema_mismatch"
 
 class OpenAPITestHarness:
     """Comprehensive test harness based on actual OpenAPI specification"""
     
     def __init__(self, base_url: str = "http://localhost:8080"):
+        import requests # deferred (~90ms): selection-only and --help runs never build a harness
+
         self.base_url = base_url
         self.session = requests.Session()
         self.access_token = None
@@ -35,13 +45,14 @@ class OpenAPITestHarness:
         self.user_password = None
         self.username = None
         self.test_results: List[TestCase] = []
+        self.recorder = None # perf_metrics.MetricsRecorder, set by perf_runner for load runs
+        self.request_id_prefix = uuid.uuid4().hex[:8] # X-Request-ID is <prefix>-<seq> outside load runs
+        self.request_seq = 0
+        self.last_error = None # error class of the most recent request/validation, None if it succeeded
+        self.validation = ValidationSampler("all") # which responses get the api_spec.json contract check
         
         # Test data storage for cross-test usage
-        self.created_hair_fall_log_id = None
-        self.created_intervention_id = None
-        self.created_photo_metadata_id = None
-        self.created_medical_sharing_session_id = None
-        self.created_medical_access_session_id = None # for professional medical access
+        self.forget_created_ids()
         
         # Generate unique test data
         timestamp = int(time.time())
@@ -55,18 +66,30 @@ class OpenAPITestHarness:
         print(f"🎯 Testing all endpoints from OpenAPI specification")
         print("-" * 70)
 
+    def forget_created_ids(self):
+        """Drop the ids of resources created so far, e.g. when the harness switches to another user"""
+        self.created_hair_fall_log_id = None
+        self.created_intervention_id = None
+        self.created_photo_metadata_id = None
+        self.created_medical_sharing_session_id = None
+        self.created_medical_access_session_id = None # for professional medical access
+
     def log_test(self, name: str, result: TestResult, message: str = "", response_data: Dict = None):
         """Log a test result with detailed information"""
-        test_case = TestCase(name, result, message, response_data)
+        error_class = self.last_error if result == TestResult.FAIL else None
+        test_case = TestCase(name, result, message, response_data, error_class)
         self.test_results.append(test_case)
         print(f"{result.value} {name}")
         if message:
             print(f"    💬 {message}")
+        if error_class:
+            print(f"    🏷️ {error_class}")
 
     def make_request(self, method: str, endpoint: str, data: Dict = None, 
                     headers: Dict = None, use_auth: bool = False, 
-                    params: Dict = None) -> requests.Response:
+                    params: Dict = None) -> "requests.Response":
         """Make HTTP request with comprehensive error handling"""
+        import requests
         url = f"{self.base_url}{endpoint}"
         
         if headers is None:
@@ -79,42 +102,96 @@ class OpenAPITestHarness:
             headers["Content-Type"] = "application/json"
             data = json.dumps(data)
         
+        # Lets server log lines be joined back to this call (perf_runner.py explain)
+        if self.recorder is not None:
+            headers["X-Request-ID"] = self.recorder.next_request_id()
+        else:
+            headers["X-Request-ID"] = f"{self.request_id_prefix}-{self.request_seq}"
+            self.request_seq += 1
+        
+        start = time.monotonic()
         try:
             response = self.session.request(
                 method, url, data=data, headers=headers, params=params, timeout=30
             )
+            if self.recorder is not None:
+                self.recorder.record(method, endpoint, start, time.monotonic() - start,
+                                     response.status_code, len(response.content))
+            slot = status_slot(response.status_code)
+            self.last_error = error_label(slot) if slot is not None else None
             return response
         except requests.exceptions.RequestException as e:
-            print(f"    ❌ Request failed: {e}")
+            slot = classify_exception(e)
+            if self.recorder is not None:
+                self.recorder.record(method, endpoint, start, time.monotonic() - start, 0, error=slot)
+            self.last_error = error_label(slot)
+            print(f"    ❌ Request failed ({self.last_error}): {e}")
             return None
 
-    def validate_response_schema(self, response: requests.Response, expected_fields: List[str]) -> Tuple[bool, List[str]]:
-        """Validate response contains expected fields"""
+    def follow_cursor(self, endpoint: str, limit: int = 50, max_pages: int = None,
+                      params: Dict = None) -> Tuple[List[Any], List["requests.Response"]]:
+        """Fetch pages by following X-Next-Cursor until a page comes back without one"""
+        items, responses = [], []
+        query = dict(params or {}, limit=limit)
+        while max_pages is None or len(responses) < max_pages:
+            response = self.make_request("GET", endpoint, use_auth=True, params=query)
+            if response is None:
+                break
+            responses.append(response)
+            if response.status_code != 200:
+                break
+            items.extend(response.json())
+            cursor = response.headers.get(NEXT_CURSOR_HEADER)
+            if not cursor:
+                break
+            query = dict(params or {}, limit=limit, cursor=cursor)
+        return items, responses
+
+    def validate_response_schema(self, response: "requests.Response", expected_fields: List[str]) -> Tuple[bool, List[str]]:
+        """Validate response contains expected fields and matches its api_spec.json contract"""
+        request = getattr(response, "request", None) # None for hand-built stand-ins wrapping nested objects
         try:
             data = response.json()
-            missing_fields = []
-            
-            if isinstance(data, list):
-                if len(data) > 0: # Check if list is not empty
-                    # For list of objects, check schema of first object
-                    if isinstance(data[0], dict):
-                        for field in expected_fields:
-                            if field not in data[0]:
-                                missing_fields.append(field)
-                    else:
-                        return False, ["Response is a list, but its elements are not dictionaries, cannot validate schema."]
-            elif isinstance(data, dict):
-                for field in expected_fields:
-                    if field not in data:
-                        missing_fields.append(field)
-            else:
-                return False, ["Response is not a dictionary or list of dictionaries."]
-            
-            return len(missing_fields) == 0, missing_fields
-        except json.JSONDecodeError:
-            return False, ["Invalid JSON response"]
+        except ValueError:
+            valid, problems = False, ["Invalid JSON response"]
         except Exception as e:
-            return False, [f"Schema validation error: {str(e)}"]
+            valid, problems = False, [f"Schema validation error: {str(e)}"]
+        else:
+            valid, problems = self._check_expected_fields(data, expected_fields)
+            if request is not None:
+                key = endpoint_key(request.method, request.path_url)
+                if self.validation.should_validate(key, response.status_code, suspect=not valid):
+                    contract_ok, contract_problems = get_validator().validate_response(
+                        request.method, request.path_url, response.status_code, data)
+                    if not contract_ok:
+                        self.validation.record_mismatch(key)
+                    valid = valid and contract_ok
+                    problems = problems + contract_problems
+        if not valid:
+            self.last_error = "schema_mismatch"
+            if self.recorder is not None and request is not None:
+                self.recorder.record_schema_mismatch(request.method, request.path_url)
+        return valid, problems
+
+    def _check_expected_fields(self, data: Any, expected_fields: List[str]) -> Tuple[bool, List[str]]:
+        missing_fields = []
+        if isinstance(data, list):
+            if len(data) > 0: # Check if list is not empty
+                # For list of objects, check schema of first object
+                if isinstance(data[0], dict):
+                    for field in expected_fields:
+                        if field not in data[0]:
+                            missing_fields.append(field)
+                else:
+                    return False, ["Response is a list, but its elements are not dictionaries, cannot validate schema."]
+        elif isinstance(data, dict):
+            for field in expected_fields:
+                if field not in data:
+                    missing_fields.append(field)
+        else:
+            return False, ["Response is not a dictionary or list of dictionaries."]
+        
+        return len(missing_fields) == 0, missing_fields
 
     # --- Core Health and Public Endpoint Tests (Moved from original harness) ---
     def test_health_endpoint(self):
@@ -0,0 +1,176 @@
+# token_refresher.py
+"""
+Background refresh of virtual users' tokens, for runs longer than a token's life.
+
+Access tokens live app.jwt.access-token-expiration (3600 s) and the scenarios never
+call test_token_refresh, so without this every worker of a soak run starts collecting
+401/403s an hour in. Each registered harness gets an entry in a min-heap keyed on when
+its access token should be refreshed: a random point in the last few minutes before
+its exp claim, so users that logged in together do not all refresh in the same second.
+A few daemon threads pop due entries, call /api/v1/auth/refresh-token with their own
+sessions and swap the new tokens into the harness between two of its requests.
+
+Refresh calls are recorded under their own endpoint name (SCHEDULED_REFRESH), so they
+show up in reports next to the scenario's endpoints instead of inside them, and are
+summarised in meta["token_refresh"].
+
+Tokens are read, not verified (user_pool.jwt_expiry); a harness whose tokens have no
+readable exp claim is not scheduled.
+
+Usage:
+    python perf_runner.py run --scenario mixed --workers 50 --duration 14400
+    python perf_runner.py run --duration 600 --no-token-refresh
+"""
+
+import heapq
+import random
+import threading
+import time
+from typing import Dict, List, Optional
+
+import requests
+
+from perf_metrics import MetricsRecorder, classify_exception
+from user_pool import AUTH_PATH, jwt_expiry
+
+REFRESH_PATH = f"{AUTH_PATH}/refresh-token"
+SCHEDULED_REFRESH = f"POST {REFRESH_PATH} (scheduled)"
+DEFAULT_MARGIN_S = 60.0 # refresh at least this long before exp...
+DEFAULT_SPREAD_S = 240.0 # ...at a random point in the window this much wider
+RETRY_S = 15.0
+
+
+class TokenRefresher:
+    """Min-heap of (refresh_at, key) over registered harnesses, drained by `threads` daemon threads"""
+
+    def __init__(self, base_url: str, recorder: MetricsRecorder, threads: int = 2,
+                 margin_s: float = DEFAULT_MARGIN_S, spread_s: float = DEFAULT_SPREAD_S):
+        self.base_url = base_url.rstrip("/")
+        self.recorder = recorder # shared by the refresh threads, guarded by self.record_lock
+        self.record_lock = threading.Lock()
+        self.threads = threads
+        self.margin_s = margin_s
+        self.spread_s = spread_s
+        self.heap: List[tuple] = [] # (refresh_at wall clock, sequence, key)
+        self.harnesses: Dict[int, object] = {}
+        self.cond = threading.Condition()
+        self.stopped = False
+        self.sequence = 0
+        self.counts = {"scheduled": 0, "refreshed": 0, "failed": 0, "late": 0, "dropped": 0, "unreadable": 0}
+        self.lead_s: List[float] = [] # time left on the access token when it was replaced
+        self._threads: List[threading.Thread] = []
+
+    def _due(self, access_token: Optional[str]) -> Optional[float]:
+        expiry = jwt_expiry(access_token)
+        if not expiry:
+            return None
+        return expiry - self.margin_s - random.uniform(0.0, self.spread_s)
+
+    def _push(self, when: float, key: int):
+        # Callers hold self.cond
+        heapq.heappush(self.heap, (when, self.sequence, key))
+        self.sequence += 1
+        self.cond.notify()
+
+    def register(self, key: int, harness):
+        """Keep `harness` (worker `key`) authenticated until stop(); re-registering replaces the entry"""
+        if not harness.refresh_token:
+            return
+        when = self._due(harness.access_token)
+        with self.cond:
+            if when is None:
+                self.counts["unreadable"] += 1
+                return
+            self.harnesses[key] = harness
+            self.counts["scheduled"] += 1
+            self._push(when, key)
+
+    def unregister(self, key: int):
+        with self.cond:
+            self.harnesses.pop(key, None) # its heap entry is skipped when it comes up
+
+    def start(self):
+        self._threads = [threading.Thread(target=self._loop, daemon=True, name=f"token-refresh-{i}")
+                         for i in range(self.threads)]
+        for t in self._threads:
+            t.start()
+
+    def stop(self):
+        with self.cond:
+            self.stopped = True
+            self.cond.notify_all()
+        for t in self._threads:
+            t.join()
+
+    def _next(self) -> Optional[tuple]:
+        """Block until an entry is due; None once stopped"""
+        with self.cond:
+            while not self.stopped:
+                if not self.heap:
+                    self.cond.wait()
+                    continue
+                when, _, key = self.heap[0]
+                wait = when - time.time()
+                if wait > 0:
+                    self.cond.wait(wait)
+                    continue
+                heapq.heappop(self.heap)
+                harness = self.harnesses.get(key)
+                if harness is not None:
+                    return key, harness
+            return None
+
+    def _loop(self):
+        session = requests.Session()
+        while True:
+            entry = self._next()
+            if entry is None:
+                return
+            key, harness = entry
+            when = self._refresh(session, harness)
+            with self.cond:
+                if when is None:
+                    self.harnesses.pop(key, None)
+                elif self.harnesses.get(key) is harness:
+                    self._push(when, key)
+
+    def _refresh(self, session: requests.Session, harness) -> Optional[float]:
+        """Refresh one harness; returns when to refresh it next, None to give up on it"""
+        refresh_token = harness.refresh_token
+        now = time.time()
+        if jwt_expiry(refresh_token) <= now:
+            with self.cond:
+                self.counts["dropped"] += 1
+            return None
+        start = time.monotonic()
+        status, nbytes, error, auth = 0, 0, None, None
+        try:
+            response = session.post(f"{self.base_url}{REFRESH_PATH}", json={"refreshToken": refresh_token}, timeout=30)
+            status, nbytes = response.status_code, len(response.content)
+            auth = response.json() if status == 200 else None
+        except requests.exceptions.RequestException as e:
+            error = classify_exception(e)
+        except ValueError:
+            auth = None
+        with self.record_lock:
+            self.recorder.record("POST", REFRESH_PATH, start, time.monotonic() - start, status, nbytes,
+                                 error=error, endpoint_name=SCHEDULED_REFRESH)
+        if not isinstance(auth, dict) or not auth.get("accessToken") or not auth.get("refreshToken"):
+            with self.cond:
+                self.counts["failed"] += 1
+            return time.time() + RETRY_S
+        left = jwt_expiry(harness.access_token) - time.time()
+        # The harness thread reads these per request; each assignment is atomic under the GIL
+        harness.access_token, harness.refresh_token = auth["accessToken"], auth["refreshToken"]
+        with self.cond:
+            self.counts["refreshed"] += 1
+            self.counts["late"] += left <= 0
+            self.lead_s.append(left)
+        return self._due(harness.access_token)
+
+    def summary(self) -> Dict:
+        with self.cond:
+            lead = sorted(self.lead_s)
+            return dict(self.counts, pending=len(self.harnesses),
+                        min_lead_s=lead[0] if lead else None,
+                        median_lead_s=lead[len(lead) // 2] if lead else None)
@@ -0,0 +1,283 @@
+# upload_pipeline_bench.py
+"""
+End-to-end progress-photo uploads: upload URL, blob PUT, finalize.
+
+test_request_upload_url stops at the URL PhotoMetadataService hands out. Here every
+photo goes through the whole pipeline a client runs:
+
+  1. url        POST /api/v1/me/progress-photos/upload-url (metadata row + upload URL)
+  2. put        PUT of the encrypted blob to that URL; --blob-base sends it to a local
+                blob-store stand-in instead of the host in the URL (path and query kept)
+  3. finalize   POST /api/v1/me/progress-photos/{id}/finalize with the stored size
+
+Photos are uploaded by one user, --photos per concurrency level, at every
+--concurrency given. Each stage is timed on its own (p50/p95/p99 per level) and the
+level reports photos/s end to end and MB/s of blob bytes accepted.
+
+With --corpus, blobs come from a pre-built photo corpus (perf_runner.py corpus): sizes
+and angles follow PhotoAngle, and each PUT is written with sendfile(2) from the
+memory-mapped file over a kept-alive http.client connection, so the client neither
+produces nor copies photo bytes. Without it every photo is the same --photo-kb of
+random bytes, drawn once per run.
+
+Every request is recorded (samples.npz); blob PUTs are kept under one endpoint name
+(BLOB_PUT), and meta["upload"] holds the per-level results.
+
+Usage:
+    python perf_runner.py upload --blob-base http://localhost:9000 --photos 2000 --concurrency 8 --concurrency 64
+    python perf_runner.py upload --photo-kb 4096 --photos 200
+    python perf_runner.py upload --corpus .photo_corpus/corpus.bin --blob-base http://localhost:9000 --concurrency 128
+"""
+
+import contextlib
+import http.client
+import os
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+import numpy as np
+import requests
+
+from perf_metrics import EndpointTable, MetricsRecorder, RunBundle, classify_exception, new_run_meta
+
+PHOTOS_PATH = "/api/v1/me/progress-photos"
+UPLOAD_URL_PATH = f"{PHOTOS_PATH}/upload-url"
+BLOB_PUT = "PUT <blob>/upload/photos/{userId}/{photoId}/{filename}"
+ANGLES = ("VERTEX", "HAIRLINE", "TEMPLES", "LEFT_SIDE", "RIGHT_SIDE", "BACK") # PhotoAngle
+STAGES = ("url", "put", "finalize", "total")
+DEFAULT_CONCURRENCY = (8, 32)
+DEFAULT_PHOTO_KB = 1536
+
+
+def blob_url(upload_url: str, blob_base: Optional[str]) -> str:
+    """The upload URL, re-pointed at `blob_base` when one is given"""
+    if not blob_base:
+        return upload_url
+    parsed = urlparse(upload_url)
+    path = parsed.path if parsed.path.startswith("/") else "/" + parsed.path
+    return blob_base.rstrip("/") + path + (f"?{parsed.query}" if parsed.query else "")
+
+
+class UploadPipelineBench:
+    """Runs the three-stage upload for --photos photos at each concurrency level"""
+
+    def __init__(self, base_url: str, blob_base: Optional[str] = None, photos: int = 500,
+                 concurrency=DEFAULT_CONCURRENCY, photo_bytes: int = DEFAULT_PHOTO_KB * 1024,
+                 name: str = None, corpus: Optional[str] = None):
+        self.base_url = base_url
+        self.blob_base = blob_base
+        self.photos = photos
+        self.levels = list(concurrency)
+        self.photo_bytes = photo_bytes
+        self.name = name or f"upload-{time.strftime('%Y%m%d-%H%M%S')}"
+        self.run_id = uuid.uuid4().hex[:8]
+        self.email = f"upload_{self.run_id}@hairhealth.com"
+        self.password = f"UploadPass_{self.run_id}!"
+        self.key_info = f'{{"keyId":"{uuid.uuid4()}","algorithm":"AES-256-GCM","keyVersion":"v1"}}'
+        self.payload = b""
+        self.corpus_path = corpus
+        self.corpus = None # photo_corpus.PhotoCorpus when --corpus is given
+
+        self.t0 = 0.0
+        self.endpoints = EndpointTable()
+        self.recorders: List[MetricsRecorder] = []
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.access_token: Optional[str] = None
+        self.results: Dict[str, Dict] = {}
+
+    def _new_harness(self):
+        from main_runner import ComprehensiveTestRunner
+
+        harness = ComprehensiveTestRunner(self.base_url)
+        harness.user_email, harness.user_password = self.email, self.password
+        harness.username = self.email.split("@")[0]
+        return harness
+
+    def authenticate(self) -> bool:
+        harness = self._new_harness()
+        harness.test_user_registration()
+        if not harness.access_token:
+            harness.test_user_login()
+        self.access_token = harness.access_token
+        return self.access_token is not None
+
+    def worker_harness(self):
+        """This thread's harness, with its own recorder and blob session, created on first use"""
+        harness = getattr(self.local, "harness", None)
+        if harness is None:
+            harness = self._new_harness()
+            harness.access_token = self.access_token
+            with self.lock:
+                harness.recorder = MetricsRecorder(self.endpoints, self.t0, worker=len(self.recorders),
+                                                   run_id=self.run_id)
+                self.recorders.append(harness.recorder)
+            self.local.harness = harness
+            self.local.blob_session = requests.Session()
+            self.local.blob_connections = {}
+        return harness
+
+    def _send_corpus_blob(self, url: str, index: int, request_id: str) -> Tuple[int, int]:
+        """PUT corpus blob `index` over this thread's connection to the blob host; (status, response bytes)"""
+        parsed = urlparse(url)
+        key = (parsed.scheme, parsed.netloc)
+        conn = self.local.blob_connections.get(key)
+        if conn is None:
+            factory = http.client.HTTPSConnection if parsed.scheme == "https" else http.client.HTTPConnection
+            conn = self.local.blob_connections[key] = factory(parsed.netloc, timeout=120)
+        try:
+            conn.putrequest("PUT", parsed.path + (f"?{parsed.query}" if parsed.query else ""),
+                            skip_accept_encoding=True)
+            conn.putheader("Content-Type", "application/octet-stream")
+            conn.putheader("Content-Length", str(self.corpus.blob(index).length))
+            conn.putheader("X-Request-ID", request_id)
+            conn.endheaders()
+            self.corpus.send(conn.sock, index)
+            response = conn.getresponse()
+            return response.status, len(response.read())
+        except Exception:
+            conn.close()
+            del self.local.blob_connections[key]
+            raise
+
+    def _put_blob(self, harness, url: str, index: int) -> bool:
+        start = time.monotonic()
+        request_id = harness.recorder.next_request_id()
+        try:
+            if self.corpus is not None:
+                status, nbytes = self._send_corpus_blob(url, index, request_id)
+            else:
+                response = self.local.blob_session.put(url, data=self.payload, timeout=120,
+                                                       headers={"Content-Type": "application/octet-stream",
+                                                                "X-Request-ID": request_id})
+                status, nbytes = response.status_code, len(response.content)
+        except (requests.exceptions.RequestException, http.client.HTTPException, OSError) as e:
+            harness.recorder.record("PUT", BLOB_PUT, start, time.monotonic() - start, 0,
+                                    error=classify_exception(e), endpoint_name=BLOB_PUT)
+            return False
+        harness.recorder.record("PUT", BLOB_PUT, start, time.monotonic() - start, status, nbytes,
+                                endpoint_name=BLOB_PUT)
+        return status in (200, 201, 204)
+
+    def blob_size(self, index: int) -> int:
+        return self.corpus.blob(index).length if self.corpus is not None else len(self.payload)
+
+    def upload(self, index: int) -> Optional[tuple]:
+        """One photo through all three stages; per-stage seconds and blob bytes, or None when a stage failed"""
+        harness = self.worker_harness()
+        started = time.monotonic()
+        response = harness.make_request("POST", UPLOAD_URL_PATH, use_auth=True, data={
+            "filename": f"bench_{index}.jpg",
+            "angle": self.corpus.blob(index).angle if self.corpus is not None else ANGLES[index % len(ANGLES)],
+            "captureDate": datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"),
+            "encryptionKeyInfo": self.key_info,
+        })
+        try:
+            session = response.json() if response is not None and response.status_code == 200 else {}
+        except ValueError:
+            session = {}
+        if not isinstance(session, dict) or not session.get("uploadUrl") or not session.get("photoMetadataId"):
+            return None
+        url_done = time.monotonic()
+        if not self._put_blob(harness, blob_url(session["uploadUrl"], self.blob_base), index):
+            return None
+        put_done = time.monotonic()
+        response = harness.make_request("POST", f"{PHOTOS_PATH}/{session['photoMetadataId']}/finalize",
+                                        data={"fileSize": self.blob_size(index)}, use_auth=True)
+        if response is None or response.status_code != 200:
+            return None
+        done = time.monotonic()
+        return url_done - started, put_done - url_done, done - put_done, done - started, self.blob_size(index)
+
+    def run_level(self, concurrency: int):
+        started = time.monotonic()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            timings = [t for t in pool.map(self.upload, range(self.photos)) if t is not None]
+        elapsed = time.monotonic() - started
+        if self.corpus is not None:
+            self.corpus.close_thread_files() # this level's threads are gone; don't carry their handles over
+        timings = np.array(timings, dtype=np.float64).reshape(-1, len(STAGES) + 1)
+        stages = timings[:, :len(STAGES)] * 1000.0
+        result = {"photos": self.photos, "completed": len(timings), "failed": self.photos - len(timings),
+                  "seconds": elapsed, "photos_per_s": len(timings) / max(elapsed, 1e-9),
+                  "mb_per_s": timings[:, -1].sum() / 1e6 / max(elapsed, 1e-9)}
+        for i, stage in enumerate(STAGES):
+            column = stages[:, i]
+            result[stage] = ({f"p{q}_ms": float(np.percentile(column, q)) for q in (50, 95, 99)}
+                             if column.size else None)
+        self.results[f"c{concurrency}"] = result
+
+    def run(self) -> RunBundle:
+        if self.corpus_path:
+            from photo_corpus import PhotoCorpus
+
+            try:
+                self.corpus = PhotoCorpus(self.corpus_path)
+            except (OSError, ValueError) as e:
+                raise RuntimeError(str(e))
+            self.key_info = self.corpus.key_info
+            self.photo_bytes = self.corpus.total_bytes() // len(self.corpus)
+        else:
+            self.payload = np.random.default_rng().bytes(self.photo_bytes)
+        self.t0 = time.monotonic()
+        meta = new_run_meta(self.name, self.base_url, scenario="upload-pipeline", photos=self.photos,
+                            concurrency=self.levels, photo_bytes=self.photo_bytes, blob_base=self.blob_base,
+                            corpus=self.corpus_path, run_id=self.run_id, user_email=self.email)
+        try:
+            with open(os.devnull, "w") as sink, contextlib.redirect_stdout(sink):
+                if not self.authenticate():
+                    raise RuntimeError(f"could not authenticate as {self.email}")
+                for level in self.levels:
+                    print(f"📸 c{level}: {self.photos:,} photos of {self.photo_bytes / 1024:,.0f} KiB"
+                          f"{' on average' if self.corpus is not None else ''}", file=sys.stderr)
+                    self.run_level(level)
+        finally:
+            if self.corpus is not None:
+                self.corpus.close()
+
+        meta["duration_s"] = time.monotonic() - self.t0
+        bundle = RunBundle.from_recorders(self.recorders, meta)
+        bundle.meta["upload"] = self.results
+        return bundle
+
+
+def print_upload(results: Dict):
+    print(f"\n📸 {'Level':<6} {'done':>7} {'failed':>7} {'photos/s':>9} {'MB/s':>8} "
+          + " ".join(f"{stage + ' p50/p99':>18}" for stage in STAGES))
+    for level, r in results.items():
+        cells = " ".join(f"{r[s]['p50_ms']:>8.1f}/{r[s]['p99_ms']:<9.1f}" if r[s] else f"{'-':>18}" for s in STAGES)
+        print(f"   {level:<6} {r['completed']:>7,} {r['failed']:>7,} {r['photos_per_s']:>9.1f} {r['mb_per_s']:>8.1f} {cells}")
+
+
+def configure_parser(parser):
+    parser.add_argument("--url", default="http://localhost:8080", help="Base URL for the backend API")
+    parser.add_argument("--blob-base", help="Send blob PUTs here instead of the upload URL's own host "
+                                            "(e.g. a local blob-store stand-in)")
+    parser.add_argument("--photos", type=int, default=500, help="Photos uploaded per concurrency level")
+    parser.add_argument("--concurrency", type=int, action="append",
+                        help=f"Concurrent uploads (repeatable, default: {', '.join(map(str, DEFAULT_CONCURRENCY))})")
+    parser.add_argument("--photo-kb", type=int, default=DEFAULT_PHOTO_KB, help="Size of each encrypted blob (KiB)")
+    parser.add_argument("--corpus", help="Send blobs from this photo corpus (perf_runner.py corpus) instead; "
+                                         "overrides --photo-kb")
+    parser.add_argument("--name", help="Bundle name (default: upload-<timestamp>)")
+    parser.add_argument("--out-dir", default="runs", help="Directory that receives the run bundle")
+
+
+def run_command(args) -> int:
+    bench = UploadPipelineBench(args.url, args.blob_base, args.photos, tuple(args.concurrency or DEFAULT_CONCURRENCY),
+                                args.photo_kb * 1024, args.name, args.corpus)
+    try:
+        bundle = bench.run()
+    except RuntimeError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
+    path = bundle.save(os.path.join(args.out_dir, bench.name))
+    print_upload(bundle.meta["upload"])
+    print(f"\n✅ {bundle.meta['requests']:,} requests -> {path}")
+    return 0
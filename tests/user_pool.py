@@ -0,0 +1,275 @@
+# user_pool.py
+"""
+A file of pre-registered users with cached tokens, leased to load workers.
+
+Registration and login both cost a bcrypt hash on the server (passwordEncoder
+in AuthService), so a run that registers every virtual user starts with a hashing
+storm that has nothing to do with what is being measured. The pool is registered
+once (`pool create`), and every run then:
+
+  1. leases N users under an exclusive lock on the pool file; a lease carries an
+     expiry, so users held by a crashed run come back by themselves
+  2. refreshes them in bulk through /api/v1/auth/refresh-token (no password
+     check, just two token signatures); only users whose refresh token expired
+     or was refused fall back to /login, and users the database no longer has
+     (e.g. after a snapshot restore) are registered again. Access tokens are
+     checked by signature only, so an unexpired one is kept as is unless the
+     lease asks to verify: after a restore every user goes through
+     /refresh-token, the one call that looks the user up
+  3. writes the rotated tokens back and releases the lease at the end
+
+Tokens are read, not verified: their exp claim decides what needs refreshing.
+
+Usage:
+    python perf_runner.py pool create --size 10000 --workers 32
+    python perf_runner.py pool status
+    python perf_runner.py run --scenario mixed --workers 200 --user-pool .user_pool/localhost_8080.json
+"""
+
+import base64
+import contextlib
+import fcntl
+import json
+import os
+import socket
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
+
+import requests
+
+from impact_selector import HERE
+
+POOL_DIR = os.path.join(HERE, ".user_pool")
+POOL_FORMAT = 1
+AUTH_PATH = "/api/v1/auth"
+DEFAULT_LEASE_S = 6 * 3600
+REFRESH_MARGIN_S = 300 # tokens expiring sooner than this are refreshed at lease time
+
+
+def default_pool_path(base_url: str) -> str:
+    netloc = urlparse(base_url).netloc or base_url
+    return os.path.join(POOL_DIR, netloc.replace(":", "_") + ".json")
+
+
+def jwt_expiry(token: Optional[str]) -> float:
+    """exp claim of a JWT (unverified), 0 when it cannot be read"""
+    try:
+        payload = token.split(".")[1]
+        return float(json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))["exp"])
+    except (AttributeError, IndexError, ValueError, KeyError, TypeError):
+        return 0.0
+
+
+@dataclass
+class PooledUser:
+    email: str
+    password: str
+    username: str
+    user_id: Optional[str] = None
+    access_token: Optional[str] = None
+    refresh_token: Optional[str] = None
+    lease_owner: Optional[str] = None
+    lease_expires_at: float = 0.0
+
+    def leased(self, now: float) -> bool:
+        return self.lease_owner is not None and self.lease_expires_at > now
+
+    def apply(self, harness):
+        """Make a harness act as this user"""
+        harness.user_email, harness.user_password, harness.username = self.email, self.password, self.username
+        harness.user_id, harness.access_token, harness.refresh_token = self.user_id, self.access_token, self.refresh_token
+
+    def take(self, harness):
+        """Keep the tokens a harness ended up with (e.g. after test_token_refresh rotated them)"""
+        if harness.refresh_token:
+            self.access_token, self.refresh_token = harness.access_token, harness.refresh_token
+
+
+class UserPool:
+    """Reads and rewrites the pool file under an exclusive flock on <pool>.lock"""
+
+    def __init__(self, path: str, base_url: str, workers: int = 16):
+        self.path = path
+        self.base_url = base_url.rstrip("/")
+        self.workers = workers
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self.local = threading.local()
+        self.last_refresh: Dict[str, int] = {}
+
+    @contextlib.contextmanager
+    def _locked(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with open(self.path + ".lock", "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                users = self._read()
+                yield users
+                self._write(users)
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _read(self) -> List[PooledUser]:
+        if not os.path.exists(self.path):
+            return []
+        with open(self.path) as f:
+            data = json.load(f)
+        if data.get("base_url") != self.base_url:
+            raise ValueError(f"{self.path} holds users of {data.get('base_url')}, not {self.base_url}")
+        return [PooledUser(**u) for u in data["users"]]
+
+    def _write(self, users: List[PooledUser]):
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump({"format": POOL_FORMAT, "base_url": self.base_url, "users": [asdict(u) for u in users]}, f)
+        os.replace(tmp, self.path)
+
+    # --- server calls ---
+
+    def _session(self) -> requests.Session:
+        session = getattr(self.local, "session", None)
+        if session is None:
+            session = self.local.session = requests.Session()
+        return session
+
+    def _post(self, path: str, body: Dict) -> Optional[Dict]:
+        try:
+            response = self._session().post(f"{self.base_url}{AUTH_PATH}{path}", json=body, timeout=30)
+            auth = response.json() if response.status_code == 200 else None
+        except (requests.exceptions.RequestException, ValueError):
+            return None
+        return auth if isinstance(auth, dict) and auth.get("accessToken") and auth.get("refreshToken") else None
+
+    def _store(self, user: PooledUser, auth: Dict):
+        user.access_token, user.refresh_token = auth["accessToken"], auth["refreshToken"]
+        user.user_id = (auth.get("user") or {}).get("id", user.user_id)
+
+    def authenticate(self, user: PooledUser, now: float, verify: bool = False) -> str:
+        """Cheapest way to valid tokens: keep, refresh, login, register. Returns what it took.
+        With verify, a cached access token is not trusted to mean the user still exists."""
+        if not verify and jwt_expiry(user.access_token) > now + REFRESH_MARGIN_S:
+            return "cached"
+        if jwt_expiry(user.refresh_token) > now + 60:
+            auth = self._post("/refresh-token", {"refreshToken": user.refresh_token})
+            if auth:
+                self._store(user, auth)
+                return "refreshed"
+        auth = self._post("/login", {"email": user.email, "password": user.password})
+        if auth:
+            self._store(user, auth)
+            return "login"
+        auth = self._post("/register", {"email": user.email, "password": user.password, "username": user.username})
+        if auth:
+            self._store(user, auth)
+            return "registered"
+        return "failed"
+
+    def _authenticate_all(self, users: List[PooledUser], verify: bool = False) -> Dict[str, int]:
+        now = time.time()
+        counts: Dict[str, int] = {}
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            for outcome in pool.map(lambda u: self.authenticate(u, now, verify), users):
+                counts[outcome] = counts.get(outcome, 0) + 1
+        return counts
+
+    # --- pool operations ---
+
+    def create(self, size: int, prefix: str = "pool") -> Dict[str, int]:
+        """Grow the pool to `size` users, registering only the new ones"""
+        with self._locked() as users:
+            tag = uuid.uuid4().hex[:6]
+            new = [PooledUser(f"{prefix}_{tag}_{i}@hairhealth.com", f"PoolPass_{tag}_{i}!", f"{prefix}_{tag}_{i}")
+                   for i in range(max(size - len(users), 0))]
+        counts = self._authenticate_all(new)
+        with self._locked() as users:
+            users.extend(u for u in new if u.refresh_token)
+        return counts
+
+    def lease(self, count: int, ttl: float = DEFAULT_LEASE_S, verify: bool = False) -> List[PooledUser]:
+        """Lease `count` users and make sure each has a fresh access token; verify (e.g. after a
+        snapshot restore) also makes sure each still exists, registering it again if not"""
+        now = time.time()
+        with self._locked() as users:
+            free = [u for u in users if not u.leased(now)]
+            if len(free) < count:
+                raise RuntimeError(f"{self.path}: {count} users wanted, {len(free)} of {len(users)} free "
+                                   f"(grow it with `perf_runner.py pool create --size {len(users) + count - len(free)}`)")
+            leased = free[:count]
+            for user in leased:
+                user.lease_owner, user.lease_expires_at = self.owner, now + ttl
+        self.last_refresh = self._authenticate_all(leased, verify)
+        self.checkpoint(leased)
+        return leased
+
+    def checkpoint(self, leased: List[PooledUser]):
+        """Write the leased users' current tokens back, keeping the lease"""
+        mine = {u.email: u for u in leased}
+        with self._locked() as users:
+            for i, user in enumerate(users):
+                if user.email in mine and user.lease_owner == self.owner:
+                    users[i] = mine[user.email]
+
+    def release(self, leased: List[PooledUser]):
+        for user in leased:
+            user.lease_owner, user.lease_expires_at = None, 0.0
+        mine = {u.email: u for u in leased}
+        with self._locked() as users:
+            for i, user in enumerate(users):
+                if user.email in mine and user.lease_owner in (self.owner, None):
+                    users[i] = mine[user.email]
+
+    def refresh_all(self) -> Dict[str, int]:
+        """Bring every user's tokens up to date (leased ones included; their holders keep working)"""
+        with self._locked() as users:
+            return self._authenticate_all(users)
+
+    def clear_leases(self) -> int:
+        with self._locked() as users:
+            held = [u for u in users if u.lease_owner]
+            for user in held:
+                user.lease_owner, user.lease_expires_at = None, 0.0
+        return len(held)
+
+    def status(self) -> Dict[str, int]:
+        now = time.time()
+        with self._locked() as users:
+            return {
+                "users": len(users),
+                "leased": sum(u.leased(now) for u in users),
+                "fresh_access": sum(jwt_expiry(u.access_token) > now + REFRESH_MARGIN_S for u in users),
+                "valid_refresh": sum(jwt_expiry(u.refresh_token) > now for u in users),
+            }
+
+
+def configure_parser(parser):
+    parser.add_argument("action", choices=("create", "status", "refresh", "clear-leases"),
+                        help="create/grow the pool, show it, refresh every token now, or drop all leases")
+    parser.add_argument("--url", default="http://localhost:8080", help="Base URL for the backend API")
+    parser.add_argument("--pool", help="Pool file (default: .user_pool/<host>_<port>.json)")
+    parser.add_argument("--size", type=int, default=1000, help="create: users the pool should hold")
+    parser.add_argument("--workers", type=int, default=16, help="Concurrent auth calls")
+
+
+def run_command(args) -> int:
+    pool = UserPool(args.pool or default_pool_path(args.url), args.url, args.workers)
+    try:
+        if args.action == "create":
+            started = time.monotonic()
+            counts = pool.create(args.size)
+            print(f"👥 {sum(counts.values()):,} users added in {time.monotonic() - started:.1f}s: {counts}")
+        elif args.action == "refresh":
+            print(f"🔄 {pool.refresh_all()}")
+        elif args.action == "clear-leases":
+            print(f"🔓 {pool.clear_leases():,} leases dropped")
+        status = pool.status()
+    except (ValueError, RuntimeError) as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
+    print(f"📒 {pool.path}: {status['users']:,} users, {status['leased']:,} leased, "
+          f"{status['fresh_access']:,} with a fresh access token, {status['valid_refresh']:,} with a valid refresh token")
+    return 0